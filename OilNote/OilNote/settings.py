@@ -113,6 +113,19 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# 웹 워커(프로세스)가 여러 개라도 같은 캐시를 보도록 DB 캐시 테이블 사용
+# (고객 요약 캐시 무효화, 매출 업로드 중복 요청 방지). 배포 시 한 번 실행: python manage.py createcachetable
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "oilnote_cache",
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -287,6 +300,35 @@ CSRF_FAILURE_VIEW = 'django.views.csrf.csrf_failure'
 CSRF_COOKIE_HTTPONLY = False
 CSRF_USE_SESSIONS = False
 
+# FTP 다운로드 (ftp_data_loader 동시 다운로드 모드)
+FTP_DOWNLOAD_MAX_WORKERS = 16          # 전체 서버 합계 동시 다운로드 수
+FTP_DOWNLOAD_WORKERS_PER_SERVER = 4    # 서버당 동시 연결(로그인 세션) 수
+FTP_DOWNLOAD_TIMEOUT = 30              # 연결/전송 타임아웃(초)
+FTP_DOWNLOAD_RETRIES = 3               # 일시적 오류 재시도 횟수
+FTP_DOWNLOAD_RETRY_BACKOFF = 1.0       # 첫 재시도 대기(초), 재시도마다 2배
+FTP_INGEST_WORKERS = 4                 # 받은 매출 파일 동시 처리 주유소 수
+FTP_INGEST_PROCESSING_TIMEOUT_SECONDS = 1800  # 처리 중(processing)으로 이보다 오래 남은 파일은 중단된 것으로 보고 다시 처리
+FTP_STREAM_INGEST = False              # True: 받은 파일을 메모리에서 바로 매출 처리, 보관본은 별도 스레드에서 저장
+FTP_STREAM_SPOOL_MAX_BYTES = 8 * 1024 * 1024  # 스트리밍 수신 시 이 크기까지는 메모리, 넘으면 임시 파일
+FTP_ARCHIVE_WORKERS = 2                # 스트리밍 모드 보관본 저장 스레드 수
+
+# FTP 스케줄러 (manage.py run_ftp_scheduler)
+FTP_SCHEDULER_POLL_SECONDS = 30        # 실행 시각 확인 주기(초)
+FTP_SCHEDULER_JITTER_SECONDS = 300     # 스케줄별 실행 분산 최대값(초), 주기의 절반을 넘지 않음
+FTP_SCHEDULER_MAX_CONCURRENT = 4       # 동시에 실행할 서버 수
+
+# 대량 쿠폰 발행 작업 (manage.py recover_coupon_issue_jobs)
+COUPON_ISSUE_JOB_TIMEOUT_MINUTES = 30  # 생성 후 이 시간이 지나도 끝나지 않은 작업은 중단된 것으로 보고 수량 반환
+
+# 로그성 테이블 보존 기간 (manage.py purge_old_logs)
+# field 가 days 일보다 오래된 행을 PK 구간(batch_size)마다 나눠 지우고 구간 사이에 sleep 초 쉼
+LOG_RETENTION_POLICIES = {
+    'ftp_data_loader.FTPDataLog': {'field': 'created_at', 'days': 30, 'batch_size': 2000},
+    'admin.LogEntry': {'field': 'action_time', 'days': 365},
+    # 고객 방문 내역은 월별 집계 시그널이 구간마다 실행됨 (보관 정책 확정 전까지 비활성)
+    'OilNote_UserApp.CustomerVisitHistory': {'field': 'visit_date', 'days': 365 * 5, 'batch_size': 500, 'enabled': False},
+}
+
 # logs 디렉토리가 없으면 생성
 if not os.path.exists(os.path.join(BASE_DIR, 'logs')):
     os.makedirs(os.path.join(BASE_DIR, 'logs'))
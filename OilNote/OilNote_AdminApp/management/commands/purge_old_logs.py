@@ -0,0 +1,71 @@
+"""
+로그성 테이블 보존 기간 정리 배치 작업
+
+settings.LOG_RETENTION_POLICIES 의 테이블별 정책대로 보존 기간이 지난 행을
+PK 구간 단위로 나눠 삭제합니다.
+크론탭 설정 예시:
+30 3 * * * /path/to/python /path/to/manage.py purge_old_logs
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from OilNote_AdminApp.services.retention import get_policies, purge_expired
+
+
+class Command(BaseCommand):
+    help = '보존 기간이 지난 로그성 데이터 정리'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='models',
+            help='이 모델만 처리 (앱.모델, 여러 번 지정 가능, 지정하면 비활성 정책도 실행)'
+        )
+        parser.add_argument('--days', type=int, help='보존 일수 (정책 값 대신 사용)')
+        parser.add_argument('--batch-size', type=int, help='한 번에 지울 PK 구간 크기 (정책 값 대신 사용)')
+        parser.add_argument('--sleep', type=float, help='구간 사이 대기(초) (정책 값 대신 사용)')
+        parser.add_argument('--dry-run', action='store_true', help='삭제하지 않고 대상 행 수만 출력')
+
+    def handle(self, *args, **options):
+        for name in ('days', 'batch_size'):
+            if options[name] is not None and options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} 는 1 이상이어야 합니다.")
+        if options['sleep'] is not None and options['sleep'] < 0:
+            raise CommandError('--sleep 은 0 이상이어야 합니다.')
+
+        try:
+            policies = get_policies(options['models'])
+        except (ValueError, LookupError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS('=== 보존 기간 정리 시작 ==='))
+        total_deleted = 0
+        for policy in policies:
+            if not policy['enabled'] and not options['models']:
+                self.stdout.write(f"⏭ {policy['label']}: 비활성 정책 (--model 로 지정하면 실행)")
+                continue
+
+            days = options['days'] or policy['days']
+            result = purge_expired(
+                policy['model'],
+                policy['field'],
+                days,
+                batch_size=options['batch_size'] or policy['batch_size'],
+                sleep=policy['sleep'] if options['sleep'] is None else options['sleep'],
+                dry_run=options['dry_run']
+            )
+            total_deleted += result['deleted']
+            if options['dry_run']:
+                self.stdout.write(f"🔍 {policy['label']}: {result['deleted']:,}행 삭제 예정 ({policy['field']} < {result['cutoff']}, {days}일)")
+                continue
+
+            rate = result['deleted'] / result['seconds'] if result['seconds'] else 0
+            self.stdout.write(
+                f"✅ {policy['label']}: {result['deleted']:,}행 삭제, {result['batches']}구간 "
+                f"({result['seconds']:.1f}초, {rate:,.0f}행/초)"
+            )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'🔍 시뮬레이션 완료: {total_deleted:,}행 삭제 예정'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'🎉 정리 완료: {total_deleted:,}행 삭제'))
@@ -0,0 +1,107 @@
+"""
+로그성 테이블 보존 기간 정리
+
+보존 기간이 지난 행을 한 번의 DELETE 로 지우면 큰 테이블에서는 대상 ID 를 모두 메모리에 올리거나
+테이블을 오래 잠근다. 여기서는 지울 행의 PK 최솟값/최댓값을 한 번 구한 뒤 PK 구간(batch_size)
+단위로 나눠 지우고 구간 사이에 잠깐 쉰다. 구간마다 QuerySet.delete() 를 쓰므로 시그널/연쇄 삭제가
+없는 모델은 DELETE 한 문장으로 지워지고, 있는 모델(방문 내역 등)은 그 구간만큼만 읽어 시그널을 보낸다.
+
+테이블별 정책은 settings.LOG_RETENTION_POLICIES 에 둔다.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+from django.db.models import Max, Min
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_SLEEP_SECONDS = 0.1
+
+
+def get_policies(labels=None):
+    """
+    보존 정책 목록 (settings.LOG_RETENTION_POLICIES)
+
+    Args:
+        labels: 이 모델 라벨('앱.모델')만 (None 이면 전체)
+
+    Returns:
+        list: [{'label', 'model', 'field', 'days', 'batch_size', 'sleep', 'enabled'}]
+    """
+    configured = getattr(settings, 'LOG_RETENTION_POLICIES', {})
+    if labels:
+        unknown = set(labels) - set(configured)
+        if unknown:
+            raise ValueError(f"보존 정책이 없는 모델: {', '.join(sorted(unknown))}")
+
+    policies = []
+    for label, policy in configured.items():
+        if labels and label not in labels:
+            continue
+        policies.append({
+            'label': label,
+            'model': apps.get_model(label),
+            'field': policy['field'],
+            'days': policy['days'],
+            'batch_size': policy.get('batch_size', DEFAULT_BATCH_SIZE),
+            'sleep': policy.get('sleep', DEFAULT_SLEEP_SECONDS),
+            'enabled': policy.get('enabled', True),
+        })
+    return policies
+
+
+def retention_cutoff(model, field, days, now=None):
+    """보존 기준 시각 (날짜 필드면 날짜)"""
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    model_field = model._meta.get_field(field)
+    if isinstance(model_field, models.DateField) and not isinstance(model_field, models.DateTimeField):
+        return cutoff.date()
+    return cutoff
+
+
+def purge_expired(model, field, days, batch_size=DEFAULT_BATCH_SIZE, sleep=DEFAULT_SLEEP_SECONDS,
+                  dry_run=False, now=None):
+    """
+    field 가 days 일보다 오래된 행을 PK 구간 단위로 삭제
+
+    Args:
+        dry_run: 삭제하지 않고 대상 행 수만 셈
+
+    Returns:
+        dict: deleted(삭제/대상 행 수), batches, seconds, cutoff
+    """
+    cutoff = retention_cutoff(model, field, days, now)
+    expired = model._default_manager.filter(**{f'{field}__lt': cutoff})
+    started = time.perf_counter()
+    result = {'deleted': 0, 'batches': 0, 'seconds': 0.0, 'cutoff': cutoff}
+
+    if dry_run:
+        result['deleted'] = expired.count()
+        result['seconds'] = time.perf_counter() - started
+        return result
+
+    bounds = expired.aggregate(low=Min('pk'), high=Max('pk'))
+    low, high = bounds['low'], bounds['high']
+    while low is not None and low <= high:
+        deleted, _ = expired.filter(pk__gte=low, pk__lt=low + batch_size).delete()
+        result['deleted'] += deleted
+        result['batches'] += 1
+        low += batch_size
+        if not deleted:
+            # 지울 행이 없는 PK 구간은 건너뜀
+            low = expired.filter(pk__gte=low).aggregate(low=Min('pk'))['low']
+        elif sleep and low <= high:
+            time.sleep(sleep)
+
+    result['seconds'] = time.perf_counter() - started
+    logger.info(
+        f"{model._meta.label} 보존 기간 정리: {result['deleted']}행 삭제 "
+        f"({result['batches']}구간, {result['seconds']:.1f}초, 기준 {cutoff})"
+    )
+    return result
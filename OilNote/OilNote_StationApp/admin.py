@@ -10,7 +10,7 @@ from .models import (
     PointCard, StationCardMapping, StationList, ExcelSalesData, SalesStatistics, 
     MonthlySalesStatistics, Group, PhoneCardMapping, CouponType, CouponTemplate, 
     CustomerCoupon, StationCouponQuota, CumulativeSalesTracker, CouponPurchaseRequest,
-    CustomerVisitHistory, AutoCouponTemplate
+    CustomerVisitHistory, AutoCouponTemplate, CouponIssueJob, MonthlyCouponStatistics
 )
 from OilNote_User.models import CustomUser
 
@@ -147,7 +147,7 @@ class StationListAdmin(admin.ModelAdmin):
 class PointCardAdmin(admin.ModelAdmin):
     list_display = ('number', 'is_used', 'status_display', 'user_info', 'registered_station_info', 'station_info', 'mappings_display')
     list_filter = ('is_used', 'created_at', 'mappings__station__station_profile__station_name')
-    search_fields = ('number', 'tids', 'mappings__station__station_profile__station_name')
+    search_fields = ('number', 'tid_links__tid', 'mappings__station__station_profile__station_name')
     readonly_fields = ('created_at', 'tids', 'mappings_display', 'user_info', 'registered_station_info', 'station_info')
     list_per_page = 50
     actions = ['mark_as_used', 'mark_as_unused', 'bulk_delete_unused']
@@ -1298,6 +1298,30 @@ class StationCouponQuotaAdmin(admin.ModelAdmin):
     reset_used_quota.short_description = '사용된 쿠폰 수량 초기화'
 
 
+@admin.register(CouponIssueJob)
+class CouponIssueJobAdmin(admin.ModelAdmin):
+    """대량 쿠폰 발행 작업 Admin (조회 전용)"""
+    list_display = ('id', 'station', 'coupon_template', 'target_type', 'issued_count', 'total_count', 'status', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('station__username', 'coupon_template__coupon_name')
+    readonly_fields = [field.name for field in CouponIssueJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(MonthlyCouponStatistics)
+class MonthlyCouponStatisticsAdmin(admin.ModelAdmin):
+    """월별 쿠폰 통계 Admin (삭제하면 다음 통계 조회 때 다시 집계됨)"""
+    list_display = ('station', 'year_month', 'issued_count', 'used_count', 'updated_at')
+    list_filter = ('year_month',)
+    search_fields = ('station__username',)
+    readonly_fields = [field.name for field in MonthlyCouponStatistics._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(CouponPurchaseRequest)
 class CouponPurchaseRequestAdmin(admin.ModelAdmin):
     """쿠폰 구매 요청 관리 Admin"""
@@ -0,0 +1,82 @@
+import io
+import random
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from OilNote_StationApp.services.card_import import read_card_sheet, find_card_column, import_card_numbers
+from OilNote_User.models import CustomUser
+
+
+class _Rollback(Exception):
+    """벤치마크 데이터 롤백용"""
+
+
+class Command(BaseCommand):
+    help = '엑셀 카드 일괄 등록 성능을 측정합니다. (기본: 1천/1만/10만 행, 측정 후 롤백)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000], help='측정할 행 수 목록')
+        parser.add_argument('--station', type=str, help='측정에 사용할 주유소 아이디 (없으면 임시 주유소 생성)')
+        parser.add_argument('--duplicate-rate', type=float, default=0.05, help='파일 내 중복 행 비율')
+        parser.add_argument('--invalid-rate', type=float, default=0.01, help='형식 오류 행 비율')
+        parser.add_argument('--keep', action='store_true', help='등록된 데이터를 롤백하지 않고 남김')
+
+    def _build_sheet(self, size, duplicate_rate, invalid_rate):
+        """카드번호 엑셀 파일 생성"""
+        start = random.randint(10 ** 15, 9 * 10 ** 15)
+        numbers = [str(start + i) for i in range(size)]
+        for i in random.sample(range(size), int(size * duplicate_rate)):
+            numbers[i] = numbers[random.randrange(size)]
+        for i in random.sample(range(size), int(size * invalid_rate)):
+            numbers[i] = numbers[i][:10]
+
+        buffer = io.BytesIO()
+        pd.DataFrame({'point number': numbers}).to_excel(buffer, index=False, engine='openpyxl')
+        return buffer.getvalue()
+
+    def _run(self, station, size, options):
+        content = self._build_sheet(size, options['duplicate_rate'], options['invalid_rate'])
+
+        started = time.perf_counter()
+        df = read_card_sheet(content, 'benchmark.xlsx')
+        parse_elapsed = time.perf_counter() - started
+
+        tid = station.station_profile.tid or 'BENCH'
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            result = import_card_numbers(station, tid, df[find_card_column(df)])
+            import_elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{size:>8,}행 | 파싱 {parse_elapsed:7.2f}초 | 등록 {import_elapsed:7.2f}초 '
+            f'({size / import_elapsed:,.0f}행/초) | 쿼리 {len(queries.captured_queries):,}개 | '
+            f'신규 {result["registered_count"]:,} / 중복 {result["duplicate_count"]:,} / 오류 {result["invalid_count"]:,}'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['station']:
+                    try:
+                        station = CustomUser.objects.get(username=options['station'], user_type='STATION')
+                    except CustomUser.DoesNotExist:
+                        raise CommandError(f"주유소를 찾을 수 없습니다: {options['station']}")
+                else:
+                    station = CustomUser.objects.create(
+                        username=f'benchmark_station_{int(time.time())}',
+                        user_type='STATION',
+                        business_number=str(random.randint(10 ** 9, 10 ** 10 - 1)),
+                    )
+
+                self.stdout.write(self.style.SUCCESS(f'=== 엑셀 카드 일괄 등록 벤치마크 ({station.username}) ==='))
+                for size in options['sizes']:
+                    self._run(station, size, options)
+
+                if not options['keep']:
+                    raise _Rollback()
+        except _Rollback:
+            self.stdout.write('측정 데이터를 롤백했습니다.')
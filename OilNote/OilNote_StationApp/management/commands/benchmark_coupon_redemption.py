@@ -0,0 +1,105 @@
+"""
+쿠폰 동시 사용 처리량 측정
+
+쿠폰마다 --parallel 개의 사용 요청을 동시에 보내 처리량과 지연 시간을 잽니다.
+설정된 DB 에 측정용 주유소/고객/쿠폰을 만들고 끝나면 삭제하므로 운영 DB 에서는 실행하지 마세요.
+한 요청만 성공하는지는 OilNote_StationApp/tests.py 의 동시성 테스트(manage.py test)에서 확인합니다.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from OilNote_StationApp.models import CouponTemplate, CouponType, CustomerCoupon
+from OilNote_User.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = '쿠폰 동시 사용 요청 처리량을 측정합니다. (측정용 데이터를 만들고 측정 후 삭제)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--parallel', type=int, default=50, help='쿠폰 하나에 동시에 보낼 사용 요청 수')
+        parser.add_argument('--rounds', type=int, default=20, help='측정할 쿠폰 수')
+        parser.add_argument('--keep', action='store_true', help='측정 데이터를 삭제하지 않고 남김')
+
+    def _redeem(self, barrier, coupon_id, customer):
+        """모든 스레드가 모인 뒤 동시에 사용 요청"""
+        try:
+            barrier.wait()
+            return 'won' if CustomerCoupon.redeem(coupon_id, customer=customer) else 'lost'
+        except Exception as e:
+            return f'error: {e}'
+        finally:
+            close_old_connections()
+
+    def _create_fixtures(self, rounds):
+        suffix = f'{int(time.time())}_{random.randint(1000, 9999)}'
+        station = CustomUser.objects.create(
+            username=f'benchmark_station_{suffix}',
+            user_type='STATION',
+            business_number=str(random.randint(10 ** 9, 10 ** 10 - 1)),
+        )
+        customer = CustomUser.objects.create(username=f'benchmark_customer_{suffix}', user_type='CUSTOMER')
+        coupon_type = CouponType.objects.create(station=station, type_code='BENCHMARK', type_name='벤치마크')
+        template = CouponTemplate.objects.create(
+            station=station,
+            coupon_type=coupon_type,
+            coupon_name='동시 사용 벤치마크',
+            benefit_type='DISCOUNT',
+            discount_amount=1000,
+            is_permanent=True,
+        )
+        coupons = CustomerCoupon.objects.bulk_create([
+            CustomerCoupon(customer=customer, coupon_template=template, status='AVAILABLE')
+            for _ in range(rounds)
+        ])
+        if not coupons or coupons[0].pk is None:
+            coupons = list(CustomerCoupon.objects.filter(coupon_template=template).order_by('id'))
+        return station, customer, coupons
+
+    def handle(self, *args, **options):
+        parallel = options['parallel']
+        if parallel < 2 or options['rounds'] < 1:
+            raise CommandError('--parallel 은 2 이상, --rounds 는 1 이상이어야 합니다.')
+
+        station, customer, coupons = self._create_fixtures(options['rounds'])
+        self.stdout.write(self.style.SUCCESS(
+            f'=== 쿠폰 동시 사용 벤치마크 (쿠폰 {len(coupons)}개 × 동시 요청 {parallel}개) ==='
+        ))
+
+        total_requests = 0
+        errors = 0
+        latencies = []
+        try:
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                for index, coupon in enumerate(coupons, start=1):
+                    barrier = threading.Barrier(parallel)
+                    started = time.perf_counter()
+                    results = list(executor.map(
+                        lambda _: self._redeem(barrier, coupon.pk, customer), range(parallel)
+                    ))
+                    latencies.append(time.perf_counter() - started)
+
+                    round_errors = [result for result in results if result.startswith('error')]
+                    total_requests += parallel
+                    errors += len(round_errors)
+                    if round_errors:
+                        self.stdout.write(self.style.ERROR(
+                            f'  {index}번째 쿠폰: 오류 {len(round_errors)}건 - {round_errors[0]}'
+                        ))
+
+            elapsed = sum(latencies)
+            used = CustomerCoupon.objects.filter(pk__in=[coupon.pk for coupon in coupons], status='USED').count()
+            self.stdout.write(
+                f'사용 처리된 쿠폰 {used}/{len(coupons)}개 | 요청 {total_requests:,}건, 오류 {errors:,}건 | '
+                f'{total_requests / elapsed:,.0f}요청/초 | 쿠폰당 평균 {elapsed / len(coupons) * 1000:.1f}ms, '
+                f'최대 {max(latencies) * 1000:.1f}ms'
+            )
+        finally:
+            if not options['keep']:
+                # 고객/주유소 삭제 시 쿠폰 유형, 템플릿, 쿠폰도 함께 삭제됨
+                customer.delete()
+                station.delete()
@@ -0,0 +1,90 @@
+"""
+만료일이 지난 쿠폰 일괄 만료 처리 배치 작업
+
+매일 자정 이후 실행되어 사용 가능(AVAILABLE) 쿠폰 중 만료일이 지난 쿠폰을
+구간 단위 UPDATE 로 EXPIRED 처리합니다. (status, expiry_date) 인덱스를 사용합니다.
+크론탭 설정 예시:
+10 0 * * * /path/to/python /path/to/manage.py expire_coupons
+"""
+import logging
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from OilNote_StationApp.models import CustomerCoupon
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = '만료일이 지난 사용 가능 쿠폰을 EXPIRED 로 일괄 변경'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='기준일 (YYYY-MM-DD 형식, 기본값: 오늘). 기준일 전날까지 만료된 쿠폰을 처리'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='UPDATE 한 번에 처리할 쿠폰 수 (기본값: 5000)'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='구간 사이 대기 시간(초) - 운영 DB 부하 조절용'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='변경하지 않고 대상 쿠폰 수만 조회'
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                today = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('기준일 형식이 올바르지 않습니다. YYYY-MM-DD 형식으로 입력해주세요.')
+        else:
+            today = timezone.now().date()
+
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size 는 1 이상이어야 합니다.')
+
+        self.stdout.write(self.style.SUCCESS(f'=== 쿠폰 만료 처리 시작 (기준일: {today}) ==='))
+
+        if options['dry_run']:
+            count = CustomerCoupon.objects.filter(status='AVAILABLE', expiry_date__lt=today).count()
+            self.stdout.write(self.style.WARNING(f'🔍 시뮬레이션: 만료 처리 대상 {count:,}개'))
+            return
+
+        total = 0
+        batches = 0
+        started = time.perf_counter()
+        while True:
+            batch_started = time.perf_counter()
+            updated = CustomerCoupon.expire_overdue(today, limit=options['chunk_size'])
+            if not updated:
+                break
+
+            total += updated
+            batches += 1
+            elapsed = time.perf_counter() - batch_started
+            self.stdout.write(f'  {batches}번째 구간: {updated:,}개 ({elapsed:.2f}초, 누적 {total:,}개)')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.perf_counter() - started
+        throughput = total / elapsed if elapsed > 0 else 0
+        logger.info(f'쿠폰 만료 처리 완료: 기준일={today}, {total}개, {batches}구간, {elapsed:.2f}초')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'🎉 만료 처리 완료: {total:,}개 ({batches}구간, {elapsed:.2f}초, {throughput:,.0f}개/초)'
+            )
+        )
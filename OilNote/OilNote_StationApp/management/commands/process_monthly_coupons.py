@@ -2,29 +2,42 @@
 전월매출 기준 쿠폰 자동 발행 배치 작업
 
 매월 1일에 실행되어 전월 매출 기준으로 쿠폰을 발행합니다.
+주유소마다 발행 대상(전월 매출 합계 ≥ 임계값, 활성 관계, 이번 달 미발행)을
+쿼리 한 번으로 조회해 bulk_create 하며, --workers 로 주유소를 병렬 처리합니다.
 크론탭 설정 예시:
-0 1 1 * * /path/to/python /path/to/manage.py process_monthly_coupons
+0 1 1 * * /path/to/python /path/to/manage.py process_monthly_coupons --workers 4
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
-from django.db import transaction
-from django.db.models import Sum
+from django.db import close_old_connections, models, transaction
+from django.db.models import Exists, OuterRef, Subquery, Sum
 from datetime import datetime, timedelta
 from OilNote_StationApp.models import (
     ExcelSalesData,
     AutoCouponTemplate,
     CustomerCoupon
 )
-from OilNote_User.models import CustomUser, StationProfile, CustomerStationRelation
+from OilNote_User.models import CustomUser, CustomerStationRelation
+from OilNote_UserApp.services.customer_summary import invalidate_customer_summary
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def month_range(year_month):
+    """'YYYY-MM' → (첫날, 다음 달 첫날)"""
+    year, month = map(int, year_month.split('-'))
+    first_day = datetime(year, month, 1).date()
+    next_first_day = (first_day + timedelta(days=32)).replace(day=1)
+    return first_day, next_first_day
+
+
 class Command(BaseCommand):
     help = '전월매출 기준 쿠폰 자동 발행'
-    
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--year-month',
@@ -36,17 +49,23 @@ class Command(BaseCommand):
             type=int,
             help='특정 주유소만 처리 (선택사항)'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='동시에 처리할 주유소 수 (기본값: 1)'
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
             help='실제 발행하지 않고 시뮬레이션만 실행'
         )
-    
+
     def handle(self, *args, **options):
         self.stdout.write(
             self.style.SUCCESS('=== 전월매출 쿠폰 자동발행 배치 시작 ===')
         )
-        
+
         # 처리할 년월 결정
         if options['year_month']:
             year_month = options['year_month']
@@ -57,191 +76,186 @@ class Command(BaseCommand):
         else:
             # 전월 계산
             today = timezone.now().date()
-            if today.month == 1:
-                last_month = today.replace(year=today.year-1, month=12)
-            else:
-                last_month = today.replace(month=today.month-1)
-            year_month = last_month.strftime('%Y-%m')
-        
+            year_month = (today.replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+
+        if options['workers'] < 1:
+            raise CommandError('--workers 는 1 이상이어야 합니다.')
+
         self.stdout.write(f'처리 대상 년월: {year_month}')
-        
+
         # 주유소 목록 조회
-        stations = CustomUser.objects.filter(user_type='STATION')
+        stations = CustomUser.objects.filter(user_type='STATION').select_related('station_profile')
         if options['station_id']:
             stations = stations.filter(id=options['station_id'])
-        
-        self.stdout.write(f'처리 대상 주유소: {stations.count()}개')
-        
+        stations = list(stations)
+
+        self.stdout.write(f'처리 대상 주유소: {len(stations)}개 (동시 처리: {options["workers"]}개)')
+
         total_issued = 0
         total_customers = 0
-        
-        for station in stations:
-            try:
-                issued_count, customer_count = self.process_monthly_coupons_for_station(
-                    station, 
-                    year_month, 
-                    options['dry_run']
-                )
-                total_issued += issued_count
-                total_customers += customer_count
-                
-                self.stdout.write(
-                    f'✅ {station.username}: {customer_count}명 고객, {issued_count}개 쿠폰 발행'
-                )
-                
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'❌ {station.username} 처리 중 오류: {str(e)}')
-                )
-                logger.error(f'전월매출 쿠폰 처리 오류 - 주유소: {station.username}, 오류: {str(e)}', exc_info=True)
-        
+        started = timezone.now()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(self.run_station, station, year_month, options['dry_run']): station
+                for station in stations
+            }
+            for future in as_completed(futures):
+                station = futures[future]
+                try:
+                    issued_count, customer_count = future.result()
+                    total_issued += issued_count
+                    total_customers += customer_count
+
+                    self.stdout.write(
+                        f'✅ {station.username}: {customer_count}명 고객, {issued_count}개 쿠폰 발행'
+                    )
+
+                except Exception as e:
+                    self.stdout.write(
+                        self.style.ERROR(f'❌ {station.username} 처리 중 오류: {str(e)}')
+                    )
+                    logger.error(f'전월매출 쿠폰 처리 오류 - 주유소: {station.username}, 오류: {str(e)}', exc_info=True)
+
+        elapsed = (timezone.now() - started).total_seconds()
         if options['dry_run']:
             self.stdout.write(
-                self.style.WARNING(f'🔍 시뮬레이션 완료: {total_customers}명에게 {total_issued}개 쿠폰 발행 예정')
+                self.style.WARNING(f'🔍 시뮬레이션 완료: {total_customers}명에게 {total_issued}개 쿠폰 발행 예정 ({elapsed:.1f}초)')
             )
         else:
             self.stdout.write(
-                self.style.SUCCESS(f'🎉 배치 완료: {total_customers}명에게 {total_issued}개 쿠폰 발행')
+                self.style.SUCCESS(f'🎉 배치 완료: {total_customers}명에게 {total_issued}개 쿠폰 발행 ({elapsed:.1f}초)')
             )
-    
+
+    def run_station(self, station, year_month, dry_run=False):
+        """작업 스레드에서 주유소 한 곳 처리 (스레드별 DB 연결 정리)"""
+        close_old_connections()
+        try:
+            return self.process_monthly_coupons_for_station(station, year_month, dry_run)
+        finally:
+            close_old_connections()
+
     def process_monthly_coupons_for_station(self, station, year_month, dry_run=False):
         """특정 주유소의 전월매출 쿠폰 처리"""
         logger.info(f'주유소 {station.username}의 {year_month} 전월매출 쿠폰 처리 시작')
-        
+
         # 전월매출 쿠폰 템플릿 조회 (최신 1개만)
         monthly_template = AutoCouponTemplate.objects.filter(
             station=station,
             coupon_type='MONTHLY',
             is_active=True
         ).order_by('-created_at').first()
-        
+
         if not monthly_template:
             logger.info(f'주유소 {station.username}에 전월매출 쿠폰 템플릿이 없음')
             return 0, 0
-        
+
         # 주유소의 StationProfile에서 TID 가져오기
-        try:
-            station_profile = StationProfile.objects.get(user=station)
-            tid = station_profile.tid
-        except StationProfile.DoesNotExist:
+        station_profile = getattr(station, 'station_profile', None)
+        if not station_profile:
             logger.error(f'주유소 {station.username}의 StationProfile이 없음')
             return 0, 0
-        
-        # 매출 기준 고객 선별 및 쿠폰 발행
-        issued_count = 0
-        customer_count = 0
-        
+
         # 템플릿별 발행 조건 확인 (condition_data에서 threshold_amount 가져오기)
         threshold_amount = monthly_template.condition_data.get('threshold_amount', 50000)  # 기본 5만원
         logger.info(f'전월매출 쿠폰 임계값: {threshold_amount:,.0f}원')
-        
-        # 해당 월에 임계값 이상 매출을 올린 고객들 찾기
-        eligible_customers = self.find_eligible_customers(
-            station, 
-            tid,
-            year_month, 
-            threshold_amount
-        )
-        
-        logger.info(f'템플릿 {monthly_template.coupon_name}: {len(eligible_customers)}명 대상')
-        
-        for customer_data in eligible_customers:
-            customer = customer_data['customer']
-            sales_amount = customer_data['sales_amount']
-            
-            if not dry_run:
-                # 이번 달에 이미 전월매출 쿠폰을 받았는지 체크
-                # issued_date의 년월로 중복 체크
-                current_year = datetime.now().year
-                current_month = datetime.now().month
-                existing_coupon = CustomerCoupon.objects.filter(
-                    customer=customer,
-                    auto_coupon_template=monthly_template,
-                    issued_date__year=current_year,
-                    issued_date__month=current_month
-                ).exists()
-                
-                if existing_coupon:
-                    logger.info(f'고객 {customer.username}에게 {year_month} 전월매출 쿠폰 이미 발행됨')
-                    continue
-                
-                # 쿠폰 발행
-                try:
-                    with transaction.atomic():
-                        # CustomerCoupon 직접 생성
-                        new_coupon = CustomerCoupon.objects.create(
-                            customer=customer,
-                            auto_coupon_template=monthly_template,
-                            status='AVAILABLE'
-                        )
-                        issued_count += 1
-                        logger.info(f'✅ 전월매출 쿠폰 발행: {customer.username} → {monthly_template.coupon_name} (매출: {sales_amount:,.0f}원)')
-                except Exception as e:
-                    logger.error(f'쿠폰 발행 실패 - {customer.username}: {str(e)}')
-            else:
-                issued_count += 1
-                logger.info(f'[DRY-RUN] {customer.username} → {monthly_template.coupon_name} (매출: {sales_amount:,.0f}원)')
-            
-            customer_count += 1
-        
+
+        with transaction.atomic():
+            # 전월 매출 합계 ≥ 임계값, 활성 관계, 이번 달 미발행 고객 (쿼리 1회)
+            eligible_customers = self.find_eligible_customers(
+                station,
+                station_profile.tid,
+                year_month,
+                threshold_amount,
+                monthly_template
+            )
+            customer_count = len(eligible_customers)
+            logger.info(f'템플릿 {monthly_template.coupon_name}: {customer_count}명 대상')
+
+            if dry_run:
+                for customer_data in eligible_customers:
+                    logger.info(f'[DRY-RUN] {customer_data["username"]} → {monthly_template.coupon_name} (매출: {customer_data["sales_amount"]:,.0f}원)')
+                return customer_count, customer_count
+
+            # 쿠폰 일괄 발행 (bulk_create 는 save() 를 거치지 않으므로 만료일 직접 설정)
+            expiry_date = None if monthly_template.is_permanent else monthly_template.valid_until
+            created_coupons = CustomerCoupon.objects.bulk_create(
+                [
+                    CustomerCoupon(
+                        customer_id=customer_data['customer_id'],
+                        auto_coupon_template=monthly_template,
+                        status='AVAILABLE',
+                        expiry_date=expiry_date
+                    )
+                    for customer_data in eligible_customers
+                ],
+                batch_size=2000
+            )
+            issued_count = len(created_coupons)
+            invalidate_customer_summary([customer_data['customer_id'] for customer_data in eligible_customers])
+            if issued_count:
+                AutoCouponTemplate.objects.filter(pk=monthly_template.pk).update(
+                    issued_count=models.F('issued_count') + issued_count,
+                    total_issued=models.F('total_issued') + issued_count
+                )
+
+        logger.info(f'✅ 전월매출 쿠폰 발행: {station.username} → {monthly_template.coupon_name} {issued_count}장')
         return issued_count, customer_count
-    
-    def find_eligible_customers(self, station, tid, year_month, threshold_amount):
-        """전월매출 쿠폰 발행 대상 고객 조회"""
-        logger.info(f'전월매출 쿠폰 발행 대상 고객 조회 시작: {year_month}, 임계값: {threshold_amount:,.0f}원')
-        
-        # 년월에서 시작일과 종료일 계산
-        year, month = map(int, year_month.split('-'))
-        first_day = datetime(year, month, 1).date()
-        
-        # 다음 달의 첫날을 구하고 하루를 빼서 마지막 날 계산
-        if month == 12:
-            last_day = datetime(year + 1, 1, 1).date() - timedelta(days=1)
-        else:
-            last_day = datetime(year, month + 1, 1).date() - timedelta(days=1)
-        
-        logger.info(f'조회 기간: {first_day} ~ {last_day}')
-        
-        # ExcelSalesData에서 해당 월의 고객별 매출 합계 조회
-        customer_sales = ExcelSalesData.objects.filter(
+
+    def find_eligible_customers(self, station, tid, year_month, threshold_amount, monthly_template):
+        """
+        전월매출 쿠폰 발행 대상 고객 조회
+
+        고객명별 전월 매출 합계(HAVING ≥ 임계값)를 사용자명으로 고객-주유소 관계에 붙이고,
+        이번 달에 이 템플릿 쿠폰을 이미 받은 고객은 NOT EXISTS 로 제외한다.
+
+        Returns:
+            list: [{'customer_id', 'username', 'sales_amount'}]
+        """
+        first_day, next_first_day = month_range(year_month)
+        logger.info(f'전월매출 쿠폰 발행 대상 고객 조회: {first_day} ~ {next_first_day - timedelta(days=1)}, 임계값: {threshold_amount:,.0f}원')
+
+        monthly_sales = ExcelSalesData.objects.filter(
             tid=tid,
             sale_date__gte=first_day,
-            sale_date__lte=last_day
-        ).values('customer_name').annotate(
+            sale_date__lt=next_first_day
+        )
+        qualified_names = monthly_sales.values('customer_name').annotate(
             total_amount=Sum('total_amount')
         ).filter(
             total_amount__gte=threshold_amount
+        ).values('customer_name')
+        sales_amount = monthly_sales.filter(
+            customer_name=OuterRef('customer__username')
+        ).values('customer_name').annotate(
+            total_amount=Sum('total_amount')
+        ).values('total_amount')
+
+        # 이번 달(발행 시점 기준) 중복 발행 방지
+        current_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        already_issued = CustomerCoupon.objects.filter(
+            customer_id=OuterRef('customer_id'),
+            auto_coupon_template=monthly_template,
+            issued_date__gte=current_month,
+            issued_date__lt=(current_month + timedelta(days=32)).replace(day=1)
         )
-        
-        logger.info(f'임계값 이상 매출 고객 수: {customer_sales.count()}명')
-        
-        eligible_customers = []
-        
-        for sale_data in customer_sales:
-            customer_name = sale_data['customer_name']
-            total_amount = sale_data['total_amount']
-            
-            # customer_name으로 실제 Customer 객체 찾기
-            try:
-                customer = CustomUser.objects.get(
-                    username=customer_name,
-                    user_type='CUSTOMER'
-                )
-                
-                # 해당 고객이 이 주유소와 관계가 있는지 확인
-                if CustomerStationRelation.objects.filter(
-                    customer=customer,
-                    station=station,
-                    is_active=True
-                ).exists():
-                    eligible_customers.append({
-                        'customer': customer,
-                        'sales_amount': total_amount
-                    })
-                    logger.info(f'발행 대상: {customer_name} - 매출: {total_amount:,.0f}원')
-                
-            except CustomUser.DoesNotExist:
-                logger.warning(f'고객 {customer_name}을 찾을 수 없음')
-                continue
-        
-        return eligible_customers
\ No newline at end of file
+
+        eligible = CustomerStationRelation.objects.filter(
+            station=station,
+            is_active=True,
+            customer__user_type='CUSTOMER',
+            customer__username__in=qualified_names
+        ).exclude(
+            Exists(already_issued)
+        ).annotate(
+            sales_amount=Subquery(sales_amount)
+        ).values('customer_id', 'customer__username', 'sales_amount')
+
+        return [
+            {
+                'customer_id': row['customer_id'],
+                'username': row['customer__username'],
+                'sales_amount': row['sales_amount'] or 0
+            }
+            for row in eligible
+        ]
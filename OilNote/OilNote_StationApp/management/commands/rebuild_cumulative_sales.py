@@ -0,0 +1,145 @@
+"""
+누적매출 추적(CumulativeSalesTracker) 재집계 배치 작업
+
+누적매출 쿠폰 엔진은 매출 한 건마다 추적 행의 누적액만 갱신하므로, 매출 데이터를
+삭제하거나 다시 올린 경우 누적액이 원본과 달라질 수 있습니다.
+이 명령은 누적매출 처리된 ExcelSalesData 를 고객별로 다시 합산해 누적액과
+마지막 임계값 통과 지점을 맞춥니다. 쿠폰은 발행하지 않습니다.
+매출 업로드가 없는 시간대에 실행하세요. 크론탭 설정 예시:
+30 3 * * 0 /path/to/python /path/to/manage.py rebuild_cumulative_sales
+"""
+import logging
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from OilNote_StationApp.models import AutoCouponTemplate, CumulativeSalesTracker, ExcelSalesData
+from OilNote_User.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_CHUNK_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = '원본 매출 데이터로 누적매출 추적 누적액 재집계'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--station-id',
+            type=int,
+            help='특정 주유소만 처리 (선택사항)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='변경하지 않고 차이만 출력'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=== 누적매출 추적 재집계 시작 ==='))
+
+        stations = CustomUser.objects.filter(user_type='STATION').select_related('station_profile')
+        if options['station_id']:
+            stations = stations.filter(id=options['station_id'])
+
+        total_changed = 0
+        for station in stations:
+            tid = getattr(getattr(station, 'station_profile', None), 'tid', None)
+            if not tid:
+                continue
+            try:
+                with transaction.atomic():
+                    changed, created, reset = self.rebuild_station(station, tid, options['dry_run'])
+                total_changed += changed + created + reset
+                if changed or created or reset:
+                    self.stdout.write(f'✅ {station.username}: 수정 {changed}건, 신규 {created}건, 초기화 {reset}건')
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'❌ {station.username} 처리 중 오류: {str(e)}'))
+                logger.error(f'누적매출 재집계 오류 - 주유소: {station.username}, 오류: {str(e)}', exc_info=True)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'🔍 시뮬레이션 완료: {total_changed}건 변경 예정'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'🎉 재집계 완료: {total_changed}건 변경'))
+
+    def rebuild_station(self, station, tid, dry_run=False):
+        """
+        주유소 한 곳의 추적 행 재집계
+
+        Returns:
+            tuple: (누적액이 바뀐 행 수, 새로 만든 행 수, 0으로 초기화한 행 수)
+        """
+        # 진행 중인 매출 처리와 겹치지 않도록 기존 추적 행 잠금
+        trackers = {
+            tracker.customer_id: tracker
+            for tracker in CumulativeSalesTracker.objects.select_for_update().filter(station=station)
+        }
+
+        # 누적매출 처리된 매출의 고객명별 합계 (누적 처리 시그널과 같은 조건)
+        sales = dict(
+            ExcelSalesData.objects.filter(tid=tid, is_cumulative_processed=True, total_amount__gt=0)
+            .values('customer_name')
+            .annotate(total=Sum('total_amount'))
+            .values_list('customer_name', 'total')
+        )
+        names = list(sales)
+        totals = {}
+        for offset in range(0, len(names), LOOKUP_CHUNK_SIZE):
+            customers = CustomUser.objects.filter(
+                username__in=names[offset:offset + LOOKUP_CHUNK_SIZE],
+                user_type='CUSTOMER'
+            ).values_list('username', 'id')
+            for username, customer_id in customers:
+                totals[customer_id] = sales[username]
+
+        template = AutoCouponTemplate.objects.filter(
+            station=station,
+            coupon_type='CUMULATIVE',
+            is_active=True
+        ).first()
+        threshold = Decimal(str(template.condition_data.get('threshold_amount', 50000))) if template else None
+
+        def marker(total, tracker_threshold):
+            # 마지막으로 통과한 임계값 배수
+            value = threshold or tracker_threshold
+            return int(total // value) * value if value else 0
+
+        changed = []
+        new_trackers = []
+        for customer_id, total in totals.items():
+            tracker = trackers.get(customer_id)
+            if tracker is None:
+                new_trackers.append(CumulativeSalesTracker(
+                    customer_id=customer_id,
+                    station=station,
+                    cumulative_amount=total,
+                    threshold_amount=threshold or Decimal('50000'),
+                    last_coupon_issued_at=marker(total, None),
+                ))
+            elif tracker.cumulative_amount != total:
+                logger.info(
+                    f'누적액 보정: 고객 ID {customer_id}@{station.username} '
+                    f'{tracker.cumulative_amount:,.0f}원 → {total:,.0f}원'
+                )
+                tracker.cumulative_amount = total
+                tracker.last_coupon_issued_at = marker(total, tracker.threshold_amount)
+                changed.append(tracker)
+
+        # 원본 매출이 모두 사라진 추적 행
+        reset = []
+        for customer_id, tracker in trackers.items():
+            if customer_id not in totals and tracker.cumulative_amount:
+                tracker.cumulative_amount = 0
+                tracker.last_coupon_issued_at = 0
+                reset.append(tracker)
+
+        if not dry_run:
+            CumulativeSalesTracker.objects.bulk_update(
+                changed + reset, ['cumulative_amount', 'last_coupon_issued_at'], batch_size=2000
+            )
+            CumulativeSalesTracker.objects.bulk_create(new_trackers, batch_size=2000)
+
+        return len(changed), len(new_trackers), len(reset)
@@ -0,0 +1,43 @@
+"""
+중단된 대량 쿠폰 발행 작업 정리 배치 작업
+
+대량 수동 쿠폰 발행은 웹 워커의 백그라운드 스레드에서 실행되므로, 워커가 재시작되면
+작업이 pending/running 으로 남고 예약한 쿠폰 수량도 반환되지 않습니다.
+이 명령은 생성 후 일정 시간(기본값: 설정 COUPON_ISSUE_JOB_TIMEOUT_MINUTES)이 지나도
+끝나지 않은 작업을 실패로 바꾸고 발행하지 못한 수량(total_count - issued_count)을 반환합니다.
+크론탭 설정 예시:
+*/10 * * * * /path/to/python /path/to/manage.py recover_coupon_issue_jobs
+"""
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from OilNote_StationApp.services.coupon_issue import recover_stale_jobs
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = '오래 끝나지 않은 대량 쿠폰 발행 작업을 실패 처리하고 남은 수량 반환'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes',
+            type=int,
+            help='작업 생성 후 이 시간(분)이 지나면 중단된 것으로 처리 (기본값: 설정값)'
+        )
+
+    def handle(self, *args, **options):
+        if options['minutes'] is not None and options['minutes'] < 1:
+            raise CommandError('--minutes 는 1 이상이어야 합니다.')
+
+        self.stdout.write(self.style.SUCCESS('=== 중단된 쿠폰 발행 작업 정리 시작 ==='))
+
+        jobs = recover_stale_jobs(options['minutes'])
+        for job in jobs:
+            self.stdout.write(
+                f'✅ 작업 {job.pk} ({job.station.username}, {job.coupon_template.coupon_name}): '
+                f'발행 {job.issued_count}/{job.total_count}, 반환 {max(0, job.total_count - job.issued_count)}장'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'🎉 정리 완료: {len(jobs)}개 작업'))
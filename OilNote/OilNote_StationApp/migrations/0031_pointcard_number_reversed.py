@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+def backfill_number_reversed(apps, schema_editor):
+    """기존 카드의 역순 카드번호 채우기 (청크 단위)"""
+    PointCard = apps.get_model("OilNote_StationApp", "PointCard")
+    batch = []
+    for card in PointCard.objects.only("id", "number").iterator(chunk_size=2000):
+        card.number_reversed = (card.number or "")[::-1]
+        batch.append(card)
+        if len(batch) >= 2000:
+            PointCard.objects.bulk_update(batch, ["number_reversed"])
+            batch = []
+    if batch:
+        PointCard.objects.bulk_update(batch, ["number_reversed"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("OilNote_StationApp", "0030_remove_autocoupontemplate_cust_statio_priorit_554c66_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pointcard",
+            name="number_reversed",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                help_text="뒷자리 검색용 역순 카드번호",
+                max_length=16,
+            ),
+        ),
+        migrations.RunPython(backfill_number_reversed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_card_tids(apps, schema_editor):
+    """PointCard.tids JSON 목록을 CardTid 행으로 옮기기"""
+    PointCard = apps.get_model("OilNote_StationApp", "PointCard")
+    CardTid = apps.get_model("OilNote_StationApp", "CardTid")
+    batch = []
+    for card_id, tids in PointCard.objects.values_list("id", "tids").iterator(chunk_size=2000):
+        if not isinstance(tids, list):
+            continue
+        for tid in dict.fromkeys(str(tid) for tid in tids if tid):
+            batch.append(CardTid(card_id=card_id, tid=tid))
+        if len(batch) >= 2000:
+            CardTid.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        CardTid.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def restore_card_tids(apps, schema_editor):
+    """CardTid 행으로 PointCard.tids JSON 목록 복원"""
+    PointCard = apps.get_model("OilNote_StationApp", "PointCard")
+    CardTid = apps.get_model("OilNote_StationApp", "CardTid")
+    tids_by_card = {}
+    for card_id, tid in CardTid.objects.order_by("id").values_list("card_id", "tid").iterator(chunk_size=2000):
+        tids_by_card.setdefault(card_id, []).append(tid)
+    batch = []
+    for card in PointCard.objects.filter(id__in=tids_by_card.keys()).only("id").iterator(chunk_size=2000):
+        card.tids = tids_by_card[card.id]
+        batch.append(card)
+        if len(batch) >= 2000:
+            PointCard.objects.bulk_update(batch, ["tids"])
+            batch = []
+    if batch:
+        PointCard.objects.bulk_update(batch, ["tids"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("OilNote_StationApp", "0031_pointcard_number_reversed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CardTid",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("tid", models.CharField(max_length=50, verbose_name="주유소 TID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="등록일시")),
+                (
+                    "card",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tid_links",
+                        to="OilNote_StationApp.pointcard",
+                        verbose_name="포인트카드",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "카드-TID 연결",
+                "verbose_name_plural": "카드-TID 연결 목록",
+                "db_table": "OilNote_StationApp_cardtid",
+                "ordering": ["id"],
+                "unique_together": {("tid", "card")},
+            },
+        ),
+        migrations.RunPython(backfill_card_tids, restore_card_tids),
+        migrations.RemoveField(
+            model_name="pointcard",
+            name="tids",
+        ),
+    ]
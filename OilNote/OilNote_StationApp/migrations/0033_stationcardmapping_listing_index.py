@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("OilNote_StationApp", "0032_cardtid"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="stationcardmapping",
+            index=models.Index(
+                fields=["station", "tid", "is_active", "registered_at"],
+                name="OilNote_Sta_station_f844fa_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("OilNote_StationApp", "0033_stationcardmapping_listing_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CouponIssueJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("target_type", models.CharField(max_length=20, verbose_name="발행 대상")),
+                ("total_count", models.IntegerField(default=0, verbose_name="대상 고객 수")),
+                ("issued_count", models.IntegerField(default=0, verbose_name="발행 수")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "대기중"), ("running", "발행 중"), ("completed", "완료"), ("failed", "실패")],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="상태",
+                    ),
+                ),
+                ("error_message", models.TextField(blank=True, null=True, verbose_name="오류 메시지")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="생성일시")),
+                ("started_at", models.DateTimeField(blank=True, null=True, verbose_name="시작일시")),
+                ("finished_at", models.DateTimeField(blank=True, null=True, verbose_name="종료일시")),
+                (
+                    "coupon_template",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="OilNote_StationApp.coupontemplate",
+                        verbose_name="쿠폰 템플릿",
+                    ),
+                ),
+                (
+                    "station",
+                    models.ForeignKey(
+                        limit_choices_to={"user_type": "STATION"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="coupon_issue_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="주유소",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "쿠폰 발행 작업",
+                "verbose_name_plural": "17. 쿠폰 발행 작업 목록",
+                "db_table": "OilNote_StationApp_couponissuejob",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
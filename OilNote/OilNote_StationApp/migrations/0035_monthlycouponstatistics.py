@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("OilNote_StationApp", "0034_couponissuejob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyCouponStatistics",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("year_month", models.CharField(max_length=7, verbose_name="년월")),
+                ("issued_count", models.IntegerField(default=0, verbose_name="발행 수")),
+                ("used_count", models.IntegerField(default=0, verbose_name="사용 수")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="업데이트일시")),
+                (
+                    "station",
+                    models.ForeignKey(
+                        limit_choices_to={"user_type": "STATION"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_coupon_statistics",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="주유소",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "월별 쿠폰 통계",
+                "verbose_name_plural": "18. 월별 쿠폰 통계 목록",
+                "db_table": "OilNote_StationApp_monthlycouponstatistics",
+                "ordering": ["-year_month"],
+                "unique_together": {("station", "year_month")},
+            },
+        ),
+    ]
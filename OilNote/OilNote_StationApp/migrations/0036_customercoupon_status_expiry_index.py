@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("OilNote_StationApp", "0035_monthlycouponstatistics"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customercoupon",
+            index=models.Index(fields=["status", "expiry_date"], name="OilNote_Sta_status_bc4bfb_idx"),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("OilNote_StationApp", "0036_customercoupon_status_expiry_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="excelsalesdata",
+            index=models.Index(fields=["tid", "sale_date", "customer_name"], name="OilNote_Sta_tid_c17799_idx"),
+        ),
+    ]
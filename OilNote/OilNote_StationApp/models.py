@@ -1,13 +1,16 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
 from OilNote_User.models import CustomUser, CustomerStationRelation
+from OilNote_UserApp.services.customer_summary import invalidate_customer_summary
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
+from django.db.models.functions import Greatest
 from django.dispatch import receiver
 import logging
 from datetime import datetime
+from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +42,7 @@ class PointCard(models.Model):
     number = models.CharField(max_length=16, unique=True, help_text="16자리 카드번호")
     oil_company_code = models.CharField(max_length=1, verbose_name='정유사코드', help_text="정유사 코드 (1자리)", default='0')
     agency_code = models.CharField(max_length=3, verbose_name='대리점코드', help_text="대리점 코드 (3자리)", default='000')
-    tids = models.JSONField(default=list, help_text="카드가 등록된 TID 목록")
+    number_reversed = models.CharField(max_length=16, db_index=True, default='', editable=False, help_text="뒷자리 검색용 역순 카드번호")
     is_used = models.BooleanField(default=False, help_text="카드 사용 여부")
     created_at = models.DateTimeField(auto_now_add=True, help_text="카드 생성일시")
     updated_at = models.DateTimeField(auto_now=True, help_text="카드 수정일시")
@@ -58,53 +61,87 @@ class PointCard(models.Model):
         """20자리 전체 카드번호 반환"""
         return f"{self.oil_company_code}{self.agency_code}{self.number}"
 
+    @staticmethod
+    def reverse_number(number):
+        """뒷자리 검색 인덱스용 역순 카드번호"""
+        return (number or '')[::-1]
+
+    def save(self, *args, **kwargs):
+        # 뒷자리 검색이 인덱스를 타도록 역순 카드번호를 함께 저장
+        self.number_reversed = self.reverse_number(self.number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'number' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'number_reversed'}
+        super().save(*args, **kwargs)
+
+    @property
+    def tids(self):
+        """카드가 등록된 TID 목록 (prefetch_related('tid_links') 시 추가 쿼리 없음)"""
+        return [link.tid for link in self.tid_links.all()]
+
+    @classmethod
+    def for_tid(cls, tid):
+        """해당 TID에 등록된 카드 쿼리셋 (CardTid (tid, card) 인덱스 사용)"""
+        return cls.objects.filter(tid_links__tid=tid)
+
+    def _clear_tid_cache(self):
+        """prefetch 된 TID 목록 캐시 무효화"""
+        getattr(self, '_prefetched_objects_cache', {}).pop('tid_links', None)
+
     def add_tid(self, tid):
         """TID를 카드에 추가"""
         logger.info(f"카드 {self.number}에 TID {tid} 추가 시도")
-        logger.debug(f"현재 TID 목록: {self.tids}")
         
-        if not isinstance(self.tids, list):
-            logger.warning(f"카드 {self.number}의 tids가 리스트가 아님: {type(self.tids)}")
-            self.tids = []
+        try:
+            _, created = CardTid.objects.get_or_create(card=self, tid=tid)
+        except Exception as e:
+            logger.error(f"카드 {self.number}에 TID {tid} 추가 중 오류 발생: {str(e)}")
+            return False
         
-        if tid not in self.tids:
-            logger.info(f"새로운 TID {tid} 추가")
-            self.tids.append(tid)
-            try:
-                self.save()
-                logger.info(f"카드 {self.number}에 TID {tid} 추가 성공")
-                logger.debug(f"업데이트된 TID 목록: {self.tids}")
-                return True
-            except Exception as e:
-                logger.error(f"카드 {self.number}에 TID {tid} 추가 중 오류 발생: {str(e)}")
-                return False
+        self._clear_tid_cache()
+        if created:
+            logger.info(f"카드 {self.number}에 TID {tid} 추가 성공")
         else:
             logger.info(f"TID {tid}가 이미 카드 {self.number}에 존재함")
-            return False
+        return created
 
     def remove_tid(self, tid):
         """TID를 카드에서 제거"""
         logger.info(f"카드 {self.number}에서 TID {tid} 제거 시도")
-        logger.debug(f"현재 TID 목록: {self.tids}")
         
-        if not isinstance(self.tids, list):
-            logger.warning(f"카드 {self.number}의 tids가 리스트가 아님: {type(self.tids)}")
+        try:
+            deleted, _ = CardTid.objects.filter(card=self, tid=tid).delete()
+        except Exception as e:
+            logger.error(f"카드 {self.number}에서 TID {tid} 제거 중 오류 발생: {str(e)}")
             return False
         
-        if tid in self.tids:
-            logger.info(f"TID {tid} 제거")
-            self.tids.remove(tid)
-            try:
-                self.save()
-                logger.info(f"카드 {self.number}에서 TID {tid} 제거 성공")
-                logger.debug(f"업데이트된 TID 목록: {self.tids}")
-                return True
-            except Exception as e:
-                logger.error(f"카드 {self.number}에서 TID {tid} 제거 중 오류 발생: {str(e)}")
-                return False
+        self._clear_tid_cache()
+        if deleted:
+            logger.info(f"카드 {self.number}에서 TID {tid} 제거 성공")
         else:
             logger.info(f"TID {tid}가 카드 {self.number}에 존재하지 않음")
-            return False
+        return bool(deleted)
+
+class CardTid(models.Model):
+    """카드-TID 연결 (카드가 등록된 TID 목록)"""
+    card = models.ForeignKey(
+        PointCard,
+        on_delete=models.CASCADE,
+        verbose_name='포인트카드',
+        related_name='tid_links'
+    )
+    tid = models.CharField(max_length=50, verbose_name='주유소 TID')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='등록일시')
+
+    class Meta:
+        verbose_name = '카드-TID 연결'
+        verbose_name_plural = '카드-TID 연결 목록'
+        ordering = ['id']
+        unique_together = ['tid', 'card']  # (tid, card) 인덱스로 TID별 카드 조회
+        db_table = 'OilNote_StationApp_cardtid'
+
+    def __str__(self):
+        return f"카드 {self.card_id} - TID {self.tid}"
 
 class StationCardMapping(models.Model):
     card = models.ForeignKey(
@@ -130,6 +167,9 @@ class StationCardMapping(models.Model):
         verbose_name = '주유소-카드 매핑'
         verbose_name_plural = '7. 주유소-카드 매핑'
         ordering = ['-registered_at']
+        indexes = [
+            models.Index(fields=['station', 'tid', 'is_active', 'registered_at']),
+        ]
         db_table = 'OilNote_StationApp_stationcardmapping'
 
     def __str__(self):
@@ -139,20 +179,8 @@ class StationCardMapping(models.Model):
         logger.info(f"StationCardMapping 저장 시도: 카드={self.card.number}, TID={self.tid}")
         
         if self.tid:
-            logger.debug(f"카드 {self.card.number}의 현재 TID 목록: {self.card.tids}")
-            try:
-                # TID를 카드의 tids 리스트에 추가
-                if not isinstance(self.card.tids, list):
-                    logger.warning(f"카드 {self.card.number}의 tids가 리스트가 아님: {type(self.card.tids)}")
-                    self.card.tids = []
-                
-                if self.tid not in self.card.tids:
-                    logger.info(f"카드 {self.card.number}에 새로운 TID {self.tid} 추가")
-                    self.card.tids.append(self.tid)
-                    self.card.save()
-                    logger.debug(f"카드 {self.card.number}의 업데이트된 TID 목록: {self.card.tids}")
-            except Exception as e:
-                logger.error(f"카드 {self.card.number}에 TID {self.tid} 추가 중 오류 발생: {str(e)}")
+            # TID를 카드의 TID 목록에 추가 (카드 행은 다시 저장하지 않음)
+            self.card.add_tid(self.tid)
         
         try:
             super().save(*args, **kwargs)
@@ -165,16 +193,8 @@ class StationCardMapping(models.Model):
         logger.info(f"StationCardMapping 삭제 시도: 카드={self.card.number}, TID={self.tid}")
         
         if self.tid:
-            logger.debug(f"카드 {self.card.number}의 현재 TID 목록: {self.card.tids}")
-            try:
-                # TID를 카드의 tids 리스트에서 제거
-                if self.tid in self.card.tids:
-                    logger.info(f"카드 {self.card.number}에서 TID {self.tid} 제거")
-                    self.card.tids.remove(self.tid)
-                    self.card.save()
-                    logger.debug(f"카드 {self.card.number}의 업데이트된 TID 목록: {self.card.tids}")
-            except Exception as e:
-                logger.error(f"카드 {self.card.number}에서 TID {self.tid} 제거 중 오류 발생: {str(e)}")
+            # TID를 카드의 TID 목록에서 제거
+            self.card.remove_tid(self.tid)
         
         try:
             super().delete(*args, **kwargs)
@@ -310,56 +330,53 @@ class PhoneCardMapping(models.Model):
         if user.user_type != 'CUSTOMER':
             raise ValueError('일반 고객만 연동할 수 있습니다.')
         
-        # 이미 사용 중인 카드인지 확인 (다른 PhoneCardMapping에서 사용 중인지 확인)
-        existing_used_mapping = PhoneCardMapping.objects.filter(
-            membership_card=self.membership_card,
-            is_used=True
-        ).exclude(pk=self.pk)
-        
-        if existing_used_mapping.exists():
-            # 이미 다른 매핑에서 사용 중인 카드라면 연동 불가
-            raise ValueError('이미 다른 사용자와 연동된 멤버십 카드입니다.')
-        
-        self.linked_user = user
-        self.is_used = True
-        self.save()
-        
-        # 고객 프로필에 멤버십 카드 정보 업데이트
-        if hasattr(user, 'customer_profile'):
-            # 기존 멤버십카드가 있으면 추가, 없으면 새로 설정
-            current_cards = user.customer_profile.membership_card or ''
-            if current_cards:
-                if self.membership_card.full_number not in current_cards:
-                    user.customer_profile.membership_card = f"{current_cards},{self.membership_card.full_number}"
-            else:
-                user.customer_profile.membership_card = self.membership_card.full_number
-            
-            # 차량 번호가 있으면 고객 프로필에 복사 (기존 차량번호가 없을 때만)
-            if self.car_number and not user.customer_profile.car_number:
-                user.customer_profile.car_number = self.car_number
-            
-            user.customer_profile.save()
-        
-        # 주유소와 고객 관계 생성
-        from OilNote_User.models import CustomerStationRelation
-        relation, created = CustomerStationRelation.objects.get_or_create(
-            customer=user,
-            station=self.station,
-            defaults={'is_active': True}
-        )
-        
-        # 새로운 관계가 생성된 경우 회원가입 쿠폰 자동 발행
-        if created:
-            logger.info(f"🎯 새로운 고객-주유소 관계 생성됨, 회원가입 쿠폰 자동발행 시작")
-            issued_count = auto_issue_signup_coupons(user, self.station)
-            if issued_count > 0:
-                logger.info(f"🎉 회원가입 쿠폰 {issued_count}개 자동 발행됨")
+        with transaction.atomic():
+            # 이미 사용 중인 카드인지 확인 (다른 PhoneCardMapping에서 사용 중인지 확인)
+            existing_used_mapping = PhoneCardMapping.objects.filter(
+                membership_card=self.membership_card,
+                is_used=True
+            ).exclude(pk=self.pk)
+
+            if existing_used_mapping.exists():
+                # 이미 다른 매핑에서 사용 중인 카드라면 연동 불가
+                raise ValueError('이미 다른 사용자와 연동된 멤버십 카드입니다.')
+
+            # 고객-카드 연결을 먼저 해서 다른 고객의 카드면 매핑을 바꾸기 전에 실패하게 함
+            # (프로필의 멤버십 카드 표시값도 함께 갱신됨)
+            from OilNote_User.models import CustomerCard
+            CustomerCard.link(user, self.membership_card.number)
+
+            self.linked_user = user
+            self.is_used = True
+            self.save()
+
+            if hasattr(user, 'customer_profile'):
+                # 차량 번호가 있으면 고객 프로필에 복사 (기존 차량번호가 없을 때만)
+                if self.car_number and not user.customer_profile.car_number:
+                    user.customer_profile.car_number = self.car_number
+
+                user.customer_profile.save()
+
+            # 주유소와 고객 관계 생성
+            from OilNote_User.models import CustomerStationRelation
+            relation, created = CustomerStationRelation.objects.get_or_create(
+                customer=user,
+                station=self.station,
+                defaults={'is_active': True}
+            )
+
+            # 새로운 관계가 생성된 경우 회원가입 쿠폰 자동 발행
+            if created:
+                logger.info(f"🎯 새로운 고객-주유소 관계 생성됨, 회원가입 쿠폰 자동발행 시작")
+                issued_count = auto_issue_signup_coupons(user, self.station)
+                if issued_count > 0:
+                    logger.info(f"🎉 회원가입 쿠폰 {issued_count}개 자동 발행됨")
+                else:
+                    logger.info(f"❌ 회원가입 쿠폰 발행되지 않음")
             else:
-                logger.info(f"❌ 회원가입 쿠폰 발행되지 않음")
-        else:
-            logger.info(f"이미 존재하는 고객-주유소 관계, 회원가입 쿠폰 발행 건너뜀")
-        
-        logger.info(f"폰번호 {self.phone_number}과 사용자 {user.username} 연동 완료")
+                logger.info(f"이미 존재하는 고객-주유소 관계, 회원가입 쿠폰 발행 건너뜀")
+
+            logger.info(f"폰번호 {self.phone_number}과 사용자 {user.username} 연동 완료")
 
     def unlink_user(self):
         """사용자 연동 해제"""
@@ -432,6 +449,10 @@ class ExcelSalesData(models.Model):
         verbose_name = '엑셀 매출 데이터'
         verbose_name_plural = '4. 엑셀 매출 데이터 목록'
         ordering = ['-sale_date', '-sale_time']
+        indexes = [
+            # 주유소(TID)별 기간 집계 (전월매출 쿠폰, 월별 통계)
+            models.Index(fields=['tid', 'sale_date', 'customer_name']),
+        ]
         db_table = 'OilNote_StationApp_excelsalesdata'
 
     def __str__(self):
@@ -709,6 +730,8 @@ class CustomerCoupon(models.Model):
             models.Index(fields=['customer', 'status']),
             models.Index(fields=['coupon_template']),
             models.Index(fields=['auto_coupon_template']),
+            # 만료 처리 배치 (status='AVAILABLE' AND expiry_date < 오늘)
+            models.Index(fields=['status', 'expiry_date']),
         ]
         db_table = 'OilNote_StationApp_customercoupon'
     
@@ -740,19 +763,73 @@ class CustomerCoupon(models.Model):
         
         super().save(*args, **kwargs)
     
+    @classmethod
+    def redeem(cls, coupon_id, customer=None, used_amount=None):
+        """
+        조건부 UPDATE 한 번으로 쿠폰 사용 처리
+
+        사용 가능 상태이고 만료되지 않은 경우에만 USED 로 바뀌므로, 같은 쿠폰을
+        동시에 여러 번 사용 요청해도 한 요청만 성공한다.
+
+        Returns:
+            bool: 이번 요청으로 사용 처리되었는지 여부
+        """
+        from django.db import transaction
+
+        now = timezone.now()
+        coupons = cls.objects.filter(
+            models.Q(expiry_date__isnull=True) | models.Q(expiry_date__gte=now.date()),
+            id=coupon_id,
+            status='AVAILABLE'
+        )
+        if customer is not None:
+            coupons = coupons.filter(customer=customer)
+
+        updates = {'status': 'USED', 'used_date': now}
+        if used_amount:
+            updates['used_amount'] = used_amount
+
+        with transaction.atomic():
+            if not coupons.update(**updates):
+                return False
+            customer_id, auto_template_id = cls.objects.filter(id=coupon_id).values_list(
+                'customer_id', 'auto_coupon_template_id'
+            ).get()
+            # 자동 쿠폰 템플릿 사용 수
+            if auto_template_id:
+                AutoCouponTemplate.objects.filter(pk=auto_template_id).update(total_used=models.F('total_used') + 1)
+        invalidate_customer_summary(customer_id)
+        return True
+    
     def use_coupon(self, used_amount=None):
         """쿠폰 사용 처리"""
-        if self.status != 'AVAILABLE':
+        if not CustomerCoupon.redeem(self.pk, used_amount=used_amount):
+            # 실패 사유 확인용으로 최신 상태 조회
+            self.refresh_from_db(fields=['status', 'used_date', 'expiry_date'])
+            if self.status == 'AVAILABLE' and self.expiry_date and timezone.now().date() > self.expiry_date:
+                raise ValueError("만료된 쿠폰입니다.")
             raise ValueError("사용할 수 없는 쿠폰입니다.")
         
-        if self.expiry_date and timezone.now().date() > self.expiry_date:
-            raise ValueError("만료된 쿠폰입니다.")
-        
-        self.status = 'USED'
-        self.used_date = timezone.now()
-        if used_amount:
-            self.used_amount = used_amount
-        self.save()
+        self.refresh_from_db(fields=['status', 'used_date', 'used_amount'])
+    
+    @classmethod
+    def expire_overdue(cls, today=None, limit=5000):
+        """
+        만료일이 지난 사용 가능 쿠폰을 최대 limit 개 EXPIRED 로 변경
+
+        처리된 쿠폰은 조건에서 빠지므로 0을 반환할 때까지 반복 호출하면 된다.
+
+        Returns:
+            int: 변경된 쿠폰 수
+        """
+        today = today or timezone.now().date()
+        overdue = cls.objects.filter(status='AVAILABLE', expiry_date__lt=today)
+        rows = list(overdue.order_by().values_list('id', 'customer_id')[:limit])
+        if not rows:
+            return 0
+        updated = overdue.filter(id__in=[row[0] for row in rows]).update(status='EXPIRED')
+        invalidate_customer_summary([row[1] for row in rows])
+        return updated
     
     def is_available(self):
         """쿠폰 사용 가능 여부 확인"""
@@ -801,13 +878,125 @@ class StationCouponQuota(models.Model):
     
     def use_quota(self, count=1):
         """쿠폰 수량 사용"""
-        if not self.can_issue_coupons(count):
+        if not type(self).reserve(self.station_id, count):
+            self.refresh_from_db(fields=['total_quota', 'used_quota'])
             raise ValueError(f"쿠폰 수량 부족 (요청: {count}, 잔여: {self.remaining_quota})")
         
-        self.used_quota += count
-        self.save()
+        self.refresh_from_db(fields=['total_quota', 'used_quota', 'updated_at'])
         return True
 
+    def add_quota(self, count):
+        """쿠폰 수량 추가"""
+        type(self).objects.filter(pk=self.pk).update(
+            total_quota=models.F('total_quota') + count,
+            updated_at=timezone.now()
+        )
+        self.refresh_from_db(fields=['total_quota', 'used_quota', 'updated_at'])
+
+    @classmethod
+    def reserve(cls, station, count):
+        """
+        쿠폰 수량 예약 (잔여 수량이 충분할 때만 차감)
+
+        UPDATE ... SET used_quota = used_quota + n WHERE total_quota - used_quota >= n
+        한 문장으로 처리하므로 동시에 발행해도 잔여 수량을 넘겨 차감되지 않는다.
+
+        Returns:
+            bool: 예약 성공 여부
+        """
+        if count <= 0:
+            return True
+        station_id = getattr(station, 'pk', station)
+        updated = cls.objects.filter(
+            station_id=station_id,
+            total_quota__gte=models.F('used_quota') + count
+        ).update(used_quota=models.F('used_quota') + count, updated_at=timezone.now())
+        return updated > 0
+
+    @classmethod
+    def release(cls, station, count):
+        """예약했지만 발행하지 못한 수량 반환"""
+        if count <= 0:
+            return
+        station_id = getattr(station, 'pk', station)
+        cls.objects.filter(station_id=station_id).update(
+            used_quota=Greatest(models.F('used_quota') - count, 0),
+            updated_at=timezone.now()
+        )
+
+
+
+class CouponIssueJob(models.Model):
+    """대량 수동 쿠폰 발행 작업 (백그라운드 진행률 조회용)"""
+    STATUS_CHOICES = [
+        ('pending', '대기중'),
+        ('running', '발행 중'),
+        ('completed', '완료'),
+        ('failed', '실패'),
+    ]
+
+    station = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        verbose_name='주유소',
+        limit_choices_to={'user_type': 'STATION'},
+        related_name='coupon_issue_jobs'
+    )
+    coupon_template = models.ForeignKey(
+        CouponTemplate,
+        on_delete=models.CASCADE,
+        verbose_name='쿠폰 템플릿'
+    )
+    target_type = models.CharField(max_length=20, verbose_name='발행 대상')
+    total_count = models.IntegerField(default=0, verbose_name='대상 고객 수')
+    issued_count = models.IntegerField(default=0, verbose_name='발행 수')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='상태')
+    error_message = models.TextField(blank=True, null=True, verbose_name='오류 메시지')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='시작일시')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='종료일시')
+
+    class Meta:
+        verbose_name = '쿠폰 발행 작업'
+        verbose_name_plural = '17. 쿠폰 발행 작업 목록'
+        ordering = ['-created_at']
+        db_table = 'OilNote_StationApp_couponissuejob'
+
+    def __str__(self):
+        return f"{self.station.username} - {self.coupon_template.coupon_name} ({self.issued_count}/{self.total_count}, {self.get_status_display()})"
+
+    @property
+    def progress(self):
+        """진행률 (%)"""
+        if not self.total_count:
+            return 100 if self.status == 'completed' else 0
+        return min(100, int(self.issued_count * 100 / self.total_count))
+
+
+class MonthlyCouponStatistics(models.Model):
+    """주유소별 마감된 월의 쿠폰 발행/사용 집계 (쿠폰 통계 월별 추이 캐시)"""
+    station = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        verbose_name='주유소',
+        limit_choices_to={'user_type': 'STATION'},
+        related_name='monthly_coupon_statistics'
+    )
+    year_month = models.CharField(max_length=7, verbose_name='년월')  # YYYY-MM 형식
+    issued_count = models.IntegerField(default=0, verbose_name='발행 수')
+    used_count = models.IntegerField(default=0, verbose_name='사용 수')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='업데이트일시')
+
+    class Meta:
+        verbose_name = '월별 쿠폰 통계'
+        verbose_name_plural = '18. 월별 쿠폰 통계 목록'
+        ordering = ['-year_month']
+        unique_together = ['station', 'year_month']
+        db_table = 'OilNote_StationApp_monthlycouponstatistics'
+
+    def __str__(self):
+        return f"{self.station.username} - {self.year_month} (발행 {self.issued_count}, 사용 {self.used_count})"
+
 
 class CumulativeSalesTracker(models.Model):
     """누적매출 추적 모델"""
@@ -889,6 +1078,77 @@ class CumulativeSalesTracker(models.Model):
         
         return coupon_count > 0, coupon_count
     
+    @classmethod
+    def add_sale(cls, customer, station, amount, threshold_amount):
+        """
+        누적 매출액에 판매 금액(또는 여러 건의 합계)을 더하고 임계값 통과 여부 계산
+
+        (고객, 주유소) 추적 행을 select_for_update 로 잠근 뒤 F() 로 갱신하므로
+        같은 고객의 매출이 동시에 들어와도 누적액이 어긋나지 않는다.
+        호출하는 쪽에서 transaction.atomic() 안에서 사용해야 한다.
+        threshold_amount 가 None 이면 (활성 템플릿 없음) 누적액만 갱신한다.
+        추적 행이 없던 고객은 이미 누적 처리된 매출 합계에서 시작한다.
+
+        Returns:
+            tuple: (추적 행, 이번에 통과한 임계값 개수)
+        """
+        amount = Decimal(str(amount))
+        tracker = cls.objects.filter(customer=customer, station=station).first()
+        if tracker is None:
+            tracker, _ = cls.objects.get_or_create(
+                customer=customer,
+                station=station,
+                defaults=cls.initial_values(customer, station, threshold_amount)
+            )
+        tracker = cls.objects.select_for_update().get(pk=tracker.pk)
+
+        updates = {
+            'cumulative_amount': models.F('cumulative_amount') + amount,
+            'updated_at': timezone.now(),
+        }
+        crossed = 0
+        if threshold_amount:
+            threshold_amount = Decimal(str(threshold_amount))
+            previous_total = tracker.cumulative_amount
+            new_total = previous_total + amount
+            crossed = max(0, int(new_total // threshold_amount) - int(previous_total // threshold_amount))
+            updates['threshold_amount'] = threshold_amount
+        if crossed:
+            # 마지막으로 통과한 임계값 배수
+            updates['last_coupon_issued_at'] = int(new_total // threshold_amount) * threshold_amount
+        cls.objects.filter(pk=tracker.pk).update(**updates)
+        tracker.refresh_from_db()
+        return tracker, crossed
+    
+    @classmethod
+    def initial_values(cls, customer, station, threshold_amount=None):
+        """
+        새 추적 행의 시작값 (rebuild_cumulative_sales 와 같은 조건의 누적 처리된 매출 합계)
+
+        Returns:
+            dict: cumulative_amount, threshold_amount, last_coupon_issued_at
+        """
+        from django.db.models import Sum
+        from OilNote_User.models import StationProfile
+
+        tid = StationProfile.objects.filter(user=station).values_list('tid', flat=True).first()
+        total = Decimal('0')
+        if tid:
+            total = ExcelSalesData.objects.filter(
+                customer_name=customer.username,
+                tid=tid,
+                is_cumulative_processed=True,
+                total_amount__gt=0
+            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+
+        threshold = Decimal(str(threshold_amount)) if threshold_amount else Decimal('50000')
+        return {
+            'cumulative_amount': total,
+            'threshold_amount': threshold,
+            # 마지막으로 통과한 임계값 배수 (이미 지난 구간은 다시 발행하지 않음)
+            'last_coupon_issued_at': int(total // threshold) * threshold,
+        }
+
     def update_threshold_from_template(self, station):
         """AutoCouponTemplate에서 임계값 업데이트"""
         auto_template = AutoCouponTemplate.objects.filter(
@@ -963,8 +1223,10 @@ class CouponPurchaseRequest(models.Model):
                 station=self.station,
                 defaults={'total_quota': 0, 'used_quota': 0}
             )
-            quota.total_quota += self.requested_quantity
-            quota.save()
+            StationCouponQuota.objects.filter(pk=quota.pk).update(
+                total_quota=models.F('total_quota') + self.requested_quantity,
+                updated_at=timezone.now()
+            )
             
             # 요청 상태 업데이트
             self.status = 'APPROVED'
@@ -1096,42 +1358,75 @@ def auto_issue_signup_coupons(customer, station):
         return 0
 
 
+def bulk_issue_signup_coupons(customer_ids, station, chunk_size=5000):
+    """
+    여러 고객에게 회원가입 쿠폰 일괄 발행 (auto_issue_signup_coupons 의 일괄 버전)
+
+    템플릿 조회 1회, 기존 발행 여부 IN 조회, bulk_create 로 처리한다.
+    bulk_create 는 save() 를 거치지 않으므로 만료일은 여기서 직접 설정한다.
+
+    Returns:
+        int: 발행된 쿠폰 수
+    """
+    customer_ids = list(customer_ids)
+    if not customer_ids:
+        return 0
+
+    template = AutoCouponTemplate.objects.filter(
+        station=station,
+        coupon_type='SIGNUP',
+        is_active=True
+    ).order_by('-created_at').first()
+
+    if not template or not template.is_valid_today():
+        logger.info(f"회원가입 쿠폰 일괄 발행 건너뜀: 주유소 {station.username}에 유효한 템플릿 없음")
+        return 0
+
+    issued_ids = set()
+    for offset in range(0, len(customer_ids), chunk_size):
+        issued_ids.update(
+            CustomerCoupon.objects.filter(
+                auto_coupon_template=template,
+                customer_id__in=customer_ids[offset:offset + chunk_size]
+            ).values_list('customer_id', flat=True)
+        )
+
+    expiry_date = None if template.is_permanent else template.valid_until
+    coupons = CustomerCoupon.objects.bulk_create(
+        [
+            CustomerCoupon(
+                customer_id=customer_id,
+                auto_coupon_template=template,
+                status='AVAILABLE',
+                expiry_date=expiry_date
+            )
+            for customer_id in set(customer_ids) - issued_ids
+        ],
+        batch_size=2000
+    )
+
+    invalidate_customer_summary([coupon.customer_id for coupon in coupons])
+    logger.info(f"회원가입 쿠폰 일괄 발행: {template.coupon_name} {len(coupons)}장 (주유소: {station.username})")
+    return len(coupons)
+
+
 def track_cumulative_sales(customer, station, sale_amount, excel_sales_data):
-    """ExcelSalesData 기반 누적매출 추적 및 쿠폰 발행"""
+    """
+    ExcelSalesData 기반 누적매출 추적 및 쿠폰 발행
+
+    고객의 전체 매출 이력을 다시 합산하지 않고 CumulativeSalesTracker 의
+    (고객, 주유소) 누적액에 이번 매출만 더한다. 이번 매출로 통과한 임계값 개수만큼
+    누적매출 쿠폰을 발행한다.
+    """
     from django.db import transaction
-    from django.db.models import Sum
-    from OilNote_User.models import StationProfile
     import time
     
     start_time = time.time()
     logger.info(f"=== ExcelSalesData 기반 누적매출 쿠폰 추적 시작 ===")
-    logger.info(f"고객: {customer.username} (ID: {customer.id}), 주유소: {station.username} (ID: {station.id}), 매출: {sale_amount:,.0f}원")
+    logger.info(f"고객: {customer.username} (ID: {customer.id}), 주유소: {station.username} (ID: {station.id}), 매출: {sale_amount:,.0f}원 (ExcelSalesData ID: {excel_sales_data.id})")
     
     try:
         with transaction.atomic():
-            # StationProfile에서 TID 가져오기
-            station_profile = StationProfile.objects.filter(user=station).first()
-            if not station_profile:
-                logger.warning(f"주유소 {station.username}의 StationProfile을 찾을 수 없음")
-                return
-            
-            # 이전 누적매출 계산 (현재 처리 중인 매출 제외)
-            previous_sales = ExcelSalesData.objects.filter(
-                customer_name=customer.username,
-                tid=station_profile.tid,
-                is_cumulative_processed=True
-            ).exclude(id=excel_sales_data.id).aggregate(total=Sum('total_amount'))['total'] or 0
-            
-            # 현재 매출 금액
-            current_sale_amount = float(excel_sales_data.total_amount)
-            
-            # 새로운 전체 누적매출 (이전 매출 + 현재 매출)
-            new_total_sales = float(previous_sales) + current_sale_amount
-            
-            logger.info(f"이전 누적매출: {previous_sales:,.0f}원")
-            logger.info(f"현재 매출: {current_sale_amount:,.0f}원")
-            logger.info(f"새로운 전체 누적매출: {new_total_sales:,.0f}원")
-            
             # AutoCouponTemplate에서 임계값 가져오기
             auto_template = AutoCouponTemplate.objects.filter(
                 station=station,
@@ -1140,66 +1435,46 @@ def track_cumulative_sales(customer, station, sale_amount, excel_sales_data):
             ).first()
             
             if not auto_template:
+                # 템플릿이 없어도 누적액은 계속 쌓아 둠
+                CumulativeSalesTracker.add_sale(customer, station, excel_sales_data.total_amount, None)
                 logger.warning(f"활성화된 누적매출 AutoCouponTemplate이 없음: {station.username}")
                 return
             
             threshold_amount = auto_template.condition_data.get('threshold_amount', 50000)
-            logger.info(f"누적매출 쿠폰 임계값: {threshold_amount:,.0f}원")
-            
-            # 이미 발행된 누적매출 쿠폰 개수 확인 (모든 템플릿 포함)
-            # 템플릿 전환 시 중복 발행 방지를 위해 전체 누적매출 쿠폰 개수를 확인
-            issued_coupons = CustomerCoupon.objects.filter(
-                customer=customer,
-                auto_coupon_template__station=station,
-                auto_coupon_template__coupon_type='CUMULATIVE'
-            ).count()
-            
-            # 이전 상태에서 발행되어야 했던 쿠폰 개수
-            previous_should_have = int(float(previous_sales) // float(threshold_amount))
-            
-            # 새로운 전체 상태에서 발행되어야 할 쿠폰 개수
-            new_should_have = int(float(new_total_sales) // float(threshold_amount))
-            
-            # 실제 추가 발행 필요한 쿠폰 개수
-            new_coupons_needed = max(0, new_should_have - previous_should_have)
             
-            logger.info(f"이전 발행되어야 할 쿠폰: {previous_should_have}개")
-            logger.info(f"새로운 발행되어야 할 쿠폰: {new_should_have}개")
-            logger.info(f"이미 발행된 쿠폰: {issued_coupons}개")
-            logger.info(f"추가 발행 필요: {new_coupons_needed}개")
+            # 누적액 갱신 (행 잠금) 및 이번 매출로 통과한 임계값 개수
+            tracker, new_coupons_needed = CumulativeSalesTracker.add_sale(
+                customer, station, excel_sales_data.total_amount, threshold_amount
+            )
+            logger.info(f"누적매출: {tracker.cumulative_amount:,.0f}원 (임계값 {threshold_amount:,.0f}원, 추가 발행 필요: {new_coupons_needed}개)")
             
             if new_coupons_needed > 0:
-                logger.info(f"누적매출 쿠폰 발행 시작: {new_coupons_needed}개")
-                
-                # 누적매출 쿠폰은 이미 계산된 조건으로 바로 발행
                 if auto_template.is_valid_today():
-                    # 벌크 생성을 위한 쿠폰 리스트
-                    coupons_to_create = []
-                    
-                    for i in range(new_coupons_needed):
-                        coupons_to_create.append(
-                            CustomerCoupon(
-                                customer=customer,
-                                auto_coupon_template=auto_template,
-                                status='AVAILABLE',
-                            )
+                    # bulk_create 는 save() 를 거치지 않으므로 만료일 직접 설정
+                    expiry_date = None if auto_template.is_permanent else auto_template.valid_until
+                    created_coupons = CustomerCoupon.objects.bulk_create([
+                        CustomerCoupon(
+                            customer=customer,
+                            auto_coupon_template=auto_template,
+                            status='AVAILABLE',
+                            expiry_date=expiry_date
                         )
-                    
-                    # 벌크 생성으로 성능 개선
-                    created_coupons = CustomerCoupon.objects.bulk_create(coupons_to_create)
+                        for _ in range(new_coupons_needed)
+                    ])
                     issued_count = len(created_coupons)
+                    invalidate_customer_summary(customer.id)
                     
                     # 템플릿 통계 업데이트
-                    auto_template.issued_count += issued_count
-                    auto_template.total_issued += issued_count
-                    auto_template.save()
+                    AutoCouponTemplate.objects.filter(pk=auto_template.pk).update(
+                        issued_count=models.F('issued_count') + issued_count,
+                        total_issued=models.F('total_issued') + issued_count
+                    )
                     
                     logger.info(f"✅ 누적매출 쿠폰 {issued_count}개 발행 완료: {auto_template.coupon_name}")
-                    logger.info(f"발행 기준 누적액: {new_total_sales:,.0f}원")
                 else:
-                    logger.warning(f"쿠폰 발행 불가: {reason}")
+                    logger.warning(f"쿠폰 발행 불가: 템플릿 {auto_template.coupon_name} 유효기간 아님")
             else:
-                remaining = float(threshold_amount) - (float(new_total_sales) % float(threshold_amount))
+                remaining = threshold_amount - (float(tracker.cumulative_amount) % float(threshold_amount))
                 logger.info(f"누적매출 쿠폰 발행 조건 미충족 (다음 발행까지 {remaining:,.0f}원 필요)")
             
             elapsed_time = time.time() - start_time
@@ -1539,6 +1814,13 @@ class AutoCouponCondition(models.Model):
 
 # ========== Django 시그널 ==========
 
+@receiver(post_save, sender=CustomerCoupon)
+@receiver(post_delete, sender=CustomerCoupon)
+def on_customer_coupon_changed(sender, instance, **kwargs):
+    """쿠폰 발행/변경/삭제 시 고객 메인 화면 요약 캐시 삭제"""
+    invalidate_customer_summary(instance.customer_id)
+
+
 @receiver(post_save, sender=CustomerVisitHistory)
 def on_customer_visit(sender, instance, created, **kwargs):
     """고객 방문 시 누적매출 추적"""
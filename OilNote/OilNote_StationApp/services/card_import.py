@@ -0,0 +1,185 @@
+"""
+엑셀 멤버십 카드 일괄 등록
+
+업로드된 시트의 카드번호를 pandas 로 한 번에 검증(16자리 숫자, 파일 내 중복)하고,
+기존 카드와 기존 매핑을 IN 조회로 가져온 뒤 없는 것만 bulk_create 한다.
+결과는 행 단위 리포트로 돌려준다.
+"""
+import io
+import logging
+
+import pandas as pd
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import CardTid, PointCard, StationCardMapping
+
+logger = logging.getLogger(__name__)
+
+CARD_COLUMNS = ('point number', 'point_number', 'card_number')
+LOOKUP_CHUNK_SIZE = 5000
+BULK_BATCH_SIZE = 2000
+
+# 행 처리 결과
+RESULT_CREATED = 'created'          # 새 카드 생성 + 매핑
+RESULT_MAPPED = 'mapped'            # 기존 카드에 매핑 생성/재활성화
+RESULT_ALREADY = 'already'          # 이미 이 주유소에 등록된 카드
+RESULT_DUPLICATE = 'duplicate'      # 파일 내 중복
+RESULT_INVALID = 'invalid'          # 16자리 숫자가 아님
+
+
+def read_card_sheet(file_content, file_name):
+    """엑셀 파일 내용을 DataFrame 으로 읽기"""
+    engine = 'openpyxl' if file_name.lower().endswith('.xlsx') else 'xlrd'
+    return pd.read_excel(io.BytesIO(file_content), engine=engine, dtype=str)
+
+
+def find_card_column(df):
+    """카드번호 컬럼 이름 ('point number' 등, 없으면 첫 번째 컬럼)"""
+    for column in CARD_COLUMNS:
+        if column in df.columns:
+            return column
+    return df.columns[0]
+
+
+def normalize_card_numbers(values):
+    """
+    카드번호 열을 정리하고 행별 검증 결과를 계산
+
+    Returns:
+        DataFrame: row(엑셀 기준 행 번호), card_number, result(invalid/duplicate/None)
+        빈 값 행은 제외한다.
+    """
+    numbers = pd.Series(values).fillna('').astype(str).str.strip()
+    # 숫자로 읽힌 경우의 소수점 제거 (예: 1234567890123450.0 -> 1234567890123450)
+    numbers = numbers.str.split('.', n=1).str[0]
+
+    frame = pd.DataFrame({'row': range(1, len(numbers) + 1), 'card_number': numbers.values})
+    frame = frame[~frame['card_number'].isin(['', 'nan', 'None', 'NaN'])]
+
+    valid = frame['card_number'].str.fullmatch(r'\d{16}')
+    duplicate = valid & frame['card_number'].duplicated(keep='first')
+
+    frame['result'] = None
+    frame.loc[~valid, 'result'] = RESULT_INVALID
+    frame.loc[duplicate, 'result'] = RESULT_DUPLICATE
+    return frame.reset_index(drop=True)
+
+
+def _chunks(items, size=LOOKUP_CHUNK_SIZE):
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def _card_ids_for(numbers):
+    """카드번호 → 카드 ID (IN 조회)"""
+    card_ids = {}
+    for chunk in _chunks(numbers):
+        card_ids.update(PointCard.objects.filter(number__in=chunk).values_list('number', 'id'))
+    return card_ids
+
+
+def _mapping_states_for(station, tid, card_ids):
+    """카드 ID → 매핑 활성 여부 (해당 주유소+TID, IN 조회)"""
+    states = {}
+    for chunk in _chunks(card_ids):
+        states.update(
+            StationCardMapping.objects.filter(
+                station=station,
+                tid=tid,
+                card_id__in=chunk,
+            ).values_list('card_id', 'is_active')
+        )
+    return states
+
+
+def import_card_numbers(station, tid, values, oil_company_code='0', agency_code='000'):
+    """
+    카드번호 목록을 주유소에 일괄 등록
+
+    Args:
+        station: 주유소 사용자
+        tid: 주유소 TID
+        values: 엑셀 카드번호 열 (Series 또는 리스트)
+        oil_company_code: 새로 만드는 카드의 정유사 코드
+        agency_code: 새로 만드는 카드의 대리점 코드
+
+    Returns:
+        dict: 결과별 건수와 행 단위 리포트(rows)
+    """
+    frame = normalize_card_numbers(values)
+    pending = frame['result'].isna()
+    numbers = frame.loc[pending, 'card_number'].tolist()
+
+    now = timezone.now()
+    with transaction.atomic():
+        # 1) 기존 카드 / 기존 매핑 조회
+        existing_ids = _card_ids_for(numbers)
+        mapping_states = _mapping_states_for(station, tid, list(existing_ids.values()))
+
+        # 2) 없는 카드 일괄 생성 후 ID 조회
+        new_numbers = [number for number in numbers if number not in existing_ids]
+        PointCard.objects.bulk_create(
+            [
+                PointCard(
+                    number=number,
+                    number_reversed=PointCard.reverse_number(number),
+                    oil_company_code=oil_company_code,
+                    agency_code=agency_code,
+                )
+                for number in new_numbers
+            ],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        card_ids = dict(existing_ids)
+        card_ids.update(_card_ids_for(new_numbers))
+
+        # 3) 카드-TID 연결 / 매핑 일괄 생성, 비활성 매핑 재활성화
+        CardTid.objects.bulk_create(
+            [CardTid(card_id=card_id, tid=tid) for card_id in card_ids.values()],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        StationCardMapping.objects.bulk_create(
+            [
+                StationCardMapping(card_id=card_id, station=station, tid=tid, registered_at=now, is_active=True)
+                for card_id in card_ids.values()
+                if card_id not in mapping_states
+            ],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        inactive_ids = [card_id for card_id, is_active in mapping_states.items() if not is_active]
+        for chunk in _chunks(inactive_ids):
+            StationCardMapping.objects.filter(station=station, tid=tid, card_id__in=chunk).update(is_active=True)
+
+    # 4) 행 단위 결과
+    new_set = set(new_numbers)
+    active_ids = {card_id for card_id, is_active in mapping_states.items() if is_active}
+
+    def row_result(number):
+        if number in new_set:
+            return RESULT_CREATED
+        if existing_ids[number] in active_ids:
+            return RESULT_ALREADY
+        return RESULT_MAPPED
+
+    frame.loc[pending, 'result'] = frame.loc[pending, 'card_number'].map(row_result)
+
+    counts = frame['result'].value_counts().to_dict()
+    summary = {
+        'total_rows': len(frame),
+        'registered_count': counts.get(RESULT_CREATED, 0),
+        'mapped_count': counts.get(RESULT_MAPPED, 0),
+        'already_count': counts.get(RESULT_ALREADY, 0),
+        'duplicate_count': counts.get(RESULT_DUPLICATE, 0),
+        'invalid_count': counts.get(RESULT_INVALID, 0),
+        'rows': frame.to_dict('records'),
+    }
+    logger.info(
+        f"엑셀 카드 일괄 등록: 주유소={station.username}, TID={tid}, 행={summary['total_rows']}, "
+        f"신규={summary['registered_count']}, 매핑={summary['mapped_count']}, 기존={summary['already_count']}, "
+        f"파일내중복={summary['duplicate_count']}, 형식오류={summary['invalid_count']}"
+    )
+    return summary
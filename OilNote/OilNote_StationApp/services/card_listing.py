@@ -0,0 +1,112 @@
+"""
+주유소 등록 카드 목록 조회
+
+카드 관리 화면이 주유소 전체 카드를 한 번에 받지 않도록,
+(registered_at, id) 기준 키셋 페이지네이션과 서버 측 필터를 제공한다.
+상태별 카드 수는 조건부 집계 한 번으로 계산한다.
+"""
+from datetime import datetime, time
+
+from django.db.models import Count, Q
+
+from ..models import StationCardMapping
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def station_mappings(station, tid):
+    """주유소+TID의 활성 카드 매핑 쿼리셋"""
+    return StationCardMapping.objects.filter(station=station, tid=tid, is_active=True)
+
+
+def card_status_counts(station, tid):
+    """전체/사용가능/사용중 카드 수 (쿼리 1회)"""
+    counts = station_mappings(station, tid).aggregate(
+        total_count=Count('id'),
+        used_count=Count('id', filter=Q(card__is_used=True)),
+    )
+    counts['active_count'] = counts['total_count'] - counts['used_count']
+    return counts
+
+
+def encode_cursor(registered_at, mapping_id):
+    """다음 페이지 커서 (마지막 행의 등록일시와 ID)"""
+    return f"{registered_at.isoformat()}_{mapping_id}"
+
+
+def decode_cursor(cursor):
+    """커서 문자열을 (등록일시, ID) 로 변환, 형식이 틀리면 ValueError"""
+    registered_at, _, mapping_id = cursor.rpartition('_')
+    return datetime.fromisoformat(registered_at), int(mapping_id)
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def list_station_cards(station, tid, status=None, prefix=None, date_from=None, date_to=None,
+                       cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    주유소 등록 카드 한 페이지 조회
+
+    Args:
+        station: 주유소 사용자
+        tid: 주유소 TID
+        status: 'used' / 'unused' / None(전체)
+        prefix: 카드번호 앞자리
+        date_from, date_to: 등록일 범위 (YYYY-MM-DD)
+        cursor: 이전 응답의 next_cursor
+        page_size: 페이지 크기 (최대 MAX_PAGE_SIZE)
+
+    Returns:
+        tuple: (카드 목록, 다음 페이지 커서 또는 None)
+
+    Raises:
+        ValueError: 커서/날짜 형식이 올바르지 않은 경우
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    queryset = station_mappings(station, tid)
+
+    if status == 'used':
+        queryset = queryset.filter(card__is_used=True)
+    elif status == 'unused':
+        queryset = queryset.filter(card__is_used=False)
+
+    if prefix:
+        queryset = queryset.filter(card__number__istartswith=prefix)
+
+    start_date = _parse_date(date_from)
+    end_date = _parse_date(date_to)
+    if start_date:
+        queryset = queryset.filter(registered_at__gte=datetime.combine(start_date, time.min))
+    if end_date:
+        queryset = queryset.filter(registered_at__lte=datetime.combine(end_date, time.max))
+
+    if cursor:
+        last_registered_at, last_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(registered_at__lt=last_registered_at)
+            | Q(registered_at=last_registered_at, id__lt=last_id)
+        )
+
+    rows = list(
+        queryset.order_by('-registered_at', '-id').values(
+            'id', 'registered_at', 'card__number', 'card__is_used'
+        )[:page_size + 1]
+    )
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]['registered_at'], rows[-1]['id'])
+
+    cards = [
+        {
+            'number': row['card__number'],
+            'is_used': row['card__is_used'],
+            'created_at': row['registered_at'].strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        for row in rows
+    ]
+    return cards, next_cursor
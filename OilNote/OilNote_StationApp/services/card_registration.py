@@ -0,0 +1,151 @@
+"""
+멤버십 카드 범위 일괄 등록
+
+카드 한 장마다 get_or_create / save 를 반복하지 않고, 카드번호 구간 단위로
+기존 카드와 매핑을 한 번에 조회한 뒤 없는 것만 bulk_create 한다.
+16자리 카드번호는 모두 같은 길이의 숫자 문자열이므로 number 인덱스에 대한
+범위(BETWEEN) 조회로 구간 내 기존 카드를 가져올 수 있다.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import CardTid, PointCard, StationCardMapping
+
+logger = logging.getLogger(__name__)
+
+CARD_NUMBER_LENGTH = 16
+MAX_RANGE_SIZE = 100000
+WINDOW_SIZE = 10000
+PREVIEW_SIZE = 100
+
+
+def build_card_range(start_number, card_count):
+    """시작번호와 개수로 16자리 카드번호 목록 생성"""
+    start = int(start_number)
+    last = start + card_count - 1
+    if last >= 10 ** CARD_NUMBER_LENGTH:
+        raise ValueError(f'카드번호가 {CARD_NUMBER_LENGTH}자리를 초과합니다.')
+    return [str(start + i).zfill(CARD_NUMBER_LENGTH) for i in range(card_count)]
+
+
+def _register_window(station, tid, numbers, oil_company_code, agency_code, now):
+    """카드번호 구간 하나를 등록하고 처리 건수를 반환"""
+    first, last = numbers[0], numbers[-1]
+
+    # 1) 구간 내 기존 카드 조회 (number 인덱스 범위 조회 1회)
+    existing = set(PointCard.objects.filter(number__range=(first, last)).values_list('number', flat=True))
+
+    # 2) 없는 카드 일괄 생성
+    new_cards = [
+        PointCard(
+            number=number,
+            number_reversed=PointCard.reverse_number(number),
+            oil_company_code=oil_company_code,
+            agency_code=agency_code,
+        )
+        for number in numbers if number not in existing
+    ]
+    if new_cards:
+        PointCard.objects.bulk_create(new_cards, batch_size=2000, ignore_conflicts=True)
+
+    # 3) 구간 내 카드 ID 조회 후 카드-TID 연결 일괄 생성 (이미 있으면 무시)
+    card_ids = dict(PointCard.objects.filter(number__range=(first, last)).values_list('number', 'id'))
+    CardTid.objects.bulk_create(
+        [CardTid(card_id=card_id, tid=tid) for card_id in card_ids.values()],
+        batch_size=2000,
+        ignore_conflicts=True,
+    )
+
+    # 4) 기존 매핑 조회
+    mappings = StationCardMapping.objects.filter(
+        station=station,
+        tid=tid,
+        card__number__range=(first, last),
+    ).values_list('card_id', 'is_active')
+    mapped_card_ids = set()
+    inactive_card_ids = []
+    for card_id, is_active in mappings:
+        mapped_card_ids.add(card_id)
+        if not is_active:
+            inactive_card_ids.append(card_id)
+
+    # 5) 비활성 매핑 재활성화 + 없는 매핑 일괄 생성
+    reactivated = 0
+    if inactive_card_ids:
+        reactivated = StationCardMapping.objects.filter(
+            station=station,
+            tid=tid,
+            card_id__in=inactive_card_ids,
+        ).update(is_active=True)
+
+    new_mappings = [
+        StationCardMapping(card_id=card_id, station=station, tid=tid, registered_at=now, is_active=True)
+        for card_id in card_ids.values()
+        if card_id not in mapped_card_ids
+    ]
+    if new_mappings:
+        StationCardMapping.objects.bulk_create(new_mappings, batch_size=2000, ignore_conflicts=True)
+
+    return {
+        'created_cards': len(new_cards),
+        'existing_cards': len(existing),
+        'created_mappings': len(new_mappings),
+        'reactivated_mappings': reactivated,
+    }
+
+
+def register_card_range(station, tid, start_number, card_count, oil_company_code='0', agency_code='000'):
+    """
+    카드번호 구간을 주유소에 일괄 등록
+
+    Args:
+        station: 주유소 사용자
+        tid: 주유소 TID
+        start_number: 16자리 시작 카드번호
+        card_count: 등록할 카드 수 (최대 MAX_RANGE_SIZE)
+        oil_company_code: 새로 만드는 카드의 정유사 코드
+        agency_code: 새로 만드는 카드의 대리점 코드
+
+    Returns:
+        dict: 생성/기존 카드 수, 생성/재활성화 매핑 수, 앞부분 카드 미리보기
+    """
+    if card_count > MAX_RANGE_SIZE:
+        raise ValueError(f'한 번에 최대 {MAX_RANGE_SIZE:,}장까지 등록할 수 있습니다.')
+
+    numbers = build_card_range(start_number, card_count)
+    now = timezone.now()
+    summary = {
+        'total': len(numbers),
+        'created_cards': 0,
+        'existing_cards': 0,
+        'created_mappings': 0,
+        'reactivated_mappings': 0,
+    }
+
+    with transaction.atomic():
+        for offset in range(0, len(numbers), WINDOW_SIZE):
+            window = numbers[offset:offset + WINDOW_SIZE]
+            result = _register_window(station, tid, window, oil_company_code, agency_code, now)
+            for key, value in result.items():
+                summary[key] += value
+            logger.debug(f"카드 구간 등록: {window[0]}~{window[-1]} {result}")
+
+    summary['cards'] = [
+        {
+            'number': card['number'],
+            'is_used': card['is_used'],
+            'created_at': card['created_at'].strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        for card in PointCard.objects.filter(
+            number__range=(numbers[0], numbers[-1])
+        ).order_by('number').values('number', 'is_used', 'created_at')[:PREVIEW_SIZE]
+    ]
+
+    logger.info(
+        f"카드 범위 등록 완료: 주유소={station.username}, TID={tid}, "
+        f"{numbers[0]}~{numbers[-1]} ({summary['total']}장, 신규 카드 {summary['created_cards']}장, "
+        f"신규 매핑 {summary['created_mappings']}건, 재활성화 {summary['reactivated_mappings']}건)"
+    )
+    return summary
@@ -0,0 +1,78 @@
+"""
+주유소 멤버십 카드번호 검색
+
+실시간 검색(키 입력마다 호출)에서 전체 카드 테이블을 `number LIKE '%q%'` 로
+훑지 않도록, 요청한 주유소의 카드 매핑 범위 안에서 인덱스를 타는 순서로 검색한다.
+
+- 16자리 입력: number 정확히 일치 (unique 인덱스)
+- 앞자리 일치: number 인덱스 범위 검색
+- 뒷자리 일치: number_reversed 인덱스 범위 검색
+- 중간 일치: 위 결과로 limit 를 채우지 못한 경우에만, 해당 주유소 카드 안에서 검색
+"""
+import logging
+
+from ..models import PointCard
+
+logger = logging.getLogger(__name__)
+
+CARD_NUMBER_LENGTH = 16
+MIN_QUERY_LENGTH = 4
+DEFAULT_LIMIT = 10
+
+
+def station_card_queryset(station, tid=None):
+    """주유소(및 TID)에 활성 매핑된 카드 쿼리셋"""
+    # 같은 매핑 행에 조건이 걸리도록 한 번의 filter() 로 조인
+    conditions = {'mappings__station': station, 'mappings__is_active': True}
+    if tid:
+        conditions['mappings__tid'] = tid
+    return PointCard.objects.filter(**conditions).prefetch_related('tid_links')
+
+
+def search_station_cards(station, query, tid=None, limit=DEFAULT_LIMIT):
+    """
+    주유소 매핑 범위 안에서 카드번호 검색
+
+    Args:
+        station: 주유소 사용자
+        query: 숫자만 남긴 검색어 (최소 4자리)
+        tid: 주유소 TID (없으면 주유소 기준으로만 제한)
+        limit: 최대 반환 개수
+
+    Returns:
+        list[PointCard]: 정확히 일치 → 앞자리 → 뒷자리 → 중간 일치 순
+    """
+    if not query or len(query) < MIN_QUERY_LENGTH:
+        return []
+
+    base = station_card_queryset(station, tid)
+
+    if len(query) >= CARD_NUMBER_LENGTH:
+        return list(base.filter(number=query[:CARD_NUMBER_LENGTH])[:1])
+
+    # MySQL 에서 startswith 는 LIKE BINARY 로 변환되어 인덱스를 못 탈 수 있으므로
+    # 숫자만 저장되는 컬럼이라 결과가 같은 istartswith(LIKE 'q%') 를 사용
+    lookups = (
+        {'number__istartswith': query},
+        {'number_reversed__istartswith': PointCard.reverse_number(query)},
+    )
+
+    results = []
+    seen_ids = set()
+
+    def collect(queryset):
+        for card in queryset.order_by('number')[:limit - len(results)]:
+            if card.id not in seen_ids:
+                seen_ids.add(card.id)
+                results.append(card)
+
+    for lookup in lookups:
+        collect(base.filter(**lookup))
+        if len(results) >= limit:
+            return results
+
+    # 중간 일치는 해당 주유소 카드 범위만 훑음
+    collect(base.filter(number__contains=query).exclude(id__in=seen_ids))
+
+    logger.debug(f"카드 검색: query={query}, station={station.username}, tid={tid}, 결과={len(results)}건")
+    return results
@@ -0,0 +1,235 @@
+"""
+수동 쿠폰 일괄 발행
+
+대상 고객 ID 를 고객 ID 순 키셋으로 나눠 읽고, 구간마다 만료일을 미리 계산한
+CustomerCoupon 을 bulk_create 한다. 쿠폰 수량은 발행 전에 조건부 UPDATE 한 번으로
+예약하고, 대상이 줄어 발행하지 못한 만큼은 끝난 뒤 반환한다.
+대상이 많으면 CouponIssueJob 을 만들어 백그라운드 스레드에서 발행하고 진행률을 기록한다.
+웹 워커가 중간에 종료되어 pending/running 으로 남은 작업은 recover_stale_jobs() 가
+실패 처리하고 발행하지 못한 수량을 반환한다 (manage.py recover_coupon_issue_jobs).
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from OilNote_User.models import CustomerStationRelation
+from OilNote_UserApp.services.customer_summary import invalidate_customer_summary
+from ..models import CouponIssueJob, CustomerCoupon, Group, StationCouponQuota
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+BACKGROUND_THRESHOLD = 2000
+AUTO_COUPON_TYPES = ('SIGNUP', 'CUMULATIVE', 'MONTHLY')
+
+
+class JobAbandoned(Exception):
+    """작업이 오래된 작업으로 정리됨 (남은 수량은 정리할 때 이미 반환됨)"""
+
+
+def requires_quota(template):
+    """수량 차감 대상 쿠폰인지 (자동 쿠폰 제외)"""
+    return template.coupon_type.type_code not in AUTO_COUPON_TYPES
+
+
+def target_relations(station, target_type, group_id=None, customer_ids=None):
+    """
+    발행 대상 고객-주유소 관계 쿼리셋
+
+    (customer, station) 이 유니크이므로 customer_id 가 중복되지 않는다.
+
+    Raises:
+        Group.DoesNotExist: 그룹 대상인데 그룹이 없는 경우
+    """
+    relations = CustomerStationRelation.objects.filter(
+        station=station,
+        is_active=True,
+        customer__user_type='CUSTOMER'
+    )
+    if target_type == 'all':
+        return relations
+    if target_type == 'group' and group_id:
+        group = Group.objects.get(id=group_id, station=station)
+        return relations.filter(customer__customer_profile__group=group.name)
+    if target_type == 'individual' and customer_ids:
+        return relations.filter(customer_id__in=customer_ids)
+    return relations.none()
+
+
+def reserve_quota(station, template, count):
+    """
+    발행 수량만큼 쿠폰 수량 예약
+
+    Raises:
+        ValueError: 잔여 수량이 부족한 경우
+    """
+    if not requires_quota(template) or StationCouponQuota.reserve(station, count):
+        return
+    quota = StationCouponQuota.objects.filter(station=station).first()
+    available_count = quota.remaining_quota if quota else 0
+    raise ValueError(f'쿠폰 수량이 부족합니다. (요청: {count}개, 잔여: {available_count}개)')
+
+
+def release_quota(station, template, count):
+    """예약한 수량 반환"""
+    if requires_quota(template):
+        StationCouponQuota.release(station, count)
+
+
+def issue_coupons(station, template, relations, total, job=None, chunk_size=CHUNK_SIZE):
+    """
+    예약된 수량(total) 안에서 대상 고객에게 쿠폰 발행
+
+    Args:
+        station: 주유소 사용자
+        template: 수동 쿠폰 템플릿
+        relations: target_relations() 결과
+        total: 예약한 발행 수량 (최대 발행 수)
+        job: 진행률을 기록할 CouponIssueJob (선택)
+
+    Returns:
+        int: 발행된 쿠폰 수
+    """
+    # CustomerCoupon.save() 의 만료일 계산과 동일 (bulk_create 는 save() 를 거치지 않음)
+    expiry_date = None if template.is_permanent else template.valid_until
+
+    issued = 0
+    last_id = 0
+    abandoned = False
+    try:
+        while issued < total:
+            ids = list(
+                relations.filter(customer_id__gt=last_id)
+                .order_by('customer_id')
+                .values_list('customer_id', flat=True)[:min(chunk_size, total - issued)]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                CustomerCoupon.objects.bulk_create(
+                    [
+                        CustomerCoupon(
+                            customer_id=customer_id,
+                            coupon_template=template,
+                            status='AVAILABLE',
+                            expiry_date=expiry_date
+                        )
+                        for customer_id in ids
+                    ],
+                    batch_size=chunk_size
+                )
+                # 진행률은 쿠폰과 같은 트랜잭션에 기록 (정리 시 반환 수량의 기준)
+                if job is not None and not CouponIssueJob.objects.filter(
+                    pk=job.pk, status='running'
+                ).update(issued_count=issued + len(ids)):
+                    abandoned = True
+                    raise JobAbandoned(f'쿠폰 발행 작업 {job.pk} 이 이미 정리됨')
+            invalidate_customer_summary(ids)
+            issued += len(ids)
+            last_id = ids[-1]
+
+            logger.debug(f"쿠폰 발행 진행: {template.coupon_name} {issued}/{total}")
+    finally:
+        # 대상이 줄었거나 중간에 실패한 경우 발행하지 못한 수량 반환
+        if issued < total and not abandoned:
+            release_quota(station, template, total - issued)
+
+    logger.info(f"수동 쿠폰 발행: 주유소={station.username}, 쿠폰={template.coupon_name}, {issued}/{total}장")
+    return issued
+
+
+def _run_job(job_id, relations):
+    """백그라운드 스레드에서 발행 작업 실행"""
+    close_old_connections()
+    job = CouponIssueJob.objects.select_related('station', 'coupon_template__coupon_type').get(pk=job_id)
+    try:
+        if not CouponIssueJob.objects.filter(pk=job.pk, status='pending').update(
+            status='running', started_at=timezone.now()
+        ):
+            logger.warning(f"쿠폰 발행 작업 {job_id} 이 대기 상태가 아님, 건너뜀")
+            return
+        issued = issue_coupons(job.station, job.coupon_template, relations, job.total_count, job=job)
+        CouponIssueJob.objects.filter(pk=job.pk, status='running').update(
+            status='completed', issued_count=issued, finished_at=timezone.now()
+        )
+    except JobAbandoned as e:
+        logger.warning(f"쿠폰 발행 중단: {str(e)}")
+    except Exception as e:
+        logger.error(f"쿠폰 발행 작업 {job_id} 실패: {str(e)}", exc_info=True)
+        CouponIssueJob.objects.filter(pk=job.pk, status__in=('pending', 'running')).update(
+            status='failed', error_message=str(e), finished_at=timezone.now()
+        )
+    finally:
+        close_old_connections()
+
+
+def start_issue_job(station, template, target_type, relations, total):
+    """
+    대량 발행 작업 생성 후 백그라운드 스레드 시작 (수량은 호출 전에 예약)
+
+    Returns:
+        CouponIssueJob
+    """
+    job = CouponIssueJob.objects.create(
+        station=station,
+        coupon_template=template,
+        target_type=target_type,
+        total_count=total
+    )
+    # 작업 행이 커밋된 뒤 스레드가 조회하도록 함
+    transaction.on_commit(
+        lambda: threading.Thread(target=_run_job, args=(job.id, relations), daemon=True).start()
+    )
+    logger.info(f"쿠폰 발행 작업 시작: job={job.id}, 주유소={station.username}, 대상={total}명")
+    return job
+
+
+def recover_stale_jobs(timeout_minutes=None, now=None):
+    """
+    오래 끝나지 않은 발행 작업 정리
+
+    생성 후 timeout_minutes 가 지나도 pending/running 인 작업(워커 종료 등으로 스레드가
+    사라진 작업)을 실패로 바꾸고 total_count - issued_count 만큼 수량을 반환한다.
+    상태가 그대로일 때만 바꾸는 조건부 UPDATE 라 동시에 실행돼도 한 번만 반환된다.
+    아직 살아 있는 스레드는 다음 구간에서 상태가 바뀐 것을 보고 멈춘다.
+
+    Returns:
+        list: 정리한 CouponIssueJob 목록
+    """
+    if timeout_minutes is None:
+        timeout_minutes = getattr(settings, 'COUPON_ISSUE_JOB_TIMEOUT_MINUTES', 30)
+    now = now or timezone.now()
+    stale_jobs = CouponIssueJob.objects.filter(
+        status__in=('pending', 'running'),
+        created_at__lt=now - timedelta(minutes=timeout_minutes)
+    ).select_related('station', 'coupon_template__coupon_type')
+
+    recovered = []
+    for job in stale_jobs:
+        with transaction.atomic():
+            # 정리와 마지막 구간 발행이 겹치지 않도록 행 잠금 후 다시 확인
+            current = CouponIssueJob.objects.select_for_update().filter(
+                pk=job.pk, status__in=('pending', 'running')
+            ).first()
+            if current is None:
+                continue
+            CouponIssueJob.objects.filter(pk=job.pk).update(
+                status='failed',
+                error_message=f'{timeout_minutes}분 안에 끝나지 않아 중단된 작업으로 처리',
+                finished_at=now
+            )
+            remaining = max(0, current.total_count - current.issued_count)
+            if remaining:
+                release_quota(job.station, job.coupon_template, remaining)
+        logger.warning(
+            f"중단된 쿠폰 발행 작업 정리: job={job.pk}, 주유소={job.station.username}, "
+            f"발행 {current.issued_count}/{current.total_count}, 반환 {remaining}장"
+        )
+        current.status = 'failed'
+        recovered.append(current)
+    return recovered
@@ -0,0 +1,249 @@
+"""
+쿠폰 관리 통계
+
+상태별/템플릿별 건수는 values() 그룹 집계 한 번씩으로 구하고, 월별 추이는
+마감된 월을 MonthlyCouponStatistics 에서 읽는다. 아직 집계되지 않은 마감 월은
+TruncMonth 그룹 집계로 한 번 계산해 저장하고, 이번 달만 매번 실시간으로 센다.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from ..models import (
+    AutoCouponTemplate, CouponPurchaseRequest, CouponTemplate, CustomerCoupon,
+    MonthlyCouponStatistics, StationCouponQuota
+)
+
+logger = logging.getLogger(__name__)
+
+TREND_MONTHS = 6
+RECENT_DAYS = 7
+AUTO_COUPON_TYPES = ('SIGNUP', 'CUMULATIVE', 'MONTHLY')
+
+
+def station_coupons(station):
+    """주유소의 수동/자동 템플릿으로 발행된 고객 쿠폰"""
+    return CustomerCoupon.objects.filter(
+        Q(coupon_template__station=station) | Q(auto_coupon_template__station=station)
+    )
+
+
+def _recent_months(current_month, count=TREND_MONTHS):
+    """이번 달 포함 최근 count 개월의 월 시작일 (오래된 순)"""
+    months = [current_month]
+    for _ in range(count - 1):
+        months.append((months[-1] - timedelta(days=1)).replace(day=1))
+    months.reverse()
+    return months
+
+
+def _month_key(value):
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def _monthly_counts(coupons, start, end):
+    """[start, end) 구간의 월별 발행/사용 수 (TruncMonth 그룹 집계 2회)"""
+    issued = (
+        coupons.filter(issued_date__gte=start, issued_date__lt=end)
+        .annotate(month=TruncMonth('issued_date'))
+        .values('month')
+        .annotate(count=Count('id'))
+        .values_list('month', 'count')
+    )
+    used = (
+        coupons.filter(status='USED', used_date__gte=start, used_date__lt=end)
+        .annotate(month=TruncMonth('used_date'))
+        .values('month')
+        .annotate(count=Count('id'))
+        .values_list('month', 'count')
+    )
+    counts = defaultdict(lambda: {'issued': 0, 'used': 0})
+    for month, count in issued:
+        counts[_month_key(month)]['issued'] = count
+    for month, count in used:
+        counts[_month_key(month)]['used'] = count
+    return counts
+
+
+def closed_month_stats(station, coupons, months, current_month):
+    """
+    마감된 월의 발행/사용 수 (월별 집계 테이블 우선)
+
+    Returns:
+        dict: 'YYYY-MM' → {'issued', 'used'}
+    """
+    keys = [_month_key(month) for month in months]
+    stats = {
+        row.year_month: {'issued': row.issued_count, 'used': row.used_count}
+        for row in MonthlyCouponStatistics.objects.filter(station=station, year_month__in=keys)
+    }
+
+    missing = [month for month in months if _month_key(month) not in stats]
+    if missing:
+        counts = _monthly_counts(coupons, missing[0], current_month)
+        rows = []
+        for month in missing:
+            key = _month_key(month)
+            stats[key] = counts[key]
+            rows.append(MonthlyCouponStatistics(
+                station=station,
+                year_month=key,
+                issued_count=counts[key]['issued'],
+                used_count=counts[key]['used'],
+            ))
+        # 동시에 집계한 요청이 있으면 먼저 저장된 값을 유지
+        MonthlyCouponStatistics.objects.bulk_create(rows, ignore_conflicts=True)
+        logger.info(f"월별 쿠폰 통계 집계: 주유소={station.username}, 월={[row.year_month for row in rows]}")
+    return stats
+
+
+def _type_stat(name, type_code, counts):
+    issued = sum(counts.values())
+    used = counts.get('USED', 0)
+    return {
+        'name': name,
+        'type_code': type_code,
+        'issued': issued,
+        'used': used,
+        'usage_rate': (used / issued * 100) if issued > 0 else 0
+    }
+
+
+def _recent_activities(coupons, now):
+    """최근 7일 발행/사용 내역 (각 5건, 최신순 최대 10건)"""
+    since = now - timedelta(days=RECENT_DAYS)
+    related = coupons.select_related('customer', 'coupon_template', 'auto_coupon_template')
+
+    activities = []
+    for coupon in related.filter(issued_date__gte=since).order_by('-issued_date')[:5]:
+        activities.append({
+            'type': 'issued',
+            'message': f'{coupon.customer.username}에게 {coupon.template.coupon_name} 발행',
+            'timestamp': coupon.issued_date.strftime('%Y-%m-%d %H:%M')
+        })
+    for coupon in related.filter(used_date__gte=since, status='USED').order_by('-used_date')[:5]:
+        activities.append({
+            'type': 'used',
+            'message': f'{coupon.customer.username}이 {coupon.template.coupon_name} 사용',
+            'timestamp': coupon.used_date.strftime('%Y-%m-%d %H:%M')
+        })
+
+    activities.sort(key=lambda x: x['timestamp'], reverse=True)
+    return activities[:10]
+
+
+def build_coupon_statistics(station):
+    """
+    쿠폰 관리 화면 통계
+
+    Returns:
+        dict: basic_stats, type_stats, monthly_stats, quota_info, purchase_stats,
+        auto_coupon_stats, recent_activities
+    """
+    now = timezone.now()
+    current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    coupons = station_coupons(station)
+
+    # 1. 템플릿 목록 (수동 템플릿은 비활성 포함 - 자동 쿠폰 유형 집계에 사용)
+    templates = list(
+        CouponTemplate.objects.filter(station=station)
+        .values_list('id', 'coupon_name', 'is_active', 'coupon_type__type_code')
+    )
+    auto_templates = list(
+        AutoCouponTemplate.objects.filter(station=station, is_active=True)
+        .values_list('id', 'coupon_name', 'coupon_type')
+    )
+
+    # 2. 상태별 건수
+    status_counts = dict(coupons.values('status').annotate(count=Count('id')).values_list('status', 'count'))
+    total_issued = sum(status_counts.values())
+    total_used = status_counts.get('USED', 0)
+    usage_rate = round(total_used / total_issued * 100, 1) if total_issued > 0 else 0
+
+    # 3. 템플릿별 상태 건수
+    manual_counts = defaultdict(dict)
+    auto_counts = defaultdict(dict)
+    grouped = coupons.values('coupon_template', 'auto_coupon_template', 'status').annotate(count=Count('id'))
+    for row in grouped:
+        if row['auto_coupon_template']:
+            counts = auto_counts[row['auto_coupon_template']]
+        else:
+            counts = manual_counts[row['coupon_template']]
+        counts[row['status']] = counts.get(row['status'], 0) + row['count']
+
+    type_stats = []
+    auto_coupon_stats = dict.fromkeys(AUTO_COUPON_TYPES, 0)
+    for template_id, name, is_active, type_code in templates:
+        counts = manual_counts.get(template_id)
+        if not counts:
+            continue
+        if type_code in auto_coupon_stats:
+            auto_coupon_stats[type_code] += sum(counts.values())
+        if is_active:
+            type_stats.append(_type_stat(name, type_code or 'UNKNOWN', counts))
+    for template_id, name, coupon_type in auto_templates:
+        counts = auto_counts.get(template_id)
+        if counts:
+            type_stats.append(_type_stat(name, coupon_type, counts))
+
+    # 4. 월별 추이 (마감 월은 집계 테이블, 이번 달은 실시간)
+    months = _recent_months(current_month)
+    monthly = closed_month_stats(station, coupons, months[:-1], current_month)
+    current = coupons.aggregate(
+        issued=Count('id', filter=Q(issued_date__gte=current_month)),
+        used=Count('id', filter=Q(used_date__gte=current_month, status='USED')),
+    )
+    monthly[_month_key(current_month)] = current
+    monthly_stats = [
+        {'month': _month_key(month), 'issued': monthly[_month_key(month)]['issued'], 'used': monthly[_month_key(month)]['used']}
+        for month in months
+    ]
+
+    # 5. 쿠폰 수량 정보
+    quota = StationCouponQuota.objects.filter(station=station).first()
+    quota_info = {
+        'total_quota': quota.total_quota if quota else 0,
+        'used_quota': quota.used_quota if quota else 0,
+        'remaining_quota': quota.remaining_quota if quota else 0,
+        'quota_usage_rate': (quota.used_quota / quota.total_quota * 100) if quota and quota.total_quota > 0 else 0
+    }
+
+    # 6. 구매 요청 통계
+    request_counts = dict(
+        CouponPurchaseRequest.objects.filter(station=station)
+        .values('status').annotate(count=Count('id')).values_list('status', 'count')
+    )
+    purchase_stats = {
+        'total_requests': sum(request_counts.values()),
+        'pending_requests': request_counts.get('PENDING', 0),
+        'approved_requests': request_counts.get('APPROVED', 0),
+        'rejected_requests': request_counts.get('REJECTED', 0),
+    }
+
+    return {
+        'basic_stats': {
+            'total_templates': len(templates),
+            'active_templates': sum(1 for template in templates if template[2]),
+            'total_issued': total_issued,
+            'total_used': total_used,
+            'total_available': status_counts.get('AVAILABLE', 0),
+            'total_expired': status_counts.get('EXPIRED', 0),
+            'usage_rate': usage_rate,
+            'current_month_issued': current['issued'],
+            'current_month_used': current['used']
+        },
+        'type_stats': type_stats,
+        'monthly_stats': monthly_stats,
+        'quota_info': quota_info,
+        'purchase_stats': purchase_stats,
+        'auto_coupon_stats': {
+            'signup_coupons': auto_coupon_stats['SIGNUP'],
+            'cumulative_coupons': auto_coupon_stats['CUMULATIVE'],
+            'monthly_coupons': auto_coupon_stats['MONTHLY'],
+        },
+        'recent_activities': _recent_activities(coupons, now)
+    }
@@ -0,0 +1,294 @@
+"""
+엑셀 고객 일괄 등록
+
+행마다 카드/고객/매핑을 조회하지 않고, 파일 전체의 카드번호·전화번호로
+카드, 기존 고객 프로필, 기존 폰번호-카드 연동을 각각 IN 조회 한 번씩 가져온다.
+
+- 미가입 전화번호: 미회원 PhoneCardMapping 을 bulk_create
+- 이미 가입한 고객: 연동 완료 상태의 매핑과 고객-카드 연결 생성, 차량번호 bulk_update,
+  고객-주유소 관계 bulk_create, 새 관계에 회원가입 쿠폰 일괄 발행
+  (카드가 이미 다른 고객에게 연결되어 있으면 연동하지 않고 오류로 보고)
+"""
+import logging
+
+import pandas as pd
+from django.db import transaction
+
+from OilNote_User.models import CustomerCard, CustomerProfile, CustomerStationRelation
+from ..models import PhoneCardMapping, PointCard, bulk_issue_signup_coupons
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_CHUNK_SIZE = 5000
+BULK_BATCH_SIZE = 2000
+EMPTY_VALUES = ('', 'nan', 'None', 'NaN')
+
+# 행 처리 결과
+RESULT_REGISTERED = 'registered'    # 미회원 매핑 생성
+RESULT_LINKED = 'linked'            # 기존 회원에게 카드 연동
+RESULT_MAPPED = 'mapped'            # 카드가 이미 이 주유소에서 다른(또는 같은) 번호와 매핑됨
+RESULT_NO_CARD = 'no_card'          # 등록되지 않은 카드
+RESULT_CARD_OWNED = 'card_owned'    # 카드가 이미 다른 고객에게 연결됨
+RESULT_DUPLICATE = 'duplicate'      # 파일 내 카드번호 중복
+RESULT_INVALID = 'invalid'          # 전화번호/카드번호 형식 오류
+
+
+def find_customer_columns(df):
+    """
+    전화번호/카드번호/차량번호 컬럼 찾기
+
+    Returns:
+        tuple: (전화번호 컬럼, 카드번호 컬럼, 차량번호 컬럼 또는 None)
+        이름으로 찾지 못하면 첫 번째/두 번째/세 번째 컬럼을 사용한다.
+    """
+    def find(keywords, exclude=()):
+        for col in df.columns:
+            col_lower = str(col).lower()
+            if col not in exclude and any(keyword in col_lower for keyword in keywords):
+                return col
+        return None
+
+    columns = list(df.columns)
+    phone_column = find(('phone', '전화', '폰')) or (columns[0] if columns else None)
+    card_column = find(('card', '카드', 'point'), exclude=(phone_column,)) or (columns[1] if len(columns) > 1 else None)
+    # 'card' 에도 'car' 가 들어가므로 이미 찾은 컬럼은 제외
+    car_column = find(('car', '차량', '차'), exclude=(phone_column, card_column))
+    if not car_column and len(columns) > 2:
+        car_column = columns[2]
+    return phone_column, card_column, car_column
+
+
+def _clean(values, size):
+    """문자열 정리 (빈 셀은 '', 숫자로 읽힌 경우의 소수점 제거)"""
+    if values is None:
+        return pd.Series([''] * size)
+    series = pd.Series(values).fillna('').astype(str).str.strip().reset_index(drop=True)
+    return series.str.split('.', n=1).str[0]
+
+
+def normalize_customer_rows(phones, cards, cars=None):
+    """
+    전화번호/카드번호/차량번호 열을 정리하고 행별 검증 결과를 계산
+
+    Returns:
+        DataFrame: row(엑셀 기준 행 번호), phone_raw, card_raw, phone, card_number, car_number,
+        result(invalid/duplicate/None). 전화번호나 카드번호가 빈 행은 제외한다.
+    """
+    size = len(phones)
+    phone_raw = _clean(phones, size)
+    card_raw = _clean(cards, size)
+    car = _clean(cars, size)
+
+    frame = pd.DataFrame({
+        'row': range(1, size + 1),
+        'phone_raw': phone_raw.values,
+        'card_raw': card_raw.values,
+        'car_number': car.where(~car.isin(EMPTY_VALUES), '').values,
+    })
+    frame = frame[~frame['phone_raw'].isin(EMPTY_VALUES) & ~frame['card_raw'].isin(EMPTY_VALUES)]
+
+    phone = frame['phone_raw'].str.replace(r'[^0-9]', '', regex=True)
+    # 엑셀에서 앞의 0이 제거된 경우 복원
+    missing_zero = phone.str.len().isin([9, 10]) & phone.str.startswith('1')
+    phone = phone.where(~missing_zero, '0' + phone)
+    card_number = frame['card_raw'].str.replace(r'[^0-9]', '', regex=True)
+
+    frame = frame.assign(phone=phone, card_number=card_number)
+    valid = frame['phone'].str.fullmatch(r'\d{10,11}') & frame['card_number'].str.fullmatch(r'\d{16}')
+    duplicate = valid & frame['card_number'].duplicated(keep='first')
+
+    frame['result'] = None
+    frame.loc[~valid, 'result'] = RESULT_INVALID
+    frame.loc[duplicate, 'result'] = RESULT_DUPLICATE
+    return frame.reset_index(drop=True)
+
+
+def _chunks(items, size=LOOKUP_CHUNK_SIZE):
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def _cards_for(numbers):
+    """카드번호 → 카드 ID"""
+    cards = {}
+    for chunk in _chunks(numbers):
+        cards.update(PointCard.objects.filter(number__in=chunk).values_list('number', 'id'))
+    return cards
+
+
+def _profiles_for(phones):
+    """전화번호 → 고객 프로필 (같은 번호가 여럿이면 먼저 가입한 프로필)"""
+    profiles = {}
+    for chunk in _chunks(phones):
+        queryset = CustomerProfile.objects.filter(customer_phone__in=chunk).only(
+            'id', 'user_id', 'customer_phone', 'car_number'
+        ).order_by('-id')
+        profiles.update((profile.customer_phone, profile) for profile in queryset)
+    return profiles
+
+
+def _mapped_phones_for(station, card_ids):
+    """카드 ID → 이 주유소에서 매핑된 전화번호"""
+    mapped = {}
+    for chunk in _chunks(card_ids):
+        mapped.update(
+            PhoneCardMapping.objects.filter(
+                station=station,
+                membership_card_id__in=chunk,
+            ).values_list('membership_card_id', 'phone_number')
+        )
+    return mapped
+
+
+def _card_owners_for(card_numbers):
+    """카드번호 → 연결된 고객 (ID, 아이디)"""
+    owners = {}
+    for chunk in _chunks(card_numbers):
+        owners.update(
+            (card_number, (customer_id, username))
+            for card_number, customer_id, username in CustomerCard.objects.filter(
+                card_number__in=chunk,
+            ).values_list('card_number', 'customer_id', 'customer__username')
+        )
+    return owners
+
+
+def _link_profiles(station, rows, profiles, card_ids):
+    """
+    기존 회원 일괄 연동
+
+    Returns:
+        int: 새로 생성된 고객-주유소 관계 수
+    """
+    user_ids = list({profiles[row['phone']].user_id for row in rows})
+
+    # 고객-카드 연결 (이미 이 고객에게 연결된 카드는 건너뜀) 후 프로필 표시값 갱신
+    CustomerCard.objects.bulk_create(
+        [CustomerCard(customer_id=profiles[row['phone']].user_id, card_number=row['card_number']) for row in rows],
+        batch_size=BULK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    CustomerCard.refresh_display(user_ids)
+
+    # 차량 번호는 기존 차량번호가 없을 때만 복사
+    changed = {}
+    for row in rows:
+        profile = profiles[row['phone']]
+        if row['car_number'] and not profile.car_number:
+            profile.car_number = row['car_number']
+            changed[profile.id] = profile
+    CustomerProfile.objects.bulk_update(list(changed.values()), ['car_number'], batch_size=BULK_BATCH_SIZE)
+
+    linked_card_ids = [card_ids[row['card_number']] for row in rows]
+    for chunk in _chunks(linked_card_ids):
+        PointCard.objects.filter(id__in=chunk).update(is_used=True)
+
+    # 고객-주유소 관계 (없는 것만 생성) + 새 관계에 회원가입 쿠폰
+    related_ids = set()
+    for chunk in _chunks(user_ids):
+        related_ids.update(
+            CustomerStationRelation.objects.filter(
+                station=station,
+                customer_id__in=chunk,
+            ).values_list('customer_id', flat=True)
+        )
+    new_user_ids = [user_id for user_id in user_ids if user_id not in related_ids]
+    CustomerStationRelation.objects.bulk_create(
+        [CustomerStationRelation(customer_id=user_id, station=station, is_active=True) for user_id in new_user_ids],
+        batch_size=BULK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    bulk_issue_signup_coupons(new_user_ids, station)
+    return len(new_user_ids)
+
+
+def import_customers(station, phones, cards, cars=None):
+    """
+    엑셀 고객(전화번호-카드) 일괄 등록
+
+    Args:
+        station: 주유소 사용자
+        phones: 전화번호 열
+        cards: 카드번호 열
+        cars: 차량번호 열 (선택)
+
+    Returns:
+        dict: 결과별 건수, 새 고객-주유소 관계 수, 행 단위 리포트(rows)
+    """
+    frame = normalize_customer_rows(phones, cards, cars)
+    frame['message'] = None
+    pending = frame['result'].isna()
+
+    with transaction.atomic():
+        # 1) 카드 / 기존 고객 / 기존 매핑 / 카드 소유 고객 조회 (IN 조회 4회)
+        card_ids = _cards_for(frame.loc[pending, 'card_number'].tolist())
+        profiles = _profiles_for(frame.loc[pending, 'phone'].unique().tolist())
+        mapped_phones = _mapped_phones_for(station, list(card_ids.values()))
+        card_owners = _card_owners_for(list(card_ids))
+
+        # 2) 행 분류
+        results = {}
+        messages = {}
+        new_mappings = []
+        linked_rows = []
+        for row in frame[pending].itertuples():
+            card_id = card_ids.get(row.card_number)
+            if card_id is None:
+                results[row.Index] = RESULT_NO_CARD
+                continue
+            if card_id in mapped_phones:
+                results[row.Index] = RESULT_MAPPED
+                messages[row.Index] = mapped_phones[card_id]
+                continue
+
+            profile = profiles.get(row.phone)
+            owner = card_owners.get(row.card_number)
+            if profile and owner and owner[0] != profile.user_id:
+                results[row.Index] = RESULT_CARD_OWNED
+                messages[row.Index] = owner[1]
+                continue
+            if profile:
+                results[row.Index] = RESULT_LINKED
+                linked_rows.append({'phone': row.phone, 'card_number': row.card_number, 'car_number': row.car_number})
+            else:
+                results[row.Index] = RESULT_REGISTERED
+
+            new_mappings.append(PhoneCardMapping(
+                phone_number=row.phone,
+                membership_card_id=card_id,
+                station=station,
+                car_number=row.car_number,
+                is_used=profile is not None,
+                linked_user_id=profile.user_id if profile else None,
+            ))
+        frame.loc[pending, 'result'] = frame.index[pending].map(results)
+        frame.loc[pending, 'message'] = frame.index[pending].map(messages)
+
+        # 3) 매핑 일괄 생성 (save()/clean() 을 거치지 않으므로 중복은 위에서 걸러냄)
+        PhoneCardMapping.objects.bulk_create(new_mappings, batch_size=BULK_BATCH_SIZE)
+
+        # 4) 기존 회원 연동
+        new_relations = _link_profiles(station, linked_rows, profiles, card_ids) if linked_rows else 0
+
+    counts = frame['result'].value_counts().to_dict()
+    summary = {
+        'total_rows': len(frame),
+        'registered_count': counts.get(RESULT_REGISTERED, 0),
+        'linked_count': counts.get(RESULT_LINKED, 0),
+        'mapped_count': counts.get(RESULT_MAPPED, 0),
+        'no_card_count': counts.get(RESULT_NO_CARD, 0),
+        'card_owned_count': counts.get(RESULT_CARD_OWNED, 0),
+        'duplicate_count': counts.get(RESULT_DUPLICATE, 0),
+        'invalid_count': counts.get(RESULT_INVALID, 0),
+        'new_relation_count': new_relations,
+        'rows': frame[['row', 'phone_raw', 'card_raw', 'phone', 'card_number', 'result', 'message']].to_dict('records'),
+    }
+    logger.info(
+        f"엑셀 고객 일괄 등록: 주유소={station.username}, 행={summary['total_rows']}, "
+        f"신규={summary['registered_count']}, 회원연동={summary['linked_count']}, "
+        f"기존매핑={summary['mapped_count']}, 카드없음={summary['no_card_count']}, "
+        f"다른고객카드={summary['card_owned_count']}, "
+        f"파일내중복={summary['duplicate_count']}, 형식오류={summary['invalid_count']}, "
+        f"새 관계={summary['new_relation_count']}"
+    )
+    return summary
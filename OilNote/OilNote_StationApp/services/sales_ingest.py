@@ -0,0 +1,641 @@
+"""
+POS 매출 엑셀 파일 분석/저장
+
+주유소 매출 화면의 파일 분석(analyze_sales_file)과 FTP 수신 파일 자동 처리가 같은 경로로
+ExcelSalesData, 날짜별/월별 매출 통계, 보너스카드 고객 방문 내역을 저장한다.
+
+파일 하나는 트랜잭션 하나로 저장하므로 중간에 실패하거나 프로세스가 종료되면 아무것도 남지 않는다.
+같은 파일(또는 같은 날짜)을 다시 저장하면 기존 행을 지우고 새로 넣는데, 이미 누적매출에 반영된
+거래(판매일자·고객명·승인번호·판매금액이 같은 행)는 누적 처리 완료 상태를 그대로 이어받아
+누적매출에 다시 더하지 않고, 방문 내역이 이미 있던 거래는 고객 주유량/주유금액 합계에 다시 더하지 않는다.
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+
+import pandas as pd
+from django.db import transaction
+from django.db.models import Sum
+
+from OilNote_User.models import CustomerCard
+from OilNote_UserApp.models import CustomerVisitHistory
+
+from ..models import ExcelSalesData, MonthlySalesStatistics, SalesStatistics
+
+logger = logging.getLogger(__name__)
+
+SALES_COLUMNS = ['판매일자', '주유시간', '고객번호', '고객명', '발행번호', '주류상품종류',
+                 '판매구분', '결제구분', '판매구분2', '노즐', '제품코드', '제품/PACK',
+                 '판매수량', '판매단가', '판매금액', '적립포인트', '포인트', '보너스',
+                 'POS_ID', 'POS코드', '판매점', '영수증', '승인번호', '승인일시',
+                 '보너스카드', '고객카드번호', '데이터생성일시']
+
+
+def update_monthly_statistics(tid, sale_date, daily_transactions, daily_quantity, daily_amount, daily_avg_price, top_product, top_product_count, product_counts, product_amounts=None):
+    """월별 누적 매출 통계 업데이트 (월 전체 데이터 합산)"""
+    year_month = sale_date.strftime('%Y-%m')
+    # 해당 월의 모든 날짜별 SalesStatistics 합산
+    stats = SalesStatistics.objects.filter(
+        tid=tid,
+        sale_date__startswith=year_month
+    )
+    total_transactions = stats.aggregate(Sum('total_transactions'))['total_transactions__sum'] or 0
+    total_quantity = stats.aggregate(Sum('total_quantity'))['total_quantity__sum'] or 0
+    total_amount = stats.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
+    avg_unit_price = (Decimal(str(total_amount)) / Decimal(str(total_quantity))) if total_quantity else Decimal('0')
+    # 제품별 집계 (ExcelSalesData에서 월 전체 데이터 집계)
+    excel_rows = ExcelSalesData.objects.filter(
+        tid=tid,
+        sale_date__startswith=year_month
+    )
+    product_counts = {}
+    product_quantities = {}
+    product_amounts = {}
+    for row in excel_rows:
+        product = (row.product_pack or '').strip()
+        if not product:
+            continue
+        product_counts[product] = product_counts.get(product, 0) + 1
+        product_quantities[product] = product_quantities.get(product, 0) + float(row.quantity or 0)
+        product_amounts[product] = product_amounts.get(product, 0) + float(row.total_amount or 0)
+    # 월별 통계 덮어쓰기
+    monthly_stat, created = MonthlySalesStatistics.objects.get_or_create(
+        tid=tid,
+        year_month=year_month,
+        defaults={
+            'total_transactions': 0,
+            'total_quantity': Decimal('0'),
+            'total_amount': Decimal('0'),
+            'avg_unit_price': Decimal('0'),
+            'top_product': '',
+            'top_product_count': 0,
+            'product_breakdown': {},
+            'product_sales_count': {},
+            'product_sales_quantity': {},
+            'product_sales_amount': {},
+        }
+    )
+    monthly_stat.total_transactions = int(total_transactions)
+    monthly_stat.total_quantity = Decimal(str(total_quantity))
+    monthly_stat.total_amount = Decimal(str(total_amount))
+    monthly_stat.avg_unit_price = avg_unit_price
+    monthly_stat.product_breakdown = {}
+    monthly_stat.product_sales_count = product_counts
+    monthly_stat.product_sales_quantity = product_quantities
+    monthly_stat.product_sales_amount = product_amounts
+    # 최다 판매 제품
+    if product_counts:
+        top_product_monthly = max(product_counts.items(), key=lambda x: x[1])
+        monthly_stat.top_product = top_product_monthly[0]
+        monthly_stat.top_product_count = top_product_monthly[1]
+    else:
+        monthly_stat.top_product = ''
+        monthly_stat.top_product_count = 0
+    monthly_stat.save()
+
+
+def safe_float(value, default=0, handle_negative='zero'):
+    """
+    안전한 float 변환 함수
+    handle_negative: 'zero' (음수를 0으로), 'abs' (절댓값), 'keep' (그대로 유지)
+    """
+    if pd.isna(value):
+        return default
+    try:
+        result = float(value)
+        if handle_negative == 'zero' and result < 0:
+            logger.warning(f"음수 값 발견: {value} -> 0으로 처리")
+            return 0
+        elif handle_negative == 'abs' and result < 0:
+            logger.warning(f"음수 값 발견: {value} -> 절댓값으로 처리")
+            return abs(result)
+        elif handle_negative == 'keep' and result < 0:
+            logger.info(f"음수 값 발견: {value} -> 그대로 유지 (환불/취소 거래)")
+            return result
+        return result
+    except (ValueError, TypeError):
+        return default
+
+
+def safe_int(value, default=0, handle_negative='zero'):
+    """
+    안전한 int 변환 함수
+    handle_negative: 'zero' (음수를 0으로), 'abs' (절댓값), 'keep' (그대로 유지)
+    """
+    if pd.isna(value):
+        return default
+    try:
+        result = int(float(value))  # float로 먼저 변환 후 int로 변환
+        if handle_negative == 'zero' and result < 0:
+            logger.warning(f"음수 값 발견: {value} -> 0으로 처리")
+            return 0
+        elif handle_negative == 'abs' and result < 0:
+            logger.warning(f"음수 값 발견: {value} -> 절댓값으로 처리")
+            return abs(result)
+        elif handle_negative == 'keep' and result < 0:
+            logger.info(f"음수 값 발견: {value} -> 그대로 유지 (환불/취소 거래)")
+            return result
+        return result
+    except (ValueError, TypeError):
+        return default
+
+
+def _sale_key(sale_date, customer_name, approval_number, total_amount):
+    """누적 처리 여부를 이어받을 거래 식별값"""
+    return (sale_date, customer_name, approval_number, Decimal(str(total_amount)).quantize(Decimal('0.01')))
+
+
+def _processed_sale_keys(sales):
+    """지우기 전 행 중 누적매출에 이미 반영된 거래 (같은 거래가 여러 건이면 건수만큼)"""
+    return Counter(
+        _sale_key(*row) for row in sales.filter(is_cumulative_processed=True).values_list(
+            'sale_date', 'customer_name', 'approval_number', 'total_amount'
+        )
+    )
+
+
+def ingest_sales_file(source, station, tid, filename):
+    """
+    POS 매출 엑셀 파일 분석 후 저장 (파일 하나를 트랜잭션 하나로)
+
+    Args:
+        source: 파일 경로 또는 파일 객체
+        station: 방문 내역을 남길 주유소 사용자
+        tid: 주유소 TID
+        filename: 원본 파일명 (source_file 로 저장, 같은 TID·파일명의 기존 데이터는 교체)
+
+    Returns:
+        dict: total_rows(빈 행/헤더/합계 제외 행 수), saved_count(저장한 행 수)
+    """
+    with transaction.atomic():
+        return _ingest_sales_file(source, station, tid, filename)
+
+
+def _ingest_sales_file(source, station, tid, filename):
+    logger.info(f"파일 분석 시작: {filename}")
+    
+    # 엑셀 파일 읽기 (첫 번째 행부터 시작)
+    logger.info("엑셀 파일 읽기 시작...")
+    df = pd.read_excel(
+        source,
+        skiprows=0,  # 첫 번째 행부터 시작
+        names=SALES_COLUMNS
+    )
+    logger.info(f"엑셀 파일 읽기 완료. 총 {len(df)} 행 발견")
+    
+    # 빈 행 제거
+    df_cleaned = df.dropna(how='all')
+    logger.info(f"빈 행 제거 후: {len(df_cleaned)} 행")
+    
+    # 헤더 행과 합계 행 제거 (더 안전한 처리)
+    if len(df_cleaned) > 0:
+        # 첫 번째 행이 헤더인 경우 제거
+        first_row_sale_date = str(df_cleaned.iloc[0]['판매일자']).strip()
+        if first_row_sale_date == '판매일자' or first_row_sale_date == 'nan' or first_row_sale_date == '':
+            logger.info("헤더 행 제거")
+            df_cleaned = df_cleaned.iloc[1:]
+            logger.info(f"헤더 제거 후: {len(df_cleaned)} 행")
+        
+        # 마지막 행이 합계인 경우 제거
+        if len(df_cleaned) > 0:
+            last_row_sale_date = str(df_cleaned.iloc[-1]['판매일자']).strip()
+            if last_row_sale_date == '합계' or last_row_sale_date == 'nan' or last_row_sale_date == '':
+                logger.info("합계 행 제거")
+                df_cleaned = df_cleaned.iloc[:-1]
+                logger.info(f"합계 제거 후: {len(df_cleaned)} 행")
+    
+    # 기존 데이터 삭제 (같은 파일에서 온 데이터)
+    logger.info(f"기존 데이터 삭제: {filename}")
+    previous_sales = ExcelSalesData.objects.filter(tid=tid, source_file=filename)
+    processed_keys = _processed_sale_keys(previous_sales)
+    deleted_count = previous_sales.delete()[0]
+    logger.info(f"삭제된 기존 데이터: {deleted_count}개")
+    
+    # 데이터 분석 결과 출력
+    logger.info("=== 📊 엑셀 파일 분석 결과 ===")
+    logger.info(f"📈 기본 정보")
+    logger.info(f"파일명: {filename}")
+    logger.info(f"총 데이터 행 개수: {len(df)}행")
+    logger.info(f"실제 데이터 행 개수: {len(df_cleaned)}행")
+    
+    # 날짜별 데이터 분석 및 통계 저장
+    if len(df_cleaned) > 0:
+        try:
+            sale_dates = df_cleaned['판매일자'].dropna()
+            if len(sale_dates) > 0:
+                min_date = sale_dates.min()
+                max_date = sale_dates.max()
+                logger.info(f"📅 날짜 범위")
+                logger.info(f"최초 판매일: {min_date}")
+                logger.info(f"최종 판매일: {max_date}")
+                
+                # 날짜별 데이터 개수 및 통계 계산
+                # 날짜별 데이터 개수 및 통계 계산
+                date_counts = sale_dates.value_counts().sort_index()
+                logger.info(f"날짜별 데이터 개수:")
+                
+                # 기존 통계 데이터 확인 (같은 파일에서 온 데이터)
+                existing_stats = SalesStatistics.objects.filter(tid__startswith=tid, source_file=filename)
+                if existing_stats.exists():
+                    logger.info(f"기존 통계 데이터 발견: {existing_stats.count()}개 - 중복 방지 모드로 진행")
+                else:
+                    logger.info(f"새로운 파일 분석: {filename}")
+                
+                # 날짜별 통계 데이터 생성 및 저장
+                for date, count in date_counts.items():
+                    logger.info(f"  {date}: {count}행")
+                    
+                    # 해당 날짜의 데이터만 필터링
+                    daily_data = df_cleaned[df_cleaned['판매일자'] == date]
+                    
+                    # 일별 통계 계산
+                    daily_quantity = daily_data['판매수량'].sum()
+                    daily_amount = daily_data['판매금액'].sum()
+                    daily_avg_price = daily_amount / daily_quantity if daily_quantity > 0 else 0
+                    
+                    # 제품별 판매 현황 (가장 많이 팔린 제품)
+                    product_counts = daily_data['제품/PACK'].value_counts()
+                    top_product = product_counts.index[0] if len(product_counts) > 0 else ''
+                    top_product_count = product_counts.iloc[0] if len(product_counts) > 0 else 0
+                    
+                    # SalesStatistics 모델에 통계 데이터 저장
+                    try:
+                        with transaction.atomic():
+                            # 날짜 파싱
+                            if '/' in str(date):
+                                parsed_date = datetime.strptime(str(date), '%Y/%m/%d').date()
+                            else:
+                                parsed_date = date
+                        
+                            # 중복 확인 (tid, sale_date 조합)
+                            existing_stat = SalesStatistics.objects.filter(
+                                tid=tid,
+                                sale_date=parsed_date
+                            ).first()
+                        
+                            if existing_stat:
+                                logger.info(f"중복 데이터 발견 - 건너뛰기: {date} ({existing_stat.total_transactions}건, {existing_stat.total_amount:,.0f}원)")
+                                continue
+                        
+                            # 새로운 통계 데이터 저장
+                            sales_stat = SalesStatistics(
+                                tid=tid,  # 주유소 TID만 저장
+                                sale_date=parsed_date,
+                                total_transactions=count,
+                                total_quantity=daily_quantity,
+                                total_amount=daily_amount,
+                                avg_unit_price=daily_avg_price,
+                                top_product=top_product,
+                                top_product_count=top_product_count,
+                                source_file=filename
+                            )
+                            sales_stat.save()
+                            logger.info(f"날짜별 통계 저장 완료: {date} - {count}건, {daily_amount:,.0f}원")
+                        
+                    except Exception as e:
+                        logger.error(f"날짜별 통계 저장 중 오류 ({date}): {str(e)}")
+                        continue
+                        
+        except Exception as e:
+            logger.warning(f"날짜 분석 중 오류: {e}")
+    
+    # 제품별 데이터 분석
+    if len(df_cleaned) > 0:
+        try:
+            product_counts = df_cleaned['제품/PACK'].value_counts()
+            logger.info(f"⛽ 제품별 판매 현황")
+            total_products = len(product_counts)
+            for i, (product, count) in enumerate(product_counts.items(), 1):
+                percentage = (count / len(df_cleaned) * 100) if len(df_cleaned) > 0 else 0
+                logger.info(f"  {product}: {count}행 ({percentage:.1f}%)")
+        except Exception as e:
+            logger.warning(f"제품별 분석 중 오류: {e}")
+    
+    # 매출 정보 분석
+    if len(df_cleaned) > 0:
+        try:
+            total_quantity = df_cleaned['판매수량'].sum()
+            total_amount = df_cleaned['판매금액'].sum()
+            avg_unit_price = total_amount / total_quantity if total_quantity > 0 else 0
+            
+            logger.info(f"💰 매출 정보")
+            logger.info(f"총 판매수량: {total_quantity:,.2f}L")
+            logger.info(f"총 판매금액: {total_amount:,.0f}원")
+            logger.info(f"평균 단가: {avg_unit_price:,.0f}원/L")
+        except Exception as e:
+            logger.warning(f"매출 분석 중 오류: {e}")
+    
+    logger.info("=== 데이터베이스 저장 시작 ===")
+    
+    # 데이터베이스에 저장
+    saved_count = 0
+    daily_records = {}  # 날짜별로 데이터 그룹화
+    
+    # 먼저 날짜별로 데이터 그룹화
+    for index, row in df_cleaned.iterrows():
+        try:
+            # 날짜 파싱 (안전한 처리)
+            sale_date_str = str(row['판매일자']).strip()
+            if pd.isna(row['판매일자']) or sale_date_str == '' or sale_date_str == 'nan':
+                logger.warning(f"행 {index}: 유효하지 않은 날짜 데이터 - 건너뛰기")
+                continue
+            
+            sale_date = None
+            if '/' in sale_date_str:
+                try:
+                    sale_date = datetime.strptime(sale_date_str, '%Y/%m/%d').date()
+                except ValueError:
+                    logger.warning(f"행 {index}: 날짜 형식 오류 '{sale_date_str}' - 건너뛰기")
+                    continue
+            else:
+                logger.warning(f"행 {index}: 날짜 형식이 맞지 않음 '{sale_date_str}' - 건너뛰기")
+                continue
+            
+            # 날짜별로 데이터 그룹화
+            if sale_date not in daily_records:
+                daily_records[sale_date] = []
+            daily_records[sale_date].append(row)
+            
+        except Exception as e:
+            logger.error(f"행 {index} 날짜 파싱 중 오류: {str(e)}")
+            continue
+    
+    # 날짜별로 개별 저장
+    for sale_date, rows in daily_records.items():
+        logger.info(f"날짜별 저장 시작: {sale_date} - {len(rows)}행")
+        
+        # 해당 날짜의 기존 데이터 삭제 (tid, sale_date 기준으로 완전 삭제)
+        previous_sales = ExcelSalesData.objects.filter(
+            tid=tid,
+            sale_date=sale_date
+        )
+        processed_keys.update(_processed_sale_keys(previous_sales))
+        deleted_excel = previous_sales.delete()
+        deleted_stats = SalesStatistics.objects.filter(
+            tid=tid,
+            sale_date=sale_date
+        ).delete()
+        logger.info(f"[삭제] {sale_date} - ExcelSalesData: {deleted_excel[0]}개, SalesStatistics: {deleted_stats[0]}개")
+        
+        # 해당 날짜의 통계 데이터도 삭제
+        deleted_stats = SalesStatistics.objects.filter(
+            tid=tid,
+            sale_date=sale_date
+        ).delete()[0]
+        if deleted_stats > 0:
+            logger.info(f"기존 통계 데이터 삭제: {sale_date} - {deleted_stats}개")
+        
+        # 해당 날짜의 모든 행 저장
+        daily_saved_count = 0
+        daily_quantity = 0
+        daily_amount = 0
+        product_counts = {}
+        product_amounts = {}  # 실제 제품별 판매금액
+        
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    # 시간 파싱 (안전한 처리)
+                    sale_time_str = str(row['주유시간']).strip()
+                    if pd.isna(row['주유시간']) or sale_time_str == '' or sale_time_str == 'nan':
+                        sale_time = datetime.now().time()
+                    else:
+                        try:
+                            if ' ' in sale_time_str:
+                                time_part = sale_time_str.split(' ')[1]
+                                sale_time = datetime.strptime(time_part, '%H:%M').time()
+                            else:
+                                sale_time = datetime.now().time()
+                        except ValueError:
+                            logger.warning(f"시간 형식 오류 '{sale_time_str}' - 현재 시간 사용")
+                            sale_time = datetime.now().time()
+                
+                    # 판매수량, 판매금액은 음수도 그대로 유지 (환불/취소 거래 포함)
+                    quantity = safe_float(row['판매수량'], handle_negative='keep')
+                    unit_price = safe_float(row['판매단가'], handle_negative='keep')
+                    total_amount = safe_float(row['판매금액'], handle_negative='keep')
+                
+                    # 포인트 관련은 절댓값으로 처리 (음수 포인트 사용도 유효한 데이터)
+                    earned_points = safe_int(row.get('적립포인트', 0), handle_negative='abs')
+                    points = safe_int(row.get('포인트', 0), handle_negative='abs')
+                    bonus = safe_int(row.get('보너스', 0), handle_negative='abs')
+                
+                    # 통계 계산을 위한 누적
+                    daily_quantity += quantity
+                    daily_amount += total_amount
+                
+                    # 제품별 카운트 및 판매금액 누적
+                    product_pack = str(row.get('제품/PACK', ''))
+                    if product_pack and product_pack != 'nan':
+                        product_counts[product_pack] = product_counts.get(product_pack, 0) + 1
+                        product_amounts[product_pack] = product_amounts.get(product_pack, 0) + total_amount
+                
+                    # 이미 누적매출에 반영된 거래면 처리 완료 상태를 이어받음 (누적 시그널이 다시 더하지 않음)
+                    sale_key = _sale_key(sale_date, str(row.get('고객명', '')), str(row.get('승인번호', '')), total_amount)
+                    already_processed = processed_keys[sale_key] > 0
+                    if already_processed:
+                        processed_keys[sale_key] -= 1
+
+                    # ExcelSalesData 객체 생성 및 저장
+                    excel_data = ExcelSalesData(
+                        tid=tid,
+                        sale_date=sale_date,
+                        sale_time=sale_time,
+                        customer_number=str(row.get('고객번호', '')),
+                        customer_name=str(row.get('고객명', '')),
+                        issue_number=str(row.get('발행번호', '')),
+                        product_type=str(row.get('주류상품종류', '')),
+                        sale_type=str(row.get('판매구분', '')),
+                        payment_type=str(row.get('결제구분', '')),
+                        sale_type2=str(row.get('판매구분2', '')),
+                        nozzle=str(row.get('노즐', '')),
+                        product_code=str(row.get('제품코드', '')),
+                        product_pack=product_pack,
+                        quantity=quantity,
+                        unit_price=unit_price,
+                        total_amount=total_amount,
+                        earned_points=earned_points,
+                        points=points,
+                        bonus=bonus,
+                        pos_id=str(row.get('POS_ID', '')),
+                        pos_code=str(row.get('POS코드', '')),
+                        store=str(row.get('판매점', '')),
+                        receipt=str(row.get('영수증', '')),
+                        approval_number=str(row.get('승인번호', '')),
+                        approval_datetime=datetime.now(),
+                        bonus_card=str(row.get('보너스카드', '')),
+                        customer_card_number=str(row.get('고객카드번호', '')),
+                        data_created_at=datetime.now(),
+                        source_file=filename,
+                        is_cumulative_processed=already_processed
+                    )
+                    excel_data.save()
+                    daily_saved_count += 1
+                    saved_count += 1
+                
+                    # 보너스 카드와 일치하는 고객 찾아 방문 내역 저장
+                    bonus_card = str(row.get('보너스카드', '')).strip()
+                    if bonus_card and bonus_card != 'nan' and bonus_card != '':
+                        try:
+                            with transaction.atomic():
+                                # 보너스 카드와 일치하는 고객 찾기 (카드번호 인덱스 일치 검색)
+                                customer = CustomerCard.customer_for(bonus_card)
+                                customer_profile = getattr(customer, 'customer_profile', None) if customer else None
+                        
+                                if customer_profile:
+                                    logger.info(f"고객 발견: {customer.username} (보너스카드: {bonus_card})")
+                            
+                                    # 주유량 정보 가져오기 (quantity 값) - 마이너스 값도 그대로 유지
+                                    fuel_quantity = safe_float(row.get('판매수량', 0), handle_negative='keep')
+                                    logger.info(f"주유량 추출: {fuel_quantity:.2f}L (원본값: {row.get('판매수량', 0)})")
+                            
+                                    # 중복 방문 내역 체크 및 처리
+                                    approval_number = str(row.get('승인번호', ''))
+                                    existing_visit = CustomerVisitHistory.objects.filter(
+                                        customer=customer,
+                                        station=station,
+                                        visit_date=sale_date,
+                                        visit_time=sale_time,
+                                        approval_number=approval_number
+                                    ).first()
+                            
+                                    if existing_visit:
+                                        logger.info(f"중복 방문 내역 발견 - 기존 데이터 삭제 후 재저장: {customer.username} - {sale_date} {sale_time} (승인번호: {approval_number})")
+                                        existing_visit.delete()
+                            
+                                    # 방문 내역 저장
+                                    visit_history = CustomerVisitHistory(
+                                        customer=customer,
+                                        station=station,
+                                        tid=tid,
+                                        visit_date=sale_date,
+                                        visit_time=sale_time,
+                                        payment_type=str(row.get('결제구분', '')),
+                                        product_pack=str(row.get('제품/PACK', '')),
+                                        sale_amount=total_amount,
+                                        fuel_quantity=fuel_quantity,
+                                        approval_number=approval_number,
+                                        membership_card=bonus_card
+                                    )
+                                    visit_history.save()
+                                    logger.info(f"방문 내역 저장 완료: {customer.username} - {sale_date} {sale_time} (주유량: {fuel_quantity:.2f}L)")
+                            
+                                    # 방문 내역이 있던 거래는 주유량/주유금액 합계에 이미 반영되어 있음
+                                    if existing_visit:
+                                        continue
+
+                                    # 고객 프로필의 주유량 및 주유금액 정보 업데이트
+                                    # 기존 주유량 정보
+                                    old_total = customer_profile.total_fuel_amount
+                                    old_monthly = customer_profile.monthly_fuel_amount
+                                    old_last = customer_profile.last_fuel_amount
+                            
+                                    # 새로운 주유량 정보 계산 (마이너스 값도 그대로 반영)
+                                    customer_profile.total_fuel_amount += Decimal(str(fuel_quantity))
+                                    customer_profile.monthly_fuel_amount += Decimal(str(fuel_quantity))
+                                    customer_profile.last_fuel_amount = fuel_quantity
+                                    customer_profile.last_fuel_date = sale_date
+                            
+                                    # 새로운 주유금액 정보 계산
+                                    customer_profile.total_fuel_cost += Decimal(str(total_amount))
+                                    customer_profile.monthly_fuel_cost += Decimal(str(total_amount))
+                                    customer_profile.last_fuel_cost = total_amount
+                            
+                                    customer_profile.save()
+                            
+                                    # 업데이트된 주유량 및 주유금액 정보 로그
+                                    logger.info(f"업데이트된 주유량 정보 - 총: {customer_profile.total_fuel_amount:.2f}L, 월: {customer_profile.monthly_fuel_amount:.2f}L, 최근: {customer_profile.last_fuel_amount:.2f}L")
+                                    logger.info(f"업데이트된 주유금액 정보 - 총: {customer_profile.total_fuel_cost:,.0f}원, 월: {customer_profile.monthly_fuel_cost:,.0f}원, 최근: {customer_profile.last_fuel_cost:,.0f}원")
+                                    logger.info(f"방문 내역 및 주유 정보 저장 완료: {customer.username} - {sale_date} {sale_time} (주유량: {fuel_quantity:.2f}L, 주유금액: {total_amount:,.0f}원)")
+                                else:
+                                    logger.info(f"보너스카드 {bonus_card}와 일치하는 고객을 찾을 수 없음")
+                            
+                        except Exception as e:
+                            logger.error(f"방문 내역 저장 중 오류: {str(e)}")
+                
+            except Exception as e:
+                logger.error(f"행 처리 중 오류: {str(e)}")
+                continue
+        
+        # 해당 날짜의 통계 데이터 저장
+        try:
+            with transaction.atomic():
+                # 날짜별 통계 중복 체크: 이미 해당 날짜의 통계가 있는지 확인
+                existing_daily_stat = SalesStatistics.objects.filter(
+                    tid=tid,
+                    sale_date=sale_date
+                ).first()
+            
+                if existing_daily_stat:
+                    logger.info(f"=== 날짜별 통계 중복 발견 - 통계 저장 건너뛰기 ===")
+                    logger.info(f"날짜: {sale_date}, 기존 파일: {existing_daily_stat.source_file}")
+                    logger.info(f"현재 파일: {filename}")
+                    logger.info(f"중복 방지를 위해 날짜별 통계 저장을 건너뜁니다.")
+                
+                    # 날짜별 통계는 건너뛰지만 월별 누적은 진행
+                    logger.info(f"월별 누적은 계속 진행합니다.")
+                
+                    # 월별 누적 데이터 업데이트 (날짜별 통계 없이)
+                    try:
+                        with transaction.atomic():
+                            logger.info(f"=== 월별 누적 업데이트 호출 (날짜별 통계 없이) ===")
+                            logger.info(f"파일: {filename}, 날짜: {sale_date}")
+                            logger.info(f"전달할 데이터 - 거래건수: {daily_saved_count}, 수량: {daily_quantity}, 금액: {daily_amount:,.0f}")
+                            logger.info(f"제품별 카운트: {product_counts}")
+                            logger.info(f"제품별 판매금액: {product_amounts}")
+                    
+                            update_monthly_statistics(tid, sale_date, daily_saved_count, daily_quantity, daily_amount, daily_avg_price, top_product, top_product_count, product_counts, product_amounts)
+                    
+                            logger.info(f"월별 누적 업데이트 완료: {sale_date}")
+                    except Exception as e:
+                        logger.error(f"월별 누적 데이터 업데이트 중 오류 ({sale_date}): {str(e)}")
+                
+                    continue
+            
+                daily_avg_price = daily_amount / daily_quantity if daily_quantity > 0 else 0
+            
+                # 가장 많이 팔린 제품
+                top_product = max(product_counts.items(), key=lambda x: x[1])[0] if product_counts else ''
+                top_product_count = max(product_counts.values()) if product_counts else 0
+            
+                # SalesStatistics 모델에 통계 데이터 저장
+                sales_stat = SalesStatistics(
+                    tid=tid,
+                    sale_date=sale_date,
+                    total_transactions=daily_saved_count,
+                    total_quantity=daily_quantity,
+                    total_amount=daily_amount,
+                    avg_unit_price=daily_avg_price,
+                    top_product=top_product,
+                    top_product_count=top_product_count,
+                    source_file=filename
+                )
+                sales_stat.save()
+                logger.info(f"날짜별 통계 저장 완료: {sale_date} - {daily_saved_count}건, {daily_amount:,.0f}원")
+            
+                # 월별 누적 데이터 업데이트
+                try:
+                    with transaction.atomic():
+                        logger.info(f"=== 월별 누적 업데이트 호출 ===")
+                        logger.info(f"파일: {filename}, 날짜: {sale_date}")
+                        logger.info(f"전달할 데이터 - 거래건수: {daily_saved_count}, 수량: {daily_quantity}, 금액: {daily_amount:,.0f}")
+                        logger.info(f"제품별 카운트: {product_counts}")
+                        logger.info(f"제품별 판매금액: {product_amounts}")
+                
+                        update_monthly_statistics(tid, sale_date, daily_saved_count, daily_quantity, daily_amount, daily_avg_price, top_product, top_product_count, product_counts, product_amounts)
+                
+                        logger.info(f"월별 누적 업데이트 완료: {sale_date}")
+                except Exception as e:
+                    logger.error(f"월별 누적 데이터 업데이트 중 오류 ({sale_date}): {str(e)}")
+            
+        except Exception as e:
+            logger.error(f"날짜별 통계 저장 중 오류 ({sale_date}): {str(e)}")
+        
+        # 진행상황 로그
+        logger.info(f"날짜별 저장 완료: {sale_date} - {daily_saved_count}개 데이터 저장")
+    
+    logger.info(f"=== 분석 완료 ===")
+    logger.info(f"총 {saved_count}개 데이터 저장 완료")
+
+    return {'total_rows': len(df_cleaned), 'saved_count': saved_count}
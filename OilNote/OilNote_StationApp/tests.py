@@ -1,3 +1,235 @@
-from django.test import TestCase
+import datetime
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.db import close_old_connections, connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from OilNote_User.models import CustomerCard, CustomUser
+from .models import (
+    CouponTemplate, CouponType, CumulativeSalesTracker, CustomerCoupon, ExcelSalesData, PhoneCardMapping, PointCard
+)
+from .services.card_import import RESULT_INVALID, normalize_card_numbers
+from .services.customer_import import import_customers, normalize_customer_rows
+from .services.sales_ingest import SALES_COLUMNS, ingest_sales_file
+
+
+class NormalizeCardNumbersTests(SimpleTestCase):
+    """엑셀 카드번호 정리 (read_excel(dtype=str) 의 빈 셀은 NaN)"""
+
+    def test_blank_cells_are_dropped(self):
+        frame = normalize_card_numbers(['1234567890123456', np.nan, '', '12345'])
+
+        self.assertEqual(frame['row'].tolist(), [1, 4])
+        self.assertEqual(frame['card_number'].tolist(), ['1234567890123456', '12345'])
+        self.assertEqual(frame['result'].tolist(), [None, RESULT_INVALID])
+
+
+class NormalizeCustomerRowsTests(SimpleTestCase):
+    """엑셀 고객 행 정리"""
+
+    def test_empty_car_column(self):
+        frame = normalize_customer_rows(
+            ['01012345678', '01087654321'],
+            ['1234567890123456', '6543210987654321'],
+            [np.nan, np.nan],
+        )
+
+        self.assertEqual(frame['car_number'].tolist(), ['', ''])
+        self.assertTrue(frame['result'].isna().all())
+
+    def test_blank_car_cell(self):
+        frame = normalize_customer_rows(
+            ['01012345678', '01087654321'],
+            ['1234567890123456', '6543210987654321'],
+            ['12가3456', np.nan],
+        )
+
+        self.assertEqual(frame['car_number'].tolist(), ['12가3456', ''])
+
+
+class ImportCustomersTests(TestCase):
+    """엑셀 고객 일괄 등록"""
+
+    def setUp(self):
+        self.station = CustomUser.objects.create(username='station', user_type='STATION')
+        PointCard.objects.create(number='1234567890123456')
+        PointCard.objects.create(number='6543210987654321')
+
+    def test_missing_car_column(self):
+        result = import_customers(self.station, ['01012345678'], ['1234567890123456'])
+
+        self.assertEqual(result['registered_count'], 1)
+        mapping = PhoneCardMapping.objects.get(phone_number='01012345678')
+        self.assertEqual(mapping.car_number, '')
+
+    def test_empty_car_column(self):
+        result = import_customers(
+            self.station,
+            ['01012345678', '01087654321'],
+            ['1234567890123456', '6543210987654321'],
+            [np.nan, np.nan],
+        )
+
+        self.assertEqual(result['registered_count'], 2)
+        self.assertEqual(
+            set(PhoneCardMapping.objects.values_list('car_number', flat=True)),
+            {''}
+        )
+
+    def test_card_of_another_customer_is_not_linked(self):
+        owner = CustomUser.objects.create(username='owner', user_type='CUSTOMER')
+        customer = CustomUser.objects.create(username='customer', user_type='CUSTOMER')
+        customer.customer_profile.customer_phone = '01012345678'
+        customer.customer_profile.save()
+        CustomerCard.link(owner, '1234567890123456')
+
+        result = import_customers(self.station, ['01012345678'], ['1234567890123456'])
+
+        self.assertEqual(result['linked_count'], 0)
+        self.assertEqual(result['card_owned_count'], 1)
+        self.assertEqual(result['rows'][0]['message'], 'owner')
+        self.assertFalse(PhoneCardMapping.objects.exists())
+        self.assertFalse(PointCard.objects.get(number='1234567890123456').is_used)
+        self.assertFalse(CustomerCard.objects.filter(customer=customer).exists())
+
+
+class PhoneCardMappingLinkTests(TestCase):
+    """폰번호-카드 매핑의 고객 연동"""
+
+    def setUp(self):
+        self.station = CustomUser.objects.create(username='station', user_type='STATION')
+        self.card = PointCard.objects.create(number='1234567890123456')
+        self.mapping = PhoneCardMapping.objects.create(
+            phone_number='01012345678',
+            membership_card=self.card,
+            station=self.station,
+        )
+
+    def test_card_of_another_customer_leaves_mapping_untouched(self):
+        owner = CustomUser.objects.create(username='owner', user_type='CUSTOMER')
+        customer = CustomUser.objects.create(username='customer', user_type='CUSTOMER')
+        CustomerCard.link(owner, self.card.number)
+
+        with self.assertRaises(ValueError):
+            self.mapping.link_to_user(customer)
+
+        self.mapping.refresh_from_db()
+        self.assertFalse(self.mapping.is_used)
+        self.assertIsNone(self.mapping.linked_user_id)
+        self.assertFalse(CustomerCard.objects.filter(customer=customer).exists())
+
+
+class CumulativeSalesTrackerTests(TestCase):
+    """누적매출 추적"""
+
+    def setUp(self):
+        self.station = CustomUser.objects.create(username='station', user_type='STATION')
+        self.station.station_profile.tid = '1000'
+        self.station.station_profile.save()
+        self.customer = CustomUser.objects.create(username='customer', user_type='CUSTOMER')
+
+    def test_new_tracker_starts_from_processed_sales(self):
+        # 추적 행이 생기기 전에 이미 누적 처리된 매출 (bulk_create 는 시그널 없음)
+        ExcelSalesData.objects.bulk_create([
+            ExcelSalesData(
+                tid='1000',
+                customer_name='customer',
+                sale_date=datetime.date(2026, 1, day),
+                sale_time=datetime.time(10, 0),
+                total_amount=70000,
+                is_cumulative_processed=True,
+            )
+            for day in (1, 2)
+        ])
+
+        with transaction.atomic():
+            tracker, crossed = CumulativeSalesTracker.add_sale(self.customer, self.station, 20000, 50000)
+
+        # 140,000 → 160,000 은 150,000 하나만 통과
+        self.assertEqual(crossed, 1)
+        self.assertEqual(tracker.cumulative_amount, Decimal('160000'))
+        self.assertEqual(tracker.last_coupon_issued_at, Decimal('150000'))
+
+
+class SalesIngestTests(TestCase):
+    """POS 매출 파일 저장"""
+
+    def setUp(self):
+        self.station = CustomUser.objects.create(username='station', user_type='STATION')
+        self.station.station_profile.tid = '1000'
+        self.station.station_profile.save()
+        self.customer = CustomUser.objects.create(username='customer', user_type='CUSTOMER')
+        CustomerCard.link(self.customer, '1111222233334444')
+
+    def sales_file(self):
+        row = dict.fromkeys(SALES_COLUMNS, '')
+        row.update({
+            '판매일자': '2026/10/17',
+            '주유시간': '2026/10/17 10:05',
+            '고객명': 'customer',
+            '제품/PACK': '휘발유',
+            '판매수량': 10.5,
+            '판매단가': 1619.1,
+            '판매금액': 17000,
+            '승인번호': 'A1',
+            '보너스카드': '1111-2222-3333-4444',
+        })
+        buffer = io.BytesIO()
+        pd.DataFrame([row], columns=SALES_COLUMNS).to_excel(buffer, index=False)
+        buffer.seek(0)
+        return buffer
+
+    def test_reingesting_a_file_does_not_add_its_sales_again(self):
+        for _ in range(2):
+            ingest_sales_file(self.sales_file(), self.station, '1000', 'sales_1017.xlsx')
+
+        self.assertEqual(ExcelSalesData.objects.filter(tid='1000').count(), 1)
+        tracker = CumulativeSalesTracker.objects.get(customer=self.customer, station=self.station)
+        self.assertEqual(tracker.cumulative_amount, Decimal('17000'))
+        self.customer.customer_profile.refresh_from_db()
+        self.assertEqual(self.customer.customer_profile.total_fuel_cost, Decimal('17000'))
+
+
+class CouponRedemptionConcurrencyTests(TransactionTestCase):
+    """쿠폰 동시 사용 (조건부 UPDATE 한 번으로 한 요청만 성공)"""
+
+    PARALLEL = 50
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('메모리 SQLite 테스트 DB 는 여러 연결의 동시 쓰기를 지원하지 않음')
+        station = CustomUser.objects.create(username='station', user_type='STATION')
+        self.customer = CustomUser.objects.create(username='customer', user_type='CUSTOMER')
+        coupon_type = CouponType.objects.create(station=station, type_code='PROMO', type_name='프로모션')
+        template = CouponTemplate.objects.create(
+            station=station,
+            coupon_type=coupon_type,
+            coupon_name='1,000원 할인',
+            benefit_type='DISCOUNT',
+            discount_amount=1000,
+            is_permanent=True,
+        )
+        self.coupon = CustomerCoupon.objects.create(customer=self.customer, coupon_template=template)
+
+    def redeem(self, barrier):
+        # 모든 스레드가 모인 뒤 동시에 사용 요청
+        try:
+            barrier.wait()
+            return CustomerCoupon.redeem(self.coupon.pk, customer=self.customer)
+        finally:
+            close_old_connections()
+
+    def test_exactly_one_of_parallel_redemptions_wins(self):
+        barrier = threading.Barrier(self.PARALLEL)
+        with ThreadPoolExecutor(max_workers=self.PARALLEL) as executor:
+            results = list(executor.map(lambda _: self.redeem(barrier), range(self.PARALLEL)))
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(results.count(False), self.PARALLEL - 1)
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.status, 'USED')
@@ -75,6 +75,7 @@ urlpatterns = [
     path('get-coupon-types/', views.get_coupon_types, name='get_coupon_types'),
     path('get-coupon-templates/', views.get_coupon_templates, name='get_coupon_templates'),
     path('send-coupon/', views.send_coupon, name='send_coupon'),
+    path('coupon-issue-jobs/<int:job_id>/', views.coupon_issue_job_status, name='coupon_issue_job_status'),
     
     # 방문 기록 AJAX API
     path('api/visit-history/', views.api_visit_history, name='api_visit_history'),
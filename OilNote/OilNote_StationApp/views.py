@@ -3,8 +3,8 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, FileResponse
 from django.contrib import messages
 from django.db.models import Q, Sum
-from OilNote_User.models import CustomUser, CustomerProfile, CustomerStationRelation
-from .models import PointCard, StationCardMapping, SalesData, ExcelSalesData, MonthlySalesStatistics, SalesStatistics, Group, PhoneCardMapping, CouponType, CouponTemplate, CustomerCoupon
+from OilNote_User.models import CustomUser, CustomerCard, CustomerProfile, CustomerStationRelation
+from .models import PointCard, StationCardMapping, SalesData, ExcelSalesData, SalesStatistics, Group, PhoneCardMapping, CouponType, CouponTemplate, CustomerCoupon
 from datetime import datetime, timedelta
 import json
 import logging
@@ -24,69 +24,6 @@ from decimal import Decimal
 logger = logging.getLogger(__name__)
 
 
-def update_monthly_statistics(tid, sale_date, daily_transactions, daily_quantity, daily_amount, daily_avg_price, top_product, top_product_count, product_counts, product_amounts=None):
-    """월별 누적 매출 통계 업데이트 (월 전체 데이터 합산)"""
-    year_month = sale_date.strftime('%Y-%m')
-    # 해당 월의 모든 날짜별 SalesStatistics 합산
-    stats = SalesStatistics.objects.filter(
-        tid=tid,
-        sale_date__startswith=year_month
-    )
-    total_transactions = stats.aggregate(Sum('total_transactions'))['total_transactions__sum'] or 0
-    total_quantity = stats.aggregate(Sum('total_quantity'))['total_quantity__sum'] or 0
-    total_amount = stats.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-    avg_unit_price = (Decimal(str(total_amount)) / Decimal(str(total_quantity))) if total_quantity else Decimal('0')
-    # 제품별 집계 (ExcelSalesData에서 월 전체 데이터 집계)
-    excel_rows = ExcelSalesData.objects.filter(
-        tid=tid,
-        sale_date__startswith=year_month
-    )
-    product_counts = {}
-    product_quantities = {}
-    product_amounts = {}
-    for row in excel_rows:
-        product = (row.product_pack or '').strip()
-        if not product:
-            continue
-        product_counts[product] = product_counts.get(product, 0) + 1
-        product_quantities[product] = product_quantities.get(product, 0) + float(row.quantity or 0)
-        product_amounts[product] = product_amounts.get(product, 0) + float(row.total_amount or 0)
-    # 월별 통계 덮어쓰기
-    monthly_stat, created = MonthlySalesStatistics.objects.get_or_create(
-        tid=tid,
-        year_month=year_month,
-        defaults={
-            'total_transactions': 0,
-            'total_quantity': Decimal('0'),
-            'total_amount': Decimal('0'),
-            'avg_unit_price': Decimal('0'),
-            'top_product': '',
-            'top_product_count': 0,
-            'product_breakdown': {},
-            'product_sales_count': {},
-            'product_sales_quantity': {},
-            'product_sales_amount': {},
-        }
-    )
-    monthly_stat.total_transactions = int(total_transactions)
-    monthly_stat.total_quantity = Decimal(str(total_quantity))
-    monthly_stat.total_amount = Decimal(str(total_amount))
-    monthly_stat.avg_unit_price = avg_unit_price
-    monthly_stat.product_breakdown = {}
-    monthly_stat.product_sales_count = product_counts
-    monthly_stat.product_sales_quantity = product_quantities
-    monthly_stat.product_sales_amount = product_amounts
-    # 최다 판매 제품
-    if product_counts:
-        top_product_monthly = max(product_counts.items(), key=lambda x: x[1])
-        monthly_stat.top_product = top_product_monthly[0]
-        monthly_stat.top_product_count = top_product_monthly[1]
-    else:
-        monthly_stat.top_product = ''
-        monthly_stat.top_product_count = 0
-    monthly_stat.save()
-
-
 @login_required
 def station_main(request):
     """주유소 메인 페이지"""
@@ -390,11 +327,12 @@ def station_management(request):
         messages.error(request, '주유소 회원만 접근할 수 있습니다.')
         return redirect('home')
     
-    # 현재 주유소의 카드 매핑 수 조회
-    mappings = StationCardMapping.objects.filter(station=request.user, tid=request.user.station_profile.tid, is_active=True)
-    total_cards = mappings.count()
-    active_cards = mappings.filter(card__is_used=False).count()
-    inactive_cards = mappings.filter(card__is_used=True).count()
+    # 카드 상태별 통계 (조건부 집계 1회)
+    from .services.card_listing import card_status_counts
+    counts = card_status_counts(request.user, request.user.station_profile.tid)
+    total_cards = counts['total_count']
+    active_cards = counts['active_count']
+    inactive_cards = counts['used_count']
     
     # 비율 계산
     active_percentage = (active_cards / total_cards * 100) if total_cards > 0 else 0
@@ -495,13 +433,12 @@ def station_cardmanage(request):
         messages.error(request, '주유소 회원만 접근할 수 있습니다.')
         return redirect('home')
     
-    # 현재 주유소의 카드 매핑 수 조회
-    mappings = StationCardMapping.objects.filter(station=request.user, tid=request.user.station_profile.tid, is_active=True)
-    total_cards = mappings.count()
-    
-    # 카드 상태별 통계
-    active_cards = mappings.filter(card__is_used=False).count()
-    used_cards = mappings.filter(card__is_used=True).count()
+    # 카드 상태별 통계 (조건부 집계 1회)
+    from .services.card_listing import card_status_counts
+    counts = card_status_counts(request.user, request.user.station_profile.tid)
+    total_cards = counts['total_count']
+    active_cards = counts['active_count']
+    used_cards = counts['used_count']
     
     # 비율 계산
     active_percentage = (active_cards / total_cards * 100) if total_cards > 0 else 0
@@ -543,6 +480,18 @@ def station_cardmanage(request):
     
     return render(request, 'Cust_Station/station_cardmanage.html', context)
 
+def _card_owner_ids(search_query):
+    """검색어(카드번호 전체 또는 앞자리)에 해당하는 카드 소유 고객 ID 서브쿼리"""
+    card_number = CustomerCard.normalize(search_query)
+    if not card_number:
+        return CustomerCard.objects.none().values('customer_id')
+    if len(card_number) >= 16:
+        cards = CustomerCard.objects.filter(card_number=card_number)
+    else:
+        # 숫자만 저장되는 컬럼이라 istartswith(LIKE 'q%') 로 인덱스 범위 검색
+        cards = CustomerCard.objects.filter(card_number__istartswith=card_number)
+    return cards.values('customer_id')
+
 @login_required
 def station_usermanage(request):
     """고객 관리 페이지"""
@@ -575,7 +524,7 @@ def station_usermanage(request):
         registered_customers = registered_customers.filter(
             Q(customer__username__icontains=search_query) |
             Q(customer__customer_profile__customer_phone__icontains=search_query) |
-            Q(customer__customer_profile__membership_card__icontains=search_query)
+            Q(customer__in=_card_owner_ids(search_query))
         )
         
         # 미회원가입 고객 검색
@@ -709,7 +658,8 @@ def update_customer_info(request):
             if phone:
                 profile.customer_phone = phone
             if card_number:
-                profile.membership_card = card_number
+                # 카드 교체 (다른 고객의 카드이면 ValueError)
+                CustomerCard.replace(customer, card_number)
             
             profile.save()
             
@@ -724,6 +674,8 @@ def update_customer_info(request):
             return JsonResponse({'error': '잘못된 요청 형식입니다.'}, status=400)
         except CustomUser.DoesNotExist:
             return JsonResponse({'error': '고객을 찾을 수 없습니다.'}, status=404)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
     
@@ -731,48 +683,52 @@ def update_customer_info(request):
 
 @login_required
 def get_cards(request):
-    """등록된 카드 목록 조회"""
+    """등록된 카드 목록 조회 (키셋 페이지네이션 + 서버 필터)
+    
+    GET 파라미터: status(used/unused), prefix, date_from, date_to(YYYY-MM-DD), cursor, page_size
+    상태별 카드 수는 첫 페이지(cursor 없음)에서만 함께 반환한다.
+    """
     if not request.user.is_station:
         logger.warning(f"권한 없는 사용자의 접근 시도: {request.user.username}")
         return JsonResponse({'status': 'error', 'message': '권한이 없습니다.'}, status=403)
     
+    from .services.card_listing import list_station_cards, card_status_counts, DEFAULT_PAGE_SIZE
+    
     try:
-        # 현재 주유소에 등록된 카드 매핑 조회
-        mappings = StationCardMapping.objects.select_related('card').filter(
-            station=request.user,
-            tid=request.user.station_profile.tid,
-            is_active=True
-        ).order_by('-registered_at')
-        
-        # 전체 카드 수 계산 (캐시되지 않도록 실제 쿼리 실행)
-        total_count = mappings.count()
-        logger.info(f"주유소 {request.user.username}의 등록 카드 수: {total_count}")
-        
-        # 카드 상태별 수 계산 (캐시되지 않도록 실제 쿼리 실행)
-        active_count = mappings.filter(card__is_used=False).count()
-        used_count = mappings.filter(card__is_used=True).count()
-        
-        logger.info(f"통계 정보 - 전체: {total_count}, 사용가능: {active_count}, 사용중: {used_count}")
+        tid = request.user.station_profile.tid
+        cursor = request.GET.get('cursor') or None
+        prefix = re.sub(r'[^0-9]', '', request.GET.get('prefix', ''))
         
-        # 카드 목록 데이터 생성
-        cards_data = []
-        for mapping in mappings:
-            card = mapping.card
-            card_info = {
-                'number': card.number,
-                'is_used': card.is_used,
-                'created_at': mapping.registered_at.strftime('%Y-%m-%d %H:%M:%S')
-            }
-            cards_data.append(card_info)
-            logger.debug(f"카드 정보: {card_info}")
+        try:
+            cards_data, next_cursor = list_station_cards(
+                request.user,
+                tid,
+                status=request.GET.get('status') or None,
+                prefix=prefix or None,
+                date_from=request.GET.get('date_from') or None,
+                date_to=request.GET.get('date_to') or None,
+                cursor=cursor,
+                page_size=request.GET.get('page_size') or DEFAULT_PAGE_SIZE,
+            )
+        except ValueError:
+            return JsonResponse({
+                'status': 'error',
+                'message': '잘못된 조회 조건입니다.'
+            }, status=400)
         
-        return JsonResponse({
+        response_data = {
             'status': 'success',
             'cards': cards_data,
-            'total_count': total_count,
-            'active_count': active_count,
-            'used_count': used_count
-        })
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+        
+        if not cursor:
+            counts = card_status_counts(request.user, tid)
+            response_data.update(counts)
+            logger.info(f"주유소 {request.user.username} 카드 통계 - 전체: {counts['total_count']}, 사용가능: {counts['active_count']}, 사용중: {counts['used_count']}")
+        
+        return JsonResponse(response_data)
     except Exception as e:
         logger.error(f"카드 목록 조회 중 오류 발생: {str(e)}", exc_info=True)
         return JsonResponse({
@@ -815,16 +771,11 @@ def register_cards_single(request):
             
             logger.info(f"카드 생성 시도: {card_number}")
             # get_or_create를 사용하여 중복 생성 방지
-            card, created = PointCard.objects.get_or_create(
-                number=card_number,
-                defaults={'tids': []}
-            )
+            card, created = PointCard.objects.get_or_create(number=card_number)
             logger.info(f"카드 생성 결과: created={created}, card_id={card.id}")
             
-            # TID 추가
-            if tid not in card.tids:
-                card.add_tid(tid)
-                logger.info(f"카드에 TID 추가: {tid}")
+            # TID 추가 (이미 있으면 무시)
+            card.add_tid(tid)
             
             # 카드와 주유소 매핑 생성
             logger.info(f"매핑 생성 시도: 주유소={request.user.username}, 카드={card_number}")
@@ -993,73 +944,33 @@ def register_cards_bulk(request):
                     'message': 'TID는 필수 입력값입니다.'
                 })
             
+            # 카드번호 구간 단위로 기존 카드/매핑을 한 번에 조회하고 없는 것만 일괄 생성
+            from .services.card_registration import register_card_range
             try:
-                start_num = int(start_num)
-            except ValueError:
-                logger.warning(f"시작번호를 정수로 변환할 수 없음: {start_num}")
+                result = register_card_range(
+                    station=request.user,
+                    tid=tid,
+                    start_number=start_num,
+                    card_count=card_count,
+                    oil_company_code=oil_company_code,
+                    agency_code=agency_code,
+                )
+            except ValueError as e:
+                logger.warning(f"카드 일괄 등록 범위 오류: {str(e)}")
                 return JsonResponse({
                     'status': 'error',
-                    'message': '시작번호는 숫자여야 합니다.'
+                    'message': str(e)
                 }, status=400)
-
-            registered_cards = []
-            
-            for i in range(card_count):
-                card_number = str(start_num + i).zfill(16)
-                logger.debug(f"카드 생성 시도: {card_number}")
-                
-                try:
-                    # get_or_create를 사용하여 중복 생성 방지
-                    card, created = PointCard.objects.get_or_create(
-                        number=card_number,
-                        defaults={
-                            'tids': [],
-                            'oil_company_code': oil_company_code,
-                            'agency_code': agency_code
-                        }
-                    )
-                    logger.debug(f"카드 생성 결과: created={created}, card_id={card.id}")
-                    
-                    # TID 추가
-                    if tid not in card.tids:
-                        logger.debug(f"카드 {card_number}에 TID {tid} 추가 시도")
-                        card.tids.append(tid)
-                        card.save()
-                        logger.debug(f"카드 {card_number}의 업데이트된 TID 목록: {card.tids}")
-                    
-                    # 카드와 주유소 매핑 생성
-                    logger.debug(f"매핑 생성 시도: 카드={card_number}, TID={tid}")
-                    mapping, mapping_created = StationCardMapping.objects.get_or_create(
-                        station=request.user,
-                        tid=tid,
-                        card=card,
-                        defaults={'is_active': True}
-                    )
-                    logger.debug(f"매핑 생성 결과: created={mapping_created}, mapping_id={mapping.id}")
-                    
-                    # 매핑이 이미 존재하지만 비활성화된 경우 활성화
-                    if not mapping_created and not mapping.is_active:
-                        mapping.is_active = True
-                        mapping.save()
-                        logger.info(f"비활성화된 매핑을 활성화함: mapping_id={mapping.id}")
-                    
-                    registered_cards.append({
-                        'number': card.number,
-                        'is_used': card.is_used,
-                        'created_at': card.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"카드 {card_number} 생성 중 오류: {str(e)}", exc_info=True)
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'카드 {card_number} 생성 중 오류가 발생했습니다.'
-                    }, status=500)
             
             return JsonResponse({
                 'status': 'success',
-                'message': f'{len(registered_cards)}개의 카드가 성공적으로 등록되었습니다.',
-                'cards': registered_cards
+                'message': f"{result['total']}개의 카드가 성공적으로 등록되었습니다.",
+                'cards': result['cards'],
+                'total': result['total'],
+                'created_cards': result['created_cards'],
+                'existing_cards': result['existing_cards'],
+                'created_mappings': result['created_mappings'],
+                'reactivated_mappings': result['reactivated_mappings']
             })
             
         except json.JSONDecodeError:
@@ -1552,8 +1463,6 @@ def send_coupon(request):
         return JsonResponse({'status': 'error', 'message': '권한이 없습니다.'}, status=403)
     
     try:
-        from .models import StationCouponQuota
-        
         template_id = request.POST.get('coupon_template_id')
         customer_ids = request.POST.getlist('customer_ids')
         target_type = request.POST.get('target_type')  # all, group, individual
@@ -1575,68 +1484,41 @@ def send_coupon(request):
         if template.coupon_type.type_code == 'SIGNUP':
             return JsonResponse({'status': 'error', 'message': '회원가입 쿠폰은 수동으로 발행할 수 없습니다.'})
         
+        from .services.coupon_issue import (
+            BACKGROUND_THRESHOLD, issue_coupons, release_quota, reserve_quota, start_issue_job, target_relations,
+        )
+
         # 발행 대상 고객 확인
-        customers = []
-        
-        if target_type == 'all':
-            # 모든 연결된 고객
-            customers = CustomUser.objects.filter(
-                user_type='CUSTOMER',
-                station_relations__station=request.user,
-                station_relations__is_active=True
-            ).distinct()
-        elif target_type == 'group' and group_id:
-            # 특정 그룹 고객
-            try:
-                group = Group.objects.get(id=group_id, station=request.user)
-                customers = CustomUser.objects.filter(
-                    user_type='CUSTOMER',
-                    customer_profile__group=group.name,
-                    station_relations__station=request.user,
-                    station_relations__is_active=True
-                ).distinct()
-            except Group.DoesNotExist:
-                return JsonResponse({'status': 'error', 'message': '유효하지 않은 그룹입니다.'})
-        elif target_type == 'individual' and customer_ids:
-            # 개별 고객
-            customers = CustomUser.objects.filter(
-                id__in=customer_ids,
-                user_type='CUSTOMER',
-                station_relations__station=request.user,
-                station_relations__is_active=True
-            )
+        try:
+            relations = target_relations(request.user, target_type, group_id, customer_ids)
+        except Group.DoesNotExist:
+            return JsonResponse({'status': 'error', 'message': '유효하지 않은 그룹입니다.'})
         
-        if not customers.exists():
+        customer_count = relations.count()
+        if not customer_count:
             return JsonResponse({'status': 'error', 'message': '발행할 고객이 없습니다.'})
         
-        customer_count = customers.count()
+        # 쿠폰 수량 예약 (자동 쿠폰 제외, 조건부 UPDATE 로 원자적 차감)
+        try:
+            reserve_quota(request.user, template, customer_count)
+        except ValueError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)})
         
-        # 쿠폰 수량 체크 (자동 쿠폰 제외)
-        if template.coupon_type.type_code not in ['SIGNUP', 'CUMULATIVE', 'MONTHLY']:
-            quota = StationCouponQuota.objects.filter(station=request.user).first()
-            if not quota or not quota.can_issue_coupons(customer_count):
-                available_count = quota.remaining_quota if quota else 0
-                return JsonResponse({
-                    'status': 'error', 
-                    'message': f'쿠폰 수량이 부족합니다. (요청: {customer_count}개, 잔여: {available_count}개)'
-                })
+        # 대량 발행은 백그라운드 작업으로 처리
+        if customer_count > BACKGROUND_THRESHOLD:
+            try:
+                job = start_issue_job(request.user, template, target_type, relations, customer_count)
+            except Exception:
+                release_quota(request.user, template, customer_count)
+                raise
+            return JsonResponse({
+                'status': 'success',
+                'message': f'{customer_count}명의 고객에게 쿠폰 발행을 시작했습니다.',
+                'job_id': job.id,
+                'total_count': customer_count
+            })
         
-        # 쿠폰 발행
-        issued_count = 0
-        with transaction.atomic():
-            for customer in customers:
-                CustomerCoupon.objects.create(
-                    customer=customer,
-                    coupon_template=template,
-                    status='AVAILABLE'
-                )
-                issued_count += 1
-            
-            # 수동 쿠폰의 경우 수량 차감
-            if template.coupon_type.type_code not in ['SIGNUP', 'CUMULATIVE', 'MONTHLY']:
-                quota = StationCouponQuota.objects.filter(station=request.user).first()
-                if quota:
-                    quota.use_quota(issued_count)
+        issued_count = issue_coupons(request.user, template, relations, customer_count)
         
         return JsonResponse({
             'status': 'success',
@@ -1648,6 +1530,32 @@ def send_coupon(request):
         logger.error(f"쿠폰 발행 오류: {str(e)}")
         return JsonResponse({'status': 'error', 'message': '쿠폰 발행 중 오류가 발생했습니다.'})
 
+@login_required
+@require_GET
+def coupon_issue_job_status(request, job_id):
+    """대량 쿠폰 발행 작업 진행률 조회"""
+    if not request.user.is_station:
+        return JsonResponse({'status': 'error', 'message': '권한이 없습니다.'}, status=403)
+    
+    from .models import CouponIssueJob
+    try:
+        job = CouponIssueJob.objects.get(id=job_id, station=request.user)
+    except CouponIssueJob.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': '발행 작업을 찾을 수 없습니다.'}, status=404)
+    
+    return JsonResponse({
+        'status': 'success',
+        'job': {
+            'id': job.id,
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'total_count': job.total_count,
+            'issued_count': job.issued_count,
+            'progress': job.progress,
+            'error_message': job.error_message,
+        }
+    })
+
 @require_http_methods(["GET"])
 @login_required
 def get_unused_cards(request):
@@ -1681,7 +1589,7 @@ def get_unused_cards(request):
         logger.info(f"주유소 TID: {tid}")
         
         # 현재 주유소+TID에 등록된 미사용 카드만 조회
-        mappings = StationCardMapping.objects.select_related('card').filter(
+        mappings = StationCardMapping.objects.select_related('card').prefetch_related('card__tid_links').filter(
             station=request.user,
             tid=tid,
             is_active=True,
@@ -1787,7 +1695,6 @@ def register_card(request):
                 number=card_number,
                 oil_company_code=oil_company_code,
                 agency_code=agency_code,
-                tids=[tid],
                 created_at=timezone.now()
             )
             logger.info(f"새 카드 등록 완료: {new_card.number}, TID: {tid}")
@@ -1975,7 +1882,7 @@ def register_customer(request):
                         logger.info("기존 고객 프로필 업데이트 시작")
                         try:
                             logger.info(f"기존 고객 정보 - 사용자: {existing_customer.user.username}, 기존 차량번호: {existing_customer.car_number or '없음'}")
-                            existing_customer.membership_card = card_number
+                            CustomerCard.link(existing_customer.user, card_number)
                             # 차량 번호가 있으면 고객 프로필에 업데이트 (기존 차량번호가 없을 때만)
                             car_number_clean = car_number.strip() if car_number else None
                             logger.info(f"차량 번호 처리 - 원본: '{car_number}', 정리됨: '{car_number_clean}'")
@@ -2365,517 +2272,15 @@ def analyze_sales_file(request):
             return JsonResponse({'error': '파일을 찾을 수 없습니다.'}, status=404)
         
         # 엑셀 파일 분석 및 데이터베이스 저장
-        import pandas as pd
-        from datetime import datetime
-        
-        logger.info(f"파일 분석 시작: {filename}")
-        logger.info(f"파일 경로: {file_path}")
-        
-        # 엑셀 파일 읽기 (첫 번째 행부터 시작)
-        logger.info("엑셀 파일 읽기 시작...")
-        df = pd.read_excel(
-            file_path,
-            skiprows=0,  # 첫 번째 행부터 시작
-            names=['판매일자', '주유시간', '고객번호', '고객명', '발행번호', '주류상품종류', 
-                  '판매구분', '결제구분', '판매구분2', '노즐', '제품코드', '제품/PACK',
-                  '판매수량', '판매단가', '판매금액', '적립포인트', '포인트', '보너스',
-                  'POS_ID', 'POS코드', '판매점', '영수증', '승인번호', '승인일시',
-                  '보너스카드', '고객카드번호', '데이터생성일시']
-        )
-        logger.info(f"엑셀 파일 읽기 완료. 총 {len(df)} 행 발견")
-        
-        # 빈 행 제거
-        df_cleaned = df.dropna(how='all')
-        logger.info(f"빈 행 제거 후: {len(df_cleaned)} 행")
-        
-        # 헤더 행과 합계 행 제거 (더 안전한 처리)
-        if len(df_cleaned) > 0:
-            # 첫 번째 행이 헤더인 경우 제거
-            first_row_sale_date = str(df_cleaned.iloc[0]['판매일자']).strip()
-            if first_row_sale_date == '판매일자' or first_row_sale_date == 'nan' or first_row_sale_date == '':
-                logger.info("헤더 행 제거")
-                df_cleaned = df_cleaned.iloc[1:]
-                logger.info(f"헤더 제거 후: {len(df_cleaned)} 행")
-            
-            # 마지막 행이 합계인 경우 제거
-            if len(df_cleaned) > 0:
-                last_row_sale_date = str(df_cleaned.iloc[-1]['판매일자']).strip()
-                if last_row_sale_date == '합계' or last_row_sale_date == 'nan' or last_row_sale_date == '':
-                    logger.info("합계 행 제거")
-                    df_cleaned = df_cleaned.iloc[:-1]
-                    logger.info(f"합계 제거 후: {len(df_cleaned)} 행")
-        
-        # 기존 데이터 삭제 (같은 파일에서 온 데이터)
-        logger.info(f"기존 데이터 삭제: {filename}")
-        deleted_count = ExcelSalesData.objects.filter(source_file=filename).delete()[0]
-        logger.info(f"삭제된 기존 데이터: {deleted_count}개")
-        
-        # 데이터 분석 결과 출력
-        logger.info("=== 📊 엑셀 파일 분석 결과 ===")
-        logger.info(f"📈 기본 정보")
-        logger.info(f"파일명: {filename}")
-        logger.info(f"총 데이터 행 개수: {len(df)}행")
-        logger.info(f"실제 데이터 행 개수: {len(df_cleaned)}행")
-        
-        # 날짜별 데이터 분석 및 통계 저장
-        if len(df_cleaned) > 0:
-            try:
-                sale_dates = df_cleaned['판매일자'].dropna()
-                if len(sale_dates) > 0:
-                    min_date = sale_dates.min()
-                    max_date = sale_dates.max()
-                    logger.info(f"📅 날짜 범위")
-                    logger.info(f"최초 판매일: {min_date}")
-                    logger.info(f"최종 판매일: {max_date}")
-                    
-                    # 날짜별 데이터 개수 및 통계 계산
-                    # 날짜별 데이터 개수 및 통계 계산
-                    date_counts = sale_dates.value_counts().sort_index()
-                    logger.info(f"날짜별 데이터 개수:")
-                    
-                    # 기존 통계 데이터 확인 (같은 파일에서 온 데이터)
-                    from .models import SalesStatistics
-                    existing_stats = SalesStatistics.objects.filter(tid__startswith=tid, source_file=filename)
-                    if existing_stats.exists():
-                        logger.info(f"기존 통계 데이터 발견: {existing_stats.count()}개 - 중복 방지 모드로 진행")
-                    else:
-                        logger.info(f"새로운 파일 분석: {filename}")
-                    
-                    # 날짜별 통계 데이터 생성 및 저장
-                    for date, count in date_counts.items():
-                        logger.info(f"  {date}: {count}행")
-                        
-                        # 해당 날짜의 데이터만 필터링
-                        daily_data = df_cleaned[df_cleaned['판매일자'] == date]
-                        
-                        # 일별 통계 계산
-                        daily_quantity = daily_data['판매수량'].sum()
-                        daily_amount = daily_data['판매금액'].sum()
-                        daily_avg_price = daily_amount / daily_quantity if daily_quantity > 0 else 0
-                        
-                        # 제품별 판매 현황 (가장 많이 팔린 제품)
-                        product_counts = daily_data['제품/PACK'].value_counts()
-                        top_product = product_counts.index[0] if len(product_counts) > 0 else ''
-                        top_product_count = product_counts.iloc[0] if len(product_counts) > 0 else 0
-                        
-                        # SalesStatistics 모델에 통계 데이터 저장
-                        try:
-                            # 날짜 파싱
-                            if '/' in str(date):
-                                parsed_date = datetime.strptime(str(date), '%Y/%m/%d').date()
-                            else:
-                                parsed_date = date
-                            
-                            # 중복 확인 (tid, sale_date 조합)
-                            existing_stat = SalesStatistics.objects.filter(
-                                tid=tid,
-                                sale_date=parsed_date
-                            ).first()
-                            
-                            if existing_stat:
-                                logger.info(f"중복 데이터 발견 - 건너뛰기: {date} ({existing_stat.total_transactions}건, {existing_stat.total_amount:,.0f}원)")
-                                continue
-                            
-                            # 새로운 통계 데이터 저장
-                            sales_stat = SalesStatistics(
-                                tid=tid,  # 주유소 TID만 저장
-                                sale_date=parsed_date,
-                                total_transactions=count,
-                                total_quantity=daily_quantity,
-                                total_amount=daily_amount,
-                                avg_unit_price=daily_avg_price,
-                                top_product=top_product,
-                                top_product_count=top_product_count,
-                                source_file=filename
-                            )
-                            sales_stat.save()
-                            logger.info(f"날짜별 통계 저장 완료: {date} - {count}건, {daily_amount:,.0f}원")
-                            
-                        except Exception as e:
-                            logger.error(f"날짜별 통계 저장 중 오류 ({date}): {str(e)}")
-                            continue
-                            
-            except Exception as e:
-                logger.warning(f"날짜 분석 중 오류: {e}")
-        
-        # 제품별 데이터 분석
-        if len(df_cleaned) > 0:
-            try:
-                product_counts = df_cleaned['제품/PACK'].value_counts()
-                logger.info(f"⛽ 제품별 판매 현황")
-                total_products = len(product_counts)
-                for i, (product, count) in enumerate(product_counts.items(), 1):
-                    percentage = (count / len(df_cleaned) * 100) if len(df_cleaned) > 0 else 0
-                    logger.info(f"  {product}: {count}행 ({percentage:.1f}%)")
-            except Exception as e:
-                logger.warning(f"제품별 분석 중 오류: {e}")
-        
-        # 매출 정보 분석
-        if len(df_cleaned) > 0:
-            try:
-                total_quantity = df_cleaned['판매수량'].sum()
-                total_amount = df_cleaned['판매금액'].sum()
-                avg_unit_price = total_amount / total_quantity if total_quantity > 0 else 0
-                
-                logger.info(f"💰 매출 정보")
-                logger.info(f"총 판매수량: {total_quantity:,.2f}L")
-                logger.info(f"총 판매금액: {total_amount:,.0f}원")
-                logger.info(f"평균 단가: {avg_unit_price:,.0f}원/L")
-            except Exception as e:
-                logger.warning(f"매출 분석 중 오류: {e}")
-        
-        logger.info("=== 데이터베이스 저장 시작 ===")
-        
-        # 데이터베이스에 저장
-        saved_count = 0
-        daily_records = {}  # 날짜별로 데이터 그룹화
-        
-        # 먼저 날짜별로 데이터 그룹화
-        for index, row in df_cleaned.iterrows():
-            try:
-                # 날짜 파싱 (안전한 처리)
-                sale_date_str = str(row['판매일자']).strip()
-                if pd.isna(row['판매일자']) or sale_date_str == '' or sale_date_str == 'nan':
-                    logger.warning(f"행 {index}: 유효하지 않은 날짜 데이터 - 건너뛰기")
-                    continue
-                
-                sale_date = None
-                if '/' in sale_date_str:
-                    try:
-                        sale_date = datetime.strptime(sale_date_str, '%Y/%m/%d').date()
-                    except ValueError:
-                        logger.warning(f"행 {index}: 날짜 형식 오류 '{sale_date_str}' - 건너뛰기")
-                        continue
-                else:
-                    logger.warning(f"행 {index}: 날짜 형식이 맞지 않음 '{sale_date_str}' - 건너뛰기")
-                    continue
-                
-                # 날짜별로 데이터 그룹화
-                if sale_date not in daily_records:
-                    daily_records[sale_date] = []
-                daily_records[sale_date].append(row)
-                
-            except Exception as e:
-                logger.error(f"행 {index} 날짜 파싱 중 오류: {str(e)}")
-                continue
-        
-        # 날짜별로 개별 저장
-        for sale_date, rows in daily_records.items():
-            logger.info(f"날짜별 저장 시작: {sale_date} - {len(rows)}행")
-            
-            # 해당 날짜의 기존 데이터 삭제 (tid, sale_date 기준으로 완전 삭제)
-            deleted_excel = ExcelSalesData.objects.filter(
-                tid=tid,
-                sale_date=sale_date
-            ).delete()
-            deleted_stats = SalesStatistics.objects.filter(
-                tid=tid,
-                sale_date=sale_date
-            ).delete()
-            logger.info(f"[삭제] {sale_date} - ExcelSalesData: {deleted_excel[0]}개, SalesStatistics: {deleted_stats[0]}개")
-            
-            # 해당 날짜의 통계 데이터도 삭제
-            deleted_stats = SalesStatistics.objects.filter(
-                tid=tid,
-                sale_date=sale_date
-            ).delete()[0]
-            if deleted_stats > 0:
-                logger.info(f"기존 통계 데이터 삭제: {sale_date} - {deleted_stats}개")
-            
-            # 해당 날짜의 모든 행 저장
-            daily_saved_count = 0
-            daily_quantity = 0
-            daily_amount = 0
-            product_counts = {}
-            product_amounts = {}  # 실제 제품별 판매금액
-            
-            for row in rows:
-                try:
-                    # 시간 파싱 (안전한 처리)
-                    sale_time_str = str(row['주유시간']).strip()
-                    if pd.isna(row['주유시간']) or sale_time_str == '' or sale_time_str == 'nan':
-                        sale_time = datetime.now().time()
-                    else:
-                        try:
-                            if ' ' in sale_time_str:
-                                time_part = sale_time_str.split(' ')[1]
-                                sale_time = datetime.strptime(time_part, '%H:%M').time()
-                            else:
-                                sale_time = datetime.now().time()
-                        except ValueError:
-                            logger.warning(f"시간 형식 오류 '{sale_time_str}' - 현재 시간 사용")
-                            sale_time = datetime.now().time()
-                    
-                    # 숫자 데이터 처리 (안전한 변환)
-                    def safe_float(value, default=0, handle_negative='zero'):
-                        """
-                        안전한 float 변환 함수
-                        handle_negative: 'zero' (음수를 0으로), 'abs' (절댓값), 'keep' (그대로 유지)
-                        """
-                        if pd.isna(value):
-                            return default
-                        try:
-                            result = float(value)
-                            if handle_negative == 'zero' and result < 0:
-                                logger.warning(f"음수 값 발견: {value} -> 0으로 처리")
-                                return 0
-                            elif handle_negative == 'abs' and result < 0:
-                                logger.warning(f"음수 값 발견: {value} -> 절댓값으로 처리")
-                                return abs(result)
-                            elif handle_negative == 'keep' and result < 0:
-                                logger.info(f"음수 값 발견: {value} -> 그대로 유지 (환불/취소 거래)")
-                                return result
-                            return result
-                        except (ValueError, TypeError):
-                            return default
-                    
-                    def safe_int(value, default=0, handle_negative='zero'):
-                        """
-                        안전한 int 변환 함수
-                        handle_negative: 'zero' (음수를 0으로), 'abs' (절댓값), 'keep' (그대로 유지)
-                        """
-                        if pd.isna(value):
-                            return default
-                        try:
-                            result = int(float(value))  # float로 먼저 변환 후 int로 변환
-                            if handle_negative == 'zero' and result < 0:
-                                logger.warning(f"음수 값 발견: {value} -> 0으로 처리")
-                                return 0
-                            elif handle_negative == 'abs' and result < 0:
-                                logger.warning(f"음수 값 발견: {value} -> 절댓값으로 처리")
-                                return abs(result)
-                            elif handle_negative == 'keep' and result < 0:
-                                logger.info(f"음수 값 발견: {value} -> 그대로 유지 (환불/취소 거래)")
-                                return result
-                            return result
-                        except (ValueError, TypeError):
-                            return default
-                    
-                    # 판매수량, 판매금액은 음수도 그대로 유지 (환불/취소 거래 포함)
-                    quantity = safe_float(row['판매수량'], handle_negative='keep')
-                    unit_price = safe_float(row['판매단가'], handle_negative='keep')
-                    total_amount = safe_float(row['판매금액'], handle_negative='keep')
-                    
-                    # 포인트 관련은 절댓값으로 처리 (음수 포인트 사용도 유효한 데이터)
-                    earned_points = safe_int(row.get('적립포인트', 0), handle_negative='abs')
-                    points = safe_int(row.get('포인트', 0), handle_negative='abs')
-                    bonus = safe_int(row.get('보너스', 0), handle_negative='abs')
-                    
-                    # 통계 계산을 위한 누적
-                    daily_quantity += quantity
-                    daily_amount += total_amount
-                    
-                    # 제품별 카운트 및 판매금액 누적
-                    product_pack = str(row.get('제품/PACK', ''))
-                    if product_pack and product_pack != 'nan':
-                        product_counts[product_pack] = product_counts.get(product_pack, 0) + 1
-                        product_amounts[product_pack] = product_amounts.get(product_pack, 0) + total_amount
-                    
-                    # ExcelSalesData 객체 생성 및 저장
-                    excel_data = ExcelSalesData(
-                        tid=tid,
-                        sale_date=sale_date,
-                        sale_time=sale_time,
-                        customer_number=str(row.get('고객번호', '')),
-                        customer_name=str(row.get('고객명', '')),
-                        issue_number=str(row.get('발행번호', '')),
-                        product_type=str(row.get('주류상품종류', '')),
-                        sale_type=str(row.get('판매구분', '')),
-                        payment_type=str(row.get('결제구분', '')),
-                        sale_type2=str(row.get('판매구분2', '')),
-                        nozzle=str(row.get('노즐', '')),
-                        product_code=str(row.get('제품코드', '')),
-                        product_pack=product_pack,
-                        quantity=quantity,
-                        unit_price=unit_price,
-                        total_amount=total_amount,
-                        earned_points=earned_points,
-                        points=points,
-                        bonus=bonus,
-                        pos_id=str(row.get('POS_ID', '')),
-                        pos_code=str(row.get('POS코드', '')),
-                        store=str(row.get('판매점', '')),
-                        receipt=str(row.get('영수증', '')),
-                        approval_number=str(row.get('승인번호', '')),
-                        approval_datetime=datetime.now(),
-                        bonus_card=str(row.get('보너스카드', '')),
-                        customer_card_number=str(row.get('고객카드번호', '')),
-                        data_created_at=datetime.now(),
-                        source_file=filename
-                    )
-                    excel_data.save()
-                    daily_saved_count += 1
-                    saved_count += 1
-                    
-                    # 보너스 카드와 일치하는 고객 찾아 방문 내역 저장
-                    bonus_card = str(row.get('보너스카드', '')).strip()
-                    if bonus_card and bonus_card != 'nan' and bonus_card != '':
-                        try:
-                            # OilNote_UserApp의 CustomerVisitHistory 모델 import
-                            from OilNote_UserApp.models import CustomerVisitHistory
-                            from OilNote_User.models import CustomUser, CustomerProfile
-                            
-                            # 보너스 카드와 일치하는 고객 찾기
-                            customer_profile = CustomerProfile.objects.filter(
-                                membership_card__icontains=bonus_card
-                            ).first()
-                            
-                            if customer_profile:
-                                customer = customer_profile.user
-                                logger.info(f"고객 발견: {customer.username} (보너스카드: {bonus_card})")
-                                
-                                # 주유량 정보 가져오기 (quantity 값) - 마이너스 값도 그대로 유지
-                                fuel_quantity = safe_float(row.get('판매수량', 0), handle_negative='keep')
-                                logger.info(f"주유량 추출: {fuel_quantity:.2f}L (원본값: {row.get('판매수량', 0)})")
-                                
-                                # 중복 방문 내역 체크 및 처리
-                                approval_number = str(row.get('승인번호', ''))
-                                existing_visit = CustomerVisitHistory.objects.filter(
-                                    customer=customer,
-                                    station=request.user,
-                                    visit_date=sale_date,
-                                    visit_time=sale_time,
-                                    approval_number=approval_number
-                                ).first()
-                                
-                                if existing_visit:
-                                    logger.info(f"중복 방문 내역 발견 - 기존 데이터 삭제 후 재저장: {customer.username} - {sale_date} {sale_time} (승인번호: {approval_number})")
-                                    existing_visit.delete()
-                                
-                                # 방문 내역 저장
-                                visit_history = CustomerVisitHistory(
-                                    customer=customer,
-                                    station=request.user,
-                                    tid=tid,
-                                    visit_date=sale_date,
-                                    visit_time=sale_time,
-                                    payment_type=str(row.get('결제구분', '')),
-                                    product_pack=str(row.get('제품/PACK', '')),
-                                    sale_amount=total_amount,
-                                    fuel_quantity=fuel_quantity,
-                                    approval_number=approval_number,
-                                    membership_card=bonus_card
-                                )
-                                visit_history.save()
-                                logger.info(f"방문 내역 저장 완료: {customer.username} - {sale_date} {sale_time} (주유량: {fuel_quantity:.2f}L)")
-                                
-                                # 고객 프로필의 주유량 및 주유금액 정보 업데이트
-                                from OilNote_User.models import CustomerProfile
-                                
-                                # 기존 주유량 정보
-                                old_total = customer_profile.total_fuel_amount
-                                old_monthly = customer_profile.monthly_fuel_amount
-                                old_last = customer_profile.last_fuel_amount
-                                
-                                # 새로운 주유량 정보 계산 (마이너스 값도 그대로 반영)
-                                customer_profile.total_fuel_amount += fuel_quantity
-                                customer_profile.monthly_fuel_amount += fuel_quantity
-                                customer_profile.last_fuel_amount = fuel_quantity
-                                customer_profile.last_fuel_date = sale_date
-                                
-                                # 새로운 주유금액 정보 계산
-                                customer_profile.total_fuel_cost += total_amount
-                                customer_profile.monthly_fuel_cost += total_amount
-                                customer_profile.last_fuel_cost = total_amount
-                                
-                                customer_profile.save()
-                                
-                                # 업데이트된 주유량 및 주유금액 정보 로그
-                                logger.info(f"업데이트된 주유량 정보 - 총: {customer_profile.total_fuel_amount:.2f}L, 월: {customer_profile.monthly_fuel_amount:.2f}L, 최근: {customer_profile.last_fuel_amount:.2f}L")
-                                logger.info(f"업데이트된 주유금액 정보 - 총: {customer_profile.total_fuel_cost:,.0f}원, 월: {customer_profile.monthly_fuel_cost:,.0f}원, 최근: {customer_profile.last_fuel_cost:,.0f}원")
-                                logger.info(f"방문 내역 및 주유 정보 저장 완료: {customer.username} - {sale_date} {sale_time} (주유량: {fuel_quantity:.2f}L, 주유금액: {total_amount:,.0f}원)")
-                            else:
-                                logger.info(f"보너스카드 {bonus_card}와 일치하는 고객을 찾을 수 없음")
-                                
-                        except Exception as e:
-                            logger.error(f"방문 내역 저장 중 오류: {str(e)}")
-                    
-                except Exception as e:
-                    logger.error(f"행 처리 중 오류: {str(e)}")
-                    continue
-            
-            # 해당 날짜의 통계 데이터 저장
-            try:
-                # 날짜별 통계 중복 체크: 이미 해당 날짜의 통계가 있는지 확인
-                existing_daily_stat = SalesStatistics.objects.filter(
-                    tid=tid,
-                    sale_date=sale_date
-                ).first()
-                
-                if existing_daily_stat:
-                    logger.info(f"=== 날짜별 통계 중복 발견 - 통계 저장 건너뛰기 ===")
-                    logger.info(f"날짜: {sale_date}, 기존 파일: {existing_daily_stat.source_file}")
-                    logger.info(f"현재 파일: {filename}")
-                    logger.info(f"중복 방지를 위해 날짜별 통계 저장을 건너뜁니다.")
-                    
-                    # 날짜별 통계는 건너뛰지만 월별 누적은 진행
-                    logger.info(f"월별 누적은 계속 진행합니다.")
-                    
-                    # 월별 누적 데이터 업데이트 (날짜별 통계 없이)
-                    try:
-                        logger.info(f"=== 월별 누적 업데이트 호출 (날짜별 통계 없이) ===")
-                        logger.info(f"파일: {filename}, 날짜: {sale_date}")
-                        logger.info(f"전달할 데이터 - 거래건수: {daily_saved_count}, 수량: {daily_quantity}, 금액: {daily_amount:,.0f}")
-                        logger.info(f"제품별 카운트: {product_counts}")
-                        logger.info(f"제품별 판매금액: {product_amounts}")
-                        
-                        update_monthly_statistics(tid, sale_date, daily_saved_count, daily_quantity, daily_amount, daily_avg_price, top_product, top_product_count, product_counts, product_amounts)
-                        
-                        logger.info(f"월별 누적 업데이트 완료: {sale_date}")
-                    except Exception as e:
-                        logger.error(f"월별 누적 데이터 업데이트 중 오류 ({sale_date}): {str(e)}")
-                    
-                    continue
-                
-                daily_avg_price = daily_amount / daily_quantity if daily_quantity > 0 else 0
-                
-                # 가장 많이 팔린 제품
-                top_product = max(product_counts.items(), key=lambda x: x[1])[0] if product_counts else ''
-                top_product_count = max(product_counts.values()) if product_counts else 0
-                
-                # SalesStatistics 모델에 통계 데이터 저장
-                sales_stat = SalesStatistics(
-                    tid=tid,
-                    sale_date=sale_date,
-                    total_transactions=daily_saved_count,
-                    total_quantity=daily_quantity,
-                    total_amount=daily_amount,
-                    avg_unit_price=daily_avg_price,
-                    top_product=top_product,
-                    top_product_count=top_product_count,
-                    source_file=filename
-                )
-                sales_stat.save()
-                logger.info(f"날짜별 통계 저장 완료: {sale_date} - {daily_saved_count}건, {daily_amount:,.0f}원")
-                
-                # 월별 누적 데이터 업데이트
-                try:
-                    logger.info(f"=== 월별 누적 업데이트 호출 ===")
-                    logger.info(f"파일: {filename}, 날짜: {sale_date}")
-                    logger.info(f"전달할 데이터 - 거래건수: {daily_saved_count}, 수량: {daily_quantity}, 금액: {daily_amount:,.0f}")
-                    logger.info(f"제품별 카운트: {product_counts}")
-                    logger.info(f"제품별 판매금액: {product_amounts}")
-                    
-                    update_monthly_statistics(tid, sale_date, daily_saved_count, daily_quantity, daily_amount, daily_avg_price, top_product, top_product_count, product_counts, product_amounts)
-                    
-                    logger.info(f"월별 누적 업데이트 완료: {sale_date}")
-                except Exception as e:
-                    logger.error(f"월별 누적 데이터 업데이트 중 오류 ({sale_date}): {str(e)}")
-                
-            except Exception as e:
-                logger.error(f"날짜별 통계 저장 중 오류 ({sale_date}): {str(e)}")
-            
-            # 진행상황 로그
-            logger.info(f"날짜별 저장 완료: {sale_date} - {daily_saved_count}개 데이터 저장")
-        
-        logger.info(f"=== 분석 완료 ===")
-        logger.info(f"총 {saved_count}개 데이터 저장 완료")
+        from .services.sales_ingest import ingest_sales_file
+        result = ingest_sales_file(file_path, request.user, tid, filename)
+        saved_count = result['saved_count']
         
         return JsonResponse({
             'message': f'파일 분석이 완료되었습니다: {filename} (총 {saved_count}개 데이터 저장)',
             'result': {
                 'filename': filename,
-                'total_rows': len(df_cleaned),
+                'total_rows': result['total_rows'],
                 'saved_count': saved_count,
                 'tid': tid
             }
@@ -3679,11 +3084,11 @@ def search_card_by_number(request):
             }, status=400)
         
         try:
-            # 카드번호로 카드 찾기 (부분 매칭)
-            from .models import PointCard
-            cards = PointCard.objects.filter(number__icontains=card_number).order_by('number')[:10]  # 최대 10개까지만 반환
+            # 주유소 매핑 범위 안에서 카드번호 검색 (최대 10개)
+            from .services.card_search import search_station_cards
+            cards = search_station_cards(request.user, card_number, tid=request.user.station_profile.tid)
             
-            if cards.exists():
+            if cards:
                 # 실시간 검색과 동일한 형식으로 카드 데이터 변환
                 cards_data = []
                 for card in cards:
@@ -3701,7 +3106,7 @@ def search_card_by_number(request):
                     'status': 'success',
                     'exists': True,
                     'cards': cards_data,
-                    'total_count': cards.count()
+                    'total_count': len(cards_data)
                 })
             else:
                 return JsonResponse({
@@ -3751,16 +3156,13 @@ def search_cards_by_number_partial(request):
             })
         
         try:
-            # 카드번호로 카드 검색 (부분 매칭)
-            from .models import PointCard
+            # 주유소 매핑 범위 안에서 카드번호 검색 (앞자리/뒷자리 인덱스 우선, 최대 10개)
+            from .services.card_search import search_station_cards
             logger.info(f"검색할 카드번호: {card_number}")
             
-            # 16자리 카드번호에서 어느 위치든 입력된 숫자가 포함되는 카드 검색
-            cards = PointCard.objects.filter(
-                number__icontains=card_number
-            ).order_by('number')[:10]  # 최대 10개까지만 반환
+            cards = search_station_cards(request.user, card_number, tid=request.user.station_profile.tid)
             
-            logger.info(f"검색된 카드 수: {cards.count()}")
+            logger.info(f"검색된 카드 수: {len(cards)}")
             
             cards_data = []
             for card in cards:
@@ -3784,13 +3186,11 @@ def search_cards_by_number_partial(request):
                     'updated_at': card.updated_at.strftime('%Y-%m-%d %H:%M:%S')
                 })
             
-            logger.info(f"반환할 카드 데이터: {cards_data}")
             response_data = {
                 'status': 'success',
                 'cards': cards_data,
                 'count': len(cards_data)
             }
-            logger.info(f"최종 응답: {response_data}")
             return JsonResponse(response_data)
                 
         except Exception as e:
@@ -4349,315 +3749,11 @@ def get_coupon_statistics(request):
         return JsonResponse({'status': 'error', 'message': '권한이 없습니다.'}, status=403)
     
     try:
-        from django.db.models import Count, Sum, Q, Avg
-        from django.utils import timezone
-        from datetime import datetime, timedelta
-        from .models import (
-            CouponTemplate, CustomerCoupon, StationCouponQuota, 
-            CouponPurchaseRequest, CumulativeSalesTracker
-        )
-        
-        now = timezone.now()
-        current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        last_month = (current_month - timedelta(days=1)).replace(day=1)
-        
-        # 1. 기본 쿠폰 통계
-        templates = CouponTemplate.objects.filter(station=request.user)
-        total_templates = templates.count()
-        active_templates = templates.filter(is_active=True).count()
-        
-        # 2. 발행 및 사용 통계
-        from django.db.models import Q
-        station_filter = Q(coupon_template__station=request.user) | Q(auto_coupon_template__station=request.user)
-        coupons = CustomerCoupon.objects.filter(station_filter)
-        
-        # 이번달 발행/사용 통계
-        current_month_issued = coupons.filter(
-            issued_date__gte=current_month
-        ).count()
-        
-        current_month_used = coupons.filter(
-            used_date__gte=current_month,
-            status='USED'
-        ).count()
-        
-        # 전체 통계
-        total_issued = coupons.count()
-        total_used = coupons.filter(status='USED').count()
-        total_available = coupons.filter(status='AVAILABLE').count()
-        total_expired = coupons.filter(status='EXPIRED').count()
-        
-        logger.info("🟢 [USAGE-RATE] 사용률 계산 시작")
-        logger.info(f"   - 전체 발행수: {total_issued}")
-        logger.info(f"   - 사용된 쿠폰수: {total_used}")
-        logger.info(f"   - 사용 가능한 쿠폰수: {total_available}")
-        logger.info(f"   - 만료된 쿠폰수: {total_expired}")
-        
-        # 사용률 계산
-        if total_issued > 0:
-            usage_rate_raw = (total_used / total_issued * 100)
-            usage_rate = round(usage_rate_raw, 1)  # 소수점 1자리로 반올림
-            logger.info(f"   - 사용률 원본값: {usage_rate_raw}")
-            logger.info(f"   - 사용률 반올림값: {usage_rate}")
-        else:
-            usage_rate = 0
-            logger.info(f"   - 발행수가 0이므로 사용률: 0%")
-        
-        # 쿠폰 상태별 상세 분석 (처음 5개)
-        status_samples = {}
-        for status in ['AVAILABLE', 'USED', 'EXPIRED']:
-            sample_coupons = coupons.filter(status=status)[:3]
-            status_samples[status] = []
-            for coupon in sample_coupons:
-                status_samples[status].append({
-                    'id': coupon.id,
-                    'issued_date': coupon.issued_date,
-                    'used_date': coupon.used_date,
-                    'status': coupon.status
-                })
-        
-        logger.info("🟢 [USAGE-RATE] 쿠폰 상태별 샘플:")
-        for status, samples in status_samples.items():
-            logger.info(f"   - {status}: {len(samples)}개 샘플")
-            for idx, sample in enumerate(samples):
-                logger.info(f"     {idx+1}. ID:{sample['id']}, 발행:{sample['issued_date']}, 사용:{sample['used_date']}, 상태:{sample['status']}")
-                
-        logger.info(f"🟢 [USAGE-RATE] 최종 사용률: {usage_rate}%")
-        
-        # 3. 쿠폰 타입별 통계
-        type_stats = []
-        logger.info("🟢 [TYPE-STATS] 쿠폰 타입별 통계 계산 시작")
-        
-        # 3-1. 수동 쿠폰 템플릿 (CouponTemplate) 통계
-        manual_templates = templates.filter(is_active=True)
-        logger.info(f"🟢 [TYPE-STATS] 활성 수동 템플릿 수: {manual_templates.count()}")
-        
-        for template in manual_templates:
-            template_coupons = coupons.filter(coupon_template=template)
-            issued_count = template_coupons.count()
-            used_count = template_coupons.filter(status='USED').count()
-            
-            logger.info(f"🟢 [TYPE-STATS] 수동 템플릿: {template.coupon_name}")
-            logger.info(f"   - 템플릿 ID: {template.id}")
-            logger.info(f"   - 쿠폰 타입: {template.coupon_type.type_code if template.coupon_type else 'None'}")
-            logger.info(f"   - 발행수: {issued_count}")
-            logger.info(f"   - 사용수: {used_count}")
-            
-            if issued_count > 0:
-                type_stats.append({
-                    'name': template.coupon_name,
-                    'type_code': template.coupon_type.type_code if template.coupon_type else 'UNKNOWN',
-                    'issued': issued_count,
-                    'used': used_count,
-                    'usage_rate': (used_count / issued_count * 100) if issued_count > 0 else 0
-                })
-                logger.info(f"   - ✅ type_stats에 추가됨")
-            else:
-                logger.info(f"   - ⚠️ 발행수 0으로 제외됨")
-        
-        # 3-2. 자동 쿠폰 템플릿 (AutoCouponTemplate) 통계
-        from .models import AutoCouponTemplate
-        auto_templates = AutoCouponTemplate.objects.filter(
-            station=request.user,
-            is_active=True
-        )
-        logger.info(f"🟢 [TYPE-STATS] 활성 자동 템플릿 수: {auto_templates.count()}")
-        
-        for auto_template in auto_templates:
-            auto_template_coupons = coupons.filter(auto_coupon_template=auto_template)
-            issued_count = auto_template_coupons.count()
-            used_count = auto_template_coupons.filter(status='USED').count()
-            
-            logger.info(f"🟢 [TYPE-STATS] 자동 템플릿: {auto_template.coupon_name}")
-            logger.info(f"   - 템플릿 ID: {auto_template.id}")
-            logger.info(f"   - 쿠폰 타입: {auto_template.coupon_type}")
-            logger.info(f"   - 발행수: {issued_count}")
-            logger.info(f"   - 사용수: {used_count}")
-            
-            if issued_count > 0:
-                type_stats.append({
-                    'name': auto_template.coupon_name,
-                    'type_code': auto_template.coupon_type,
-                    'issued': issued_count,
-                    'used': used_count,
-                    'usage_rate': (used_count / issued_count * 100) if issued_count > 0 else 0
-                })
-                logger.info(f"   - ✅ type_stats에 추가됨")
-            else:
-                logger.info(f"   - ⚠️ 발행수 0으로 제외됨")
-        
-        logger.info(f"🟢 [TYPE-STATS] 최종 type_stats 항목 수: {len(type_stats)}")
-        for idx, stat in enumerate(type_stats):
-            logger.info(f"   - {idx+1}: {stat['name']} ({stat['type_code']}) - 발행:{stat['issued']}, 사용:{stat['used']}")
-        
-        # 4. 월별 발행 추이 (최근 6개월)
-        monthly_stats = []
-        logger.info(f"🟢 [MONTHLY-STATS] 월별 통계 계산 시작 - 현재월: {current_month}")
-        
-        for i in range(6):
-            # 올바른 월별 계산: 년/월 단위로 이전 월 계산
-            target_year = current_month.year
-            target_month = current_month.month - i
-            
-            # 월이 0 이하로 가면 이전 년도로 이동
-            while target_month <= 0:
-                target_month += 12
-                target_year -= 1
-            
-            # 해당 월의 시작과 끝 계산
-            from calendar import monthrange
-            month_start = datetime(target_year, target_month, 1, tzinfo=current_month.tzinfo)
-            last_day = monthrange(target_year, target_month)[1]
-            month_end = datetime(target_year, target_month, last_day, 23, 59, 59, tzinfo=current_month.tzinfo)
-            
-            logger.info(f"🟢 [MONTHLY-STATS] {i}번째 월 계산:")
-            logger.info(f"   - 월 시작: {month_start}")
-            logger.info(f"   - 월 종료: {month_end}")
-            
-            month_issued = coupons.filter(
-                issued_date__gte=month_start,
-                issued_date__lte=month_end
-            ).count()
-            
-            # 사용 쿠폰 상세 로깅
-            used_coupons_query = coupons.filter(
-                used_date__gte=month_start,
-                used_date__lte=month_end,
-                status='USED'
-            )
-            month_used = used_coupons_query.count()
-            
-            logger.info(f"   - 발행수: {month_issued}")
-            logger.info(f"   - 사용수: {month_used}")
-            
-            # 7월 데이터일 경우 추가 상세 로깅
-            if target_year == 2025 and target_month == 7:
-                logger.info(f"🔍 [JULY-DEBUG] 7월 데이터 상세 분석:")
-                
-                # 7월 사용된 쿠폰들의 상세 정보
-                july_used_coupons = used_coupons_query[:10]  # 최대 10개만 로깅
-                for idx, coupon in enumerate(july_used_coupons):
-                    logger.info(f"   - 쿠폰 {idx+1}: ID={coupon.id}, used_date={coupon.used_date}, status={coupon.status}")
-                
-                # 7월에 issued_date가 있지만 used_date가 null인 쿠폰 확인
-                july_issued_not_used = coupons.filter(
-                    issued_date__gte=month_start,
-                    issued_date__lte=month_end,
-                    used_date__isnull=True
-                ).count()
-                logger.info(f"   - 7월 발행되었으나 미사용: {july_issued_not_used}개")
-                
-                # 7월에 used_date는 있지만 status가 USED가 아닌 것들
-                july_used_date_but_not_used_status = coupons.filter(
-                    used_date__gte=month_start,
-                    used_date__lte=month_end,
-                ).exclude(status='USED').count()
-                logger.info(f"   - 7월 used_date 있으나 status!=USED: {july_used_date_but_not_used_status}개")
-                
-                # 전체 7월 관련 쿠폰 (issued_date 또는 used_date가 7월인 것)
-                july_all_coupons = coupons.filter(
-                    Q(issued_date__gte=month_start, issued_date__lte=month_end) |
-                    Q(used_date__gte=month_start, used_date__lte=month_end)
-                ).count()
-                logger.info(f"   - 7월 관련 전체 쿠폰: {july_all_coupons}개")
-            
-            monthly_stats.append({
-                'month': f"{target_year:04d}-{target_month:02d}",
-                'issued': month_issued,
-                'used': month_used
-            })
-        
-        monthly_stats.reverse()  # 시간순으로 정렬
-        
-        # 월별 통계 최종 결과 로깅
-        logger.info(f"🟢 [MONTHLY-STATS] 최종 월별 통계 결과:")
-        for stat in monthly_stats:
-            logger.info(f"   - {stat['month']}: 발행={stat['issued']}, 사용={stat['used']}")
-        
-        # 5. 쿠폰 수량 정보
-        quota = StationCouponQuota.objects.filter(station=request.user).first()
-        quota_info = {
-            'total_quota': quota.total_quota if quota else 0,
-            'used_quota': quota.used_quota if quota else 0,
-            'remaining_quota': quota.remaining_quota if quota else 0,
-            'quota_usage_rate': (quota.used_quota / quota.total_quota * 100) if quota and quota.total_quota > 0 else 0
-        }
-        
-        # 6. 구매 요청 통계
-        purchase_requests = CouponPurchaseRequest.objects.filter(station=request.user)
-        purchase_stats = {
-            'total_requests': purchase_requests.count(),
-            'pending_requests': purchase_requests.filter(status='PENDING').count(),
-            'approved_requests': purchase_requests.filter(status='APPROVED').count(),
-            'rejected_requests': purchase_requests.filter(status='REJECTED').count(),
-        }
-        
-        # 7. 자동 쿠폰 시스템 통계
-        auto_coupon_stats = {
-            'signup_coupons': coupons.filter(
-                coupon_template__coupon_type__type_code='SIGNUP'
-            ).count(),
-            'cumulative_coupons': coupons.filter(
-                coupon_template__coupon_type__type_code='CUMULATIVE'
-            ).count(),
-            'monthly_coupons': coupons.filter(
-                coupon_template__coupon_type__type_code='MONTHLY'
-            ).count(),
-        }
-        
-        # 8. 최근 활동
-        recent_activities = []
-        
-        # 최근 발행된 쿠폰 (5개)
-        recent_issued = coupons.filter(
-            issued_date__gte=now - timedelta(days=7)
-        ).order_by('-issued_date')[:5]
-        
-        for coupon in recent_issued:
-            recent_activities.append({
-                'type': 'issued',
-                'message': f'{coupon.customer.username}에게 {coupon.coupon_template.coupon_name} 발행',
-                'timestamp': coupon.issued_date.strftime('%Y-%m-%d %H:%M')
-            })
-        
-        # 최근 사용된 쿠폰 (5개)
-        recent_used = coupons.filter(
-            used_date__gte=now - timedelta(days=7),
-            status='USED'
-        ).order_by('-used_date')[:5]
-        
-        for coupon in recent_used:
-            recent_activities.append({
-                'type': 'used',
-                'message': f'{coupon.customer.username}이 {coupon.coupon_template.coupon_name} 사용',
-                'timestamp': coupon.used_date.strftime('%Y-%m-%d %H:%M')
-            })
-        
-        # 시간순 정렬
-        recent_activities.sort(key=lambda x: x['timestamp'], reverse=True)
-        recent_activities = recent_activities[:10]  # 최대 10개
-        
+        from .services.coupon_statistics import build_coupon_statistics
+
         return JsonResponse({
             'status': 'success',
-            'data': {
-                'basic_stats': {
-                    'total_templates': total_templates,
-                    'active_templates': active_templates,
-                    'total_issued': total_issued,
-                    'total_used': total_used,
-                    'total_available': total_available,
-                    'total_expired': total_expired,
-                    'usage_rate': round(usage_rate, 1),
-                    'current_month_issued': current_month_issued,
-                    'current_month_used': current_month_used
-                },
-                'type_stats': type_stats,
-                'monthly_stats': monthly_stats,
-                'quota_info': quota_info,
-                'purchase_stats': purchase_stats,
-                'auto_coupon_stats': auto_coupon_stats,
-                'recent_activities': recent_activities
-            }
+            'data': build_coupon_statistics(request.user)
         })
         
     except Exception as e:
@@ -5230,25 +4326,11 @@ def upload_cards_excel(request):
             # pandas를 사용하여 엑셀 파일 읽기
             logger.info("엑셀 파일 읽기 시작")
             try:
-                import pandas as pd
-                import io
+                from .services.card_import import read_card_sheet, find_card_column, import_card_numbers
                 
-                # 파일 내용을 메모리에서 읽기
                 file_content = excel_file.read()
-                excel_file.seek(0)  # 파일 포인터를 처음으로 되돌림
-                logger.info(f"파일 내용 읽기 완료: {len(file_content)} bytes")
-                
-                # 엑셀 파일 읽기
-                if file_name.endswith('.xlsx'):
-                    logger.info("openpyxl 엔진으로 엑셀 파일 읽기")
-                    df = pd.read_excel(io.BytesIO(file_content), engine='openpyxl')
-                else:
-                    logger.info("xlrd 엔진으로 엑셀 파일 읽기")
-                    df = pd.read_excel(io.BytesIO(file_content), engine='xlrd')
-                
+                df = read_card_sheet(file_content, file_name)
                 logger.info(f"엑셀 파일 읽기 완료: {len(df)}행, {len(df.columns)}열")
-                logger.info(f"데이터프레임 컬럼: {list(df.columns)}")
-                logger.info(f"첫 번째 행 데이터: {df.iloc[0].tolist() if not df.empty else '빈 데이터'}")
                 
             except ImportError as e:
                 logger.error(f"pandas 또는 openpyxl이 설치되지 않음: {str(e)}")
@@ -5257,17 +4339,12 @@ def upload_cards_excel(request):
                     'message': '엑셀 파일 처리를 위한 라이브러리가 설치되지 않았습니다.'
                 }, status=500)
             except Exception as e:
-                logger.error(f"엑셀 파일 읽기 오류: {str(e)}")
-                logger.error(f"오류 타입: {type(e)}")
-                import traceback
-                logger.error(f"스택 트레이스: {traceback.format_exc()}")
+                logger.error(f"엑셀 파일 읽기 오류: {str(e)}", exc_info=True)
                 return JsonResponse({
                     'status': 'error',
                     'message': f'엑셀 파일을 읽을 수 없습니다: {str(e)}'
                 }, status=400)
             
-            # 데이터 검증 및 처리
-            logger.info("데이터 검증 시작")
             if df.empty:
                 logger.warning("엑셀 파일에 데이터가 없음")
                 return JsonResponse({
@@ -5275,142 +4352,68 @@ def upload_cards_excel(request):
                     'message': '엑셀 파일에 데이터가 없습니다.'
                 }, status=400)
             
-            # 카드번호가 있는 컬럼 찾기
-            logger.info(f"데이터프레임 컬럼: {list(df.columns)}")
-            
             # 'point number' 컬럼이 있으면 사용, 없으면 첫 번째 컬럼 사용
-            card_column = None
-            if 'point number' in df.columns:
-                card_column = 'point number'
-                logger.info("'point number' 컬럼을 사용합니다.")
-            elif 'point_number' in df.columns:
-                card_column = 'point_number'
-                logger.info("'point_number' 컬럼을 사용합니다.")
-            elif 'card_number' in df.columns:
-                card_column = 'card_number'
-                logger.info("'card_number' 컬럼을 사용합니다.")
-            else:
-                # 첫 번째 컬럼 사용
-                card_column = df.columns[0]
-                logger.info(f"첫 번째 컬럼 '{card_column}'을 사용합니다.")
-            
-            # 카드번호 추출 및 문자열 변환
-            card_numbers = df[card_column].astype(str).str.strip()
-            logger.info(f"추출된 카드번호 개수: {len(card_numbers)}")
-            logger.info(f"첫 5개 카드번호: {card_numbers.head().tolist()}")
-            
-            # 카드번호 검증
-            valid_cards = []
-            invalid_cards = []
-            
-            for idx, card_number in enumerate(card_numbers, 1):
-                if pd.isna(card_number) or card_number == '' or card_number == 'nan':
-                    logger.debug(f"행 {idx}: 빈 값 건너뛰기")
-                    continue
-                
-                # 소수점 제거 (예: 1234567890123450.0 -> 1234567890123450)
-                if '.' in card_number:
-                    card_number = card_number.split('.')[0]
-                    logger.debug(f"행 {idx}: 소수점 제거 후 {card_number}")
-                
-                # 16자리 숫자인지 확인
-                if len(card_number) == 16 and card_number.isdigit():
-                    valid_cards.append(card_number)
-                    logger.debug(f"행 {idx}: 유효한 카드번호 {card_number}")
-                else:
-                    invalid_cards.append(f"행 {idx}: {card_number}")
-                    logger.debug(f"행 {idx}: 잘못된 카드번호 {card_number} (길이: {len(card_number)}, 숫자여부: {card_number.isdigit()})")
-            
-            logger.info(f"유효한 카드번호: {len(valid_cards)}개")
-            logger.info(f"잘못된 카드번호: {len(invalid_cards)}개")
+            card_column = find_card_column(df)
+            logger.info(f"카드번호 컬럼: '{card_column}'")
+            
+            # 검증(16자리, 파일 내 중복) → 기존 카드/매핑 일괄 조회 → 없는 것만 일괄 생성
+            result = import_card_numbers(
+                request.user,
+                tid,
+                df[card_column],
+                oil_company_code=oil_company_code,
+                agency_code=agency_code,
+            )
             
-            if not valid_cards:
+            valid_count = result['registered_count'] + result['mapped_count'] + result['already_count']
+            if not valid_count:
                 logger.warning("유효한 카드번호가 없음")
                 return JsonResponse({
                     'status': 'error',
                     'message': '유효한 카드번호가 없습니다. 16자리 숫자만 입력해주세요.'
                 }, status=400)
             
-            # 카드 등록 처리
-            logger.info("카드 등록 처리 시작")
-            registered_count = 0
-            duplicate_count = 0
-            error_count = 0
-            
-            for card_number in valid_cards:
-                try:
-                    logger.debug(f"카드 등록 시도: {card_number}")
-                    # get_or_create를 사용하여 중복 생성 방지
-                    card, created = PointCard.objects.get_or_create(
-                        number=card_number,
-                        defaults={
-                            'oil_company_code': oil_company_code,
-                            'agency_code': agency_code,
-                            'tids': []
-                        }
-                    )
-                    
-                    if created:
-                        registered_count += 1
-                        logger.info(f"새 카드 등록: {card_number}")
-                    else:
-                        duplicate_count += 1
-                        logger.info(f"기존 카드 발견: {card_number}")
-                    
-                    # TID 추가
-                    if tid not in card.tids:
-                        card.add_tid(tid)
-                        logger.info(f"카드에 TID 추가: {tid}")
-                    
-                    # 카드와 주유소 매핑 생성
-                    mapping, mapping_created = StationCardMapping.objects.get_or_create(
-                        station=request.user,
-                        tid=tid,
-                        card=card,
-                        defaults={'is_active': True}
-                    )
-                    
-                    # 이미 매핑이 존재하지만 비활성화된 경우 활성화
-                    if not mapping_created and not mapping.is_active:
-                        mapping.is_active = True
-                        mapping.save()
-                        logger.info(f"비활성화된 매핑을 활성화함: mapping_id={mapping.id}")
-                        
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"카드 {card_number} 등록 중 오류: {str(e)}")
-                    import traceback
-                    logger.error(f"스택 트레이스: {traceback.format_exc()}")
-            
             # 결과 메시지 생성
+            duplicate_count = result['mapped_count'] + result['already_count']
             message_parts = []
-            if registered_count > 0:
-                message_parts.append(f"새로 등록된 카드: {registered_count}장")
+            if result['registered_count'] > 0:
+                message_parts.append(f"새로 등록된 카드: {result['registered_count']}장")
             if duplicate_count > 0:
                 message_parts.append(f"기존 카드: {duplicate_count}장")
-            if error_count > 0:
-                message_parts.append(f"오류 발생: {error_count}장")
-            if invalid_cards:
-                message_parts.append(f"잘못된 형식: {len(invalid_cards)}개")
+            if result['duplicate_count'] > 0:
+                message_parts.append(f"파일 내 중복: {result['duplicate_count']}개")
+            if result['invalid_count'] > 0:
+                message_parts.append(f"잘못된 형식: {result['invalid_count']}개")
             
             message = ", ".join(message_parts)
             logger.info(f"업로드 결과: {message}")
             
+            # 문제가 있는 행만 리포트로 반환 (최대 1000행)
+            problem_rows = [
+                row for row in result['rows']
+                if row['result'] in ('invalid', 'duplicate')
+            ]
+            invalid_rows = [row for row in problem_rows if row['result'] == 'invalid']
             details = ""
-            if invalid_cards:
-                details = f"잘못된 카드번호: {', '.join(invalid_cards[:5])}"
-                if len(invalid_cards) > 5:
-                    details += f" 외 {len(invalid_cards) - 5}개"
+            if invalid_rows:
+                details = "잘못된 카드번호: " + ", ".join(
+                    f"행 {row['row']}: {row['card_number']}" for row in invalid_rows[:5]
+                )
+                if len(invalid_rows) > 5:
+                    details += f" 외 {len(invalid_rows) - 5}개"
             
             logger.info("=== 엑셀 카드 업로드 요청 완료 ===")
             return JsonResponse({
                 'status': 'success',
                 'message': f'엑셀 업로드 완료: {message}',
                 'details': details,
-                'registered_count': registered_count,
+                'registered_count': result['registered_count'],
                 'duplicate_count': duplicate_count,
-                'error_count': error_count,
-                'invalid_count': len(invalid_cards)
+                'file_duplicate_count': result['duplicate_count'],
+                'error_count': 0,
+                'invalid_count': result['invalid_count'],
+                'report': problem_rows[:1000],
+                'report_truncated': len(problem_rows) > 1000
             })
             
         except Exception as e:
@@ -5538,29 +4541,12 @@ def upload_customers_excel(request):
                     'message': '엑셀 파일(.xlsx, .xls)만 업로드 가능합니다.'
                 }, status=400)
             
-            # pandas를 사용하여 엑셀 파일 읽기
+            # 엑셀 파일 읽기 (앞자리 0 보존을 위해 문자열로 읽음)
             logger.info("엑셀 파일 읽기 시작")
             try:
-                import pandas as pd
-                import io
-                
-                # 파일 내용을 메모리에서 읽기
-                file_content = excel_file.read()
-                excel_file.seek(0)  # 파일 포인터를 처음으로 되돌림
-                logger.info(f"파일 내용 읽기 완료: {len(file_content)} bytes")
-                
-                # 엑셀 파일 읽기
-                if file_name.endswith('.xlsx'):
-                    logger.info("openpyxl 엔진으로 엑셀 파일 읽기")
-                    df = pd.read_excel(io.BytesIO(file_content), engine='openpyxl')
-                else:
-                    logger.info("xlrd 엔진으로 엑셀 파일 읽기")
-                    df = pd.read_excel(io.BytesIO(file_content), engine='xlrd')
-                
-                logger.info(f"엑셀 파일 읽기 완료: {len(df)}행, {len(df.columns)}열")
-                logger.info(f"데이터프레임 컬럼: {list(df.columns)}")
-                logger.info(f"첫 번째 행 데이터: {df.iloc[0].tolist() if not df.empty else '빈 데이터'}")
-                
+                from .services.card_import import read_card_sheet
+                df = read_card_sheet(excel_file.read(), file_name)
+                logger.info(f"엑셀 파일 읽기 완료: {len(df)}행, {len(df.columns)}열, 컬럼: {list(df.columns)}")
             except ImportError as e:
                 logger.error(f"pandas 또는 openpyxl이 설치되지 않음: {str(e)}")
                 return JsonResponse({
@@ -5568,293 +4554,115 @@ def upload_customers_excel(request):
                     'message': '엑셀 파일 처리를 위한 라이브러리가 설치되지 않았습니다.'
                 }, status=500)
             except Exception as e:
-                logger.error(f"엑셀 파일 읽기 오류: {str(e)}")
-                logger.error(f"오류 타입: {type(e)}")
-                import traceback
-                logger.error(f"스택 트레이스: {traceback.format_exc()}")
+                logger.error(f"엑셀 파일 읽기 오류: {str(e)}", exc_info=True)
                 return JsonResponse({
                     'status': 'error',
                     'message': f'엑셀 파일을 읽을 수 없습니다: {str(e)}'
                 }, status=400)
-            
-            # 데이터 검증 및 처리
-            logger.info("데이터 검증 시작")
+
             if df.empty:
                 logger.warning("엑셀 파일에 데이터가 없음")
                 return JsonResponse({
                     'status': 'error',
                     'message': '엑셀 파일에 데이터가 없습니다.'
                 }, status=400)
-            
-            # 컬럼 찾기
-            logger.info(f"데이터프레임 컬럼: {list(df.columns)}")
-            
-            # 컬럼명 매핑
-            phone_column = None
-            card_column = None
-            car_column = None
-            
-            # 전화번호 컬럼 찾기
-            for col in df.columns:
-                col_lower = str(col).lower()
-                if 'phone' in col_lower or '전화' in col_lower or '폰' in col_lower:
-                    phone_column = col
-                    logger.info(f"전화번호 컬럼 발견: {col}")
-                    break
-            
-            # 카드번호 컬럼 찾기
-            for col in df.columns:
-                col_lower = str(col).lower()
-                if 'card' in col_lower or '카드' in col_lower or 'point' in col_lower:
-                    card_column = col
-                    logger.info(f"카드번호 컬럼 발견: {col}")
-                    break
-            
-            # 차량번호 컬럼 찾기
-            for col in df.columns:
-                col_lower = str(col).lower()
-                if 'car' in col_lower or '차량' in col_lower or '차' in col_lower:
-                    car_column = col
-                    logger.info(f"차량번호 컬럼 발견: {col}")
-                    break
-            
-            # 필수 컬럼 확인
-            if not phone_column:
-                phone_column = df.columns[0] if len(df.columns) > 0 else None
-                logger.info(f"전화번호 컬럼을 첫 번째 컬럼으로 설정: {phone_column}")
-            
-            if not card_column:
-                card_column = df.columns[1] if len(df.columns) > 1 else None
-                logger.info(f"카드번호 컬럼을 두 번째 컬럼으로 설정: {card_column}")
-            
-            if not car_column and len(df.columns) > 2:
-                car_column = df.columns[2]
-                logger.info(f"차량번호 컬럼을 세 번째 컬럼으로 설정: {car_column}")
-            
-            # 데이터 추출
-            phone_numbers = df[phone_column].astype(str).str.strip() if phone_column else pd.Series()
-            card_numbers = df[card_column].astype(str).str.strip() if card_column else pd.Series()
-            car_numbers = df[car_column].astype(str).str.strip() if car_column else pd.Series()
-            
-            logger.info(f"추출된 전화번호 개수: {len(phone_numbers)}")
-            logger.info(f"추출된 카드번호 개수: {len(card_numbers)}")
-            logger.info(f"추출된 차량번호 개수: {len(car_numbers)}")
-            
-            # 데이터 검증 및 처리
-            valid_customers = []
+
+            from .services.customer_import import (
+                find_customer_columns, import_customers,
+                RESULT_INVALID, RESULT_NO_CARD, RESULT_MAPPED, RESULT_CARD_OWNED,
+            )
+            phone_column, card_column, car_column = find_customer_columns(df)
+            logger.info(f"전화번호 컬럼: {phone_column}, 카드번호 컬럼: {card_column}, 차량번호 컬럼: {car_column}")
+            if card_column is None:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': '전화번호와 카드번호 컬럼이 필요합니다.'
+                }, status=400)
+
+            result = import_customers(
+                request.user,
+                df[phone_column],
+                df[card_column],
+                df[car_column] if car_column is not None else None,
+            )
+
+            # 행별 오류 메시지
             invalid_customers = []
-            
-            for idx, (phone, card, car) in enumerate(zip(phone_numbers, card_numbers, car_numbers), 1):
-                # 빈 값 처리
-                if pd.isna(phone) or phone == '' or phone == 'nan':
-                    logger.debug(f"행 {idx}: 전화번호 빈 값 건너뛰기")
-                    continue
-                
-                if pd.isna(card) or card == '' or card == 'nan':
-                    logger.debug(f"행 {idx}: 카드번호 빈 값 건너뛰기")
-                    continue
-                
-                # 소수점 제거
-                if '.' in str(phone):
-                    phone = str(phone).split('.')[0]
-                if '.' in str(card):
-                    card = str(card).split('.')[0]
-                if car and '.' in str(car):
-                    car = str(car).split('.')[0]
-                
-                # 전화번호 검증 및 정리
-                phone_clean = re.sub(r'[^0-9]', '', str(phone))
-                
-                # 엑셀에서 앞의 0이 제거된 경우 복원
-                if len(phone_clean) == 10 and phone_clean.startswith('1'):
-                    phone_clean = '0' + phone_clean
-                elif len(phone_clean) == 9 and phone_clean.startswith('1'):
-                    phone_clean = '0' + phone_clean
-                
-                if not re.match(r'^\d{10,11}$', phone_clean):
-                    error_detail = f"행 {idx}: 전화번호 형식 오류 - '{phone}' (올바른 형식: 01012345678)"
-                    invalid_customers.append(f"행 {idx}: 전화번호 형식 오류 ({phone} -> {phone_clean})")
-                    logger.debug(f"행 {idx}: 잘못된 전화번호 {phone} -> {phone_clean}")
-                    
-                    # 오류 상세 정보 저장
-                    if 'error_details' not in locals():
-                        error_details = []
-                    error_details.append(error_detail)
-                    continue
-                
-                # 카드번호 검증 (16자리 숫자)
-                card_clean = re.sub(r'[^0-9]', '', str(card))
-                if not re.match(r'^\d{16}$', card_clean):
-                    error_detail = f"행 {idx}: 카드번호 형식 오류 - '{card}' (올바른 형식: 16자리 숫자)"
-                    invalid_customers.append(f"행 {idx}: 카드번호 형식 오류 ({card})")
-                    logger.debug(f"행 {idx}: 잘못된 카드번호 {card}")
-                    
-                    # 오류 상세 정보 저장
-                    if 'error_details' not in locals():
-                        error_details = []
-                    error_details.append(error_detail)
-                    continue
-                
-                # 차량번호 정리 (선택사항)
-                car_clean = None
-                if car and str(car).strip() and str(car).strip() != 'nan':
-                    car_clean = str(car).strip()
-                
-                valid_customers.append({
-                    'phone': phone_clean,
-                    'card': card_clean,
-                    'car': car_clean,
-                    'row': idx
-                })
-                logger.debug(f"행 {idx}: 유효한 고객 데이터 - 전화번호: {phone_clean}, 카드번호: {card_clean}, 차량번호: {car_clean}")
-            
-            logger.info(f"유효한 고객 데이터: {len(valid_customers)}개")
-            logger.info(f"잘못된 고객 데이터: {len(invalid_customers)}개")
-            
-            if not valid_customers:
+            error_details = []
+            for row in result['rows']:
+                if row['result'] == RESULT_INVALID:
+                    invalid_customers.append(f"행 {row['row']}: 형식 오류 ({row['phone_raw']} / {row['card_raw']})")
+                    error_details.append(
+                        f"행 {row['row']}: 형식 오류 - 전화번호 '{row['phone_raw']}', 카드번호 '{row['card_raw']}' "
+                        f"(올바른 형식: 01012345678 / 16자리 숫자)"
+                    )
+                elif row['result'] == RESULT_NO_CARD:
+                    error_details.append(
+                        f"행 {row['row']}: 카드번호 {row['card_number']}가 등록되지 않았습니다. 먼저 카드 관리에서 카드를 등록해주세요."
+                    )
+                elif row['result'] == RESULT_MAPPED:
+                    error_details.append(
+                        f"행 {row['row']}: 카드번호 {row['card_number']}가 이미 전화번호 {row['message']}와 매핑되어 있습니다."
+                    )
+                elif row['result'] == RESULT_CARD_OWNED:
+                    error_details.append(
+                        f"행 {row['row']}: 카드번호 {row['card_number']}가 이미 다른 고객({row['message']})에게 연결되어 있습니다."
+                    )
+
+            registered_count = result['registered_count']
+            linked_count = result['linked_count']
+            duplicate_count = result['duplicate_count']
+            error_count = result['no_card_count'] + result['mapped_count'] + result['card_owned_count']
+
+            if result['total_rows'] == result['invalid_count']:
                 logger.warning("유효한 고객 데이터가 없음")
                 return JsonResponse({
                     'status': 'error',
                     'message': '유효한 고객 데이터가 없습니다. 전화번호와 카드번호를 확인해주세요.'
                 }, status=400)
-            
-            # 고객 등록 처리
-            logger.info("고객 등록 처리 시작")
-            registered_count = 0
-            duplicate_count = 0
-            error_count = 0
-            
-            for customer_data in valid_customers:
-                try:
-                    logger.debug(f"고객 등록 시도: {customer_data}")
-                    
-                    phone = customer_data['phone']
-                    card_number = customer_data['card']
-                    car_number = customer_data['car']
-                    
-                    # 카드 존재 확인
-                    try:
-                        card = PointCard.objects.get(number=card_number)
-                        logger.debug(f"카드 발견: {card_number}")
-                    except PointCard.DoesNotExist:
-                        error_detail = f"행 {customer_data['row']}: 카드번호 {card_number}가 등록되지 않았습니다. 먼저 카드 관리에서 카드를 등록해주세요."
-                        logger.warning(f"카드가 존재하지 않음: {card_number}")
-                        error_count += 1
-                        
-                        # 오류 상세 정보 저장
-                        if 'error_details' not in locals():
-                            error_details = []
-                        error_details.append(error_detail)
-                        continue
-                    
-                    # 기존 고객 확인 (전화번호 기준)
-                    from OilNote_User.models import CustomerProfile
-                    existing_customer = CustomerProfile.objects.filter(
-                        customer_phone=phone
-                    ).select_related('user').first()
-                    
-                    if existing_customer:
-                        error_detail = f"행 {customer_data['row']}: 전화번호 {phone}가 이미 회원가입한 고객입니다. (사용자: {existing_customer.user.username})"
-                        logger.info(f"기존 고객 발견: {existing_customer.user.username} (전화번호: {phone})")
-                        duplicate_count += 1
-                        continue
-                    
-                    # 카드가 이미 다른 전화번호와 매핑되어 있는지 확인
-                    from OilNote_StationApp.models import PhoneCardMapping
-                    existing_card_mapping = PhoneCardMapping.objects.filter(
-                        membership_card=card,
-                        station=request.user
-                    ).first()
-                    
-                    if existing_card_mapping:
-                        error_detail = f"행 {customer_data['row']}: 카드번호 {card_number}가 이미 전화번호 {existing_card_mapping.phone_number}와 매핑되어 있습니다."
-                        logger.warning(f"카드가 이미 다른 전화번호와 매핑됨: {card_number} -> {existing_card_mapping.phone_number}")
-                        error_count += 1
-                        
-                        # 오류 상세 정보 저장
-                        if 'error_details' not in locals():
-                            error_details = []
-                        error_details.append(error_detail)
-                        continue
-                    
-                    # 미회원 매핑 생성
-                    logger.info(f"신규 고객 등록 - 미회원 매핑 생성: 전화번호 {phone}, 카드번호 {card_number}")
-                    
-                    # 차량 번호가 빈 문자열이면 None으로 설정
-                    car_number_clean = car_number.strip() if car_number else None
-                    if car_number_clean == '':
-                        car_number_clean = None
-                    
-                    # 미회원 매핑 생성
-                    from OilNote_StationApp.models import PhoneCardMapping
-                    mapping, created = PhoneCardMapping.objects.get_or_create(
-                        phone_number=phone,
-                        membership_card=card,
-                        station=request.user,
-                        defaults={
-                            'car_number': car_number_clean,
-                            'is_used': False
-                        }
-                    )
-                    
-                    if created:
-                        registered_count += 1
-                        logger.info(f"새 고객 등록 완료: 전화번호 {phone}")
-                    else:
-                        duplicate_count += 1
-                        logger.info(f"기존 매핑 발견: 전화번호 {phone}")
-                        
-                except Exception as e:
-                    error_count += 1
-                    error_detail = f"행 {customer_data['row']}: {str(e)}"
-                    logger.error(f"고객 {customer_data} 등록 중 오류: {str(e)}")
-                    import traceback
-                    logger.error(f"스택 트레이스: {traceback.format_exc()}")
-                    
-                    # 오류 상세 정보 저장
-                    if 'error_details' not in locals():
-                        error_details = []
-                    error_details.append(error_detail)
-            
+
             # 결과 메시지 생성
             message_parts = []
             if registered_count > 0:
                 message_parts.append(f"새로 등록된 고객: {registered_count}명")
+            if linked_count > 0:
+                message_parts.append(f"기존 회원 연동: {linked_count}명")
             if duplicate_count > 0:
-                message_parts.append(f"기존 고객: {duplicate_count}명")
+                message_parts.append(f"파일 내 중복: {duplicate_count}건")
             if error_count > 0:
                 message_parts.append(f"오류 발생: {error_count}명")
             if invalid_customers:
                 message_parts.append(f"잘못된 형식: {len(invalid_customers)}개")
-            
+
             message = ", ".join(message_parts)
             logger.info(f"업로드 결과: {message}")
-            
+
             details = ""
             if invalid_customers:
                 details = f"잘못된 데이터: {', '.join(invalid_customers[:5])}"
                 if len(invalid_customers) > 5:
                     details += f" 외 {len(invalid_customers) - 5}개"
-            
-            # 오류 상세 정보 추가
+
             error_details_text = ""
-            if 'error_details' in locals() and error_details:
+            if error_details:
                 error_details_text = "\n\n오류 상세 정보:\n" + "\n".join(error_details[:10])  # 최대 10개까지만 표시
                 if len(error_details) > 10:
                     error_details_text += f"\n... 외 {len(error_details) - 10}개 오류"
-            
+
             logger.info("=== 엑셀 고객 업로드 요청 완료 ===")
             return JsonResponse({
                 'status': 'success',
                 'message': f'고객 일괄 등록 완료: {message}',
                 'details': details + error_details_text,
                 'registered_count': registered_count,
+                'linked_count': linked_count,
                 'duplicate_count': duplicate_count,
                 'error_count': error_count,
                 'invalid_count': len(invalid_customers),
-                'error_details': error_details if 'error_details' in locals() else []
+                'new_relation_count': result['new_relation_count'],
+                'error_details': error_details[:1000]
             })
-            
+
         except Exception as e:
             logger.error(f"엑셀 고객 업로드 중 오류 발생: {str(e)}", exc_info=True)
             return JsonResponse({
@@ -5873,11 +4681,12 @@ def membership_cards_management(request):
         messages.error(request, '주유소 회원만 접근할 수 있습니다.')
         return redirect('home')
     
-    # 현재 주유소의 카드 매핑 수 조회
-    mappings = StationCardMapping.objects.filter(station=request.user, tid=request.user.station_profile.tid, is_active=True)
-    total_cards = mappings.count()
-    active_cards = mappings.filter(card__is_used=False).count()
-    inactive_cards = mappings.filter(card__is_used=True).count()
+    # 카드 상태별 통계 (조건부 집계 1회)
+    from .services.card_listing import card_status_counts
+    counts = card_status_counts(request.user, request.user.station_profile.tid)
+    total_cards = counts['total_count']
+    active_cards = counts['active_count']
+    inactive_cards = counts['used_count']
     
     # 비율 계산
     active_percentage = (active_cards / total_cards * 100) if total_cards > 0 else 0
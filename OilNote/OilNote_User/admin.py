@@ -6,7 +6,7 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django.contrib.auth.hashers import make_password
-from .models import CustomUser, CustomerProfile, StationProfile, CustomerStationRelation
+from .models import CustomUser, CustomerProfile, StationProfile, CustomerStationRelation, CustomerCard
 from OilNote_StationApp.models import CustomerCoupon
 from django.urls import path
 from django.http import HttpResponseRedirect
@@ -43,6 +43,7 @@ class CustomerProfileInline(admin.StackedInline):
     verbose_name_plural = '3. 고객 프로필'
     extra = 0
     fields = ('name', 'customer_phone', 'car_number', 'car_model', 'fuel_type', 'membership_card', 'group', 'total_fuel_amount', 'monthly_fuel_amount', 'last_fuel_amount', 'total_fuel_cost', 'monthly_fuel_cost', 'last_fuel_cost', 'last_fuel_date')
+    readonly_fields = ('membership_card',)
 
 class StationProfileInline(admin.StackedInline):
     model = StationProfile
@@ -50,6 +51,14 @@ class StationProfileInline(admin.StackedInline):
     verbose_name_plural = '4. 주유소 프로필'
     extra = 0
 
+class CustomerCardInline(admin.TabularInline):
+    model = CustomerCard
+    extra = 0
+    verbose_name = '멤버십 카드'
+    verbose_name_plural = '멤버십 카드 목록'
+    fields = ('card_number', 'created_at')
+    readonly_fields = ('created_at',)
+
 class CustomerStationInline(admin.TabularInline):
     model = CustomerStationRelation
     fk_name = 'customer'
@@ -177,7 +186,7 @@ class CustomUserAdmin(UserAdmin):
     def get_inlines(self, request, obj):
         if obj:
             if obj.user_type == 'CUSTOMER':
-                return [CustomerProfileInline, CustomerStationInline, CustomerCouponInline]
+                return [CustomerProfileInline, CustomerCardInline, CustomerStationInline, CustomerCouponInline]
             elif obj.user_type == 'STATION':
                 return [StationProfileInline]
         return []
@@ -278,8 +287,8 @@ class CustomUserAdmin(UserAdmin):
 class CustomerProfileAdmin(admin.ModelAdmin):
     list_display = ('name', 'customer_phone', 'car_number', 'car_model', 'fuel_type', 'group', 'total_fuel_amount', 'monthly_fuel_amount', 'last_fuel_amount', 'total_fuel_cost', 'monthly_fuel_cost', 'last_fuel_cost', 'created_at', 'station_list')
     list_filter = ('fuel_type', 'group', 'created_at')
-    search_fields = ('name', 'customer_phone', 'car_number', 'car_model', 'group')
-    readonly_fields = ('created_at', 'updated_at')
+    search_fields = ('name', 'customer_phone', 'car_number', 'car_model', 'group', '=user__membership_cards__card_number')
+    readonly_fields = ('membership_card', 'created_at', 'updated_at')
     
     fieldsets = (
         ('기본 정보', {'fields': ('user', 'name', 'customer_phone')}),
@@ -431,6 +440,13 @@ class CustomerStationRelationAdmin(admin.ModelAdmin):
         self.message_user(request, f'{updated}개의 관계가 주 거래처에서 해제되었습니다.')
     unset_primary.short_description = "주 거래처 해제"
 
+@admin.register(CustomerCard)
+class CustomerCardAdmin(admin.ModelAdmin):
+    list_display = ['card_number', 'customer', 'created_at']
+    search_fields = ['=card_number', 'customer__username']
+    readonly_fields = ['created_at']
+    raw_id_fields = ['customer']
+
 # 어드민 사이트 커스터마이징
 admin.site.site_header = "Oil Note 관리자"
 admin.site.site_title = "Oil Note Admin"
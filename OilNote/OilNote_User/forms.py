@@ -287,9 +287,8 @@ class CustomerSignUpForm(CustomUserCreationForm):
                             else:
                                 logger.info(f"카드 연동 불가: {phone_mapping.membership_card.full_number} (이미 다른 사용자와 연동됨)")
                         
-                        # 고객 프로필에 멤버십카드 정보 업데이트 (여러 카드 지원)
+                        # 고객 프로필 저장 (멤버십카드 표시값은 link_to_user 의 CustomerCard 연결에서 파생)
                         if linked_cards:
-                            customer_profile.membership_card = ','.join(linked_cards)
                             # 폰번호와 차량번호가 유지되도록 명시적으로 다시 설정
                             if phone:
                                 customer_profile.customer_phone = phone
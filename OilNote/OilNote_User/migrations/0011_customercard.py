@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def split_membership_cards(apps, schema_editor):
+    """쉼표로 이어 붙인 CustomerProfile.membership_card 를 CustomerCard 행으로 분리"""
+    CustomerProfile = apps.get_model('OilNote_User', 'CustomerProfile')
+    CustomerCard = apps.get_model('OilNote_User', 'CustomerCard')
+
+    owners = {}
+    profiles = CustomerProfile.objects.exclude(membership_card__isnull=True).exclude(membership_card='')
+    for user_id, value in profiles.order_by('id').values_list('user_id', 'membership_card').iterator():
+        for part in value.split(','):
+            number = ''.join(ch for ch in part if ch.isdigit())
+            if len(number) == 20:
+                # 정유사코드+대리점코드가 붙은 전체 번호는 16자리 카드번호로
+                number = number[-16:]
+            # 같은 카드가 여러 고객에게 적혀 있으면 먼저 등록된 프로필에 연결
+            if number and len(number) <= 20 and number not in owners:
+                owners[number] = user_id
+
+    CustomerCard.objects.bulk_create(
+        [CustomerCard(customer_id=user_id, card_number=number) for number, user_id in owners.items()],
+        batch_size=2000,
+    )
+
+    # 표시값을 연결 테이블 기준으로 다시 계산
+    numbers = {}
+    for user_id, number in CustomerCard.objects.order_by('id').values_list('customer_id', 'card_number'):
+        numbers.setdefault(user_id, []).append(number)
+    changed = []
+    for profile in profiles.only('id', 'user_id', 'membership_card').iterator():
+        display = ','.join(numbers.get(profile.user_id, [])) or None
+        if profile.membership_card != display:
+            profile.membership_card = display
+            changed.append(profile)
+    CustomerProfile.objects.bulk_update(changed, ['membership_card'], batch_size=2000)
+
+
+def join_membership_cards(apps, schema_editor):
+    CustomerProfile = apps.get_model('OilNote_User', 'CustomerProfile')
+    CustomerCard = apps.get_model('OilNote_User', 'CustomerCard')
+
+    numbers = {}
+    for user_id, number in CustomerCard.objects.order_by('id').values_list('customer_id', 'card_number'):
+        numbers.setdefault(user_id, []).append(number)
+    profiles = list(CustomerProfile.objects.filter(user_id__in=numbers.keys()).only('id', 'user_id', 'membership_card'))
+    for profile in profiles:
+        profile.membership_card = ','.join(numbers[profile.user_id])
+    CustomerProfile.objects.bulk_update(profiles, ['membership_card'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("OilNote_User", "0010_customuser_stations_crm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CustomerCard",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("card_number", models.CharField(max_length=20, unique=True, verbose_name="카드번호")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="연결일")),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        limit_choices_to={"user_type": "CUSTOMER"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="membership_cards",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="고객",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "고객 멤버십 카드",
+                "verbose_name_plural": "6. 고객 멤버십 카드",
+                "db_table": "Cust_User_customercard",
+                "ordering": ["id"],
+            },
+        ),
+        migrations.RunPython(split_membership_cards, join_membership_cards),
+        migrations.AlterField(
+            model_name="customerprofile",
+            name="membership_card",
+            field=models.CharField(
+                blank=True, editable=False, max_length=500, null=True, verbose_name="멤버십 카드 번호"
+            ),
+        ),
+    ]
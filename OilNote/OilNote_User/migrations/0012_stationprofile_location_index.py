@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OilNote_User', '0011_customercard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stationprofile',
+            index=models.Index(fields=['latitude', 'longitude'], name='Cust_User_s_latitud_50ad97_idx'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 class CustomUser(AbstractUser):
@@ -51,7 +51,8 @@ class CustomerProfile(models.Model):
     customer_phone = models.CharField(max_length=20, blank=True, null=True)
     car_number = models.CharField(max_length=20, blank=True, null=True, verbose_name='차량 번호')
     car_model = models.CharField(max_length=50, blank=True, null=True, verbose_name='차량 모델')
-    membership_card = models.CharField(max_length=500, blank=True, null=True, verbose_name='멤버십 카드 번호')
+    # 표시용 값: CustomerCard 연결에서 파생되며 직접 수정하지 않음
+    membership_card = models.CharField(max_length=500, blank=True, null=True, editable=False, verbose_name='멤버십 카드 번호')
     fuel_type = models.CharField(
         max_length=20, 
         choices=[
@@ -131,6 +132,9 @@ class CustomerProfile(models.Model):
         if not self.pk:  # 새로운 프로필 생성 시에만
             if not self.name and self.user.first_name:
                 self.name = self.user.first_name
+        else:
+            # 메모리의 오래된 표시값으로 덮어쓰지 않도록 연결 테이블에서 다시 계산
+            self.membership_card = CustomerCard.display_for(self.user_id)
         super().save(*args, **kwargs)
 
 
@@ -172,6 +176,10 @@ class StationProfile(models.Model):
         verbose_name = '주유소 프로필'
         verbose_name_plural = '4. 주유소 프로필들'
         db_table = 'Cust_User_stationprofile'
+        indexes = [
+            # 주변 주유소 조회 (위도/경도 범위 조건)
+            models.Index(fields=['latitude', 'longitude']),
+        ]
 
     def __str__(self):
         return f"{self.station_name} ({self.business_number})"
@@ -247,3 +255,108 @@ class CustomerStationRelation(models.Model):
         self.last_visit_date = timezone.now()
         self.visit_count += 1
         self.save()
+
+
+class CustomerCard(models.Model):
+    """고객-멤버십 카드 연결 (카드 한 장은 한 고객에게만 연결)"""
+    customer = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='membership_cards',
+        limit_choices_to={'user_type': 'CUSTOMER'},
+        verbose_name='고객'
+    )
+    card_number = models.CharField(max_length=20, unique=True, verbose_name='카드번호')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='연결일')
+
+    class Meta:
+        verbose_name = '고객 멤버십 카드'
+        verbose_name_plural = '6. 고객 멤버십 카드'
+        ordering = ['id']
+        db_table = 'Cust_User_customercard'
+
+    def __str__(self):
+        return f"{self.customer.username} - {self.card_number}"
+
+    def save(self, *args, **kwargs):
+        self.card_number = self.normalize(self.card_number)
+        super().save(*args, **kwargs)
+        self._refresh_profile()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._refresh_profile()
+        return result
+
+    def _refresh_profile(self):
+        """고객 프로필의 멤버십 카드 표시값 갱신"""
+        CustomerProfile.objects.filter(user_id=self.customer_id).update(
+            membership_card=self.display_for(self.customer_id)
+        )
+
+    @staticmethod
+    def normalize(card_number):
+        """
+        숫자만 남긴 16자리 카드번호
+
+        정유사코드(1)+대리점코드(3)가 붙은 20자리 전체 번호는 뒤 16자리로 맞춘다.
+        """
+        digits = ''.join(ch for ch in str(card_number or '') if ch.isdigit())
+        return digits[-16:] if len(digits) == 20 else digits
+
+    @classmethod
+    def customer_for(cls, card_number):
+        """카드번호로 고객 조회 (card_number 유니크 인덱스 일치 검색), 없으면 None"""
+        link = cls.objects.filter(card_number=cls.normalize(card_number)).select_related('customer').first()
+        return link.customer if link else None
+
+    @classmethod
+    def display_for(cls, customer_id):
+        """고객 프로필에 표시할 카드번호 문자열 (연결 순서대로 쉼표 구분)"""
+        numbers = cls.objects.filter(customer_id=customer_id).order_by('id').values_list('card_number', flat=True)
+        return ','.join(numbers) or None
+
+    @classmethod
+    def refresh_display(cls, customer_ids):
+        """여러 고객의 프로필 표시값을 연결 테이블 기준으로 일괄 갱신"""
+        customer_ids = list(customer_ids)
+        numbers = {}
+        for customer_id, card_number in cls.objects.filter(
+            customer_id__in=customer_ids
+        ).order_by('id').values_list('customer_id', 'card_number'):
+            numbers.setdefault(customer_id, []).append(card_number)
+
+        profiles = list(CustomerProfile.objects.filter(user_id__in=customer_ids).only('id', 'user_id', 'membership_card'))
+        for profile in profiles:
+            profile.membership_card = ','.join(numbers.get(profile.user_id, [])) or None
+        CustomerProfile.objects.bulk_update(profiles, ['membership_card'], batch_size=2000)
+
+    @classmethod
+    def link(cls, customer, card_number):
+        """
+        고객에게 카드 연결
+
+        Returns:
+            bool: 새로 연결되었는지 여부
+
+        Raises:
+            ValueError: 카드번호가 비어 있거나 다른 고객에게 이미 연결된 경우
+        """
+        card_number = cls.normalize(card_number)
+        if not card_number:
+            raise ValueError('카드번호가 올바르지 않습니다.')
+
+        link, created = cls.objects.get_or_create(card_number=card_number, defaults={'customer': customer})
+        if link.customer_id != customer.id:
+            raise ValueError('이미 다른 고객과 연동된 멤버십 카드입니다.')
+        return created
+
+    @classmethod
+    def replace(cls, customer, card_number):
+        """고객의 카드를 지정한 카드 한 장으로 교체"""
+        card_number = cls.normalize(card_number)
+        with transaction.atomic():
+            cls.objects.filter(customer=customer).exclude(card_number=card_number).delete()
+            created = cls.link(customer, card_number)
+            CustomerProfile.objects.filter(user=customer).update(membership_card=cls.display_for(customer.id))
+        return created
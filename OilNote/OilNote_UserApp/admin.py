@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CustomerVisitHistory
+from .models import CustomerVisitHistory, CustomerVisitMonthSummary
 
 class CustomerFuelFilter(admin.SimpleListFilter):
     title = '주유량 범위'
@@ -51,4 +51,15 @@ class CustomerVisitHistoryAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('customer', 'station', 'customer__customer_profile') 
\ No newline at end of file
+        return super().get_queryset(request).select_related('customer', 'station', 'customer__customer_profile') 
+
+@admin.register(CustomerVisitMonthSummary)
+class CustomerVisitMonthSummaryAdmin(admin.ModelAdmin):
+    """고객 월별 방문 집계 Admin (방문 기록 저장/삭제 시 자동 갱신)"""
+    list_display = ['customer', 'station', 'year_month', 'visit_count', 'total_amount', 'total_fuel', 'updated_at']
+    list_filter = ['year_month']
+    search_fields = ['customer__username', 'station__username']
+    readonly_fields = [field.name for field in CustomerVisitMonthSummary._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
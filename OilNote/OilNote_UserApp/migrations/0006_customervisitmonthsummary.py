@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import ExtractMonth, ExtractYear
+import django.db.models.deletion
+
+
+def backfill_visit_month_summaries(apps, schema_editor):
+    """기존 방문 기록으로 고객·주유소·월별 방문 집계 생성"""
+    CustomerVisitHistory = apps.get_model('OilNote_UserApp', 'CustomerVisitHistory')
+    CustomerVisitMonthSummary = apps.get_model('OilNote_UserApp', 'CustomerVisitMonthSummary')
+
+    rows = CustomerVisitHistory.objects.annotate(
+        year=ExtractYear('visit_date'),
+        month=ExtractMonth('visit_date'),
+    ).values('customer_id', 'station_id', 'year', 'month').annotate(
+        visit_count=models.Count('id'),
+        total_amount=models.Sum('sale_amount'),
+        total_fuel=models.Sum('fuel_quantity'),
+    ).order_by()
+
+    summaries = []
+    for row in rows.iterator():
+        summaries.append(CustomerVisitMonthSummary(
+            customer_id=row['customer_id'],
+            station_id=row['station_id'],
+            year_month=f"{row['year']:04d}-{row['month']:02d}",
+            visit_count=row['visit_count'],
+            total_amount=row['total_amount'] or 0,
+            total_fuel=row['total_fuel'] or 0,
+        ))
+        if len(summaries) >= 2000:
+            CustomerVisitMonthSummary.objects.bulk_create(summaries)
+            summaries = []
+    CustomerVisitMonthSummary.objects.bulk_create(summaries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('OilNote_UserApp', '0005_alter_customervisithistory_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerVisitMonthSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year_month', models.CharField(max_length=7, verbose_name='년월')),
+                ('visit_count', models.IntegerField(default=0, verbose_name='방문 수')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='판매금액 합계')),
+                ('total_fuel', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='주유량 합계(L)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='업데이트일시')),
+                ('customer', models.ForeignKey(limit_choices_to={'user_type': 'CUSTOMER'}, on_delete=django.db.models.deletion.CASCADE, related_name='visit_month_summaries', to=settings.AUTH_USER_MODEL, verbose_name='고객')),
+                ('station', models.ForeignKey(limit_choices_to={'user_type': 'STATION'}, on_delete=django.db.models.deletion.CASCADE, related_name='customer_visit_month_summaries', to=settings.AUTH_USER_MODEL, verbose_name='주유소')),
+            ],
+            options={
+                'verbose_name': '고객 월별 방문 집계',
+                'verbose_name_plural': '고객 월별 방문 집계',
+                'db_table': 'Cust_UserApp_customervisitmonthsummary',
+                'ordering': ['-year_month'],
+                'indexes': [models.Index(fields=['customer', 'year_month'], name='Cust_UserAp_custome_8340bb_idx')],
+                'unique_together': {('customer', 'station', 'year_month')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='customervisithistory',
+            index=models.Index(fields=['customer', 'visit_date'], name='Cust_UserAp_custome_c30563_idx'),
+        ),
+        migrations.RunPython(backfill_visit_month_summaries, migrations.RunPython.noop),
+    ]
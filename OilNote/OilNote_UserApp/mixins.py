@@ -0,0 +1,18 @@
+from .services.station_selection import resolve_station_selection
+
+
+class SelectedStationMixin:
+    """
+    고객 화면 공통 주유소 선택 컨텍스트
+
+    registered_stations, primary_station, selected_station, selected_station_id,
+    selected_station_name 을 컨텍스트에 넣는다. (요청당 한 번 계산, 관계 목록도 요청마다 한 번만 조회)
+    """
+
+    def get_station_selection(self):
+        return resolve_station_selection(self.request)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_station_selection())
+        return context
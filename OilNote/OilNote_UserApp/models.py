@@ -1,7 +1,14 @@
+from datetime import date, timedelta
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.utils import timezone
 
+from .services.customer_summary import invalidate_customer_summary
+
 CustomUser = get_user_model()
 
 class CustomerVisitHistory(models.Model):
@@ -36,7 +43,126 @@ class CustomerVisitHistory(models.Model):
         verbose_name_plural = '고객 방문 내역'
         ordering = ['-visit_date', '-visit_time']
         unique_together = ['customer', 'station', 'visit_date', 'visit_time', 'approval_number']
+        indexes = [
+            # 주유노트 월별 방문 목록 (방문일 범위 조건)
+            models.Index(fields=['customer', 'visit_date']),
+        ]
         db_table = 'Cust_UserApp_customervisithistory'
 
     def __str__(self):
-        return f"{self.customer.username} - {self.station.username} ({self.visit_date} {self.visit_time})" 
\ No newline at end of file
+        return f"{self.customer.username} - {self.station.username} ({self.visit_date} {self.visit_time})" 
+
+
+class CustomerVisitMonthSummary(models.Model):
+    """고객·주유소·월별 방문 집계 (주유노트 월 선택 목록과 월 합계용, 방문 기록 저장 시 갱신)"""
+    customer = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='visit_month_summaries',
+        limit_choices_to={'user_type': 'CUSTOMER'},
+        verbose_name='고객'
+    )
+    station = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='customer_visit_month_summaries',
+        limit_choices_to={'user_type': 'STATION'},
+        verbose_name='주유소'
+    )
+    year_month = models.CharField(max_length=7, verbose_name='년월')  # YYYY-MM 형식
+    visit_count = models.IntegerField(default=0, verbose_name='방문 수')
+    total_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name='판매금액 합계')
+    total_fuel = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='주유량 합계(L)')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='업데이트일시')
+
+    class Meta:
+        verbose_name = '고객 월별 방문 집계'
+        verbose_name_plural = '고객 월별 방문 집계'
+        ordering = ['-year_month']
+        unique_together = ['customer', 'station', 'year_month']
+        indexes = [
+            models.Index(fields=['customer', 'year_month']),
+        ]
+        db_table = 'Cust_UserApp_customervisitmonthsummary'
+
+    def __str__(self):
+        return f"{self.customer.username} - {self.station.username} ({self.year_month}, {self.visit_count}회)"
+
+    @classmethod
+    def add_visit(cls, visit, sign=1):
+        """방문 기록 한 건을 해당 월 집계에 더하거나(sign=1) 뺀다(sign=-1)"""
+        year_month = visit.visit_date.strftime('%Y-%m')
+        if sign > 0:
+            cls.objects.get_or_create(
+                customer_id=visit.customer_id,
+                station_id=visit.station_id,
+                year_month=year_month
+            )
+        # 빼는 경우 행을 새로 만들지 않음 (고객/주유소 삭제로 인한 연쇄 삭제 중일 수 있음)
+        cls.objects.filter(
+            customer_id=visit.customer_id,
+            station_id=visit.station_id,
+            year_month=year_month
+        ).update(
+            visit_count=F('visit_count') + sign,
+            total_amount=F('total_amount') + sign * (visit.sale_amount or 0),
+            total_fuel=F('total_fuel') + sign * (visit.fuel_quantity or 0),
+            updated_at=timezone.now()
+        )
+
+    @classmethod
+    def refresh(cls, customer_id, station_id, year_month):
+        """방문 기록에서 해당 월 집계를 다시 계산 (방문이 없으면 행 삭제)"""
+        year, month = map(int, year_month.split('-'))
+        first_day = date(year, month, 1)
+        next_first_day = (first_day + timedelta(days=32)).replace(day=1)
+        totals = CustomerVisitHistory.objects.filter(
+            customer_id=customer_id,
+            station_id=station_id,
+            visit_date__gte=first_day,
+            visit_date__lt=next_first_day
+        ).aggregate(visit_count=Count('id'), total_amount=Sum('sale_amount'), total_fuel=Sum('fuel_quantity'))
+
+        if not totals['visit_count']:
+            cls.objects.filter(customer_id=customer_id, station_id=station_id, year_month=year_month).delete()
+            return
+        cls.objects.update_or_create(
+            customer_id=customer_id,
+            station_id=station_id,
+            year_month=year_month,
+            defaults={
+                'visit_count': totals['visit_count'],
+                'total_amount': totals['total_amount'] or 0,
+                'total_fuel': totals['total_fuel'] or 0,
+            }
+        )
+
+
+@receiver(pre_save, sender=CustomerVisitHistory)
+def remember_visit_month(sender, instance, **kwargs):
+    """방문 기록 수정 전 집계 키 보관 (고객/주유소/방문일이 바뀌면 이전 월도 다시 계산)"""
+    if instance.pk:
+        instance._previous_month_key = CustomerVisitHistory.objects.filter(
+            pk=instance.pk
+        ).values_list('customer_id', 'station_id', 'visit_date').first()
+
+
+@receiver(post_save, sender=CustomerVisitHistory)
+def on_visit_history_saved(sender, instance, created, **kwargs):
+    """방문 기록 저장 시 월별 방문 집계 갱신 + 고객 메인 화면 요약 캐시 삭제"""
+    if created:
+        CustomerVisitMonthSummary.add_visit(instance)
+    else:
+        previous = getattr(instance, '_previous_month_key', None)
+        if previous:
+            CustomerVisitMonthSummary.refresh(previous[0], previous[1], previous[2].strftime('%Y-%m'))
+        CustomerVisitMonthSummary.refresh(instance.customer_id, instance.station_id, instance.visit_date.strftime('%Y-%m'))
+    invalidate_customer_summary(instance.customer_id)
+
+
+@receiver(post_delete, sender=CustomerVisitHistory)
+def on_visit_history_deleted(sender, instance, **kwargs):
+    """방문 기록 삭제 시 월별 방문 집계에서 빼고 고객 메인 화면 요약 캐시 삭제"""
+    CustomerVisitMonthSummary.add_visit(instance, sign=-1)
+    invalidate_customer_summary(instance.customer_id)
+
@@ -0,0 +1,179 @@
+"""
+고객 쿠폰 지갑
+
+쿠폰 페이지와 쿠폰 지갑 API 가 같은 조회/직렬화/정렬을 쓴다. 두 템플릿 종류와 발행처
+(주유소 프로필)를 select_related 로 한 번에 가져오고, 만료일 순 페이지 단위로 자른다.
+쿠폰 페이지는 첫 페이지만 그리고 이후 페이지는 API 로 이어서 불러온다. ETag 는 조건에 맞는 쿠폰 집합의 지문(건수, 최대 ID, 최근 사용일,
+템플릿 수정일)으로 만들어 바뀐 것이 없으면 304 로 응답할 수 있게 한다.
+"""
+import hashlib
+
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+BENEFIT_FILTERS = {
+    'DISCOUNT': ('DISCOUNT', 'BOTH'),
+    'PRODUCT': ('PRODUCT', 'BOTH'),
+    'BOTH': ('BOTH',),
+}
+STATUS_FILTERS = ('AVAILABLE', 'USED', 'EXPIRED')
+AUTO_COUPON_TYPE_NAMES = {
+    'SIGNUP': '회원가입',
+    'CUMULATIVE': '누적매출',
+    'MONTHLY': '전월매출',
+}
+
+
+def wallet_queryset(customer, station=None, benefit=None, statuses=None):
+    """
+    고객 쿠폰 조회 (발행처/유형까지 select_related)
+
+    Args:
+        station: 이 주유소 템플릿 쿠폰만 (None 이면 전체)
+        benefit: DISCOUNT/PRODUCT (BOTH 포함) 또는 BOTH
+        statuses: 상태 목록 (None 이면 전체)
+    """
+    from OilNote_StationApp.models import CustomerCoupon
+
+    coupons = CustomerCoupon.objects.filter(customer=customer)
+    if statuses:
+        coupons = coupons.filter(status__in=statuses)
+    if station is not None:
+        coupons = coupons.filter(Q(coupon_template__station=station) | Q(auto_coupon_template__station=station))
+    if benefit in BENEFIT_FILTERS:
+        benefit_types = BENEFIT_FILTERS[benefit]
+        coupons = coupons.filter(
+            Q(coupon_template__benefit_type__in=benefit_types) |
+            Q(auto_coupon_template__benefit_type__in=benefit_types)
+        )
+    return coupons.select_related(
+        'coupon_template__coupon_type', 'coupon_template__station__station_profile',
+        'auto_coupon_template__station__station_profile'
+    )
+
+
+def benefit_description(template):
+    """템플릿 혜택 설명"""
+    if template.benefit_type == 'DISCOUNT':
+        return f"{template.discount_amount:,.0f}원 할인"
+    elif template.benefit_type == 'PRODUCT':
+        return f"{template.product_name} 무료"
+    elif template.benefit_type == 'BOTH':
+        return f"{template.discount_amount:,.0f}원 할인 + {template.product_name} 무료"
+    return ""
+
+
+def coupon_type_name(coupon):
+    """발행 유형 이름 (자동 쿠폰은 유형 코드, 수동 쿠폰은 쿠폰 유형)"""
+    template = coupon.template
+    if coupon.auto_coupon_template:
+        return AUTO_COUPON_TYPE_NAMES.get(template.coupon_type, template.coupon_type)
+    return template.coupon_type.type_name if template.coupon_type else '일반'
+
+
+def station_name(template):
+    profile = getattr(template.station, 'station_profile', None)
+    return profile.station_name if profile else template.station.username
+
+
+def serialize_coupon(coupon, today=None):
+    """쿠폰 지갑 API 응답 항목"""
+    today = today or timezone.now().date()
+    template = coupon.template
+    expiry_date = coupon.expiry_date or (template.valid_until if not template.is_permanent else None)
+    is_expired = coupon.status == 'EXPIRED' or (coupon.status == 'AVAILABLE' and expiry_date is not None and expiry_date < today)
+    return {
+        'id': coupon.id,
+        'title': template.coupon_name,
+        'description': template.description,
+        'benefit_type': template.benefit_type,
+        'benefit_description': benefit_description(template),
+        'discount_value': int(template.discount_amount) if template.discount_amount is not None else None,
+        'product_name': template.product_name,
+        'coupon_type_name': coupon_type_name(coupon),
+        'station_id': template.station_id,
+        'station_name': station_name(template),
+        'status': 'EXPIRED' if is_expired else coupon.status,
+        'expiry_date': expiry_date.isoformat() if expiry_date else None,
+        'issued_date': coupon.issued_date.strftime('%Y-%m-%d'),
+        'used_date': coupon.used_date.strftime('%Y-%m-%d %H:%M') if coupon.used_date else None,
+    }
+
+
+def parse_wallet_params(params):
+    """
+    쿼리 파라미터 정리
+
+    Returns:
+        dict: station_id(int, None=전체), benefit, statuses, page, page_size
+    """
+    station_id = str(params.get('station_id') or 'all')
+    status = (params.get('status') or 'AVAILABLE').upper()
+    statuses = list(STATUS_FILTERS) if status == 'ALL' else [s for s in status.split(',') if s in STATUS_FILTERS]
+    benefit = (params.get('benefit') or '').upper() or None
+
+    try:
+        page = max(1, int(params.get('page', 1)))
+    except (TypeError, ValueError):
+        page = 1
+    try:
+        page_size = min(MAX_PAGE_SIZE, max(1, int(params.get('page_size', DEFAULT_PAGE_SIZE))))
+    except (TypeError, ValueError):
+        page_size = DEFAULT_PAGE_SIZE
+
+    return {
+        'station_id': int(station_id) if station_id.isdigit() else None,
+        'benefit': benefit if benefit in BENEFIT_FILTERS else None,
+        'statuses': statuses or ['AVAILABLE'],
+        'page': page,
+        'page_size': page_size,
+    }
+
+
+def wallet_etag(coupons, params):
+    """조건에 맞는 쿠폰 집합과 요청 파라미터로 만든 ETag 값"""
+    fingerprint = coupons.aggregate(
+        count=Count('id'),
+        last_id=Max('id'),
+        last_used=Max('used_date'),
+        manual_updated=Max('coupon_template__updated_at'),
+        auto_updated=Max('auto_coupon_template__updated_at'),
+    )
+    raw = '|'.join(str(value) for value in (
+        params['station_id'], params['benefit'], ','.join(params['statuses']), params['page'], params['page_size'],
+        timezone.now().date(), *fingerprint.values()
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def ordered_page(coupons, page, page_size):
+    """
+    만료일 가까운 순(무기한은 뒤) 페이지의 쿠폰
+
+    Returns:
+        tuple: (쿠폰 목록, 다음 페이지 여부)
+    """
+    offset = (page - 1) * page_size
+    rows = list(
+        coupons.order_by(F('expiry_date').asc(nulls_last=True), '-issued_date', '-id')[offset:offset + page_size + 1]
+    )
+    return rows[:page_size], len(rows) > page_size
+
+
+def wallet_page(coupons, page, page_size):
+    """
+    만료일 가까운 순(무기한은 뒤) 페이지
+
+    Returns:
+        dict: coupons(직렬화 목록), page, page_size, has_next
+    """
+    rows, has_next = ordered_page(coupons, page, page_size)
+    today = timezone.now().date()
+    return {
+        'coupons': [serialize_coupon(coupon, today) for coupon in rows],
+        'page': page,
+        'page_size': page_size,
+        'has_next': has_next,
+    }
@@ -0,0 +1,105 @@
+"""
+고객 메인 화면 요약 (쿠폰 보유 현황 + 이번 달 방문 통계)
+
+쿠폰은 혜택 유형별 조건부 Count 한 번, 방문은 건수/금액/주유량 aggregate 한 번으로
+계산하고, 고객별 캐시(짧은 TTL)에 주유소 선택 범위별로 담아 둔다.
+쿠폰 발행/사용/만료와 방문 기록 저장 시 invalidate_customer_summary() 로 비운다.
+캐시는 settings.CACHES 의 DB 캐시 테이블이라 웹 워커와 배치 작업 등 모든 프로세스가 같은 값을 보고 지운다.
+"""
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_TIMEOUT = 60
+DISCOUNT_BENEFITS = ('DISCOUNT', 'BOTH')
+PRODUCT_BENEFITS = ('PRODUCT', 'BOTH')
+
+
+def _cache_key(customer_id):
+    return f'customer_summary:{customer_id}'
+
+
+def invalidate_customer_summary(customer_ids):
+    """고객 요약 캐시 삭제 (고객 ID 하나 또는 여러 개)"""
+    if isinstance(customer_ids, int):
+        customer_ids = [customer_ids]
+    keys = [_cache_key(customer_id) for customer_id in set(customer_ids)]
+    if keys:
+        cache.delete_many(keys)
+
+
+def coupon_summary(customer, station=None):
+    """
+    사용 가능 쿠폰 수 (전체/할인/상품, BOTH 는 할인·상품 양쪽에 포함)
+
+    station 이 있으면 수동/자동 템플릿 중 하나라도 그 주유소 것인 쿠폰만 센다.
+    """
+    from OilNote_StationApp.models import CustomerCoupon
+
+    coupons = CustomerCoupon.objects.filter(customer=customer, status='AVAILABLE')
+    if station is not None:
+        coupons = coupons.filter(Q(coupon_template__station=station) | Q(auto_coupon_template__station=station))
+
+    def benefit_in(benefit_types):
+        return (
+            Q(coupon_template__benefit_type__in=benefit_types) |
+            Q(auto_coupon_template__benefit_type__in=benefit_types)
+        )
+
+    return coupons.aggregate(
+        total_coupons=Count('id'),
+        discount_coupon_count=Count('id', filter=benefit_in(DISCOUNT_BENEFITS)),
+        product_coupon_count=Count('id', filter=benefit_in(PRODUCT_BENEFITS)),
+    )
+
+
+def monthly_visit_summary(customer, station=None, recent_count=5):
+    """이번 달 방문 건수/금액/주유량과 최근 방문 기록"""
+    from ..models import CustomerVisitHistory
+
+    today = timezone.now().date()
+    visits = CustomerVisitHistory.objects.filter(
+        customer=customer,
+        visit_date__gte=today.replace(day=1),
+        visit_date__lte=today
+    )
+    if station is not None:
+        visits = visits.filter(station=station)
+
+    totals = visits.aggregate(
+        monthly_visit_count=Count('id'),
+        monthly_total_amount=Sum('sale_amount'),
+        monthly_total_fuel=Sum('fuel_quantity'),
+    )
+    recent = list(visits.select_related('station__station_profile')[:recent_count]) if totals['monthly_visit_count'] else []
+    return {
+        'monthly_visit_count': totals['monthly_visit_count'],
+        'monthly_total_amount': totals['monthly_total_amount'] or 0,
+        'monthly_total_fuel': totals['monthly_total_fuel'] or 0,
+        'monthly_visits': recent,
+    }
+
+
+def get_customer_summary(customer, station=None):
+    """
+    고객 메인 화면 요약 (캐시 우선)
+
+    Returns:
+        dict: total_coupons, discount_coupon_count, product_coupon_count,
+        monthly_visit_count, monthly_total_amount, monthly_total_fuel, monthly_visits
+    """
+    key = _cache_key(customer.id)
+    scope = str(station.id) if station is not None else 'all'
+    summaries = cache.get(key) or {}
+    if scope in summaries:
+        return summaries[scope]
+
+    summary = coupon_summary(customer, station)
+    summary.update(monthly_visit_summary(customer, station))
+    summaries[scope] = summary
+    cache.set(key, summaries, SUMMARY_CACHE_TIMEOUT)
+    return summary
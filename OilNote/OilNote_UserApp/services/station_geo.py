@@ -0,0 +1,126 @@
+"""
+현재 위치 주변 주유소 조회
+
+위도/경도 인덱스에 경계 상자(bounding box) 범위 조건을 걸어 반경 근처 주유소만 가져온 뒤,
+후보 좌표 전체에 대해 NumPy 로 하버사인 거리를 한 번에 계산한다.
+주유소별 사용 가능 쿠폰 수는 주유소·혜택 유형별 GROUP BY 한 번으로 센다.
+"""
+import math
+
+import numpy as np
+from django.db.models import Count
+from django.db.models.functions import Coalesce
+
+EARTH_RADIUS_M = 6371000
+DEFAULT_RADIUS_M = 1000
+
+
+def bounding_box(latitude, longitude, radius_m):
+    """
+    반경 radius_m 원을 감싸는 위도/경도 범위
+
+    Returns:
+        tuple: (최소 위도, 최대 위도, 최소 경도, 최대 경도)
+    """
+    lat_delta = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = math.cos(math.radians(latitude))
+    # 극지방에서는 경도 범위가 전체로 넓어짐
+    lon_delta = 180.0 if cos_lat < 1e-6 else min(180.0, lat_delta / cos_lat)
+    return (
+        max(-90.0, latitude - lat_delta),
+        min(90.0, latitude + lat_delta),
+        max(-180.0, longitude - lon_delta),
+        min(180.0, longitude + lon_delta),
+    )
+
+
+def haversine_distances(latitude, longitude, latitudes, longitudes):
+    """기준 좌표에서 여러 좌표까지의 거리 (Haversine 공식, 미터 단위 배열)"""
+    lat1 = math.radians(latitude)
+    lon1 = math.radians(longitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=float))
+    lon2 = np.radians(np.asarray(longitudes, dtype=float))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def find_nearby_stations(latitude, longitude, radius_m=DEFAULT_RADIUS_M):
+    """
+    반경 내 주유소 (가까운 순)
+
+    Returns:
+        list: [{'station_id', 'station_name', 'address', 'tid', 'latitude', 'longitude', 'distance'}]
+    """
+    from OilNote_User.models import StationProfile
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_m)
+    candidates = list(
+        StationProfile.objects.filter(
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lon, max_lon)
+        ).values('user_id', 'station_name', 'address', 'tid', 'latitude', 'longitude')
+    )
+    if not candidates:
+        return []
+
+    distances = haversine_distances(
+        latitude, longitude,
+        [float(profile['latitude']) for profile in candidates],
+        [float(profile['longitude']) for profile in candidates]
+    )
+    nearby = []
+    for index in np.argsort(distances, kind='stable'):
+        distance = float(distances[index])
+        if distance > radius_m:
+            break
+        profile = candidates[index]
+        nearby.append({
+            'station_id': profile['user_id'],
+            'station_name': profile['station_name'],
+            'address': profile['address'],
+            'tid': profile['tid'],
+            'latitude': float(profile['latitude']),
+            'longitude': float(profile['longitude']),
+            'distance': distance,
+        })
+    return nearby
+
+
+def available_coupon_counts(customer, station_ids):
+    """
+    주유소별 고객의 사용 가능 쿠폰 수 (쿼리 1회)
+
+    할인 쿠폰은 세차(CAR_WASH), 상품 쿠폰은 상품(PRODUCT)으로 세고, 할인+상품(BOTH)은 양쪽에 센다.
+    주유 쿠폰 유형은 없으므로 FUEL 은 항상 0 이다.
+
+    Returns:
+        dict: {station_id: {'CAR_WASH', 'PRODUCT', 'FUEL', 'total'}}
+    """
+    from OilNote_StationApp.models import CustomerCoupon
+
+    counts = {
+        station_id: {'CAR_WASH': 0, 'PRODUCT': 0, 'FUEL': 0, 'total': 0}
+        for station_id in station_ids
+    }
+    if not counts:
+        return counts
+
+    rows = CustomerCoupon.objects.filter(
+        customer=customer,
+        status='AVAILABLE'
+    ).annotate(
+        station_id=Coalesce('coupon_template__station_id', 'auto_coupon_template__station_id'),
+        benefit_type=Coalesce('coupon_template__benefit_type', 'auto_coupon_template__benefit_type'),
+    ).filter(
+        station_id__in=list(counts)
+    ).values('station_id', 'benefit_type').annotate(count=Count('id')).order_by()
+
+    for row in rows:
+        station_counts = counts[row['station_id']]
+        station_counts['total'] += row['count']
+        if row['benefit_type'] in ('DISCOUNT', 'BOTH'):
+            station_counts['CAR_WASH'] += row['count']
+        if row['benefit_type'] in ('PRODUCT', 'BOTH'):
+            station_counts['PRODUCT'] += row['count']
+    return counts
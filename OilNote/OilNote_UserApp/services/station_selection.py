@@ -0,0 +1,90 @@
+"""
+고객 화면의 주유소 선택
+
+고객의 활성 주유소 관계 목록(주유소 프로필 포함)은 요청의 사용자 객체에 한 번만 읽어 둔다.
+프로세스 간 공유 캐시를 두지 않으므로 다른 워커에서 바뀐 관계도 다음 요청에서 바로 보인다.
+선택 주유소는 GET station_id → 세션 → 주거래 주유소 → 전체 순으로 정하며,
+요청마다 한 번만 계산해 request 에 저장한다.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = 'selected_station_id'
+
+
+def get_registered_stations(customer):
+    """고객의 활성 주유소 관계 목록 (station__station_profile 포함, 사용자 객체당 한 번 조회)"""
+    from OilNote_User.models import CustomerStationRelation
+
+    relations = getattr(customer, '_registered_stations', None)
+    if relations is None:
+        relations = list(
+            CustomerStationRelation.objects.filter(
+                customer=customer,
+                is_active=True
+            ).select_related('station__station_profile').order_by('id')
+        )
+        customer._registered_stations = relations
+    return relations
+
+
+def find_registered_station(customer, station_id):
+    """고객이 등록한 주유소 중 station_id 관계 (없으면 None)"""
+    return next(
+        (relation for relation in get_registered_stations(customer) if str(relation.station_id) == str(station_id)),
+        None
+    )
+
+
+def station_display_name(station):
+    profile = getattr(station, 'station_profile', None)
+    return profile.station_name if profile else station.username
+
+
+def resolve_station_selection(request):
+    """
+    요청의 주유소 선택 (요청당 한 번 계산)
+
+    Returns:
+        dict: registered_stations, primary_station, selected_station,
+        selected_station_id('all' 또는 주유소 ID 문자열), selected_station_name
+    """
+    selection = getattr(request, '_station_selection', None)
+    if selection is not None:
+        return selection
+
+    relations = get_registered_stations(request.user)
+    primary_relation = next((relation for relation in relations if relation.is_primary), None)
+
+    # URL 파라미터 → 세션 → 주거래 주유소 → 전체
+    station_id = request.GET.get('station_id') or request.session.get(SESSION_KEY)
+    if not station_id:
+        station_id = str(primary_relation.station_id) if primary_relation else 'all'
+    station_id = str(station_id)
+
+    selected_station = None
+    remember = True
+    if station_id != 'all':
+        relation = next((relation for relation in relations if str(relation.station_id) == station_id), None)
+        if relation:
+            selected_station = relation.station
+        else:
+            # 잘못된 주유소 ID 는 세션에서 지워 다음 요청에서 주거래 주유소로 돌아가게 함
+            logger.info(f'선택한 주유소를 찾을 수 없음 - 고객: {request.user.username}, 주유소 ID: {station_id}')
+            request.session.pop(SESSION_KEY, None)
+            station_id = 'all'
+            remember = False
+
+    if remember and request.session.get(SESSION_KEY) != station_id:
+        request.session[SESSION_KEY] = station_id
+
+    selection = {
+        'registered_stations': relations,
+        'primary_station': primary_relation,
+        'selected_station': selected_station,
+        'selected_station_id': station_id,
+        'selected_station_name': station_display_name(selected_station) if selected_station else '전체',
+    }
+    request._station_selection = selection
+    return selection
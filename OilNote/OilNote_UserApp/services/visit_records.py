@@ -0,0 +1,57 @@
+"""
+주유노트(방문 기록) 조회
+
+월 선택 목록과 월별 합계는 고객·주유소·월별 방문 집계(CustomerVisitMonthSummary)에서
+인덱스 조회 한 번으로 읽고, 방문 목록은 방문일 범위 조건으로 페이지 단위로 가져온다.
+"""
+import math
+from datetime import date, timedelta
+
+from django.db.models import Sum
+
+RECORDS_PAGE_SIZE = 30
+
+
+def visit_months(customer, station=None):
+    """
+    방문 기록이 있는 월 목록 (최신순, 월별 합계 포함)
+
+    Returns:
+        list: [{'year_month', 'visit_count', 'total_amount', 'total_fuel'}]
+    """
+    from ..models import CustomerVisitMonthSummary
+
+    summaries = CustomerVisitMonthSummary.objects.filter(customer=customer, visit_count__gt=0)
+    if station is not None:
+        summaries = summaries.filter(station=station)
+    return list(
+        summaries.values('year_month').annotate(
+            visit_count=Sum('visit_count'),
+            total_amount=Sum('total_amount'),
+            total_fuel=Sum('total_fuel'),
+        ).order_by('-year_month')
+    )
+
+
+def month_visits(customer, year, month, station=None, page=1, page_size=RECORDS_PAGE_SIZE):
+    """해당 월 방문 기록 한 페이지 (최신순)"""
+    from ..models import CustomerVisitHistory
+
+    first_day = date(year, month, 1)
+    next_first_day = (first_day + timedelta(days=32)).replace(day=1)
+    visits = CustomerVisitHistory.objects.filter(
+        customer=customer,
+        visit_date__gte=first_day,
+        visit_date__lt=next_first_day
+    )
+    if station is not None:
+        visits = visits.filter(station=station)
+
+    offset = (page - 1) * page_size
+    return list(
+        visits.select_related('station__station_profile').order_by('-visit_date', '-visit_time')[offset:offset + page_size]
+    )
+
+
+def page_count(total, page_size=RECORDS_PAGE_SIZE):
+    return max(1, math.ceil(total / page_size))
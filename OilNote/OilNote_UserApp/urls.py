@@ -8,6 +8,7 @@ urlpatterns = [
     path('records/', views.CustomerRecordsView.as_view(), name='records'),
     path('profile/', views.CustomerProfileView.as_view(), name='profile'),
     path('coupons/', views.CustomerCouponsView.as_view(), name='coupons'),
+    path('coupons/wallet/', views.coupon_wallet, name='coupon_wallet'),
     path('coupons/<int:coupon_id>/use/', views.use_coupon, name='use_coupon'),
     path('stations/', views.StationListView.as_view(), name='station_list'),
     path('stations/<int:station_id>/register/', views.register_station, name='register_station'),
@@ -11,13 +11,24 @@ from OilNote_User.models import CustomerStationRelation, CustomUser, StationProf
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
 from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 
-from OilNote_StationApp.models import CustomerCoupon
+from .mixins import SelectedStationMixin
+from .services.coupon_wallet import (
+    DEFAULT_PAGE_SIZE, ordered_page, parse_wallet_params, serialize_coupon, wallet_etag, wallet_page, wallet_queryset
+)
+from .services.customer_summary import DISCOUNT_BENEFITS, coupon_summary
+from .services.station_selection import find_registered_station, get_registered_stations, station_display_name
 
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CustomerMainView(LoginRequiredMixin, TemplateView):
+class CustomerMainView(LoginRequiredMixin, SelectedStationMixin, TemplateView):
     template_name = 'Cust_main/customer_main.html'
     login_url = 'users:login'
     
@@ -31,138 +42,18 @@ class CustomerMainView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         context['user'] = self.request.user
         
-        # 연결된 주유소 정보 가져오기
-        context['registered_stations'] = self.request.user.station_relations.filter(
-            is_active=True
-        ).select_related('station__station_profile')
-        
-        # 주 거래처 정보
-        context['primary_station'] = context['registered_stations'].filter(
-            is_primary=True
-        ).first()
-
-        # 주거래 주유소 정보 로깅
-        if context['primary_station']:
-            print(f"현재 주거래 주유소: {context['primary_station'].station.station_profile.station_name}")
-        else:
-            print("주거래 주유소가 설정되지 않음")
-
-        # 주유소 선택 파라미터 (세션 기반)
-        station_id = self.request.GET.get('station_id')
-        
-        # 세션에서 저장된 주유소 선택 확인
-        session_station_id = self.request.session.get('selected_station_id')
+        selected_station = self.get_station_selection()['selected_station']
         
-        if station_id:
-            # URL 파라미터로 주유소가 선택된 경우 세션에 저장
-            self.request.session['selected_station_id'] = station_id
-            print(f"URL 파라미터로 주유소 선택: {station_id}")
-        elif session_station_id:
-            # 세션에 저장된 주유소가 있는 경우 사용
-            station_id = session_station_id
-            print(f"세션에서 주유소 선택 복원: {station_id}")
-        else:
-            # 기본값: 주거래 주유소 또는 전체
-            if context['primary_station']:
-                station_id = str(context['primary_station'].station.id)
-                self.request.session['selected_station_id'] = station_id
-                print(f"주거래 주유소를 기본 선택: {station_id}")
-            else:
-                station_id = 'all'
-                self.request.session['selected_station_id'] = station_id
-                print("전체 주유소를 기본 선택")
+        # 쿠폰 보유 현황 + 이번 달 방문 통계 (고객별 캐시, 미스 시 집계 쿼리 2~3회)
+        from .services.customer_summary import get_customer_summary
+        summary = get_customer_summary(self.request.user, selected_station)
         
-        selected_station = None
-        selected_station_name = '전체'
-        if station_id != 'all':
-            try:
-                selected_station = None
-                for relation in context['registered_stations']:
-                    if str(relation.station.id) == str(station_id):
-                        selected_station = relation.station
-                        selected_station_name = relation.station.station_profile.station_name
-                        print(f"선택된 주유소: {selected_station_name} (ID: {station_id})")
-                        break
-                if not selected_station:
-                    print(f"주유소 ID {station_id}를 찾을 수 없음")
-                    # 잘못된 주유소 ID인 경우 세션에서 제거
-                    self.request.session.pop('selected_station_id', None)
-                    station_id = 'all'
-                    selected_station_name = '전체'
-            except Exception as e:
-                print(f"주유소 선택 중 오류: {e}")
-                selected_station = None
-                selected_station_name = '전체'
-                # 오류 발생 시 세션에서 제거
-                self.request.session.pop('selected_station_id', None)
-        else:
-            print("전체 주유소 선택됨")
-        
-        from .models import CustomerVisitHistory
-        from datetime import datetime, date
-        from django.db.models import Sum, Count
-        
-        current_date = datetime.now()
-        current_month = current_date.month
-        current_year = current_date.year
-        
-        # 이번달 방문 기록 조회 (주유소별 or 전체)
-        visit_filter = {
-            'customer': self.request.user,
-            'visit_date__year': current_year,
-            'visit_date__month': current_month
-        }
-        if selected_station:
-            visit_filter['station'] = selected_station
-        monthly_visits = CustomerVisitHistory.objects.filter(**visit_filter)
-        
-        # 통계 계산
-        monthly_visit_count = monthly_visits.count()
-        monthly_total_amount = monthly_visits.aggregate(
-            total=Sum('sale_amount')
-        )['total'] or 0
-        monthly_total_fuel = monthly_visits.aggregate(
-            total=Sum('fuel_quantity')
-        )['total'] or 0
-
-        
-
-        # 쿠폰 정보 조회 (주유소별 필터링 적용)
-        if selected_station:
-            # 특정 주유소 선택 시: 해당 주유소의 쿠폰만 조회
-            total_coupons = CustomerCoupon.objects.filter(
-                customer=self.request.user, 
-                status='AVAILABLE',
-                coupon_template__station=selected_station
-            ).count()
-            discount_coupon_count = _get_customer_coupon_count_by_benefit_include_both_station(self.request.user, 'DISCOUNT', selected_station)
-            product_coupon_count = _get_customer_coupon_count_by_benefit_include_both_station(self.request.user, 'PRODUCT', selected_station)
-            print(f"선택된 주유소 쿠폰 - 할인: {discount_coupon_count}, 상품: {product_coupon_count}, 전체: {total_coupons}")
-        else:
-            # 전체 선택 시: 모든 주유소의 쿠폰 조회
-            total_coupons = CustomerCoupon.objects.filter(customer=self.request.user, status='AVAILABLE').count()
-            discount_coupon_count = _get_customer_coupon_count_by_benefit_include_both(self.request.user, 'DISCOUNT')
-            product_coupon_count = _get_customer_coupon_count_by_benefit_include_both(self.request.user, 'PRODUCT')
-            print(f"전체 주유소 쿠폰 - 할인: {discount_coupon_count}, 상품: {product_coupon_count}, 전체: {total_coupons}")
-        
-        context.update({
-            'monthly_visit_count': monthly_visit_count,
-            'monthly_total_amount': monthly_total_amount,
-            'monthly_total_fuel': monthly_total_fuel,
-            'monthly_visits': monthly_visits[:5],  # 최근 5개 기록만
-            'selected_station_id': station_id or 'all',
-            'selected_station': selected_station,
-            'selected_station_name': selected_station_name,
-            # 쿠폰 관련 컨텍스트 (혜택 유형별)
-            'discount_coupon_count': discount_coupon_count,
-            'product_coupon_count': product_coupon_count,
-            'total_coupons': total_coupons,            
-        })
+        context.update(summary)
         
         return context
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CustomerRecordsView(LoginRequiredMixin, TemplateView):
+class CustomerRecordsView(LoginRequiredMixin, SelectedStationMixin, TemplateView):
     template_name = 'Cust_main/records.html'
     login_url = 'users:login'
     
@@ -174,81 +65,16 @@ class CustomerRecordsView(LoginRequiredMixin, TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        from .models import CustomerVisitHistory
         from datetime import datetime
-        from django.db.models import F
+        from .services.visit_records import month_visits, page_count, visit_months
 
-        # 주유소 선택 파라미터 처리 (세션 기반)
-        station_id = self.request.GET.get('station_id')
-        
-        # 세션에서 저장된 주유소 선택 확인
-        session_station_id = self.request.session.get('selected_station_id')
-        
-        if station_id:
-            # URL 파라미터로 주유소가 선택된 경우 세션에 저장
-            self.request.session['selected_station_id'] = station_id
-            print(f"주유노트 페이지 - URL 파라미터로 주유소 선택: {station_id}")
-        elif session_station_id:
-            # 세션에 저장된 주유소가 있는 경우 사용
-            station_id = session_station_id
-            print(f"주유노트 페이지 - 세션에서 주유소 선택 복원: {station_id}")
-        else:
-            # 기본값: 주거래 주유소 또는 전체
-            from OilNote_User.models import CustomerStationRelation
-            primary_relation = CustomerStationRelation.objects.filter(
-                customer=self.request.user,
-                is_primary=True,
-                is_active=True
-            ).first()
-            
-            if primary_relation:
-                station_id = str(primary_relation.station.id)
-                self.request.session['selected_station_id'] = station_id
-                print(f"주유노트 페이지 - 주거래 주유소를 기본 선택: {station_id}")
-            else:
-                station_id = 'all'
-                self.request.session['selected_station_id'] = station_id
-                print("주유노트 페이지 - 전체 주유소를 기본 선택")
-        
-        selected_station = None
-        if station_id and station_id != 'all':
-            try:
-                # 연결된 주유소 중에서 선택
-                from OilNote_User.models import CustomerStationRelation
-                relation = CustomerStationRelation.objects.filter(
-                    customer=self.request.user,
-                    station_id=station_id,
-                    is_active=True
-                ).select_related('station__station_profile').first()
-                
-                if relation:
-                    selected_station = relation.station
-                    print(f"주유노트 페이지 - 선택된 주유소: {selected_station.station_profile.station_name}")
-                else:
-                    print(f"주유노트 페이지 - 주유소 ID {station_id}를 찾을 수 없음")
-                    # 잘못된 주유소 ID인 경우 세션에서 제거
-                    self.request.session.pop('selected_station_id', None)
-                    station_id = 'all'
-            except Exception as e:
-                print(f"주유노트 페이지 - 주유소 선택 중 오류: {e}")
-                # 오류 발생 시 세션에서 제거
-                self.request.session.pop('selected_station_id', None)
-                station_id = 'all'
-        
-        # 연결된 주유소 목록
-        from OilNote_User.models import CustomerStationRelation
-        context['registered_stations'] = CustomerStationRelation.objects.filter(
-            customer=self.request.user,
-            is_active=True
-        ).select_related('station__station_profile')
-        
-        context['selected_station_id'] = station_id or 'all'
-        context['selected_station'] = selected_station
+        selected_station = self.get_station_selection()['selected_station']
 
-        # year, month GET 파라미터 처리
+        # year, month, page GET 파라미터 처리
         now = datetime.now()
         year = self.request.GET.get('year')
         month = self.request.GET.get('month')
+        page = self.request.GET.get('page')
         try:
             year = int(year)
         except (TypeError, ValueError):
@@ -257,45 +83,32 @@ class CustomerRecordsView(LoginRequiredMixin, TemplateView):
             month = int(month)
         except (TypeError, ValueError):
             month = now.month
+        if not 1 <= month <= 12:
+            month = now.month
+        try:
+            page = max(1, int(page))
+        except (TypeError, ValueError):
+            page = 1
 
-        # 해당 월의 방문 기록만 필터링 (주유소별 필터링 적용)
-        visit_filter = {
-            'customer': self.request.user,
-            'visit_date__year': year,
-            'visit_date__month': month
-        }
-        
-        if selected_station:
-            visit_filter['station'] = selected_station
-            print(f"주유노트 조회 - 주유소 필터링: {selected_station.station_profile.station_name}")
-        else:
-            print("주유노트 조회 - 전체 주유소")
-        
-        visit_records = CustomerVisitHistory.objects.filter(
-            **visit_filter
-        ).select_related('station').order_by('-visit_date', '-visit_time')
-
-        # 해당 월의 총 주유금액
-        from django.db.models import Sum
-        monthly_total_amount = visit_records.aggregate(total=Sum('sale_amount'))['total'] or 0
+        # 사용자가 기록한 월 목록(최신순)과 월별 합계 - 월별 방문 집계에서 한 번에 조회
+        months = visit_months(self.request.user, selected_station)
+        month_list = [tuple(map(int, row['year_month'].split('-'))) for row in months]
+        current = next((row for row in months if row['year_month'] == f'{year:04d}-{month:02d}'), None)
+        monthly_visit_count = current['visit_count'] if current else 0
+        num_pages = page_count(monthly_visit_count)
+        page = min(page, num_pages)
 
-        # 사용자가 기록한 월 목록(최신순) - 주유소별 필터링 적용
-        month_filter = {'customer': self.request.user}
-        if selected_station:
-            month_filter['station'] = selected_station
-        
-        month_list = CustomerVisitHistory.objects.filter(
-            **month_filter
-        ).annotate(
-            year_val=F('visit_date__year'),
-            month_val=F('visit_date__month')
-        ).values_list('year_val', 'month_val').distinct().order_by('-year_val', '-month_val')
+        # 해당 월의 방문 기록 (방문일 범위 조건, 페이지 단위)
+        visit_records = month_visits(self.request.user, year, month, selected_station, page) if monthly_visit_count else []
 
         context['visit_records'] = visit_records
         context['year'] = year
         context['month'] = month
         context['month_list'] = month_list
-        context['monthly_total_amount'] = monthly_total_amount
+        context['monthly_total_amount'] = current['total_amount'] if current else 0
+        context['monthly_visit_count'] = monthly_visit_count
+        context['page'] = page
+        context['num_pages'] = num_pages
         return context
 
 
@@ -362,7 +175,6 @@ class CustomerProfileView(LoginRequiredMixin, TemplateView):
             phone = request.POST.get('phone', '').strip()
             car_number = request.POST.get('car_number', '').strip()
             email = request.POST.get('email', '').strip()
-            membership_card = request.POST.get('membership_card', '').strip()
             group = request.POST.get('group', '').strip()
             primary_station_id = request.POST.get('primary_station_id')
             # ... 기존 필드 업데이트 ...
@@ -371,15 +183,11 @@ class CustomerProfileView(LoginRequiredMixin, TemplateView):
                 user.first_name = name
             if car_number:
                 customer_profile.car_number = car_number
-            phone_changed = False
             if phone and phone != customer_profile.customer_phone:
                 customer_profile.customer_phone = phone
-                phone_changed = True
                 # ... (생략) ...
             if email:
                 user.email = email
-            if membership_card and not phone_changed:
-                customer_profile.membership_card = membership_card
             if group:
                 customer_profile.group = group
             else:
@@ -536,14 +344,10 @@ def reset_station_selection(request):
         return JsonResponse({'status': 'error', 'message': '권한이 없습니다.'}, status=403)
     
     try:
-        from OilNote_User.models import CustomerStationRelation
-        
         # 주거래 주유소 찾기
-        primary_relation = CustomerStationRelation.objects.filter(
-            customer=request.user,
-            is_primary=True,
-            is_active=True
-        ).first()
+        primary_relation = next(
+            (relation for relation in get_registered_stations(request.user) if relation.is_primary), None
+        )
         
         if primary_relation:
             station_id = str(primary_relation.station.id)
@@ -553,7 +357,7 @@ def reset_station_selection(request):
                 'status': 'success',
                 'message': '주거래 주유소로 초기화되었습니다.',
                 'station_id': station_id,
-                'station_name': primary_relation.station.station_profile.station_name
+                'station_name': station_display_name(primary_relation.station)
             })
         else:
             # 주거래 주유소가 없는 경우 전체로 설정
@@ -573,7 +377,7 @@ def reset_station_selection(request):
         }, status=500)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CustomerCouponsView(LoginRequiredMixin, TemplateView):
+class CustomerCouponsView(LoginRequiredMixin, SelectedStationMixin, TemplateView):
     template_name = 'Cust_main/coupons.html'
     login_url = 'users:login'
     
@@ -586,296 +390,103 @@ class CustomerCouponsView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # 주유소 선택 파라미터 처리 (세션 기반)
-        station_id = self.request.GET.get('station_id')
-        
-        # 세션에서 저장된 주유소 선택 확인
-        session_station_id = self.request.session.get('selected_station_id')
-        
-        if station_id:
-            # URL 파라미터로 주유소가 선택된 경우 세션에 저장
-            self.request.session['selected_station_id'] = station_id
-            print(f"쿠폰 페이지 - URL 파라미터로 주유소 선택: {station_id}")
-        elif session_station_id:
-            # 세션에 저장된 주유소가 있는 경우 사용
-            station_id = session_station_id
-            print(f"쿠폰 페이지 - 세션에서 주유소 선택 복원: {station_id}")
-        else:
-            # 기본값: 주거래 주유소 또는 전체
-            from OilNote_User.models import CustomerStationRelation
-            primary_relation = CustomerStationRelation.objects.filter(
-                customer=self.request.user,
-                is_primary=True,
-                is_active=True
-            ).first()
-            
-            if primary_relation:
-                station_id = str(primary_relation.station.id)
-                self.request.session['selected_station_id'] = station_id
-                print(f"쿠폰 페이지 - 주거래 주유소를 기본 선택: {station_id}")
-            else:
-                station_id = 'all'
-                self.request.session['selected_station_id'] = station_id
-                print("쿠폰 페이지 - 전체 주유소를 기본 선택")
-        
-        selected_station = None
-        if station_id and station_id != 'all':
-            try:
-                # 연결된 주유소 중에서 선택
-                from OilNote_User.models import CustomerStationRelation
-                relation = CustomerStationRelation.objects.filter(
-                    customer=self.request.user,
-                    station_id=station_id,
-                    is_active=True
-                ).select_related('station__station_profile').first()
-                
-                if relation:
-                    selected_station = relation.station
-                    print(f"쿠폰 페이지 - 선택된 주유소: {selected_station.station_profile.station_name}")
-                else:
-                    print(f"쿠폰 페이지 - 주유소 ID {station_id}를 찾을 수 없음")
-                    # 잘못된 주유소 ID인 경우 세션에서 제거
-                    self.request.session.pop('selected_station_id', None)
-                    station_id = 'all'
-            except Exception as e:
-                print(f"쿠폰 페이지 - 주유소 선택 중 오류: {e}")
-                # 오류 발생 시 세션에서 제거
-                self.request.session.pop('selected_station_id', None)
-                station_id = 'all'
-        
-        # 연결된 주유소 목록
-        from OilNote_User.models import CustomerStationRelation
-        context['registered_stations'] = CustomerStationRelation.objects.filter(
-            customer=self.request.user,
-            is_active=True
-        ).select_related('station__station_profile')
-        
-        context['selected_station_id'] = station_id or 'all'
-        context['selected_station'] = selected_station
-        
-        # 임시 쿠폰 데이터 (실제 구현 시에는 데이터베이스에서 가져와야 함)
-        # 세차 쿠폰 예시 데이터
-        car_wash_coupon_list = [
-            {
-                'title': '세차 서비스 50% 할인',
-                'description': '주유소 세차장에서 사용 가능한 할인 쿠폰입니다.',
-                'discount_type': 'PERCENT',
-                'discount_value': 50,
-                'min_amount': 10000,
-                'expiry_date': '2024-12-31',
-                'is_expired': False,
-                'is_used': False,
-            },
-            {
-                'title': '세차 서비스 2000원 할인',
-                'description': '주유소 세차장에서 사용 가능한 할인 쿠폰입니다.',
-                'discount_type': 'AMOUNT',
-                'discount_value': 2000,
-                'min_amount': 5000,
-                'expiry_date': '2024-11-30',
-                'is_expired': False,
-                'is_used': True,
-            },
-        ]
-        
-        # 상품 쿠폰 예시 데이터
-        product_coupon_list = [
-            {
-                'title': '편의점 상품 30% 할인',
-                'description': '주유소 편의점에서 사용 가능한 할인 쿠폰입니다.',
-                'discount_type': 'PERCENT',
-                'discount_value': 30,
-                'min_amount': 5000,
-                'expiry_date': '2024-12-31',
-                'is_expired': False,
-                'is_used': False,
-            },
-            {
-                'title': '편의점 상품 1000원 할인',
-                'description': '주유소 편의점에서 사용 가능한 할인 쿠폰입니다.',
-                'discount_type': 'AMOUNT',
-                'discount_value': 1000,
-                'min_amount': 3000,
-                'expiry_date': '2024-10-31',
-                'is_expired': True,
-                'is_used': False,
-            },
-        ]
-        
-        # 실제 쿠폰 데이터로 교체
-        from OilNote_StationApp.models import CustomerCoupon
-        
-        # 고객의 실제 쿠폰 조회 (사용 완료된 쿠폰 제외)
-        from django.db.models import Q
+        selected_station = self.get_station_selection()['selected_station']
         
-        base_filter = Q(
-            customer=self.request.user,
-            status__in=['AVAILABLE', 'EXPIRED']  # 사용 가능하거나 만료된 쿠폰만 표시
-        )
-        
-        # 주유소별 필터링 적용 (auto_coupon_template과 coupon_template 모두 고려)
-        if selected_station:
-            station_filter = Q(coupon_template__station=selected_station) | Q(auto_coupon_template__station=selected_station)
-            final_filter = base_filter & station_filter
-            print(f"쿠폰 조회 - 주유소 필터링: {selected_station.station_profile.station_name}")
-        else:
-            final_filter = base_filter
-            print("쿠폰 조회 - 전체 주유소")
-        
-        customer_coupons = CustomerCoupon.objects.filter(
-            final_filter
-        ).select_related(
-            'coupon_template', 'coupon_template__coupon_type', 'coupon_template__station',
-            'auto_coupon_template', 'auto_coupon_template__station'
-        ).order_by('-issued_date')
-        
-        # 혜택 유형별 분류
-        discount_coupon_list = []  # 세차 할인
-        product_coupon_list = []   # 무료 상품
-        combo_coupon_list = []     # 할인+상품
-        
-        for coupon in customer_coupons:
-            template = coupon.template
-            
-            # 템플릿 기준으로 만료 여부 확인
-            is_template_expired = False
-            if not template.is_permanent and template.valid_until:
-                from django.utils import timezone
-                today = timezone.now().date()
-                is_template_expired = today > template.valid_until
-            
-            # 쿠폰 타입명 처리 (auto_coupon_template vs coupon_template)
-            if coupon.auto_coupon_template:
-                # 자동 쿠폰의 경우
-                type_map = {
-                    'SIGNUP': '회원가입',
-                    'CUMULATIVE': '누적매출',
-                    'MONTHLY': '전월매출'
-                }
-                coupon_type_name = type_map.get(template.coupon_type, template.coupon_type)
-                benefit_description = self._get_auto_template_benefit_description(template)
-            else:
-                # 수동 쿠폰의 경우
-                coupon_type_name = template.coupon_type.type_name if template.coupon_type else '일반'
-                benefit_description = template.get_benefit_description() if hasattr(template, 'get_benefit_description') else ''
-            
-            coupon_data = {
-                'id': coupon.id,
-                'title': template.coupon_name,
-                'description': template.description or f"{coupon_type_name} 쿠폰입니다. 할인 혜택은 세차장에서 사용 가능합니다." if template.benefit_type in ['DISCOUNT', 'BOTH'] else template.description or f"{coupon_type_name} 쿠폰입니다.",
-                'benefit_description': benefit_description,
-                'discount_type': 'AMOUNT',  # 정액 할인만 사용
-                'discount_value': template.discount_amount,
-                'product_name': template.product_name,
-                'benefit_type': template.benefit_type,
-                'coupon_type_name': coupon_type_name,  # 발행처 표시용
-                'expiry_date': template.valid_until if template.valid_until and not template.is_permanent else None,
-                'is_expired': is_template_expired or coupon.status == 'EXPIRED',
-                'is_used': coupon.status == 'USED',
-                'is_available': coupon.status == 'AVAILABLE' and not is_template_expired,
-                'issued_date': coupon.issued_date.strftime('%Y-%m-%d'),
-                'used_date': coupon.used_date.strftime('%Y-%m-%d') if coupon.used_date else None,
-                'station_name': template.station.station_profile.station_name if hasattr(template.station, 'station_profile') else template.station.username,
-                'is_permanent': template.is_permanent,
-            }
-            
-            # 혜택 유형별 분류 (BOTH는 두 섹션 모두에 표시)
-            benefit_type = template.benefit_type
-            if benefit_type == 'DISCOUNT':
-                discount_coupon_list.append(coupon_data)
-            elif benefit_type == 'PRODUCT':
-                product_coupon_list.append(coupon_data)
-            elif benefit_type == 'BOTH':
-                # 할인+상품은 두 섹션 모두에 표시
-                discount_coupon_list.append(coupon_data)
-                product_coupon_list.append(coupon_data)
-        
-        # 통계 계산 (사용 가능한 쿠폰만 계산)
-        available_coupons = customer_coupons.filter(status='AVAILABLE')
-        total_coupons = available_coupons.count()
-        discount_coupons = available_coupons.filter(
-            coupon_template__benefit_type__in=['DISCOUNT', 'BOTH']
-        ).count()
-        product_coupons = available_coupons.filter(
-            coupon_template__benefit_type__in=['PRODUCT', 'BOTH']
-        ).count()
-        
-        # 쿠폰 사용 내역(사용완료 쿠폰)
-        used_base_filter = Q(
-            customer=self.request.user,
-            status='USED'
-        )
-        
-        if selected_station:
-            used_station_filter = Q(coupon_template__station=selected_station) | Q(auto_coupon_template__station=selected_station)
-            used_final_filter = used_base_filter & used_station_filter
-        else:
-            used_final_filter = used_base_filter
-        used_coupons = CustomerCoupon.objects.filter(
-            used_final_filter
-        ).select_related(
-            'coupon_template', 'coupon_template__coupon_type', 'coupon_template__station',
-            'auto_coupon_template', 'auto_coupon_template__station'
+        # 사용 가능/만료 쿠폰 (만료일 가까운 순) - 혜택 유형별 첫 페이지만, 이후는 쿠폰 지갑 API 로 이어서 조회
+        # (BOTH는 두 섹션 모두에 표시)
+        today = timezone.now().date()
+        sections = {}
+        for benefit in ('DISCOUNT', 'PRODUCT'):
+            coupons, has_next = ordered_page(
+                wallet_queryset(self.request.user, selected_station, benefit, ['AVAILABLE', 'EXPIRED']),
+                1, DEFAULT_PAGE_SIZE
+            )
+            sections[benefit] = ([_coupon_card(coupon, today) for coupon in coupons], has_next)
+        discount_coupon_list, discount_has_next = sections['DISCOUNT']  # 세차 할인
+        product_coupon_list, product_has_next = sections['PRODUCT']     # 무료 상품
+
+        # 쿠폰 사용 내역(사용완료 쿠폰, 최근 50개)
+        used_coupons = wallet_queryset(
+            self.request.user, selected_station, statuses=['USED']
         ).order_by('-used_date', '-issued_date')[:50]
-        used_coupon_list = []
-        for coupon in used_coupons:
-            template = coupon.template
-            
-            # 쿠폰 타입명 처리 (auto_coupon_template vs coupon_template)
-            if coupon.auto_coupon_template:
-                # 자동 쿠폰의 경우
-                type_map = {
-                    'SIGNUP': '회원가입',
-                    'CUMULATIVE': '누적매출',
-                    'MONTHLY': '전월매출'
-                }
-                coupon_type_name = type_map.get(template.coupon_type, template.coupon_type)
-                benefit_description = self._get_auto_template_benefit_description(template)
-            else:
-                # 수동 쿠폰의 경우
-                coupon_type_name = template.coupon_type.type_name if template.coupon_type else '일반'
-                benefit_description = template.get_benefit_description() if hasattr(template, 'get_benefit_description') else ''
-            
-            used_coupon_list.append({
-                'id': coupon.id,
-                'title': template.coupon_name,
-                'description': template.description or f"{coupon_type_name} 쿠폰입니다.",
-                'benefit_description': benefit_description,
-                'discount_type': 'AMOUNT',
-                'discount_value': template.discount_amount,
-                'product_name': template.product_name,
-                'benefit_type': template.benefit_type,
-                'coupon_type_name': coupon_type_name,
-                'expiry_date': template.valid_until if template.valid_until and not template.is_permanent else None,
-                'is_expired': coupon.status == 'EXPIRED',
-                'is_used': True,
-                'is_available': False,
-                'issued_date': coupon.issued_date.strftime('%Y-%m-%d'),
-                'used_date': coupon.used_date.strftime('%Y-%m-%d %H:%M') if coupon.used_date else None,
-                'station_name': template.station.station_profile.station_name if hasattr(template.station, 'station_profile') else template.station.username,
-                'is_permanent': template.is_permanent,
-            })
-        context['used_coupon_list'] = used_coupon_list
+        context['used_coupon_list'] = [_coupon_card(coupon, today) for coupon in used_coupons]
 
+        # 통계 (사용 가능한 쿠폰, 수동/자동 템플릿 모두 혜택 유형별로 집계)
+        counts = coupon_summary(self.request.user, selected_station)
         context.update({
             'discount_coupon_list': discount_coupon_list,  # 세차 할인 (BOTH 포함)
             'product_coupon_list': product_coupon_list,    # 무료 상품 (BOTH 포함)
-            'total_coupons': total_coupons,
-            'discount_coupons': discount_coupons,  # 할인 혜택이 있는 쿠폰 수
-            'product_coupons': product_coupons,    # 상품 혜택이 있는 쿠폰 수
+            'discount_has_next': discount_has_next,
+            'product_has_next': product_has_next,
+            'coupon_page_size': DEFAULT_PAGE_SIZE,
+            'total_coupons': counts['total_coupons'],
+            'discount_coupons': counts['discount_coupon_count'],  # 할인 혜택이 있는 쿠폰 수
+            'product_coupons': counts['product_coupon_count'],    # 상품 혜택이 있는 쿠폰 수
         })
         
         return context
-    
-    def _get_auto_template_benefit_description(self, template):
-        """AutoCouponTemplate의 benefit 설명 생성"""
-        if template.benefit_type == 'DISCOUNT':
-            return f"{template.discount_amount:,.0f}원 할인"
-        elif template.benefit_type == 'PRODUCT':
-            return f"{template.product_name} 무료"
-        elif template.benefit_type == 'BOTH':
-            return f"{template.discount_amount:,.0f}원 할인 + {template.product_name} 무료"
-        return ""
+
+
+def _coupon_card(coupon, today):
+    """쿠폰 페이지 카드 데이터 (지갑 API 항목 + 템플릿 표시용 필드)"""
+    coupon_data = serialize_coupon(coupon, today)
+    template = coupon.template
+    if template.benefit_type in DISCOUNT_BENEFITS:
+        default_description = f"{coupon_data['coupon_type_name']} 쿠폰입니다. 할인 혜택은 세차장에서 사용 가능합니다."
+    else:
+        default_description = f"{coupon_data['coupon_type_name']} 쿠폰입니다."
+    coupon_data.update({
+        'description': template.description or default_description,
+        'discount_type': 'AMOUNT',  # 정액 할인만 사용
+        'expiry_date': coupon.expiry_date or (template.valid_until if not template.is_permanent else None),
+        'is_expired': coupon_data['status'] == 'EXPIRED',
+        'is_used': coupon_data['status'] == 'USED',
+        'is_available': coupon_data['status'] == 'AVAILABLE',
+        'is_permanent': template.is_permanent,
+    })
+    return coupon_data
+
+
+@csrf_exempt
+@login_required
+def coupon_wallet(request):
+    """
+    쿠폰 지갑 API (PWA 캐시용)
+
+    GET 파라미터: station_id(all/주유소 ID, 기본값: 선택된 주유소), benefit(DISCOUNT/PRODUCT/BOTH),
+    status(AVAILABLE/USED/EXPIRED/ALL, 쉼표로 여러 개), page, page_size(최대 50)
+    If-None-Match 가 현재 ETag 와 같으면 304 를 반환한다.
+    """
+    if request.user.user_type != 'CUSTOMER':
+        return JsonResponse({'status': 'error', 'message': '권한이 없습니다.'}, status=403)
+
+    if request.method != 'GET':
+        return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=405)
+
+    query = request.GET.copy()
+    if 'station_id' not in query:
+        query['station_id'] = request.session.get('selected_station_id') or 'all'
+    params = parse_wallet_params(query)
+
+    station = None
+    if params['station_id'] is not None:
+        relation = find_registered_station(request.user, params['station_id'])
+        if relation is None:
+            return JsonResponse({'status': 'error', 'message': '등록되지 않은 주유소입니다.'}, status=404)
+        station = relation.station
+
+    try:
+        coupons = wallet_queryset(request.user, station, params['benefit'], params['statuses'])
+        etag = wallet_etag(coupons, params)
+        response = get_conditional_response(request, etag=quote_etag(etag))
+        if response is None:
+            response = JsonResponse({'status': 'success', **wallet_page(coupons, params['page'], params['page_size'])})
+        response['ETag'] = quote_etag(etag)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    except Exception as e:
+        logger.error(f'쿠폰 지갑 조회 오류 - 고객: {request.user.username}, 오류: {str(e)}', exc_info=True)
+        return JsonResponse({'status': 'error', 'message': '쿠폰 조회 중 오류가 발생했습니다.'}, status=500)
 
 
 def _get_customer_coupon_count(user, coupon_type_code):
@@ -908,49 +519,6 @@ def _get_customer_coupon_count_by_benefit(user, benefit_type):
         status='AVAILABLE'
     ).filter(template_filter).count()
 
-def _get_customer_coupon_count_by_benefit_include_both(user, benefit_type):
-    """고객의 특정 혜택 유형 쿠폰 개수 조회 (BOTH 타입 포함, 사용 가능한 것만)"""
-    from OilNote_StationApp.models import CustomerCoupon
-    from django.db.models import Q
-    
-    if benefit_type == 'DISCOUNT':
-        benefit_types = ['DISCOUNT', 'BOTH']
-    elif benefit_type == 'PRODUCT':
-        benefit_types = ['PRODUCT', 'BOTH']
-    else:
-        benefit_types = [benefit_type]
-    
-    # auto_coupon_template과 coupon_template 모두 고려
-    filter_condition = Q(customer=user, status='AVAILABLE') & (
-        Q(coupon_template__benefit_type__in=benefit_types) |
-        Q(auto_coupon_template__benefit_type__in=benefit_types)
-    )
-    
-    return CustomerCoupon.objects.filter(filter_condition).count()
-
-def _get_customer_coupon_count_by_benefit_include_both_station(user, benefit_type, station):
-    """고객의 특정 주유소에서 특정 혜택 유형 쿠폰 개수 조회 (BOTH 타입 포함, 사용 가능한 것만)"""
-    from OilNote_StationApp.models import CustomerCoupon
-    from django.db.models import Q
-    
-    if benefit_type == 'DISCOUNT':
-        benefit_types = ['DISCOUNT', 'BOTH']
-    elif benefit_type == 'PRODUCT':
-        benefit_types = ['PRODUCT', 'BOTH']
-    else:
-        benefit_types = [benefit_type]
-    
-    # 두 템플릿 타입을 모두 고려한 필터링
-    template_filter = (
-        Q(coupon_template__benefit_type__in=benefit_types, coupon_template__station=station) |
-        Q(auto_coupon_template__benefit_type__in=benefit_types, auto_coupon_template__station=station)
-    )
-    
-    return CustomerCoupon.objects.filter(
-        customer=user,
-        status='AVAILABLE'
-    ).filter(template_filter).count()
-
 @csrf_exempt
 @login_required
 def use_coupon(request, coupon_id):
@@ -965,16 +533,14 @@ def use_coupon(request, coupon_id):
         from OilNote_StationApp.models import CustomerCoupon
         
         # 쿠폰 조회
-        coupon = CustomerCoupon.objects.get(
+        coupon = CustomerCoupon.objects.select_related(
+            'coupon_template', 'auto_coupon_template'
+        ).get(
             id=coupon_id,
             customer=request.user
         )
         
-        # 쿠폰 사용 가능 여부 확인
-        if not coupon.is_available():
-            return JsonResponse({'status': 'error', 'message': '사용할 수 없는 쿠폰입니다.'})
-        
-        # 쿠폰 사용 처리
+        # 쿠폰 사용 처리 (조건부 UPDATE - 사용 불가/만료/동시 사용 시 ValueError)
         coupon.use_coupon()
         
         return JsonResponse({
@@ -1002,6 +568,7 @@ def check_location_coupons(request):
         latitude = float(data.get('latitude'))
         longitude = float(data.get('longitude'))
         accuracy = float(data.get('accuracy', 0))
+        max_distance = 1000  # 1km 이내
         
         # 위치 정보 유효성 검사
         if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
@@ -1010,46 +577,19 @@ def check_location_coupons(request):
                 'message': '유효하지 않은 위치 정보입니다.'
             })
         
-        # 쿠폰을 발행할 수 있는 주유소 찾기 (위치 정보가 있는 주유소)
-        from OilNote_User.models import StationProfile
-        from OilNote_StationApp.models import Coupon
-        from math import radians, cos, sin, asin, sqrt
-        
-        # 모든 주유소 프로필 가져오기 (위치 정보가 있는 것만)
-        station_profiles = StationProfile.objects.filter(
-            latitude__isnull=False,
-            longitude__isnull=False
-        ).select_related('user')
-        
-        nearby_stations = []
-        max_distance = 1000  # 1km 이내
-        
-        for profile in station_profiles:
-            # 두 지점 간의 거리 계산 (Haversine 공식)
-            distance = calculate_distance(
-                latitude, longitude,
-                float(profile.latitude), float(profile.longitude)
-            )
-            
-            # 지정된 거리 이내인 경우만 추가
-            if distance <= max_distance:
-                # 해당 주유소의 사용 가능한 쿠폰 정보 조회
-                coupon_counts = Coupon.get_coupon_counts_by_type(profile.user)
-                
-                nearby_stations.append({
-                    'station_id': profile.user.id,
-                    'station_name': profile.station_name,
-                    'address': profile.address,
-                    'tid': profile.tid,
-                    'distance': round(distance),
-                    'latitude': float(profile.latitude),
-                    'longitude': float(profile.longitude),
-                    'coupon_counts': coupon_counts,
-                    'has_coupons': coupon_counts['total'] > 0
-                })
-        
-        # 거리순으로 정렬
-        nearby_stations.sort(key=lambda x: x['distance'])
+        # 경계 상자로 근처 주유소만 조회 후 거리 계산 (가까운 순)
+        from .services.station_geo import available_coupon_counts, find_nearby_stations
+
+        nearby_stations = find_nearby_stations(latitude, longitude, max_distance)
+
+        # 주유소별 사용 가능한 쿠폰 수 (쿼리 1회)
+        coupon_counts = available_coupon_counts(
+            request.user, [station['station_id'] for station in nearby_stations]
+        )
+        for station in nearby_stations:
+            station['distance'] = round(station['distance'])
+            station['coupon_counts'] = coupon_counts[station['station_id']]
+            station['has_coupons'] = station['coupon_counts']['total'] > 0
         
         return JsonResponse({
             'success': True,
@@ -1076,21 +616,6 @@ def check_location_coupons(request):
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """두 지점 간의 거리 계산 (Haversine 공식) - 미터 단위"""
-    # 지구 반지름 (미터)
-    R = 6371000
-    
-    # 라디안으로 변환
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    
-    # 좌표 차이
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    # Haversine 공식
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    
-    # 거리 계산 (미터)
-    distance = R * c
-    
-    return distance 
\ No newline at end of file
+    from .services.station_geo import haversine_distances
+
+    return float(haversine_distances(lat1, lon1, [lat2], [lon2])[0])
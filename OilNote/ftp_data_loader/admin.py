@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import FTPServerConfig, FTPDataLog, FTPDataSchedule
+from .models import FTPServerConfig, FTPDataLog, FTPDataSchedule, FTPFileManifest
 
 
 @admin.register(FTPServerConfig)
 class FTPServerConfigAdmin(admin.ModelAdmin):
-    list_display = ['name', 'host', 'port', 'username', 'is_active', 'created_at']
+    list_display = ['name', 'host', 'port', 'username', 'station', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'host', 'username']
     readonly_fields = ['created_at', 'updated_at']
@@ -15,6 +15,9 @@ class FTPServerConfigAdmin(admin.ModelAdmin):
         ('경로 설정', {
             'fields': ('remote_path', 'local_path', 'file_pattern')
         }),
+        ('매출 처리', {
+            'fields': ('station',)
+        }),
         ('상태', {
             'fields': ('is_active',)
         }),
@@ -27,16 +30,16 @@ class FTPServerConfigAdmin(admin.ModelAdmin):
 
 @admin.register(FTPDataLog)
 class FTPDataLogAdmin(admin.ModelAdmin):
-    list_display = ['filename', 'server_config', 'status', 'file_size', 'downloaded_at', 'created_at']
+    list_display = ['filename', 'server_config', 'status', 'file_size', 'processed_rows', 'downloaded_at', 'created_at']
     list_filter = ['status', 'server_config', 'downloaded_at', 'created_at']
     search_fields = ['filename', 'server_config__name']
-    readonly_fields = ['created_at', 'updated_at', 'downloaded_at', 'processed_at']
+    readonly_fields = ['created_at', 'updated_at', 'downloaded_at', 'processed_at', 'processed_rows', 'processing_seconds']
     fieldsets = (
         ('파일 정보', {
             'fields': ('server_config', 'filename', 'remote_path', 'local_path', 'file_size')
         }),
         ('상태 정보', {
-            'fields': ('status', 'error_message')
+            'fields': ('status', 'error_message', 'processed_rows', 'processing_seconds')
         }),
         ('시간 정보', {
             'fields': ('downloaded_at', 'processed_at', 'created_at', 'updated_at'),
@@ -45,12 +48,24 @@ class FTPDataLogAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(FTPFileManifest)
+class FTPFileManifestAdmin(admin.ModelAdmin):
+    """다운로드 완료 파일 목록 (삭제하면 다음 증분 동기화 때 다시 받음)"""
+    list_display = ['filename', 'server_config', 'remote_path', 'file_size', 'modified_at', 'downloaded_at']
+    list_filter = ['server_config']
+    search_fields = ['filename', 'server_config__name']
+    readonly_fields = ['server_config', 'remote_path', 'filename', 'file_size', 'modified_at', 'downloaded_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(FTPDataSchedule)
 class FTPDataScheduleAdmin(admin.ModelAdmin):
-    list_display = ['name', 'server_config', 'schedule_type', 'is_active', 'last_run', 'next_run']
+    list_display = ['name', 'server_config', 'schedule_type', 'is_active', 'last_run', 'next_run', 'last_duration']
     list_filter = ['schedule_type', 'is_active', 'last_run', 'created_at']
     search_fields = ['name', 'server_config__name']
-    readonly_fields = ['last_run', 'next_run', 'created_at', 'updated_at']
+    readonly_fields = ['last_run', 'next_run', 'last_duration', 'last_downloaded', 'last_error', 'created_at', 'updated_at']
     fieldsets = (
         ('기본 정보', {
             'fields': ('name', 'server_config')
@@ -62,7 +77,7 @@ class FTPDataScheduleAdmin(admin.ModelAdmin):
             'fields': ('is_active',)
         }),
         ('실행 정보', {
-            'fields': ('last_run', 'next_run'),
+            'fields': ('last_run', 'next_run', 'last_duration', 'last_downloaded', 'last_error'),
             'classes': ('collapse',)
         }),
         ('시간 정보', {
@@ -70,3 +85,9 @@ class FTPDataScheduleAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+    def save_model(self, request, obj, form, change):
+        # 주기를 바꾸면 다음 실행 시각은 스케줄러가 새로 계산
+        if {'schedule_type', 'cron_expression', 'is_active'} & set(form.changed_data):
+            obj.next_run = None
+        super().save_model(request, obj, form, change)
@@ -0,0 +1,131 @@
+"""
+FTP 다운로드 벤치마크
+
+로컬 pyftpdlib 서버(테스트 전용 의존성)에 파일 N개를 올려 두고 순차 다운로드
+(download_all_files)와 동시 다운로드(ConcurrentFTPDownloader)의 처리량을 비교합니다.
+--latency-ms 로 RETR 마다 서버 응답 지연을 넣어 원격 주유소 FTP 를 흉내 냅니다.
+측정 후 임시 서버 설정, 로그, 파일은 삭제합니다.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ftp_data_loader.models import FTPServerConfig
+from ftp_data_loader.services import ConcurrentFTPDownloader, FTPDataService
+
+
+class Command(BaseCommand):
+    help = '로컬 FTP 서버로 순차/동시 다운로드 처리량 측정 (pyftpdlib 필요)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=1000, help='파일 수 (기본값: 1000)')
+        parser.add_argument('--size', type=int, default=20 * 1024, help='파일 크기(바이트, 기본값: 20KB)')
+        parser.add_argument('--workers', type=int, default=8, help='동시 다운로드 연결 수 (기본값: 8)')
+        parser.add_argument('--latency-ms', type=int, default=20, help='RETR 응답 지연(ms, 기본값: 20)')
+        parser.add_argument('--skip-serial', action='store_true', help='순차 다운로드 측정 생략')
+
+    def _start_server(self, root, latency):
+        try:
+            from pyftpdlib.authorizers import DummyAuthorizer
+            from pyftpdlib.handlers import FTPHandler
+            from pyftpdlib.servers import ThreadedFTPServer
+        except ImportError:
+            raise CommandError('pyftpdlib 이 필요합니다: pip install pyftpdlib')
+
+        class SlowRetrHandler(FTPHandler):
+            def ftp_RETR(self, file):
+                time.sleep(latency)
+                return super().ftp_RETR(file)
+
+        authorizer = DummyAuthorizer()
+        authorizer.add_user('benchmark', 'benchmark', root, perm='elr')
+        SlowRetrHandler.authorizer = authorizer
+        SlowRetrHandler.banner = 'benchmark'
+        server = ThreadedFTPServer(('127.0.0.1', 0), SlowRetrHandler)
+        thread = threading.Thread(target=server.serve_forever, kwargs={'handle_exit': False}, daemon=True)
+        thread.start()
+        return server, server.socket.getsockname()[1]
+
+    def _check(self, directory, files, size):
+        names = [name for name in os.listdir(directory) if name.endswith('.xlsx')] if os.path.isdir(directory) else []
+        complete = sum(1 for name in names if os.path.getsize(os.path.join(directory, name)) == size)
+        return complete == files, complete
+
+    def _report(self, label, count, elapsed, size):
+        self.stdout.write(
+            f'{label}: {count:,}개 {elapsed:.2f}초 | {count / elapsed:,.0f}파일/초 | '
+            f'{count * size / elapsed / 1024 / 1024:,.1f}MB/초'
+        )
+
+    def handle(self, *args, **options):
+        if options['files'] < 1 or options['workers'] < 1:
+            raise CommandError('--files 와 --workers 는 1 이상이어야 합니다.')
+
+        # 파일마다 남는 다운로드 로그가 측정 출력을 덮지 않도록
+        logging.getLogger('pyftpdlib').setLevel(logging.WARNING)
+        logging.getLogger('ftp_data_loader.services').setLevel(logging.WARNING)
+
+        work_dir = tempfile.mkdtemp(prefix='ftp_benchmark_')
+        serve_dir = os.path.join(work_dir, 'remote')
+        os.makedirs(serve_dir)
+        payload = os.urandom(options['size'])
+        for index in range(options['files']):
+            with open(os.path.join(serve_dir, f'sales_{index:05d}.xlsx'), 'wb') as f:
+                f.write(payload)
+
+        server, port = self._start_server(serve_dir, options['latency_ms'] / 1000)
+        config = FTPServerConfig.objects.create(
+            name='다운로드 벤치마크',
+            host='127.0.0.1',
+            port=port,
+            username='benchmark',
+            password='benchmark',
+            remote_path='/',
+            local_path=os.path.join(work_dir, 'serial'),
+            file_pattern='*.xlsx',
+            is_active=False,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"=== FTP 다운로드 벤치마크 (파일 {options['files']:,}개 × {options['size']:,}B, "
+            f"RETR 지연 {options['latency_ms']}ms, 동시 연결 {options['workers']}개) ==="
+        ))
+
+        try:
+            serial_elapsed = None
+            if not options['skip_serial']:
+                started = time.perf_counter()
+                service = FTPDataService(config)
+                service.download_all_files()
+                service.disconnect()
+                serial_elapsed = time.perf_counter() - started
+                ok, complete = self._check(config.local_path, options['files'], options['size'])
+                self._report('순차 다운로드', complete, serial_elapsed, options['size'])
+                if not ok:
+                    raise CommandError(f'순차 다운로드 파일 수 불일치: {complete}/{options["files"]}')
+
+            config.local_path = os.path.join(work_dir, 'concurrent')
+            config.save()
+            started = time.perf_counter()
+            ConcurrentFTPDownloader(
+                max_workers=options['workers'], workers_per_server=options['workers']
+            ).run([config])
+            concurrent_elapsed = time.perf_counter() - started
+            ok, complete = self._check(config.local_path, options['files'], options['size'])
+            self._report('동시 다운로드', complete, concurrent_elapsed, options['size'])
+            if not ok:
+                raise CommandError(f'동시 다운로드 파일 수 불일치: {complete}/{options["files"]}')
+
+            failed = config.ftpdatalog_set.filter(status='failed').count()
+            if serial_elapsed:
+                self.stdout.write(self.style.SUCCESS(
+                    f'속도 향상: {serial_elapsed / concurrent_elapsed:.1f}배 (실패 로그 {failed}건)'
+                ))
+        finally:
+            server.close_all()
+            config.delete()
+            shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,79 @@
+"""
+FTP 스케줄러 데몬
+
+FTPDataSchedule 의 실행 시각이 된 스케줄을 가져가 증분 다운로드 후 매출 데이터로 저장합니다.
+스케줄은 행 잠금으로 가져가므로 여러 서버에서 함께 실행해도 됩니다.
+SIGTERM/SIGINT 를 받으면 진행 중인 실행을 마치고 종료합니다.
+실행 예시 (systemd/supervisor 등으로 상시 실행):
+/path/to/python /path/to/manage.py run_ftp_scheduler
+"""
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from ftp_data_loader.services import FTPScheduler
+
+
+class Command(BaseCommand):
+    help = 'FTP 데이터 스케줄 실행 (상시 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=getattr(settings, 'FTP_SCHEDULER_POLL_SECONDS', 30),
+            help='실행 시각 확인 주기(초) (기본값: FTP_SCHEDULER_POLL_SECONDS)'
+        )
+        parser.add_argument(
+            '--max-concurrent',
+            type=int,
+            help='동시에 실행할 서버 수 (기본값: FTP_SCHEDULER_MAX_CONCURRENT)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='실행 시각이 된 스케줄을 한 번만 처리하고 종료'
+        )
+
+    def handle(self, *args, **options):
+        if options['poll'] <= 0:
+            raise CommandError('--poll 은 0보다 커야 합니다.')
+        if options['max_concurrent'] is not None and options['max_concurrent'] < 1:
+            raise CommandError('--max-concurrent 는 1 이상이어야 합니다.')
+
+        scheduler = FTPScheduler(max_concurrent=options['max_concurrent'])
+        stop = threading.Event()
+        if not options['once']:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stop.set())
+            self.stdout.write(self.style.SUCCESS(f"=== FTP 스케줄러 시작 (확인 주기 {options['poll']:g}초) ==="))
+
+        while not stop.is_set():
+            try:
+                for result in scheduler.tick():
+                    self.write_result(result)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'❌ 스케줄 처리 중 오류: {str(e)}'))
+            finally:
+                close_old_connections()
+            if options['once']:
+                break
+            stop.wait(options['poll'])
+
+        if not options['once']:
+            self.stdout.write(self.style.SUCCESS('=== FTP 스케줄러 종료 ==='))
+
+    def write_result(self, result):
+        schedule = result['schedule']
+        if result['error']:
+            self.stdout.write(self.style.ERROR(
+                f"❌ {schedule.name}: {result['error']} ({result['duration']:.1f}초)"
+            ))
+            return
+        self.stdout.write(
+            f"✅ {schedule.name}: {result['downloaded']}개 다운로드, {result['processed']}개 처리, "
+            f"{result['rows']}행 저장 ({result['duration']:.1f}초, 다음 실행 {schedule.next_run:%Y-%m-%d %H:%M:%S})"
+        )
@@ -0,0 +1,79 @@
+"""
+FTP 증분 동기화
+
+활성화된 FTP 서버에서 다운로드 완료 목록(FTPFileManifest)에 없거나 크기/수정일시가
+바뀐 파일만 받습니다. 목록은 MLSD(미지원 시 LIST) 한 번으로 조회합니다.
+받은 파일은 이어서 주유소 매출 데이터로 저장합니다 (--no-process 로 생략).
+--stream 은 파일을 로컬에 쓰기 전에 메모리에서 바로 매출 데이터로 저장합니다.
+크론탭 설정 예시:
+10 0 * * * /path/to/python /path/to/manage.py sync_ftp_files
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ftp_data_loader.models import FTPServerConfig
+from ftp_data_loader.services import ConcurrentFTPDownloader, FTPDataService, SalesIngestPipeline
+
+
+class Command(BaseCommand):
+    help = 'FTP 서버에서 새로 생겼거나 바뀐 파일만 다운로드'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server-id', type=int, help='특정 FTP 설정만 처리 (선택사항)')
+        parser.add_argument('--full', action='store_true', help='다운로드 완료 목록을 무시하고 전체 다운로드')
+        parser.add_argument('--serial', action='store_true', help='서버/파일을 하나씩 순서대로 다운로드')
+        parser.add_argument('--workers', type=int, help='서버당 동시 연결 수 (기본값: FTP_DOWNLOAD_WORKERS_PER_SERVER)')
+        parser.add_argument('--no-process', action='store_true', help='다운로드만 하고 매출 데이터 저장은 생략')
+        parser.add_argument('--stream', action='store_true', help='받는 즉시 메모리에서 매출 데이터로 저장 (보관본은 별도 스레드)')
+
+    def handle(self, *args, **options):
+        configs = FTPServerConfig.objects.filter(is_active=True)
+        if options['server_id']:
+            configs = FTPServerConfig.objects.filter(id=options['server_id'])
+        configs = list(configs)
+        if not configs:
+            raise CommandError('처리할 FTP 설정이 없습니다.')
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers 는 1 이상이어야 합니다.')
+        if options['stream'] and (options['serial'] or options['no_process']):
+            raise CommandError('--stream 은 --serial, --no-process 와 함께 쓸 수 없습니다.')
+
+        incremental = not options['full']
+        self.stdout.write(self.style.SUCCESS(
+            f"=== FTP {'증분' if incremental else '전체'} 동기화 시작 (서버 {len(configs)}개) ==="
+        ))
+        started = time.perf_counter()
+
+        if options['serial']:
+            results = {}
+            for config in configs:
+                service = FTPDataService(config)
+                try:
+                    results[config.id] = service.download_all_files(incremental=incremental)
+                finally:
+                    service.disconnect()
+        else:
+            results = ConcurrentFTPDownloader(
+                workers_per_server=options['workers'], incremental=incremental, stream=options['stream']
+            ).run(configs)
+
+        total = 0
+        for config in configs:
+            downloaded = results.get(config.id, [])
+            total += len(downloaded)
+            self.stdout.write(f'✅ {config.name}: {len(downloaded)}개 파일 다운로드')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🎉 동기화 완료: {total}개 파일 ({time.perf_counter() - started:.1f}초)'
+        ))
+
+        if options['no_process']:
+            return
+        started = time.perf_counter()
+        result = SalesIngestPipeline().run(configs)
+        style = self.style.SUCCESS if not result['failed'] else self.style.WARNING
+        self.stdout.write(style(
+            f"📊 매출 처리: {result['processed']}개 파일, {result['rows']}행 저장, "
+            f"{result['failed']}개 실패 ({time.perf_counter() - started:.1f}초)"
+        ))
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ftp_data_loader', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FTPFileManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('remote_path', models.CharField(max_length=500, verbose_name='원격 경로')),
+                ('filename', models.CharField(max_length=255, verbose_name='파일명')),
+                ('file_size', models.BigIntegerField(blank=True, null=True, verbose_name='파일 크기')),
+                ('modified_at', models.DateTimeField(blank=True, null=True, verbose_name='원격 수정일시')),
+                ('downloaded_at', models.DateTimeField(verbose_name='다운로드 완료일')),
+                ('server_config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='manifest', to='ftp_data_loader.ftpserverconfig', verbose_name='FTP 설정')),
+            ],
+            options={
+                'verbose_name': 'FTP 다운로드 파일 목록',
+                'verbose_name_plural': 'FTP 다운로드 파일 목록',
+                'unique_together': {('server_config', 'remote_path', 'filename')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ftp_data_loader', '0002_ftpfilemanifest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ftpdatalog',
+            name='processed_rows',
+            field=models.IntegerField(blank=True, null=True, verbose_name='저장 행 수'),
+        ),
+        migrations.AddField(
+            model_name='ftpdatalog',
+            name='processing_seconds',
+            field=models.FloatField(blank=True, null=True, verbose_name='처리 시간(초)'),
+        ),
+        migrations.AddField(
+            model_name='ftpserverconfig',
+            name='station',
+            field=models.ForeignKey(blank=True, help_text='받은 매출 파일을 저장할 주유소 (비우면 파일명에 든 TID 로 찾음)', limit_choices_to={'user_type': 'STATION'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ftp_servers', to=settings.AUTH_USER_MODEL, verbose_name='주유소'),
+        ),
+        migrations.AlterField(
+            model_name='ftpdatalog',
+            name='status',
+            field=models.CharField(choices=[('pending', '대기중'), ('downloading', '다운로드 중'), ('completed', '완료'), ('failed', '실패'), ('processing', '처리 중'), ('processed', '처리 완료')], default='pending', max_length=20, verbose_name='상태'),
+        ),
+        migrations.AddIndex(
+            model_name='ftpdatalog',
+            index=models.Index(fields=['status', 'processed_at'], name='ftp_data_lo_status_52a5d5_idx'),
+        ),
+    ]
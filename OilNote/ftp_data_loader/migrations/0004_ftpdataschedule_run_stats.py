@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ftp_data_loader', '0003_ftp_sales_ingest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ftpdataschedule',
+            name='last_downloaded',
+            field=models.IntegerField(blank=True, null=True, verbose_name='마지막 다운로드 파일 수'),
+        ),
+        migrations.AddField(
+            model_name='ftpdataschedule',
+            name='last_duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='마지막 실행 시간(초)'),
+        ),
+        migrations.AddField(
+            model_name='ftpdataschedule',
+            name='last_error',
+            field=models.TextField(blank=True, null=True, verbose_name='마지막 오류'),
+        ),
+        migrations.AddIndex(
+            model_name='ftpdataschedule',
+            index=models.Index(fields=['is_active', 'next_run'], name='ftp_data_lo_is_acti_a6ca46_idx'),
+        ),
+    ]
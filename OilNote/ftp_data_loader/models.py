@@ -1,4 +1,5 @@
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models
 from django.utils import timezone
 from django.contrib.auth.models import User
 
@@ -13,6 +14,16 @@ class FTPServerConfig(models.Model):
     remote_path = models.CharField(max_length=500, verbose_name="원격 경로", default="/")
     local_path = models.CharField(max_length=500, verbose_name="로컬 저장 경로")
     file_pattern = models.CharField(max_length=200, verbose_name="파일 패턴", default="*.xlsx")
+    station = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ftp_servers',
+        limit_choices_to={'user_type': 'STATION'},
+        verbose_name="주유소",
+        help_text="받은 매출 파일을 저장할 주유소 (비우면 파일명에 든 TID 로 찾음)"
+    )
     is_active = models.BooleanField(default=True, verbose_name="활성화")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
@@ -33,6 +44,7 @@ class FTPDataLog(models.Model):
         ('completed', '완료'),
         ('failed', '실패'),
         ('processing', '처리 중'),
+        ('processed', '처리 완료'),
     ]
     
     server_config = models.ForeignKey(FTPServerConfig, on_delete=models.CASCADE, verbose_name="FTP 설정")
@@ -44,6 +56,8 @@ class FTPDataLog(models.Model):
     error_message = models.TextField(blank=True, null=True, verbose_name="오류 메시지")
     downloaded_at = models.DateTimeField(null=True, blank=True, verbose_name="다운로드 완료일")
     processed_at = models.DateTimeField(null=True, blank=True, verbose_name="처리 완료일")
+    processed_rows = models.IntegerField(null=True, blank=True, verbose_name="저장 행 수")
+    processing_seconds = models.FloatField(null=True, blank=True, verbose_name="처리 시간(초)")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
     
@@ -51,11 +65,75 @@ class FTPDataLog(models.Model):
         verbose_name = "FTP 데이터 로그"
         verbose_name_plural = "FTP 데이터 로그"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'processed_at']),
+        ]
     
     def __str__(self):
         return f"{self.filename} - {self.get_status_display()}"
 
 
+class FTPFileManifest(models.Model):
+    """서버별 다운로드 완료 파일 목록 (증분 동기화 비교용)"""
+    server_config = models.ForeignKey(FTPServerConfig, on_delete=models.CASCADE, related_name='manifest', verbose_name="FTP 설정")
+    remote_path = models.CharField(max_length=500, verbose_name="원격 경로")
+    filename = models.CharField(max_length=255, verbose_name="파일명")
+    file_size = models.BigIntegerField(null=True, blank=True, verbose_name="파일 크기")
+    modified_at = models.DateTimeField(null=True, blank=True, verbose_name="원격 수정일시")
+    downloaded_at = models.DateTimeField(verbose_name="다운로드 완료일")
+    
+    class Meta:
+        verbose_name = "FTP 다운로드 파일 목록"
+        verbose_name_plural = "FTP 다운로드 파일 목록"
+        unique_together = ['server_config', 'remote_path', 'filename']
+    
+    def __str__(self):
+        return f"{self.server_config.name}: {self.remote_path}/{self.filename}"
+    
+    @classmethod
+    def pending_files(cls, server_config, files):
+        """
+        목록 중 새로 생겼거나 바뀐 파일만 반환
+
+        크기가 다르거나, 양쪽 모두 수정일시가 있고 서로 다르면 바뀐 것으로 본다.
+        """
+        if not files:
+            return []
+        known = {
+            (remote_path, filename): (file_size, modified_at)
+            for remote_path, filename, file_size, modified_at in cls.objects.filter(
+                server_config=server_config,
+                remote_path__in={file_info['path'] for file_info in files}
+            ).values_list('remote_path', 'filename', 'file_size', 'modified_at')
+        }
+        pending = []
+        for file_info in files:
+            previous = known.get((file_info['path'], file_info['name']))
+            if previous is None:
+                pending.append(file_info)
+                continue
+            size, modified = previous
+            remote_modified = file_info.get('modified')
+            if size != file_info['size'] or (modified and remote_modified and modified != remote_modified):
+                pending.append(file_info)
+        return pending
+    
+    @classmethod
+    def record(cls, server_config, file_info):
+        """다운로드 완료 파일 기록 (동시 다운로드 작업자에서 호출되므로 잠금 없이 UPDATE 후 없으면 INSERT)"""
+        key = {'server_config': server_config, 'remote_path': file_info['path'], 'filename': file_info['name']}
+        values = {
+            'file_size': file_info['size'],
+            'modified_at': file_info.get('modified'),
+            'downloaded_at': timezone.now(),
+        }
+        if not cls.objects.filter(**key).update(**values):
+            try:
+                cls.objects.create(**key, **values)
+            except IntegrityError:
+                cls.objects.filter(**key).update(**values)
+
+
 class FTPDataSchedule(models.Model):
     """FTP 데이터 스케줄 모델"""
     SCHEDULE_CHOICES = [
@@ -73,12 +151,30 @@ class FTPDataSchedule(models.Model):
     is_active = models.BooleanField(default=True, verbose_name="활성화")
     last_run = models.DateTimeField(null=True, blank=True, verbose_name="마지막 실행")
     next_run = models.DateTimeField(null=True, blank=True, verbose_name="다음 실행")
+    last_duration = models.FloatField(null=True, blank=True, verbose_name="마지막 실행 시간(초)")
+    last_downloaded = models.IntegerField(null=True, blank=True, verbose_name="마지막 다운로드 파일 수")
+    last_error = models.TextField(blank=True, null=True, verbose_name="마지막 오류")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
     
     class Meta:
         verbose_name = "FTP 데이터 스케줄"
         verbose_name_plural = "FTP 데이터 스케줄"
+        indexes = [
+            models.Index(fields=['is_active', 'next_run']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.get_schedule_type_display()}"
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .services import CronExpression
+
+        if self.schedule_type == 'custom':
+            if not self.cron_expression:
+                raise ValidationError({'cron_expression': '사용자 정의 스케줄은 Cron 표현식이 필요합니다.'})
+            try:
+                CronExpression(self.cron_expression)
+            except ValueError as e:
+                raise ValidationError({'cron_expression': str(e)})
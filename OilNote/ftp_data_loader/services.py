@@ -1,19 +1,105 @@
 import os
 import logging
-from ftplib import FTP, FTP_TLS
-from datetime import datetime
+import queue
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from ftplib import FTP, FTP_TLS, all_errors, error_perm
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
 from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
 from django.utils import timezone
-from .models import FTPServerConfig, FTPDataLog
+from .models import FTPServerConfig, FTPDataLog, FTPDataSchedule, FTPFileManifest
 
 logger = logging.getLogger(__name__)
 
 
+_UNIX_LIST_LINE = re.compile(
+    r'^(?P<type>[-dlbcps])\S{9}\S*\s+\d+\s+\S+\s+\S+\s+(?P<size>\d+)\s+'
+    r'(?P<month>[A-Za-z]{3})\s+(?P<day>\d{1,2})\s+(?P<time_or_year>\d{1,2}:\d{2}|\d{4})\s+(?P<name>.+)$'
+)
+_DOS_LIST_LINE = re.compile(
+    r'^(?P<date>\d{2}-\d{2}-\d{2}(?:\d{2})?)\s+(?P<time>\d{1,2}:\d{2}[AaPp][Mm])\s+'
+    r'(?P<size><DIR>|\d+)\s+(?P<name>.+)$'
+)
+_MONTHS = {name: index for index, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1
+)}
+
+
+def parse_mlsd_modify(value):
+    """MLSD modify 값(YYYYMMDDHHMMSS[.sss], UTC) → 초 단위 aware datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:14], '%Y%m%d%H%M%S').replace(tzinfo=dt_timezone.utc)
+    except ValueError:
+        return None
+
+
+def to_db_datetime(value):
+    """UTC 원격 시각 → DB 저장용 (USE_TZ=False 이면 현재 시간대의 naive datetime)"""
+    if value is None or settings.USE_TZ:
+        return value
+    return timezone.make_naive(value)
+
+
+def parse_list_line(line, now=None):
+    """
+    LIST 한 줄 파싱 (유닉스 ls -l 형식, IIS/DOS 형식)
+
+    유닉스 형식은 최근 파일에 연도가 없으므로 미래가 되지 않는 연도로 추정한다.
+    서버 시간대를 알 수 없어 UTC 로 간주한다.
+
+    Returns:
+        dict: name, size, modified, is_dir (해석할 수 없으면 None)
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    match = _UNIX_LIST_LINE.match(line)
+    if match:
+        month = _MONTHS.get(match['month'].lower())
+        if month is None:
+            return None
+        day = int(match['day'])
+        if ':' in match['time_or_year']:
+            hour, minute = map(int, match['time_or_year'].split(':'))
+            modified = datetime(now.year, month, day, hour, minute, tzinfo=dt_timezone.utc)
+            if modified > now + timedelta(days=1):
+                modified = modified.replace(year=now.year - 1)
+        else:
+            modified = datetime(int(match['time_or_year']), month, day, tzinfo=dt_timezone.utc)
+        name = match['name']
+        if match['type'] == 'l' and ' -> ' in name:
+            name = name.split(' -> ', 1)[0]
+        return {'name': name, 'size': int(match['size']), 'modified': modified, 'is_dir': match['type'] == 'd'}
+
+    match = _DOS_LIST_LINE.match(line)
+    if match:
+        date_format = '%m-%d-%Y' if len(match['date']) == 10 else '%m-%d-%y'
+        modified = datetime.strptime(f"{match['date']} {match['time'].upper()}", f'{date_format} %I:%M%p')
+        is_dir = match['size'].upper() == '<DIR>'
+        return {
+            'name': match['name'],
+            'size': None if is_dir else int(match['size']),
+            'modified': modified.replace(tzinfo=dt_timezone.utc),
+            'is_dir': is_dir,
+        }
+    return None
+
+
 class FTPDataService:
     """FTP 데이터 서비스 클래스"""
     
-    def __init__(self, server_config: FTPServerConfig):
+    def __init__(self, server_config: FTPServerConfig, timeout=30):
         self.server_config = server_config
+        self.timeout = timeout
         self.ftp = None
     
     def connect(self):
@@ -21,7 +107,7 @@ class FTPDataService:
         try:
             # 먼저 일반 FTP로 시도
             self.ftp = FTP()
-            self.ftp.connect(str(self.server_config.host), int(self.server_config.port), timeout=30)
+            self.ftp.connect(str(self.server_config.host), int(self.server_config.port), timeout=self.timeout)
             
             # 패시브 모드 설정
             self.ftp.set_pasv(True)
@@ -53,7 +139,7 @@ class FTPDataService:
                 
                 try:
                     self.ftp = FTP_TLS()
-                    self.ftp.connect(str(self.server_config.host), int(self.server_config.port), timeout=30)
+                    self.ftp.connect(str(self.server_config.host), int(self.server_config.port), timeout=self.timeout)
                     
                     # TLS 보안 설정
                     self.ftp.auth()
@@ -96,42 +182,102 @@ class FTPDataService:
                 logger.error(f"FTP 연결 해제 실패: {str(e)}")
     
     def list_files(self, remote_path=None):
-        """원격 디렉토리의 파일 목록 조회"""
+        """
+        원격 디렉토리의 파일 목록 조회
+
+        MLSD 한 번으로 크기/수정일시를 함께 받고, 지원하지 않는 서버는 LIST 결과를 파싱한다.
+        둘 다 안 되면 NLST 후 파일마다 SIZE 를 조회한다. (modified 는 알 수 없으면 None)
+
+        Returns:
+            list: [{'name', 'size', 'path', 'modified'}]
+        """
         if not self.ftp:
             if not self.connect():
                 return []
         
         try:
             path = remote_path or str(self.server_config.remote_path)
-            files = []
             self.ftp.cwd(path)
-            file_list = self.ftp.nlst()
+            # SIZE 는 바이너리 모드에서만 허용하는 서버가 있음
+            self.ftp.voidcmd('TYPE I')
             
-            for filename in file_list:
-                if self._matches_pattern(filename):
-                    try:
-                        size = self.ftp.size(filename)
-                        files.append({
-                            'name': filename,
-                            'size': size,
-                            'path': path
-                        })
-                    except Exception as e:
-                        logger.warning(f"파일 정보 조회 실패: {filename} - {str(e)}")
-                        continue
+            entries = self._list_mlsd()
+            if entries is None:
+                entries = self._list_long()
+            if entries is None:
+                return self._list_with_size(path)
             
-            return files
+            return [
+                {'name': name, 'size': size, 'path': path, 'modified': to_db_datetime(modified)}
+                for name, size, modified in entries
+                if self._matches_pattern(name)
+            ]
         except Exception as e:
             logger.error(f"파일 목록 조회 실패: {str(e)}")
             return []
     
+    def _list_mlsd(self):
+        """MLSD 목록 [(파일명, 크기, 수정일시)] (미지원 서버는 None)"""
+        try:
+            lines = self.ftp.mlsd(facts=['type', 'size', 'modify'])
+            entries = []
+            for name, facts in lines:
+                if facts.get('type', 'file') != 'file':
+                    continue
+                size = int(facts['size']) if facts.get('size', '').isdigit() else None
+                entries.append((name, size, parse_mlsd_modify(facts.get('modify'))))
+            return entries
+        except error_perm as e:
+            logger.info(f"MLSD 미지원, LIST 로 조회: {self.server_config.host} - {str(e)}")
+            return None
+    
+    def _list_long(self):
+        """LIST 결과 파싱 [(파일명, 크기, 수정일시)] (형식을 알 수 없으면 None)"""
+        lines = []
+        try:
+            self.ftp.retrlines('LIST', lines.append)
+        except error_perm as e:
+            logger.info(f"LIST 실패, NLST 로 조회: {self.server_config.host} - {str(e)}")
+            return None
+        
+        entries = []
+        for line in lines:
+            if not line.strip() or line.startswith('total '):
+                continue
+            parsed = parse_list_line(line)
+            if parsed is None:
+                logger.info(f"LIST 형식 해석 불가, NLST 로 조회: {self.server_config.host} - {line}")
+                return None
+            if parsed['is_dir']:
+                continue
+            entries.append((parsed['name'], parsed['size'], parsed['modified']))
+        return entries
+    
+    def _list_with_size(self, path):
+        """NLST 후 파일마다 SIZE 조회 (MLSD/LIST 를 쓸 수 없는 서버)"""
+        files = []
+        for filename in self.ftp.nlst():
+            if self._matches_pattern(filename):
+                try:
+                    size = self.ftp.size(filename)
+                    files.append({
+                        'name': filename,
+                        'size': size,
+                        'path': path,
+                        'modified': None
+                    })
+                except Exception as e:
+                    logger.warning(f"파일 정보 조회 실패: {filename} - {str(e)}")
+                    continue
+        return files
+    
     def _matches_pattern(self, filename):
         """파일명이 패턴과 일치하는지 확인"""
         import fnmatch
         return fnmatch.fnmatch(filename, str(self.server_config.file_pattern))
     
-    def download_file(self, remote_filename, local_filename=None):
-        """파일 다운로드"""
+    def download_file(self, remote_filename, local_filename=None, size=None, modified=None):
+        """파일 다운로드 (.part 로 받아 크기 확인 후 이름 변경, 남은 .part 는 이어받기)"""
         if not self.ftp:
             if not self.connect():
                 return False
@@ -144,12 +290,8 @@ class FTPDataService:
                     remote_filename
                 )
             
-            # 로컬 디렉토리 생성
-            os.makedirs(os.path.dirname(local_filename), exist_ok=True)
-            
             # 파일 다운로드
-            with open(local_filename, 'wb') as local_file:
-                self.ftp.retrbinary(f'RETR {remote_filename}', local_file.write)
+            retrieve_file(self.ftp, remote_filename, local_filename, size=size, modified=modified)
             
             logger.info(f"파일 다운로드 완료: {remote_filename} -> {local_filename}")
             return True
@@ -157,9 +299,16 @@ class FTPDataService:
             logger.error(f"파일 다운로드 실패: {remote_filename} - {str(e)}")
             return False
     
-    def download_all_files(self):
-        """모든 파일 다운로드"""
+    def download_all_files(self, incremental=False):
+        """
+        모든 파일 다운로드
+
+        incremental=True 이면 다운로드 완료 목록(FTPFileManifest)과 비교해 새로 생겼거나
+        바뀐 파일만 받는다.
+        """
         files = self.list_files()
+        if incremental:
+            files = FTPFileManifest.pending_files(self.server_config, files)
         downloaded_files = []
         
         for file_info in files:
@@ -175,10 +324,11 @@ class FTPDataService:
                 )
                 
                 # 파일 다운로드
-                if self.download_file(file_info['name']):
+                if self.download_file(file_info['name'], size=file_info['size'], modified=file_info.get('modified')):
                     log_entry.status = 'completed'
                     log_entry.downloaded_at = timezone.now()
                     log_entry.save()
+                    FTPFileManifest.record(self.server_config, file_info)
                     downloaded_files.append(file_info['name'])
                     logger.info(f"파일 다운로드 완료: {file_info['name']}")
                 else:
@@ -193,25 +343,830 @@ class FTPDataService:
         
         return downloaded_files
     
-    def process_downloaded_files(self):
-        """다운로드된 파일 처리"""
-        # 여기에 파일 처리 로직을 추가할 수 있습니다
-        # 예: 엑셀 파일 분석, 데이터베이스 저장 등
-        pass
+    def download_all_files_concurrent(self, workers=None, incremental=False):
+        """모든 파일을 로그인된 연결 여러 개로 동시에 다운로드 (incremental: 새/변경 파일만)"""
+        downloader = ConcurrentFTPDownloader(workers_per_server=workers, incremental=incremental)
+        return downloader.run([self.server_config]).get(self.server_config.id, [])
+    
+    def process_downloaded_files(self, workers=None):
+        """다운로드된 파일을 매출 데이터로 저장 (처리 결과: SalesIngestPipeline.run 참고)"""
+        return SalesIngestPipeline(max_workers=workers).run([self.server_config])
+
+
+class FTPConnectionError(Exception):
+    """FTP/FTPS 연결 또는 로그인 실패"""
+
+
+class FTPConnectionPool:
+    """서버 하나에 대한 로그인된 FTP/FTPS 연결 풀 (최대 size 개)"""
+
+    def __init__(self, server_config, size, timeout=30):
+        self.server_config = server_config
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def adopt(self, ftp):
+        """이미 로그인된 연결을 유휴 연결로 등록 (파일 목록 조회에 쓴 연결 재사용)"""
+        if ftp is not None:
+            self._idle.put(ftp)
+
+    @contextmanager
+    def connection(self):
+        """
+        연결 하나 대여
+
+        사용 중 예외가 나면 그 연결은 상태를 알 수 없으므로 닫고 버린다.
+        """
+        self._slots.acquire()
+        ftp = None
+        try:
+            ftp = self._checkout()
+            yield ftp
+        except Exception:
+            self._discard(ftp)
+            ftp = None
+            raise
+        finally:
+            if ftp is not None:
+                self._idle.put(ftp)
+            self._slots.release()
+
+    def _checkout(self):
+        while True:
+            try:
+                ftp = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                ftp.voidcmd('NOOP')
+                return ftp
+            except all_errors:
+                self._discard(ftp)
+
+        service = FTPDataService(self.server_config, timeout=self.timeout)
+        if not service.connect():
+            raise FTPConnectionError(f'FTP 연결 실패: {self.server_config.host}:{self.server_config.port}')
+        return service.ftp
+
+    def _discard(self, ftp):
+        if ftp is None:
+            return
+        try:
+            ftp.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """유휴 연결 모두 종료"""
+        while True:
+            try:
+                ftp = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                ftp.quit()
+            except all_errors:
+                self._discard(ftp)
+
+
+# REST 명령 미지원 응답 (문법 오류/미구현/파라미터 미구현)
+_REST_UNSUPPORTED_CODES = ('500', '501', '502', '504')
+PART_SUFFIX = '.part'
+
+
+class FTPIncompleteTransfer(Exception):
+    """받은 크기가 원격 파일 크기와 다름 (전송 중 끊김 등)"""
+
+
+def _remote_size(ftp, remote_filename):
+    try:
+        ftp.voidcmd('TYPE I')
+        size = ftp.size(remote_filename)
+    except all_errors:
+        return None
+    return int(size) if size is not None else None
+
+
+def retrieve_file(ftp, remote_filename, local_filename, size=None, modified=None):
+    """
+    원격 파일을 로컬 파일로 저장 (이어받기 지원)
+
+    local_filename.part 에 받은 뒤 크기를 원격 파일과 맞춰 보고 나서야 local_filename 으로
+    원자적으로 바꾼다. 이전 시도에서 남은 .part 가 있으면 REST <offset> 으로 이어받고,
+    서버가 REST 를 지원하지 않으면 처음부터 받는다. 실패해도 .part 는 남겨 다음 시도에서 이어받는다.
+
+    Args:
+        size: 원격 파일 크기 (모르면 SIZE 로 조회)
+        modified: 원격 파일 수정 시각 (이보다 오래된 .part 는 다른 버전이므로 버림)
+
+    Returns:
+        int: 이번에 받은 바이트 수
+    """
+    os.makedirs(os.path.dirname(local_filename) or '.', exist_ok=True)
+    part_filename = local_filename + PART_SUFFIX
+    if size is None:
+        size = _remote_size(ftp, remote_filename)
+
+    offset = os.path.getsize(part_filename) if os.path.exists(part_filename) else 0
+    if offset and modified is not None and os.path.getmtime(part_filename) < modified.timestamp():
+        offset = 0
+    if size is not None and offset > size:
+        offset = 0
+
+    received = 0
+    if size is None or offset < size:
+        if offset:
+            total = f'{size:,}' if size is not None else '?'
+            logger.info(f"파일 이어받기: {remote_filename} ({offset:,}/{total} bytes)")
+        try:
+            received = _retrieve_into(ftp, remote_filename, part_filename, offset)
+        except error_perm as e:
+            if not offset or str(e)[:3] not in _REST_UNSUPPORTED_CODES:
+                raise
+            logger.info(f"REST 미지원 서버 - 처음부터 다시 받음: {remote_filename}")
+            received = _retrieve_into(ftp, remote_filename, part_filename, 0)
+
+    received_size = os.path.getsize(part_filename)
+    if size is not None and received_size != size:
+        if received_size > size:
+            # 전송 중 원격 파일이 바뀜 - 이어받을 수 없으므로 버림
+            os.remove(part_filename)
+        raise FTPIncompleteTransfer(
+            f'파일 크기 불일치: {remote_filename} (원격 {size:,} bytes, 수신 {received_size:,} bytes)'
+        )
+
+    os.replace(part_filename, local_filename)
+    return received
+
+
+def _retrieve_into(ftp, remote_filename, part_filename, offset):
+    """offset 부터 받아 part_filename 에 이어 쓰기 (offset 0 이면 새로 씀)"""
+    received = 0
+
+    with open(part_filename, 'ab' if offset else 'wb') as part_file:
+        def write(block):
+            nonlocal received
+            part_file.write(block)
+            received += len(block)
+
+        ftp.retrbinary(f'RETR {remote_filename}', write, rest=offset or None)
+    return received
+
+
+def stream_file(ftp, remote_filename, size=None, spool_max_size=None):
+    """
+    원격 파일을 SpooledTemporaryFile 로 받기
+
+    spool_max_size(기본값: FTP_STREAM_SPOOL_MAX_BYTES) 이하는 메모리에 두고 넘으면 임시 파일로 옮긴다.
+    받은 크기가 size 와 다르면 FTPIncompleteTransfer. 처음 위치로 되감아 반환하며 닫는 것은 호출한 쪽이 한다.
+    """
+    spool = tempfile.SpooledTemporaryFile(
+        max_size=spool_max_size or getattr(settings, 'FTP_STREAM_SPOOL_MAX_BYTES', 8 * 1024 * 1024)
+    )
+    try:
+        ftp.retrbinary(f'RETR {remote_filename}', spool.write)
+        received_size = spool.tell()
+        if size is not None and received_size != size:
+            raise FTPIncompleteTransfer(
+                f'파일 크기 불일치: {remote_filename} (원격 {size:,} bytes, 수신 {received_size:,} bytes)'
+            )
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def write_archive(spool, local_filename):
+    """스트리밍으로 받은 파일을 local_filename 에 보관 (.part 에 쓴 뒤 이름 변경) 후 spool 닫기"""
+    try:
+        os.makedirs(os.path.dirname(local_filename) or '.', exist_ok=True)
+        part_filename = local_filename + PART_SUFFIX
+        spool.seek(0)
+        with open(part_filename, 'wb') as part_file:
+            shutil.copyfileobj(spool, part_file, 1024 * 1024)
+        os.replace(part_filename, local_filename)
+    finally:
+        spool.close()
+
+
+class _ServerJob:
+    """서버 한 곳의 동시 다운로드 상태 (파일 큐, 연결 풀, 결과)"""
+
+    def __init__(self, server_config, files, pool):
+        self.server_config = server_config
+        self.pool = pool
+        self.files = queue.Queue()
+        for file_info in files:
+            self.files.put(file_info)
+        self.downloaded = []
+        self.lock = threading.Lock()
+
+
+class ConcurrentFTPDownloader:
+    """
+    여러 FTP 서버 동시 다운로드
+
+    전역 스레드 풀(max_workers) 위에서 서버마다 workers_per_server 개의 작업자가
+    서버별 연결 풀의 로그인된 연결을 잡고 그 서버의 파일 큐를 비운다.
+    incremental=True 이면 다운로드 완료 목록과 비교해 새/변경 파일만 큐에 넣는다.
+    작업자는 서버를 번갈아 제출하므로 느린 서버 하나가 다른 서버를 막지 않는다.
+    일시적 오류(연결 끊김, 4xx 응답, 타임아웃, 크기 불일치)는 받은 데까지 이어받도록 지수 백오프로 재시도하고
+    5xx 영구 오류는 바로 실패 처리한다. 파일마다 FTPDataLog 한 행을 작업자가 직접 갱신한다.
+
+    stream=True 이면 파일을 로컬에 먼저 쓰지 않고 SpooledTemporaryFile 로 받아 바로 매출 데이터로
+    저장하고(주유소별로 한 번에 하나씩), local_path 보관본은 별도 스레드에서 쓴다. 보관본까지
+    써야 다운로드 완료 목록에 기록하며 run() 은 보관이 모두 끝난 뒤 반환한다.
+    주유소를 찾지 못한 파일은 보관만 하고 completed 로 남겨 SalesIngestPipeline 이 처리하게 한다.
+    """
+
+    def __init__(self, max_workers=None, workers_per_server=None, timeout=None, retries=None, backoff=None,
+                 incremental=False, stream=False):
+        self.incremental = incremental
+        self.stream = stream
+        self.max_workers = max_workers or getattr(settings, 'FTP_DOWNLOAD_MAX_WORKERS', 16)
+        self.workers_per_server = workers_per_server or getattr(settings, 'FTP_DOWNLOAD_WORKERS_PER_SERVER', 4)
+        self.timeout = timeout or getattr(settings, 'FTP_DOWNLOAD_TIMEOUT', 30)
+        self.retries = getattr(settings, 'FTP_DOWNLOAD_RETRIES', 3) if retries is None else retries
+        self.backoff = getattr(settings, 'FTP_DOWNLOAD_RETRY_BACKOFF', 1.0) if backoff is None else backoff
+
+    def run(self, server_configs):
+        """
+        서버들의 패턴 일치 파일 동시 다운로드
+
+        Returns:
+            dict: {서버 설정 ID: [다운로드한 파일명]}
+        """
+        server_configs = list(server_configs)
+        jobs = []
+        if self.stream:
+            self._ingest = SalesIngestPipeline()
+            self._station_locks = {}
+            self._station_locks_lock = threading.Lock()
+            self._archiver = ThreadPoolExecutor(max_workers=getattr(settings, 'FTP_ARCHIVE_WORKERS', 2))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # 1) 서버별 파일 목록 조회 (서버마다 동시에, 조회한 연결은 풀에 넘김)
+            listings = list(executor.map(self._list_server, server_configs))
+            for server_config, (files, ftp) in zip(server_configs, listings):
+                if self.incremental:
+                    files = FTPFileManifest.pending_files(server_config, files)
+                pool = FTPConnectionPool(server_config, size=max(1, min(self.workers_per_server, len(files))), timeout=self.timeout)
+                pool.adopt(ftp)
+                if files:
+                    jobs.append(_ServerJob(server_config, files, pool))
+                else:
+                    pool.close_all()
+
+            # 2) 서버별 작업자 제출 (서버를 번갈아 가며)
+            futures = []
+            for index in range(self.workers_per_server):
+                for job in jobs:
+                    if index < job.pool.size:
+                        futures.append(executor.submit(self._drain, job))
+            for future in futures:
+                future.result()
+
+        for job in jobs:
+            job.pool.close_all()
+        if self.stream:
+            self._archiver.shutdown(wait=True)
+        return {job.server_config.id: job.downloaded for job in jobs}
+
+    def _list_server(self, server_config):
+        service = FTPDataService(server_config, timeout=self.timeout)
+        try:
+            if not service.connect():
+                return [], None
+            return service.list_files(), service.ftp
+        except Exception as e:
+            logger.error(f"서버 {server_config.name} 파일 목록 조회 실패: {str(e)}")
+            service.disconnect()
+            return [], None
+        finally:
+            close_old_connections()
+
+    def _drain(self, job):
+        """작업자: 서버 파일 큐가 빌 때까지 다운로드"""
+        try:
+            while True:
+                try:
+                    file_info = job.files.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self._download(job, file_info)
+                except Exception as e:
+                    logger.error(f"파일 처리 중 오류: {file_info['name']} - {str(e)}")
+        finally:
+            close_old_connections()
+
+    def _download(self, job, file_info):
+        server_config = job.server_config
+        local_filename = os.path.join(server_config.local_path, file_info['name'])
+        remote_filename = f"{file_info['path'].rstrip('/')}/{file_info['name']}"
+        log_entry = FTPDataLog.objects.create(
+            server_config=server_config,
+            filename=file_info['name'],
+            remote_path=file_info['path'],
+            local_path=local_filename,
+            file_size=file_info['size'],
+            status='downloading'
+        )
+
+        error = None
+        spool = None
+        for attempt in range(self.retries + 1):
+            try:
+                with job.pool.connection() as ftp:
+                    if self.stream:
+                        spool = stream_file(ftp, remote_filename, size=file_info['size'])
+                    else:
+                        retrieve_file(
+                            ftp, remote_filename, local_filename,
+                            size=file_info['size'], modified=file_info.get('modified')
+                        )
+                error = None
+                break
+            except error_perm as e:
+                # 5xx 영구 오류 (파일 없음, 권한 없음 등)는 재시도하지 않음
+                error = e
+                break
+            except (FTPConnectionError, FTPIncompleteTransfer, *all_errors) as e:
+                error = e
+                if attempt < self.retries:
+                    delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.5)
+                    logger.warning(
+                        f"파일 다운로드 재시도 {attempt + 1}/{self.retries}: {file_info['name']} "
+                        f"({delay:.1f}초 후) - {str(e)}"
+                    )
+                    time.sleep(delay)
+
+        if error is None and spool is not None:
+            self._ingest_stream(job, log_entry, file_info, spool)
+        elif error is None:
+            log_entry.status = 'completed'
+            log_entry.downloaded_at = timezone.now()
+            log_entry.save()
+            FTPFileManifest.record(server_config, file_info)
+            with job.lock:
+                job.downloaded.append(file_info['name'])
+            logger.info(f"파일 다운로드 완료: {remote_filename} -> {local_filename}")
+        else:
+            log_entry.status = 'failed'
+            log_entry.error_message = f"다운로드 실패: {file_info['name']} - {str(error)}"
+            log_entry.save()
+            logger.error(f"파일 다운로드 실패: {file_info['name']} - {str(error)}")
+
+    def _ingest_stream(self, job, log_entry, file_info, spool):
+        """스트리밍으로 받은 파일을 바로 매출 데이터로 저장하고 보관본 쓰기를 넘김"""
+        try:
+            station = self._ingest.resolve_station(log_entry)
+            log_entry.status = 'processing' if station else 'completed'
+            log_entry.downloaded_at = timezone.now()
+            log_entry.save()
+            with job.lock:
+                job.downloaded.append(file_info['name'])
+            if station:
+                with self._station_lock(station.id):
+                    self._ingest.ingest(log_entry, station, spool)
+        finally:
+            self._archiver.submit(self._archive, job.server_config, log_entry, file_info, spool)
+
+    def _station_lock(self, station_id):
+        with self._station_locks_lock:
+            return self._station_locks.setdefault(station_id, threading.Lock())
+
+    def _archive(self, server_config, log_entry, file_info, spool):
+        """보관 스레드: local_path 에 보관본을 쓰고 다운로드 완료 목록에 기록"""
+        try:
+            write_archive(spool, log_entry.local_path)
+            FTPFileManifest.record(server_config, file_info)
+        except Exception as e:
+            logger.error(f"파일 보관 실패: {log_entry.local_path} - {str(e)}")
+            FTPDataLog.objects.filter(pk=log_entry.pk).update(
+                error_message=f"보관 실패: {str(e)}", updated_at=timezone.now()
+            )
+        finally:
+            close_old_connections()
+
+
+class SalesIngestPipeline:
+    """
+    다운로드 완료 파일 → 매출 분석/저장
+
+    다운로드가 끝났지만 아직 처리하지 않은 FTPDataLog(completed, processed_at 없음)를
+    주유소별로 묶어 주유소마다 작업자 하나가 순서대로 처리한다. 같은 TID 의 날짜별 데이터를
+    교체하는 작업이 겹치지 않게 하면서, 주유소끼리는 최대 max_workers 곳을 동시에 처리한다.
+    파일마다 상태·수정일이 읽은 그대로일 때만 processing 으로 바꾸는 조건부 UPDATE 로 먼저
+    가져가므로 여러 프로세스가 동시에 실행돼도 같은 파일을 두 번 처리하지 않는다.
+
+    상태 흐름: completed → processing → processed / failed
+    처리 도중 프로세스가 종료되어 processing 으로 processing_timeout 초 넘게 남은 파일은
+    다음 실행에서 다시 가져가 처리한다. 파일 저장은 트랜잭션 하나라 중단된 처리는 아무것도 남기지 않고,
+    이미 저장된 파일을 다시 처리해도 누적매출에 반영된 거래는 다시 더하지 않는다 (ingest_sales_file 참고).
+    스트리밍 모드에서 보관본을 쓰기 전에 종료되어 로컬 파일이 없으면 failed 로 바꾸며,
+    다운로드 완료 목록에도 기록되지 않았으므로 다음 증분 동기화에서 다시 받는다.
+
+    주유소는 FTP 설정의 주유소, 없으면 파일명에 든 TID(예: 매출_1234567890.xlsx)로 정한다.
+    """
+
+    def __init__(self, max_workers=None, processing_timeout=None):
+        self.max_workers = max_workers or getattr(settings, 'FTP_INGEST_WORKERS', 4)
+        self.processing_timeout = processing_timeout or getattr(settings, 'FTP_INGEST_PROCESSING_TIMEOUT_SECONDS', 1800)
+        self._stations_by_tid = {}
+
+    def run(self, server_configs=None):
+        """
+        처리 대기 파일 처리
+
+        Args:
+            server_configs: 이 설정들로 받은 파일만 (None 이면 전체)
+
+        Returns:
+            dict: processed(처리 파일 수), failed(실패 파일 수), rows(저장 행 수)
+        """
+        stale_before = timezone.now() - timedelta(seconds=self.processing_timeout)
+        logs = FTPDataLog.objects.filter(
+            Q(status='completed') | Q(status='processing', updated_at__lt=stale_before),
+            processed_at__isnull=True
+        ).select_related('server_config__station__station_profile').order_by('id')
+        if server_configs is not None:
+            logs = logs.filter(server_config__in=list(server_configs))
+
+        groups = {}
+        result = {'processed': 0, 'failed': 0, 'rows': 0}
+        for log_entry in logs:
+            if log_entry.status == 'processing':
+                logger.warning(f"처리 중 중단된 파일 다시 처리: {log_entry.filename} (마지막 갱신: {log_entry.updated_at})")
+                if not os.path.exists(log_entry.local_path):
+                    # 스트리밍 수신 후 보관 전에 중단됨 (다운로드 완료 목록에 없으므로 다음 동기화에서 다시 받음)
+                    if self._claim(log_entry, status='failed',
+                                   error_message=f"처리 중단: 보관본 없음, 다음 동기화에서 다시 받음 ({log_entry.local_path})"):
+                        result['failed'] += 1
+                    continue
+            station = self.resolve_station(log_entry)
+            if station is None:
+                if self._claim(log_entry, status='failed',
+                               error_message=f"처리 실패: 주유소 TID 를 찾을 수 없음 ({log_entry.filename})"):
+                    result['failed'] += 1
+                continue
+            groups.setdefault(station.id, (station, []))[1].append(log_entry)
+        if not groups:
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(groups)))) as executor:
+            for station_result in executor.map(lambda group: self._process_station(*group), groups.values()):
+                for key in result:
+                    result[key] += station_result[key]
+
+        logger.info(f"매출 파일 처리 완료: {result['processed']}개 처리, {result['failed']}개 실패, {result['rows']}행 저장")
+        return result
+
+    def resolve_station(self, log_entry):
+        """로그 파일의 주유소 (FTP 설정의 주유소, 없으면 파일명의 TID 로 찾음, 못 찾으면 None)"""
+        station = log_entry.server_config.station
+        if station is not None and getattr(getattr(station, 'station_profile', None), 'tid', None):
+            return station
+
+        from OilNote_User.models import StationProfile
+
+        tokens = [token for token in re.split(r'[^0-9A-Za-z]+', os.path.splitext(log_entry.filename)[0]) if token]
+        unknown = [token for token in tokens if token not in self._stations_by_tid]
+        if unknown:
+            for profile in StationProfile.objects.filter(tid__in=unknown).select_related('user'):
+                self._stations_by_tid[profile.tid] = profile.user
+            for token in unknown:
+                self._stations_by_tid.setdefault(token, None)
+        return next((self._stations_by_tid[token] for token in tokens if self._stations_by_tid[token]), None)
+
+    def _process_station(self, station, log_entries):
+        """작업자: 주유소 한 곳의 파일을 받은 순서대로 처리"""
+        result = {'processed': 0, 'failed': 0, 'rows': 0}
+        try:
+            for log_entry in log_entries:
+                if not self._claim(log_entry, status='processing'):
+                    continue
+                rows = self.ingest(log_entry, station, log_entry.local_path)
+                if rows is None:
+                    result['failed'] += 1
+                else:
+                    result['processed'] += 1
+                    result['rows'] += rows
+        finally:
+            close_old_connections()
+        return result
+
+    def ingest(self, log_entry, station, source):
+        """
+        처리 중(processing) 파일 하나를 매출 데이터로 저장하고 결과를 로그에 기록
+
+        Args:
+            source: 파일 경로 또는 파일 객체
+
+        Returns:
+            int: 저장한 행 수 (실패하면 None)
+        """
+        from OilNote_StationApp.services.sales_ingest import ingest_sales_file
+
+        tid = station.station_profile.tid
+        started = time.perf_counter()
+        try:
+            ingested = ingest_sales_file(source, station, tid, log_entry.filename)
+        except Exception as e:
+            logger.error(f"매출 파일 처리 실패: {log_entry.filename} (TID: {tid}) - {str(e)}", exc_info=True)
+            self._mark(
+                log_entry, 'processing', status='failed',
+                error_message=f"처리 실패: {str(e)}",
+                processing_seconds=time.perf_counter() - started
+            )
+            return None
+
+        elapsed = time.perf_counter() - started
+        self._mark(
+            log_entry, 'processing', status='processed',
+            processed_at=timezone.now(),
+            processed_rows=ingested['saved_count'],
+            processing_seconds=elapsed
+        )
+        logger.info(f"매출 파일 처리 완료: {log_entry.filename} (TID: {tid}) - {ingested['saved_count']}행, {elapsed:.1f}초")
+        return ingested['saved_count']
+
+    @staticmethod
+    def _claim(log_entry, **values):
+        """읽은 뒤 상태·수정일이 바뀌지 않았을 때만 갱신 (다른 프로세스가 가져간 파일이면 False)"""
+        values.setdefault('updated_at', timezone.now())
+        return FTPDataLog.objects.filter(
+            pk=log_entry.pk, status=log_entry.status, updated_at=log_entry.updated_at
+        ).update(**values) == 1
+
+    @staticmethod
+    def _mark(log_entry, expected_status, **values):
+        """상태가 expected_status 일 때만 갱신 (다른 프로세스가 가져간 파일이면 False)"""
+        values.setdefault('updated_at', timezone.now())
+        return FTPDataLog.objects.filter(pk=log_entry.pk, status=expected_status).update(**values) == 1
+
+
+class CronExpression:
+    """
+    5필드 cron 표현식 (분 시 일 월 요일)
+
+    *, 숫자, 범위(a-b), 목록(a,b), 간격(*/n, a-b/n)을 지원한다. 요일은 0-7 (0, 7 = 일요일).
+    일과 요일이 모두 * 가 아니면 cron 과 같이 둘 중 하나만 맞아도 실행한다.
+    """
+    FIELDS = (('분', 0, 59), ('시', 0, 23), ('일', 1, 31), ('월', 1, 12), ('요일', 0, 7))
+
+    def __init__(self, expression):
+        parts = str(expression).split()
+        if len(parts) != 5:
+            raise ValueError('Cron 표현식은 "분 시 일 월 요일" 5개 필드여야 합니다.')
+        self.expression = ' '.join(parts)
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            sorted(self._parse_field(part, *field)) for part, field in zip(parts, self.FIELDS)
+        )
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.day_restricted = not parts[2].startswith('*')
+        self.weekday_restricted = not parts[4].startswith('*')
+
+    @staticmethod
+    def _parse_field(part, name, low, high):
+        values = set()
+        for item in part.split(','):
+            step = 1
+            if '/' in item:
+                item, step_text = item.split('/', 1)
+                if not step_text.isdigit() or int(step_text) < 1:
+                    raise ValueError(f'{name} 필드 간격 오류: {part}')
+                step = int(step_text)
+            if item == '*':
+                start, end = low, high
+            elif '-' in item:
+                start_text, end_text = item.split('-', 1)
+                if not (start_text.isdigit() and end_text.isdigit()):
+                    raise ValueError(f'{name} 필드 형식 오류: {part}')
+                start, end = int(start_text), int(end_text)
+            elif item.isdigit():
+                start = int(item)
+                end = high if step > 1 else start
+            else:
+                raise ValueError(f'{name} 필드 형식 오류: {part}')
+            if not low <= start <= end <= high:
+                raise ValueError(f'{name} 필드 범위 오류: {part} ({low}-{high})')
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day):
+        in_days = day.day in self.days
+        in_weekdays = day.isoweekday() % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def next_after(self, after):
+        """after 이후 첫 실행 시각 (after 와 같은 시간대)"""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(366 * 5):
+            if day.month in self.months and self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime.combine(day, dt_time(hour, minute), tzinfo=after.tzinfo)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f'실행 시각이 없는 Cron 표현식: {self.expression}')
+
+
+def next_schedule_time(schedule, after):
+    """
+    after 이후 스케줄 기준 시각 (지터 제외)
+
+    매시간/매일/매주/매월은 정시, 자정, 월요일 자정, 1일 자정에 맞추고
+    사용자 정의는 Cron 표현식을 따른다.
+    """
+    if schedule.schedule_type == 'custom':
+        return CronExpression(schedule.cron_expression or '').next_after(after)
+
+    base = after.replace(minute=0, second=0, microsecond=0)
+    if schedule.schedule_type == 'hourly':
+        return base + timedelta(hours=1)
+    base = base.replace(hour=0)
+    if schedule.schedule_type == 'daily':
+        return base + timedelta(days=1)
+    if schedule.schedule_type == 'weekly':
+        return base + timedelta(days=7 - base.weekday())
+    if schedule.schedule_type == 'monthly':
+        return (base.replace(day=1) + timedelta(days=32)).replace(day=1)
+    raise ValueError(f'알 수 없는 스케줄 타입: {schedule.schedule_type}')
+
+
+def schedule_next_run(schedule, after):
+    """
+    다음 실행 시각 (기준 시각 + 스케줄별 고정 지터)
+
+    주유소 수백 곳이 같은 정각에 몰리지 않도록 스케줄 ID 로 정한 0~FTP_SCHEDULER_JITTER_SECONDS 초를
+    더한다. 지터는 실행 주기의 절반을 넘지 않는다.
+    """
+    occurrence = next_schedule_time(schedule, after)
+    period = (next_schedule_time(schedule, occurrence) - occurrence).total_seconds()
+    jitter = int(min(getattr(settings, 'FTP_SCHEDULER_JITTER_SECONDS', 300), period / 2))
+    offset = zlib.crc32(f'ftp-schedule:{schedule.pk}'.encode()) % (jitter + 1)
+    return occurrence + timedelta(seconds=offset)
+
+
+class FTPScheduler:
+    """
+    FTPDataSchedule 실행기
+
+    실행 시각이 된 스케줄을 SELECT ... FOR UPDATE SKIP LOCKED 로 잠그고, 같은 트랜잭션에서
+    last_run/next_run 을 다음 실행 시각으로 옮겨 가져간다. 그래서 여러 프로세스가 함께 돌아도
+    한 번의 실행 시각은 한 곳에서만 처리한다. 가져간 스케줄은 최대 max_concurrent 개를 동시에
+    증분 다운로드 → 매출 처리하고 실행 시간/다운로드 수/오류를 스케줄에 남긴다.
+    꺼져 있던 동안 지난 실행 시각은 몰아서 실행하지 않고 한 번만 실행한다.
+    """
+
+    def __init__(self, max_concurrent=None, batch_size=100):
+        self.max_concurrent = max_concurrent or getattr(settings, 'FTP_SCHEDULER_MAX_CONCURRENT', 4)
+        self.batch_size = batch_size
+
+    def tick(self, now=None):
+        """
+        실행 시각이 된 스케줄 실행 (끝날 때까지 대기)
+
+        Returns:
+            list: [{'schedule', 'downloaded', 'processed', 'rows', 'duration', 'error'}]
+        """
+        now = now or timezone.now()
+        self.initialize(now)
+        claimed = self.claim_due(now)
+        if not claimed:
+            return []
+
+        # 같은 서버의 스케줄이 함께 걸리면 한 번만 받음
+        by_server = {}
+        for schedule in claimed:
+            by_server.setdefault(schedule.server_config_id, []).append(schedule)
+        configs = FTPServerConfig.objects.in_bulk(list(by_server))
+
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrent, len(by_server)))) as executor:
+            runs = executor.map(
+                lambda item: self._run(configs.get(item[0]), item[1]),
+                by_server.items()
+            )
+            for run_results in runs:
+                results.extend(run_results)
+        return results
+
+    def initialize(self, now):
+        """다음 실행 시각이 없는 활성 스케줄에 다음 실행 시각 지정"""
+        for schedule in FTPDataSchedule.objects.filter(is_active=True, next_run__isnull=True):
+            try:
+                next_run = schedule_next_run(schedule, now)
+            except ValueError as e:
+                self._disable(schedule, e)
+                continue
+            FTPDataSchedule.objects.filter(pk=schedule.pk, next_run__isnull=True).update(
+                next_run=next_run, updated_at=now
+            )
+
+    def claim_due(self, now):
+        """실행 시각이 된 스케줄을 잠그고 다음 실행 시각으로 옮긴 뒤 반환"""
+        claimed = []
+        with transaction.atomic():
+            due = FTPDataSchedule.objects.select_for_update(skip_locked=True).filter(
+                is_active=True,
+                next_run__lte=now
+            ).order_by('next_run')[:self.batch_size]
+            for schedule in due:
+                try:
+                    schedule.next_run = schedule_next_run(schedule, now)
+                except ValueError as e:
+                    self._disable(schedule, e)
+                    continue
+                schedule.last_run = now
+                schedule.save(update_fields=['last_run', 'next_run', 'updated_at'])
+                claimed.append(schedule)
+        return claimed
+
+    def _run(self, server_config, schedules):
+        """작업 스레드: 서버 한 곳 증분 다운로드 → 매출 처리 후 스케줄에 결과 기록"""
+        started = time.perf_counter()
+        downloaded, ingested, error = [], {'processed': 0, 'failed': 0, 'rows': 0}, None
+        try:
+            if server_config is None or not server_config.is_active:
+                error = '비활성 FTP 설정'
+            else:
+                downloaded = ConcurrentFTPDownloader(
+                    incremental=True, stream=getattr(settings, 'FTP_STREAM_INGEST', False)
+                ).run([server_config]).get(server_config.id, [])
+                ingested = SalesIngestPipeline().run([server_config])
+        except Exception as e:
+            error = str(e)
+            logger.error(f"스케줄 실행 오류 - 서버: {getattr(server_config, 'name', '-')}, 오류: {error}", exc_info=True)
+        finally:
+            duration = time.perf_counter() - started
+            try:
+                FTPDataSchedule.objects.filter(pk__in=[schedule.pk for schedule in schedules]).update(
+                    last_duration=duration,
+                    last_downloaded=len(downloaded),
+                    last_error=error,
+                    updated_at=timezone.now()
+                )
+            finally:
+                close_old_connections()
+
+        for schedule in schedules:
+            logger.info(
+                f"스케줄 실행 완료: {schedule.name} - {len(downloaded)}개 다운로드, "
+                f"{ingested['rows']}행 저장, {duration:.1f}초" + (f", 오류: {error}" if error else '')
+            )
+        return [
+            {
+                'schedule': schedule,
+                'downloaded': len(downloaded),
+                'processed': ingested['processed'],
+                'rows': ingested['rows'],
+                'duration': duration,
+                'error': error,
+            }
+            for schedule in schedules
+        ]
+
+    @staticmethod
+    def _disable(schedule, error):
+        logger.error(f"스케줄 비활성화 - {schedule.name}: {error}")
+        FTPDataSchedule.objects.filter(pk=schedule.pk).update(
+            is_active=False, next_run=None, last_error=f"스케줄 설정 오류: {error}", updated_at=timezone.now()
+        )
 
 
 class FTPDataManager:
     """FTP 데이터 관리자 클래스"""
     
     @staticmethod
-    def download_from_all_servers():
-        """모든 활성화된 FTP 서버에서 파일 다운로드"""
+    def download_from_all_servers(concurrent=False, incremental=False, **options):
+        """
+        모든 활성화된 FTP 서버에서 파일 다운로드
+
+        concurrent=True 이면 서버들을 동시에 처리하고 {서버 설정 ID: [파일명]} 을 반환한다.
+        incremental=True 이면 새로 생겼거나 바뀐 파일만 받는다.
+        (options: ConcurrentFTPDownloader 인자 - max_workers, workers_per_server, timeout, retries, backoff)
+        """
         active_configs = FTPServerConfig.objects.filter(is_active=True)
         
+        if concurrent:
+            active_configs = list(active_configs)
+            results = ConcurrentFTPDownloader(incremental=incremental, **options).run(active_configs)
+            for config in active_configs:
+                logger.info(f"서버 {config.name}에서 {len(results.get(config.id, []))}개 파일 다운로드 완료")
+            return results
+        
         for config in active_configs:
             try:
                 service = FTPDataService(config)
-                downloaded_files = service.download_all_files()
+                downloaded_files = service.download_all_files(incremental=incremental)
                 service.disconnect()
                 
                 logger.info(f"서버 {config.name}에서 {len(downloaded_files)}개 파일 다운로드 완료")
@@ -220,6 +1175,11 @@ class FTPDataManager:
                 logger.error(f"서버 {config.name} 처리 중 오류: {str(e)}")
                 continue
     
+    @staticmethod
+    def process_downloaded_files(server_configs=None, workers=None):
+        """다운로드 완료 파일 매출 처리 (server_configs 가 None 이면 전체)"""
+        return SalesIngestPipeline(max_workers=workers).run(server_configs)
+    
     @staticmethod
     def get_download_logs(server_config=None, status=None, limit=50):
         """다운로드 로그 조회"""
@@ -235,13 +1195,10 @@ class FTPDataManager:
     
     @staticmethod
     def cleanup_old_logs(days=30):
-        """오래된 로그 정리"""
-        from datetime import timedelta
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
-        deleted_count = FTPDataLog.objects.filter(
-            created_at__lt=cutoff_date
-        ).delete()[0]
+        """오래된 로그 정리 (PK 구간 단위로 나눠 삭제)"""
+        from OilNote_AdminApp.services.retention import purge_expired
+
+        deleted_count = purge_expired(FTPDataLog, 'created_at', days)['deleted']
         
         logger.info(f"{deleted_count}개의 오래된 로그 삭제 완료")
-        return deleted_count 
\ No newline at end of file
+        return deleted_count
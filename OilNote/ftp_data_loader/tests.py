@@ -1,3 +1,123 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+
+from .models import FTPDataSchedule
+from .services import CronExpression, next_schedule_time, schedule_next_run
+
+
+class CronExpressionTests(SimpleTestCase):
+    """5필드 cron 표현식 해석"""
+
+    def test_lists_ranges_and_steps(self):
+        cron = CronExpression('0,30 9-17/2 */10 1-3,12 *')
+
+        self.assertEqual(cron.minutes, [0, 30])
+        self.assertEqual(cron.hours, [9, 11, 13, 15, 17])
+        self.assertEqual(cron.days, [1, 11, 21, 31])
+        self.assertEqual(cron.months, [1, 2, 3, 12])
+
+    def test_start_with_step_runs_to_end_of_range(self):
+        self.assertEqual(CronExpression('5/20 * * * *').minutes, [5, 25, 45])
+
+    def test_sunday_is_zero_or_seven(self):
+        self.assertEqual(CronExpression('0 0 * * 7').weekdays, {0})
+        self.assertEqual(CronExpression('0 0 * * 5-7').weekdays, {0, 5, 6})
+
+    def test_invalid_expressions(self):
+        for expression in ('0 0 * *', '60 * * * *', '0 0 0 * *', '*/0 * * * *', '5-1 * * * *', 'a * * * *'):
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                CronExpression(expression)
+
+    def test_next_after_skips_to_matching_weekday(self):
+        # 2026-10-17 은 토요일
+        cron = CronExpression('30 9 * * 1-5')
+
+        self.assertEqual(cron.next_after(datetime(2026, 10, 17, 10, 0)), datetime(2026, 10, 19, 9, 30))
+
+    def test_next_after_is_strictly_later(self):
+        cron = CronExpression('*/15 * * * *')
+
+        self.assertEqual(cron.next_after(datetime(2026, 10, 17, 10, 15)), datetime(2026, 10, 17, 10, 30))
+        self.assertEqual(cron.next_after(datetime(2026, 10, 17, 10, 14, 59)), datetime(2026, 10, 17, 10, 15))
+
+    def test_day_and_weekday_match_either(self):
+        # 일과 요일이 모두 지정되면 13일 또는 금요일 (2026-10-02 금요일, 2026-10-13 화요일)
+        cron = CronExpression('0 0 13 * 5')
+
+        self.assertEqual(cron.next_after(datetime(2026, 10, 1)), datetime(2026, 10, 2))
+        self.assertEqual(cron.next_after(datetime(2026, 10, 10)), datetime(2026, 10, 13))
+
+    def test_day_or_weekday_alone(self):
+        self.assertEqual(CronExpression('0 0 13 * *').next_after(datetime(2026, 10, 1)), datetime(2026, 10, 13))
+        self.assertEqual(CronExpression('0 0 * * 5').next_after(datetime(2026, 10, 3)), datetime(2026, 10, 9))
+
+    def test_impossible_date_raises(self):
+        with self.assertRaises(ValueError):
+            CronExpression('0 0 31 2 *').next_after(datetime(2026, 10, 1))
+
+
+class NextScheduleTimeTests(SimpleTestCase):
+    """스케줄 타입별 기준 실행 시각"""
+
+    after = datetime(2026, 10, 15, 13, 20)  # 목요일
+
+    def test_fixed_schedule_types(self):
+        expected = {
+            'hourly': datetime(2026, 10, 15, 14, 0),
+            'daily': datetime(2026, 10, 16),
+            'weekly': datetime(2026, 10, 19),
+            'monthly': datetime(2026, 11, 1),
+        }
+        for schedule_type, next_time in expected.items():
+            with self.subTest(schedule_type=schedule_type):
+                schedule = FTPDataSchedule(schedule_type=schedule_type)
+                self.assertEqual(next_schedule_time(schedule, self.after), next_time)
+
+    def test_monthly_at_year_end(self):
+        schedule = FTPDataSchedule(schedule_type='monthly')
+
+        self.assertEqual(next_schedule_time(schedule, datetime(2026, 12, 31, 23, 59)), datetime(2027, 1, 1))
+
+    def test_custom_uses_cron_expression(self):
+        schedule = FTPDataSchedule(schedule_type='custom', cron_expression='0 6,18 * * *')
+
+        self.assertEqual(next_schedule_time(schedule, self.after), datetime(2026, 10, 15, 18, 0))
+
+    def test_custom_impossible_date_raises(self):
+        schedule = FTPDataSchedule(schedule_type='custom', cron_expression='0 0 31 2 *')
+
+        with self.assertRaises(ValueError):
+            next_schedule_time(schedule, self.after)
+
+
+class ScheduleNextRunTests(SimpleTestCase):
+    """다음 실행 시각의 스케줄별 지터"""
+
+    after = datetime(2026, 10, 15, 13, 20)
+
+    def jitters(self, **fields):
+        offsets = []
+        for pk in range(1, 201):
+            schedule = FTPDataSchedule(pk=pk, **fields)
+            offsets.append(schedule_next_run(schedule, self.after) - next_schedule_time(schedule, self.after))
+        return offsets
+
+    @override_settings(FTP_SCHEDULER_JITTER_SECONDS=300)
+    def test_jitter_is_within_setting(self):
+        offsets = self.jitters(schedule_type='hourly')
+
+        self.assertTrue(all(timedelta(0) <= offset <= timedelta(seconds=300) for offset in offsets))
+        # 스케줄마다 다르게 흩어짐
+        self.assertGreater(len(set(offsets)), 1)
+
+    @override_settings(FTP_SCHEDULER_JITTER_SECONDS=3600)
+    def test_jitter_is_capped_at_half_the_period(self):
+        offsets = self.jitters(schedule_type='custom', cron_expression='*/10 * * * *')
+
+        self.assertTrue(all(timedelta(0) <= offset <= timedelta(minutes=5) for offset in offsets))
+
+    def test_jitter_is_stable_per_schedule(self):
+        schedule = FTPDataSchedule(pk=42, schedule_type='daily')
+
+        self.assertEqual(schedule_next_run(schedule, self.after), schedule_next_run(schedule, self.after))
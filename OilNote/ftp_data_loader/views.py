@@ -164,9 +164,8 @@ def ftp_download_files(request, server_id):
     
     if request.method == 'POST':
         try:
-            service = FTPDataService(server)
-            downloaded_files = service.download_all_files()
-            service.disconnect()
+            # 서버당 여러 연결로 동시 다운로드 (FTP_DOWNLOAD_WORKERS_PER_SERVER)
+            downloaded_files = FTPDataService(server).download_all_files_concurrent()
             
             if downloaded_files:
                 messages.success(request, f'{len(downloaded_files)}개 파일이 다운로드되었습니다.')
@@ -266,7 +265,7 @@ def ftp_bulk_download(request):
     """모든 활성화된 FTP 서버에서 파일 다운로드"""
     if request.method == 'POST':
         try:
-            FTPDataManager.download_from_all_servers()
+            FTPDataManager.download_from_all_servers(concurrent=True)
             messages.success(request, '모든 FTP 서버에서 파일 다운로드가 완료되었습니다.')
         except Exception as e:
             messages.error(request, f'일괄 다운로드 중 오류가 발생했습니다: {str(e)}')